@@ -4,32 +4,35 @@ Clean, modular version using separate modules for better maintainability
 """
 
 import streamlit as st
-import PyPDF2
 import time
 import base64
 import requests
 import json
-from docx import Document
+import hashlib
 import math
 import re
-import tempfile
 import os
-import mimetypes
-import google.generativeai as genai
 import subprocess
 import threading
 import atexit
 import io
-import uuid
-import hashlib
-try:
-    import ffmpeg
-except ImportError:
-    ffmpeg = None
 
 # Import from our modules
 from modules.config import *
-from modules.utils import flush_debug_logs_to_streamlit, extract_modules_from_file_content
+from modules.prompt_builder import tracked_generate
+from modules.models import editable_pathways_from_pathway, dumps as dumps_pathways
+from modules.pathway_store import PastPathways, get_pathway_store
+from modules.pathway_patch import PatchLog, PatchError
+from modules.module_index import get_module_index
+from modules.mind_map import get_pathway_mind_map, mind_map_for_pathway
+from modules.transcript_cleaner import is_transcript
+from modules.pipeline import get_pipeline
+from modules.intent_classifier import classify_intent
+from modules.widget_keys import WidgetKeyAllocator
+from modules.app_log import set_log_session, ring_buffer, debug_print
+from modules.telemetry import span, summarize_spans, to_jsonl, to_otlp, clear_spans
+from modules.block_render import paginate, MODULES_PER_PAGE, SECTIONS_PER_PAGE
+from modules.content_blocks import generate_content_blocks, get_content_block_cache, DEFAULT_BLOCK_TYPES, BLOCK_FIELDS, PREFETCH_AHEAD
 from modules.chatbot import create_pathway_chatbot, create_pathway_chatbot_popup, process_chatbot_request
 from markmap_component import markmap
 
@@ -105,20 +108,24 @@ def start_backend_server():
             text=True
         )
         
-        # Wait for server to start with better timeout
+        # Wait for server to start, polling often so a fast start is picked up right away
         st.info("⏳ Waiting for backend server to start...")
-        for i in range(10):
-            time.sleep(1)
+        for i in range(50):
+            time.sleep(0.2)
+            if backend_process.poll() is not None:
+                break  # The process exited; no point waiting for it
             try:
-                response = requests.get("http://localhost:8000/health", timeout=3)
+                response = requests.get("http://localhost:8000/health", timeout=1)
                 if response.status_code == 200:
                     st.success("✅ Backend server started successfully")
                     return True
             except:
-                if i < 5:
-                    st.info(f"⏳ Waiting for backend... ({i+1}/10)")
-                else:
-                    st.info(f"⏳ Backend is taking longer than expected... ({i+1}/10)")
+                if i % 5 == 4:
+                    seconds = (i + 1) // 5
+                    if seconds < 5:
+                        st.info(f"⏳ Waiting for backend... ({seconds}/10)")
+                    else:
+                        st.info(f"⏳ Backend is taking longer than expected... ({seconds}/10)")
         
         # If we get here, backend didn't start
         st.error("❌ Backend server failed to start within timeout")
@@ -157,56 +164,59 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Global widget key registry to prevent duplicates
-WIDGET_KEY_REGISTRY = set()
+def get_pathway_owner():
+    """
+    Key that scopes stored pathways to one user. It is kept in the page URL
+    (?owner=...), so reloading or bookmarking the page keeps the same history
+    while other browser sessions get their own.
+    """
+    if 'pathway_owner' not in st.session_state:
+        owner = st.query_params.get('owner', '')
+        if not re.fullmatch(r'[0-9a-f]{16,64}', owner or ''):
+            owner = os.urandom(12).hex()
+            st.query_params['owner'] = owner
+        st.session_state['pathway_owner'] = owner
+    return st.session_state['pathway_owner']
+
+def get_widget_key_allocator():
+    """The session's widget key allocator"""
+    if 'widget_key_allocator' not in st.session_state:
+        st.session_state['widget_key_allocator'] = WidgetKeyAllocator()
+    return st.session_state['widget_key_allocator']
 
-def generate_unique_widget_key(base_key, content_hash=None):
+def generate_unique_widget_key(base_key, identity=None, revision=None):
     """
-    Generate a guaranteed unique widget key for Streamlit components
-    Prevents DuplicateWidgetID errors by using UUID and content hashing
+    Generate a deterministic widget key for Streamlit components
+    The same widget gets the same key on every rerun so it keeps its state;
+    repeats within one run get a counter suffix to prevent DuplicateWidgetID errors
     """
-    try:
-        # Sanitize the base key
-        sanitized_base = re.sub(r'[^a-zA-Z0-9_]', '_', str(base_key))
-        
-        # Create content-based hash if content provided
-        if content_hash:
-            content_id = hashlib.md5(str(content_hash).encode()).hexdigest()[:8]
-        else:
-            content_id = str(uuid.uuid4())[:8]
-        
-        # Generate unique key with timestamp component
-        timestamp = int(time.time() * 1000000) % 1000000  # Last 6 digits of microsecond timestamp
-        unique_key = f"{sanitized_base}_{content_id}_{timestamp}"
-        
-        # Ensure absolute uniqueness by checking registry
-        counter = 0
-        original_key = unique_key
-        while unique_key in WIDGET_KEY_REGISTRY:
-            counter += 1
-            unique_key = f"{original_key}_{counter}"
-        
-        # Register the key
-        WIDGET_KEY_REGISTRY.add(unique_key)
-        
-        return unique_key
-        
-    except Exception as e:
-        # Fallback to pure UUID if anything fails
-        fallback_key = f"widget_{uuid.uuid4().hex[:12]}"
-        WIDGET_KEY_REGISTRY.add(fallback_key)
-        return fallback_key
+    return get_widget_key_allocator().key(base_key, identity, revision)
 
 def clear_widget_key_registry():
-    """Clear the widget key registry - useful for testing or reset"""
-    global WIDGET_KEY_REGISTRY
-    WIDGET_KEY_REGISTRY.clear()
+    """Reset the session's widget keys - useful for testing or reset"""
+    st.session_state['widget_key_allocator'] = WidgetKeyAllocator()
 
 # Main application
 def main():
+    # Widget key counters start over on every run
+    get_widget_key_allocator().begin_run()
+    
+    # Logs from this run go to the session's ring buffer
+    if 'log_session_id' not in st.session_state:
+        st.session_state['log_session_id'] = os.urandom(6).hex()
+    set_log_session(st.session_state['log_session_id'])
+    
     # Initialize session state variables
     if 'ai_cache' not in st.session_state:
         st.session_state.ai_cache = {}
+    # Past pathways live in the on-disk store; session state only holds a lazy view
+    # of the rows that belong to this browser session
+    if 'past_generated_pathways' not in st.session_state:
+        try:
+            st.session_state['past_generated_pathways'] = PastPathways(get_pathway_store(), owner=get_pathway_owner())
+        except Exception as e:
+            debug_print("⚠️ Pathway store unavailable, keeping history in memory: %s", e)
+            st.session_state['past_generated_pathways'] = []
     
     # Start backend server automatically
     if not start_backend_server():
@@ -229,18 +239,19 @@ def main():
         ["🏠 Home", "🔍 Training Discovery", "🧠 Mind Maps", "📹 Video Generation", "📄 Document Processing", "⚙️ Settings"]
     )
     
-    if page == "🏠 Home":
-        show_home_page()
-    elif page == "🔍 Training Discovery":
-        show_training_discovery_page()
-    elif page == "🧠 Mind Maps":
-        show_mind_maps_page()
-    elif page == "📹 Video Generation":
-        show_video_generation_page()
-    elif page == "📄 Document Processing":
-        show_document_processing_page()
-    elif page == "⚙️ Settings":
-        show_settings_page()
+    with span('render.page', page=page):
+        if page == "🏠 Home":
+            show_home_page()
+        elif page == "🔍 Training Discovery":
+            show_training_discovery_page()
+        elif page == "🧠 Mind Maps":
+            show_mind_maps_page()
+        elif page == "📹 Video Generation":
+            show_video_generation_page()
+        elif page == "📄 Document Processing":
+            show_document_processing_page()
+        elif page == "⚙️ Settings":
+            show_settings_page()
 
 def show_home_page():
     """Home page with overview and quick actions"""
@@ -764,89 +775,11 @@ def show_training_discovery_page():
                     )
                     file_categories[uploaded_file.name] = category
                 # --- Extract text from file ---
-                file_text = ""
-                mime_type, _ = mimetypes.guess_type(uploaded_file.name)
-                if uploaded_file.type == "application/pdf":
-                    try:
-                        # Create a file-like object from the uploaded file
-                        pdf_file = uploaded_file.getvalue()
-                        # Ensure we have bytes for PyPDF2
-                        if isinstance(pdf_file, str):
-                            pdf_file = pdf_file.encode('utf-8')
-                        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
-                        for page in pdf_reader.pages:
-                            file_text += page.extract_text() or ""
-                    except Exception as e:
-                        file_text = f"[Error extracting PDF: {e}]"
-                elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                    try:
-                        doc = Document(uploaded_file)
-                        for paragraph in doc.paragraphs:
-                            file_text += paragraph.text + "\n"
-                    except Exception as e:
-                        file_text = f"[Error extracting DOCX: {e}]"
-                elif uploaded_file.type == "text/plain":
-                    try:
-                        file_text = uploaded_file.getvalue().decode(errors="ignore")
-                    except Exception as e:
-                        file_text = f"[Error extracting TXT: {e}]"
-                elif uploaded_file.type.startswith("audio/"):
-                    try:
-                        # Save audio to temp file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[-1]) as tmp_audio:
-                            tmp_audio.write(uploaded_file.getvalue())
-                            tmp_audio_path = tmp_audio.name
-                        # Transcribe with Gemini
-                                                    # Note: Using the model from modules.config instead of direct import
-                            from modules.config import model
-                            if model:
-                                with open(tmp_audio_path, 'rb') as audio_file:
-                                    response = model.generate_content([
-                                        "Generate a transcript of the speech.",
-                                        {"mime_type": "audio/wav", "data": audio_file.read()}
-                                    ])
-                                    file_text = response.text
-                            else:
-                                file_text = "[AI model not available for transcription]"
-                        os.unlink(tmp_audio_path)
-                    except Exception as e:
-                        file_text = f"[Error transcribing audio: {e}]"
-                elif uploaded_file.type.startswith("video/") or (mime_type and mime_type.startswith("video/")):
-                    if ffmpeg is None:
-                        file_text = "[ffmpeg-python not installed. Cannot extract audio from video.]"
-                    else:
-                        try:
-                            # Save video to temp file
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[-1]) as tmp_video:
-                                tmp_video.write(uploaded_file.getvalue())
-                                tmp_video_path = tmp_video.name
-                            # Extract audio to temp file
-                            tmp_audio_path = tmp_video_path + ".audio.wav"
-                            (
-                                ffmpeg
-                                .input(tmp_video_path)
-                                .output(tmp_audio_path, format='wav', acodec='pcm_s16le', ac=1, ar='16k')
-                                .overwrite_output()
-                                .run(quiet=True)
-                            )
-                            # Transcribe with Gemini
-                            # Note: Using the model from modules.config instead of direct import
-                            from modules.config import model
-                            if model:
-                                with open(tmp_audio_path, 'rb') as audio_file:
-                                    response = model.generate_content([
-                                        "Generate a transcript of the speech.",
-                                        {"mime_type": "audio/wav", "data": audio_file.read()}
-                                    ])
-                                    file_text = response.text
-                            else:
-                                file_text = "[AI model not available for transcription]"
-                            os.unlink(tmp_video_path)
-                            os.unlink(tmp_audio_path)
-                        except Exception as e:
-                            file_text = f"[Error extracting/transcribing video: {e}]"
-                else:
-                    file_text = "[Unsupported file type for extraction]"
+                # Extraction is a pipeline stage keyed by the file bytes, so reruns
+                # and goal changes reuse the text instead of parsing or transcribing again
+                file_data = uploaded_file.getvalue()
+                extract_context = {'file_name': uploaded_file.name, 'file_type': uploaded_file.type}
+                file_text = get_pipeline().run('extract_text', file_data, extract_context)
                 extracted_file_contents[uploaded_file.name] = file_text
             
             # Update session state with file information
@@ -1104,7 +1037,7 @@ def show_training_discovery_page():
                     
                     with st.spinner("⚡ Quick AI pathway generation..."):
                         try:
-                            from modules.utils import gemini_generate_complete_pathway
+                            from modules.utils import gemini_generate_complete_pathway, flush_debug_logs_to_streamlit
                             st.write("🤖 Using AI agents in quick mode...")
                             
                             # Use AI agents even in quick mode
@@ -1117,6 +1050,7 @@ def show_training_discovery_page():
                             
                             if generated_pathways_data:
                                 st.session_state['generated_pathway'] = generated_pathways_data
+                                st.session_state['generated_pathway_saved'] = False
                                 st.success("✅ Quick AI pathway generated successfully!")
                                 st.rerun()
                             else:
@@ -1139,7 +1073,7 @@ def show_training_discovery_page():
                     
                     with st.spinner("🤖 Generating goal-aligned pathway with AI (parallel processing enabled)..."):
                         try:
-                            from modules.utils import gemini_generate_complete_pathway, get_parallel_config
+                            from modules.utils import gemini_generate_complete_pathway, get_parallel_config, flush_debug_logs_to_streamlit
                             st.write("📞 Calling AI function...")
                             
                             # Show parallel configuration
@@ -1186,6 +1120,7 @@ def show_training_discovery_page():
                             
                             if generated_pathways_data:
                                 st.session_state['generated_pathway'] = generated_pathways_data
+                                st.session_state['generated_pathway_saved'] = False
                                 st.success("✅ Goal-aligned pathway generated successfully!")
                                 st.rerun()
                             else:
@@ -1388,32 +1323,9 @@ def show_training_discovery_page():
                 st.error("❌ Selected pathway has no sections.")
                 return
             
-            for section_idx, section in enumerate(selected_pathway['sections']):
-                section_title = section.get('title', 'Untitled Section')
-                modules = section.get('modules', [])
-                
-                print(f"📋 Section {section_idx + 1} '{section_title}' has {len(modules)} modules")
-                
-                # Clean section title to avoid special characters that might cause issues
-                section_title = section_title.strip()
-                
-                # Initialize section if not exists
-                if section_title not in editable_pathways:
-                    editable_pathways[section_title] = []
-                
-                # Add modules to section with debugging
-                for module_idx, module in enumerate(modules):
-                    module_data = {
-                        'title': module.get('title', 'Untitled Module'),
-                        'description': module.get('description', ''),
-                        'content': module.get('content', 'No content available'),
-                        'source': module.get('source', ['Content from uploaded files']),
-                        'content_types': module.get('content_types', [])
-                    }
-                    editable_pathways[section_title].append(module_data)
-                    print(f"  ➕ Added module {module_idx + 1}: {module_data['title']}")
-                
-                print(f"✅ Section '{section_title}' converted with {len(editable_pathways[section_title])} modules")
+            editable_pathways = editable_pathways_from_pathway(selected_pathway)
+            for section_title, section_modules in editable_pathways.items():
+                print(f"✅ Section '{section_title}' converted with {len(section_modules)} modules")
             
             # Ensure we have at least one section
             if not editable_pathways:
@@ -1425,8 +1337,13 @@ def show_training_discovery_page():
                     'content_types': []
                 }]
             
+            # Edits to this structure are recorded as patches from here on; edits
+            # persisted earlier for the same pathway are replayed over it
+            stream, editable_pathways = open_pathway_patch_stream(selected_pathway.get('pathway_name', 'pathway'), editable_pathways)
             st.session_state['editable_pathways'] = editable_pathways
             st.session_state['editable_pathways_pathway_idx'] = st.session_state['selected_pathway_idx']
+            st.session_state['pathway_patch_log'] = PatchLog()
+            st.session_state['pathway_patch_stream'] = stream
         
         editable_pathways = st.session_state['editable_pathways']
         
@@ -1442,7 +1359,15 @@ def show_training_discovery_page():
             st.session_state['selected_section'] = None
         
         st.markdown(f"### Sections in Pathway {st.session_state['selected_pathway_idx']+1}: {selected_pathway['pathway_name']}")
-        for idx, section in enumerate(section_names):
+        section_page_count = paginate(section_names, 1, SECTIONS_PER_PAGE)[3]
+        if st.session_state.get('section_page', 1) > section_page_count:
+            st.session_state['section_page'] = section_page_count
+        if section_page_count > 1:
+            st.selectbox("Sections page", list(range(1, section_page_count + 1)), key='section_page',
+                         format_func=lambda page: f"Page {page} of {section_page_count}")
+        section_start, section_end, _, _ = paginate(section_names, st.session_state.get('section_page', 1), SECTIONS_PER_PAGE)
+        for idx in range(section_start, section_end):
+            section = section_names[idx]
             # Find section description from generated pathway
             section_desc = ""
             for gen_section in selected_pathway['sections']:
@@ -1456,7 +1381,7 @@ def show_training_discovery_page():
                     st.markdown(f"*{section_desc}*")
             with col2:
                 # Generate unique key for section view button
-                section_view_key = generate_unique_widget_key(f"section_card_{section}", section)
+                section_view_key = generate_unique_widget_key("section_card", section)
                 if st.button(f"View Modules", key=section_view_key):
                     st.session_state['selected_section'] = section
             st.markdown("---")
@@ -1502,31 +1427,54 @@ def show_training_discovery_page():
             main_col, chatbot_col = st.columns([4, 1])
             
             with main_col:
-                i = 0
-                while i < len(mods):
+                # Only the current page of modules is built, and a module's editor and
+                # content blocks are rendered only while it is opened
+                page_key = f"module_page_{section}"
+                page_count = paginate(mods, 1, MODULES_PER_PAGE)[3]
+                if st.session_state.get(page_key, 1) > page_count:
+                    st.session_state[page_key] = page_count
+                if page_count > 1:
+                    st.selectbox("Modules page", list(range(1, page_count + 1)), key=page_key,
+                                 format_func=lambda page: f"Page {page} of {page_count}")
+                page_start, page_end, _, _ = paginate(mods, st.session_state.get(page_key, 1), MODULES_PER_PAGE)
+                
+                # Batch mode: one structured call covers the content blocks of several modules
+                page_modules = mods[page_start:page_end]
+                if any(missing_content_block_types(page_module) for page_module in page_modules):
+                    if st.button("⚡ Generate content for all modules on this page", key=generate_unique_widget_key("batch_content_blocks", section)):
+                        with st.spinner("Generating content blocks..."):
+                            updated = fill_missing_content_blocks(section, page_modules, extracted_file_contents, page_start)
+                        st.session_state['editable_pathways'] = editable_pathways
+                        st.success(f"✅ Generated content for {updated} modules")
+                
+                for i in range(page_start, page_end):
+                    if i >= len(mods):
+                        break
                     mod = mods[i]
                     col1, col2, col3, col4 = st.columns([3, 1, 1, 2])
                     with col1:
                         # Display module number at the top
-                        st.markdown(f"**Module {i+1}**")
+                        st.markdown(f"**Module {i+1}: {mod.get('title', '')}**")
+                        module_open = st.toggle("Open module", key=generate_unique_widget_key("module_open", mod))
                         
-                        # Generate unique keys for each widget using the new system
-                        title_key = generate_unique_widget_key(f"title_{section}_{i}", mod.get('title', ''))
-                        desc_key = generate_unique_widget_key(f"desc_{section}_{i}", mod.get('description', ''))
-                        content_key = generate_unique_widget_key(f"content_{section}_{i}", mod.get('content', ''))
-                        
-                        new_title = st.text_input(f"Title ({section}-{i})", mod['title'], key=title_key)
-                        new_desc = st.text_input(f"Description ({section}-{i})", mod.get('description', ''), key=desc_key)
-                        new_content = st.text_area(f"Training Material ({section}-{i})", mod['content'], key=content_key, help="The substantive training content extracted from your files - procedures, concepts, information learners need to know")
+                        if module_open:
+                            # Inputs are recreated when the module text changes outside the widget
+                            title_key = generate_unique_widget_key("title", mod, mod.get('title', ''))
+                            desc_key = generate_unique_widget_key("desc", mod, mod.get('description', ''))
+                            content_key = generate_unique_widget_key("content", mod, mod.get('content', ''))
+                            
+                            new_title = st.text_input(f"Title ({section}-{i})", mod['title'], key=title_key)
+                            new_desc = st.text_input(f"Description ({section}-{i})", mod.get('description', ''), key=desc_key)
+                            new_content = st.text_area(f"Training Material ({section}-{i})", mod['content'], key=content_key, help="The substantive training content extracted from your files - procedures, concepts, information learners need to know")
                         
                         # Show source information
                         if 'source' in mod and mod['source']:
                             st.caption(f"Source: {', '.join(mod['source'])}")
-                    
+
                     # Move to section controls
                     with col4:
                         # Generate unique keys for move operations
-                        move_key = generate_unique_widget_key(f"move_{section}_{i}", f"{section}_{i}_{mod.get('title', '')}")
+                        move_key = generate_unique_widget_key("move", mod, section)
                         
                         move_to_section = st.selectbox(
                             "Move to section",
@@ -1535,36 +1483,38 @@ def show_training_discovery_page():
                             key=move_key
                         )
                         if move_to_section != section:
-                            editable_pathways[move_to_section].append(mod)
-                            mods.pop(i)
-                            st.session_state['editable_pathways'] = editable_pathways
+                            apply_pathway_patch({'op': 'move', 'section': section, 'index': i, 'to_section': move_to_section}, editable_pathways)
                             st.rerun()
                     
                     with col2:
                         # Generate unique keys for movement buttons
-                        up_key = generate_unique_widget_key(f"up_{section}_{i}", f"{section}_{i}_{mod.get('title', '')}_up")
-                        down_key = generate_unique_widget_key(f"down_{section}_{i}", f"{section}_{i}_{mod.get('title', '')}_down")
+                        up_key = generate_unique_widget_key("up", mod)
+                        down_key = generate_unique_widget_key("down", mod)
                         
                         if st.button("⬆️", key=up_key) and i > 0:
-                            mods[i-1], mods[i] = mods[i], mods[i-1]
-                            st.session_state['editable_pathways'] = editable_pathways
+                            apply_pathway_patch({'op': 'move', 'section': section, 'index': i, 'to_section': section, 'to_index': i - 1}, editable_pathways)
                             st.rerun()
                         if st.button("⬇️", key=down_key) and i < len(mods)-1:
-                            mods[i+1], mods[i] = mods[i], mods[i+1]
-                            st.session_state['editable_pathways'] = editable_pathways
+                            apply_pathway_patch({'op': 'move', 'section': section, 'index': i, 'to_section': section, 'to_index': i + 1}, editable_pathways)
                             st.rerun()
                     with col3:
                         # Generate unique key for delete button
-                        delete_key = generate_unique_widget_key(f"del_{section}_{i}", f"{section}_{i}_{mod.get('title', '')}_delete")
+                        delete_key = generate_unique_widget_key("del", mod)
                         
                         if st.button("🗑️ Delete", key=delete_key):
-                            mods.pop(i)
-                            st.session_state['editable_pathways'] = editable_pathways
+                            apply_pathway_patch({'op': 'remove', 'section': section, 'index': i}, editable_pathways)
                             st.rerun()
                     
-                    mod['title'] = new_title
-                    mod['description'] = new_desc
-                    mod['content'] = new_content
+                    if not module_open:
+                        continue
+                    
+                    # Only record a patch when the widgets actually changed something
+                    changed_fields = {
+                        field: value for field, value in (('title', new_title), ('description', new_desc), ('content', new_content))
+                        if mod.get(field, '') != value
+                    }
+                    if changed_fields:
+                        apply_pathway_patch({'op': 'replace', 'section': section, 'index': i, 'fields': changed_fields}, editable_pathways)
                     
                     # Display content types at the bottom
                     st.markdown("---")
@@ -1573,23 +1523,15 @@ def show_training_discovery_page():
                     # Get content blocks from the module (3+ content types per module)
                     content_blocks = mod.get('content_blocks', [])
                     
-                    # Check if content_blocks exist but have empty content_data
-                    need_content_generation = False
-                    if content_blocks:
-                        for block in content_blocks:
-                            if not block.get('content_data') or len(block.get('content_data', {})) == 0:
-                                need_content_generation = True
-                                break
-                    else:
-                        need_content_generation = True
-                    
-                    # Generate content blocks with actual file-based content if needed
-                    if need_content_generation:
+                    # Only block types that are missing or empty are generated, all in one call
+                    missing_types = missing_content_block_types(mod)
+                    if missing_types:
                         try:
-                            # Generate content blocks with actual content from module
-                            content_blocks = generate_content_blocks_with_file_content(mod, extracted_file_contents)
-                            mod['content_blocks'] = content_blocks
+                            merge_content_blocks(section, i, mod, generate_content_blocks_with_file_content(mod, extracted_file_contents, missing_types))
+                            content_blocks = mod['content_blocks']
                             st.session_state['editable_pathways'] = editable_pathways  # Save updated data
+                            # The next modules in reading order are likely to be opened next
+                            prefetch_content_blocks(mods[i + 1:i + 1 + PREFETCH_AHEAD], extracted_file_contents)
                         except Exception as e:
                             st.warning(f"⚠️ Content generation failed: {str(e)}")
                             # Fallback to old content_types format if content_blocks generation fails
@@ -1654,6 +1596,8 @@ def show_training_discovery_page():
                                         fallback_data = generate_fallback_content_data(block_type, "")
                                         display_content_block(block_type, fallback_data)
                                         st.info("💡 Content will be enhanced when you regenerate the pathway with file content.")
+        
+        render_pathway_actions(pathways, selected_pathway, editable_pathways, generated_pathways_data)
 
 def display_content_block(content_type, content_data):
     """Display content block based on its type with graceful handling of empty data"""
@@ -1667,6 +1611,11 @@ def display_content_block(content_type, content_data):
     if content_type == 'video':
         st.markdown("🎬 *Generated with Veo3*")
         
+        # Queued Veo3 jobs finish in the background
+        if content_data.get('generation_id'):
+            from modules.veo3_integration import refresh_video_content_data
+            refresh_video_content_data(content_data)
+        
         # Show video status
         video_status = content_data.get('video_status', 'completed')
         if video_status == 'completed':
@@ -1684,8 +1633,12 @@ def display_content_block(content_type, content_data):
             
             summary = content_data.get('video_summary', 'Educational video content')
             st.markdown(f"**📋 Summary:** {summary}")
+            if content_data.get('video_url') and content_data.get('generation_id'):
+                st.video(content_data['video_url'])
+        elif video_status == 'failed':
+            st.error(f"❌ Video generation failed: {content_data.get('error_message', 'unknown error')}")
         else:
-            st.info("🔄 Video generation in progress...")
+            st.info(f"🔄 Video generation in progress... {content_data.get('video_progress', 0)}%")
     
     elif content_type == 'knowledge_check':
         st.markdown("**📚 Assessment Questions:**")
@@ -1818,101 +1771,101 @@ def display_content_block(content_type, content_data):
                     st.markdown(f"• {item}")
             else:
                 st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
-        # --- Export and Save Buttons ---
-        st.markdown("---")
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            if st.button("← Back to File Upload"):
-                st.session_state.discovery_step = 2
+
+def render_pathway_actions(pathways, selected_pathway, editable_pathways, generated_pathways_data):
+    """Navigation, undo/redo, export and save controls shown below the pathway editor"""
+    # --- Export and Save Buttons ---
+    st.markdown("---")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        if st.button("← Back to File Upload"):
+            st.session_state.discovery_step = 2
+            st.rerun()
+    with col2:
+        if st.button("🔄 Regenerate Pathway"):
+            del st.session_state['generated_pathway']
+            del st.session_state['editable_pathways']
+            st.rerun()
+    with col3:
+        if st.button("🤖 Generate New Pathway"):
+            del st.session_state['generated_pathway']
+            del st.session_state['editable_pathways']
+            st.rerun()
+    with col4:
+        patch_log = get_pathway_patch_log()
+        undo_col, redo_col = st.columns(2)
+        with undo_col:
+            if st.button("↩️ Undo", disabled=not patch_log.can_undo()):
+                undo_pathway_edit()
                 st.rerun()
-        with col2:
-            if st.button("🔄 Regenerate Pathway"):
-                del st.session_state['generated_pathway']
-                del st.session_state['editable_pathways']
+        with redo_col:
+            if st.button("↪️ Redo", disabled=not patch_log.can_redo()):
+                redo_pathway_edit()
                 st.rerun()
-        with col3:
-            if st.button("🤖 Generate New Pathway"):
-                del st.session_state['generated_pathway']
-                del st.session_state['editable_pathways']
-                st.rerun()
-        
-        # --- Export and Save Buttons ---
+        if st.button("Export Pathways as JSON"):
+            import json
+            export_data = {
+                'pathways': [
+                    {
+                        'pathway_name': p['pathway_name'],
+                        'sections': [
+                            {
+                                'name': section,
+                                'modules': [
+                                    {'title': m['title'], 'content': m['content'], 'source': m['source']}
+                                    for m in editable_pathways[section]
+                                ]
+                            } for section in editable_pathways.keys()
+                        ]
+                    } for p in pathways
+                ]
+            }
+            json_str = dumps_pathways(export_data, indent=2)
+            st.download_button(
+                label="Download JSON",
+                data=json_str,
+                file_name=f"onboarding_pathways_all.json",
+                mime="application/json"
+            )
+    with col5:
+        if st.button("Save Pathways"):
+            st.session_state['confirmed_pathways'] = {
+                'pathways': [
+                    {
+                        'pathway_name': selected_pathway['pathway_name'],
+                        'sections': [
+                            {
+                                'name': section,
+                                'modules': [
+                                    {'title': m['title'], 'content': m['content'], 'source': m['source']}
+                                    for m in editable_pathways[section]
+                                ]
+                            } for section in editable_pathways.keys()
+                        ]
+                    }
+                ]
+            }
+            try:
+                get_pathway_store().save(st.session_state['confirmed_pathways'], kind='confirmed_pathways', owner=get_pathway_owner())
+            except Exception as e:
+                debug_print("⚠️ Could not persist confirmed pathways: %s", e)
+            st.success("Pathways saved! You can now generate multimedia content.")
+            st.session_state['show_generate_multimedia'] = True
+    if st.session_state.get('show_generate_multimedia') and st.session_state.get('confirmed_pathways'):
+        if st.button("Generate Multimedia Content for Modules"):
+            st.session_state['generate_multimedia_triggered'] = True
+    if st.session_state.get('generate_multimedia_triggered'):
         st.markdown("---")
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            if st.button("← Back to File Upload"):
-                st.session_state.discovery_step = 2
-                st.rerun()
-        with col2:
-            if st.button("🔄 Regenerate Pathway"):
-                del st.session_state['generated_pathway']
-                del st.session_state['editable_pathways']
-                st.rerun()
-        with col3:
-            if st.button("🤖 Generate New Pathway"):
-                del st.session_state['generated_pathway']
-                del st.session_state['editable_pathways']
-                st.rerun()
-        with col4:
-            if st.button("Export Pathways as JSON"):
-                import json
-                export_data = {
-                    'pathways': [
-                        {
-                            'pathway_name': p['pathway_name'],
-                            'sections': [
-                                {
-                                    'name': section,
-                                    'modules': [
-                                        {'title': m['title'], 'content': m['content'], 'source': m['source']}
-                                        for m in editable_pathways[section]
-                                    ]
-                                } for section in editable_pathways.keys()
-                            ]
-                        } for p in pathways
-                    ]
-                }
-                json_str = json.dumps(export_data, indent=2)
-                st.download_button(
-                    label="Download JSON",
-                    data=json_str,
-                    file_name=f"onboarding_pathways_all.json",
-                    mime="application/json"
-                )
-        with col5:
-            if st.button("Save Pathways"):
-                st.session_state['confirmed_pathways'] = {
-                    'pathways': [
-                        {
-                            'pathway_name': selected_pathway['pathway_name'],
-                            'sections': [
-                                {
-                                    'name': section,
-                                    'modules': [
-                                        {'title': m['title'], 'content': m['content'], 'source': m['source']}
-                                        for m in editable_pathways[section]
-                                    ]
-                                } for section in editable_pathways.keys()
-                            ]
-                        }
-                    ]
-                }
-                st.success("Pathways saved! You can now generate multimedia content.")
-                st.session_state['show_generate_multimedia'] = True
-        if st.session_state.get('show_generate_multimedia') and st.session_state.get('confirmed_pathways'):
-            if st.button("Generate Multimedia Content for Modules"):
-                st.session_state['generate_multimedia_triggered'] = True
-        if st.session_state.get('generate_multimedia_triggered'):
-            st.markdown("---")
-            st.subheader("🎬 Multimedia Content Generation (Coming Soon)")
-            st.info("The app will generate multimedia content for each module in your confirmed pathways. Stay tuned!")
+        st.subheader("🎬 Multimedia Content Generation (Coming Soon)")
+        st.info("The app will generate multimedia content for each module in your confirmed pathways. Stay tuned!")
 
-        # Save generated pathway to history
-        if 'past_generated_pathways' not in st.session_state:
-            st.session_state['past_generated_pathways'] = []
-        # Only append if not already present (by pathway_name and sections)
-        if generated_pathways_data not in st.session_state['past_generated_pathways']:
-            st.session_state['past_generated_pathways'].append(generated_pathways_data)
+    # Save generated pathway to history once per generation; the flag is
+    # cleared whenever a new pathway is generated
+    if 'past_generated_pathways' not in st.session_state:
+        st.session_state['past_generated_pathways'] = []
+    if not st.session_state.get('generated_pathway_saved'):
+        st.session_state['past_generated_pathways'].append(generated_pathways_data)
+        st.session_state['generated_pathway_saved'] = True
 
 def create_pathway_chatbot():
     """
@@ -2240,7 +2193,7 @@ def handle_file_ingestion(user_input):
         Make the response friendly and actionable. Include specific steps.
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         return response.text.strip()
         
     except Exception as e:
@@ -2341,7 +2294,7 @@ def get_chatbot_help():
         Make it conversational and easy to follow. Emphasize that modules are numbered locally within each section (Module 1, 2, 3, etc. within each section).
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         return response.text.strip()
         
     except Exception as e:
@@ -2536,35 +2489,30 @@ def find_module_by_info(module_info, editable_pathways):
     Find a module based on the provided information
     Updated to handle correct module numbering within sections
     """
-    # Create module mapping
-    module_mapping = create_module_mapping(editable_pathways)
+    module_index = get_module_index(editable_pathways)
     
     # Check for module number references (e.g., "module 2")
     if module_info.startswith('module_'):
         module_num = module_info.split('_')[1]
-        
-        # First try to find by global number
-        if module_num in module_mapping['by_global_number']:
-            return module_mapping['by_global_number'][module_num]
-        
-        # If not found globally, check if it's a section-specific reference
-        # Look for patterns like "section 3 module 2" or "safety module 1"
-        for section_name, section_modules in module_mapping['by_section_and_number'].items():
-            if module_num in section_modules:
-                return section_modules[module_num]
+        if module_num.isdigit():
+            # First try to find by global number, then as a section-local number
+            found = module_index.by_global_number(module_num) or module_index.by_local_number(module_num)
+            if found:
+                return found
     
     # Check by module title/keywords
-    module_info_lower = module_info.lower()
-    for title, module_data in module_mapping['by_title'].items():
-        if module_info_lower in title or title in module_info_lower:
-            return module_data
+    found = module_index.find_title(module_info)
+    if found:
+        return found
     
     # Check for section-specific module references
-    for section_name, section_modules in module_mapping['by_section_and_number'].items():
+    module_info_lower = module_info.lower()
+    for section_name in module_index.sections:
         if module_info_lower in section_name.lower():
             # Return first module in this section (module 1)
-            if '1' in section_modules:
-                return section_modules['1']
+            found = module_index.by_section_number(section_name, 1)
+            if found:
+                return found
     
     return None
 
@@ -2603,12 +2551,88 @@ def regenerate_module_content(target_module, tone, content_focus, changes_reques
             f"Return only the regenerated content, no explanations or markdown formatting."
         )
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         return response.text.strip()
         
     except Exception as e:
         return f"Error regenerating content: {str(e)}"
 
+def update_module_index(editable_pathways, op, inverse):
+    """Patch log listener that keeps the module lookup index current"""
+    get_module_index(editable_pathways).on_patch(op, inverse)
+
+def update_pathway_mind_map(editable_pathways, op, inverse):
+    """Patch log listener that re-renders only the mind map nodes an edit touched"""
+    get_pathway_mind_map(editable_pathways).on_patch(op, inverse)
+
+def get_pathway_patch_log():
+    """Patch log for the editable pathway currently in session state"""
+    if 'pathway_patch_log' not in st.session_state:
+        st.session_state['pathway_patch_log'] = PatchLog()
+    patch_log = st.session_state['pathway_patch_log']
+    for listener in (update_module_index, update_pathway_mind_map):
+        if listener not in patch_log.listeners:
+            patch_log.listeners.append(listener)
+    return patch_log
+
+def open_pathway_patch_stream(pathway_name, editable_pathways):
+    """
+    Name the patch stream of a freshly built editable structure after the
+    owner, the pathway and its content, store the structure as the stream's base and
+    return (stream, structure with previously persisted edits replayed)
+    """
+    stream = f"{get_pathway_owner()}/{pathway_name}@{hashlib.sha1(dumps_pathways(editable_pathways).encode('utf-8')).hexdigest()[:16]}"
+    try:
+        store = get_pathway_store()
+        restored = store.restore_stream(stream, get_pathway_owner())
+        if restored is not None:
+            return stream, restored
+        store.start_stream(stream, editable_pathways, get_pathway_owner())
+    except Exception as e:
+        debug_print("⚠️ Could not restore pathway patches: %s", e)
+    return stream, editable_pathways
+
+def persist_pathway_patches():
+    """Write pending patch entries to the pathway store"""
+    pending = get_pathway_patch_log().take_pending()
+    if not pending:
+        return
+    try:
+        get_pathway_store().append_patches(st.session_state.get('pathway_patch_stream', 'editable'), pending)
+    except Exception as e:
+        debug_print("⚠️ Could not persist pathway patches: %s", e)
+
+def apply_pathway_patch(op, editable_pathways=None):
+    """
+    Apply one structural edit (add/remove/replace/move) to editable_pathways
+    in place, record it for undo/redo and persist the patch
+    """
+    if editable_pathways is None:
+        editable_pathways = st.session_state.get('editable_pathways', {})
+    inverse = get_pathway_patch_log().apply(editable_pathways, op)
+    persist_pathway_patches()
+    return inverse
+
+def undo_pathway_edit():
+    editable_pathways = st.session_state.get('editable_pathways', {})
+    try:
+        undone = get_pathway_patch_log().undo(editable_pathways)
+    except PatchError as e:
+        debug_print("⚠️ Undo failed: %s", e)
+        return False
+    persist_pathway_patches()
+    return undone
+
+def redo_pathway_edit():
+    editable_pathways = st.session_state.get('editable_pathways', {})
+    try:
+        redone = get_pathway_patch_log().redo(editable_pathways)
+    except PatchError as e:
+        debug_print("⚠️ Redo failed: %s", e)
+        return False
+    persist_pathway_patches()
+    return redone
+
 def update_module_in_pathway(target_module, new_content):
     """
     Update the module content in the pathway
@@ -2620,8 +2644,7 @@ def update_module_in_pathway(target_module, new_content):
         if 'editable_pathways' in st.session_state:
             editable_pathways = st.session_state['editable_pathways']
             if section_name in editable_pathways and module_index < len(editable_pathways[section_name]):
-                editable_pathways[section_name][module_index]['content'] = new_content
-                st.session_state['editable_pathways'] = editable_pathways
+                apply_pathway_patch({'op': 'replace', 'section': section_name, 'index': module_index, 'fields': {'content': new_content}}, editable_pathways)
                 return True
         
         return False
@@ -2797,6 +2820,7 @@ def process_new_files(uploaded_files):
                         # Ensure we have bytes for PyPDF2
                         if isinstance(pdf_file, str):
                             pdf_file = pdf_file.encode('utf-8')
+                        import PyPDF2  # Loaded only once a PDF is uploaded
                         pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
                         file_content = ""
                         for page in pdf_reader.pages:
@@ -2864,6 +2888,9 @@ def find_module_by_title(module_title, editable_pathways):
     """
     Find a module by its title
     """
+    found = get_module_index(editable_pathways).by_title(module_title)
+    if found and found['module']['title'] == module_title:
+        return found
     for section_name, modules in editable_pathways.items():
         for i, module in enumerate(modules):
             if module['title'] == module_title:
@@ -2879,28 +2906,19 @@ def integrate_new_modules(new_modules, editable_pathways, training_context):
             # Find the best section to add this module to
             best_section = find_best_section_for_module(new_module, editable_pathways)
             
-            if best_section:
-                # Add the new module to the best section
-                editable_pathways[best_section].append({
-                    'title': new_module['title'],
-                    'description': new_module['description'],
-                    'content': new_module['content'],
-                    'source': new_module.get('source', ['New file content']),
-                    'content_types': new_module.get('content_types', [])
-                })
-            else:
+            if not best_section:
                 # Create a new section if no good match found
-                section_name = "Additional Content"
-                if section_name not in editable_pathways:
-                    editable_pathways[section_name] = []
-                
-                editable_pathways[section_name].append({
-                    'title': new_module['title'],
-                    'description': new_module['description'],
-                    'content': new_module['content'],
-                    'source': new_module.get('source', ['New file content']),
-                    'content_types': new_module.get('content_types', [])
-                })
+                best_section = "Additional Content"
+                if best_section not in editable_pathways:
+                    apply_pathway_patch({'op': 'add_section', 'section': best_section}, editable_pathways)
+            
+            apply_pathway_patch({'op': 'add', 'section': best_section, 'module': {
+                'title': new_module['title'],
+                'description': new_module['description'],
+                'content': new_module['content'],
+                'source': new_module.get('source', ['New file content']),
+                'content_types': new_module.get('content_types', [])
+            }}, editable_pathways)
         
         return True
         
@@ -2948,11 +2966,40 @@ def find_best_section_for_module(new_module, editable_pathways):
     except Exception as e:
         return None
 
+def current_pathway_mind_map():
+    """Mind map of the pathway being edited, else of the selected generated pathway"""
+    pathways = (st.session_state.get('generated_pathway') or {}).get('pathways') or []
+    selected_idx = st.session_state.get('selected_pathway_idx', 0)
+    selected_pathway = pathways[selected_idx] if 0 <= selected_idx < len(pathways) else None
+    editable_pathways = st.session_state.get('editable_pathways')
+    if editable_pathways and st.session_state.get('editable_pathways_pathway_idx') == selected_idx:
+        pathway_name = (selected_pathway or {}).get('pathway_name', 'Training Pathway')
+        return get_pathway_mind_map(editable_pathways, pathway_name)
+    if selected_pathway:
+        return mind_map_for_pathway(selected_pathway)
+    return None
+
 def show_mind_maps_page():
     """Mind maps page with Markmap only (MindMeister removed)"""
     st.header("🧠 Pathways & Markmap Visualization")
     st.markdown("Suggested pathways and module visualization.")
     
+    initial_depth = st.selectbox("Levels expanded on open", ["Auto", 1, 2, 3, 4], key="markmap_initial_depth",
+                                 help="Large maps open collapsed; click a node to expand it")
+    initial_depth = None if initial_depth == "Auto" else initial_depth
+    
+    # Built from the pathway structure itself; edits re-render only the touched nodes
+    pathway_mind_map = current_pathway_mind_map()
+    if pathway_mind_map is not None:
+        st.subheader("🗺️ Pathway Mind Map")
+        stats = pathway_mind_map.stats()
+        st.caption(f"{stats['sections']} sections · {stats['modules']} modules · map version {stats['version']}")
+        markmap(pathway_mind_map.to_markmap_markdown(), height=600, initial_depth=initial_depth)
+        with st.expander("📋 Mind map outline"):
+            st.code(pathway_mind_map.to_markmap_markdown(), language="markdown")
+    else:
+        st.info("Generate a pathway to see it as a mind map.")
+    
     # Only Markmap tab remains
     st.subheader("🗺️ Markmap Component")
     st.markdown("Test the local markmap component with sample data")
@@ -2965,9 +3012,22 @@ def show_mind_maps_page():
     
     if st.button("🎯 Test Markmap Component", type="primary"):
         st.markdown("**Rendered Mind Map:**")
-        markmap(sample_markdown, height=600)
+        markmap(sample_markdown, height=600, initial_depth=initial_depth)
         st.success("✅ Markmap component test completed!")
 
+def module_video_content_data(module):
+    """content_data dicts of a module's video blocks (content_blocks and legacy content_types)"""
+    return [
+        block['content_data'] for block in (module.get('content_blocks') or []) + (module.get('content_types') or [])
+        if isinstance(block, dict) and block.get('type') == 'video' and isinstance(block.get('content_data'), dict)
+    ]
+
+def add_video_content_block(module):
+    """Append an empty video block to a module and return its content_data"""
+    block = {'type': 'video', 'title': 'Veo3 Training Video', 'content_data': {}}
+    module.setdefault('content_blocks', []).append(block)
+    return block['content_data']
+
 def show_video_generation_page():
     """Video generation page with actual Veo3 integration"""
     st.header("📹 AI Video Generation with Veo3")
@@ -2985,41 +3045,72 @@ def show_video_generation_page():
     - **Thumbnail previews** and video management
     """)
     
+    from modules.veo3_integration import (
+        generate_veo3_video, generate_training_video_for_module, refresh_video_content_data, veo3_generator
+    )
+    
     # Show actual video generation status
     st.markdown("### 🎯 Current Video Generation Status")
     
     if 'generated_pathway' in st.session_state:
         pathways = st.session_state['generated_pathway'].get('pathways', [])
         if pathways:
-            total_modules = 0
-            video_modules = 0
-            completed_videos = 0
-            
-            for pathway in pathways:
-                for section in pathway.get('sections', []):
-                    for module in section.get('modules', []):
-                        total_modules += 1
-                        content_types = module.get('content_types', [])
-                        
-                        for ct in content_types:
-                            if isinstance(ct, dict) and ct.get('type') == 'video':
-                                video_modules += 1
-                                if ct.get('content_data', {}).get('video_status') == 'completed':
-                                    completed_videos += 1
+            total_modules = sum(len(section.get('modules', [])) for pathway in pathways for section in pathway.get('sections', []))
+            video_blocks = [
+                (module, content_data)
+                for pathway in pathways
+                for section in pathway.get('sections', [])
+                for module in section.get('modules', [])
+                for content_data in module_video_content_data(module)
+            ]
+            # Job status lives in the video job store; copy it into the pathway
+            for _, content_data in video_blocks:
+                refresh_video_content_data(content_data)
+            completed_videos = sum(1 for _, content_data in video_blocks if content_data.get('video_status') == 'completed')
             
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric("Total Modules", total_modules)
             with col2:
-                st.metric("Video-Enabled Modules", video_modules)
+                st.metric("Video-Enabled Modules", len(video_blocks))
             with col3:
                 st.metric("Completed Videos", completed_videos)
             
             # Show progress
-            if video_modules > 0:
-                progress = completed_videos / video_modules
+            if video_blocks:
+                progress = completed_videos / len(video_blocks)
                 st.progress(progress)
-                st.caption(f"Video generation progress: {completed_videos}/{video_modules} ({progress*100:.1f}%)")
+                st.caption(f"Video generation progress: {completed_videos}/{len(video_blocks)} ({progress*100:.1f}%)")
+            
+            job_counts = veo3_generator.job_queue.store.counts()
+            st.caption(f"Video jobs: {job_counts.get('queued', 0)} queued, {job_counts.get('running', 0)} running, "
+                       f"{job_counts.get('completed', 0)} completed, {job_counts.get('failed', 0)} failed")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("🎬 Queue videos for all modules"):
+                    queued = 0
+                    for pathway in pathways:
+                        for section in pathway.get('sections', []):
+                            for module in section.get('modules', []):
+                                blocks = module_video_content_data(module)
+                                if blocks and all(block.get('generation_id') and block.get('video_status') != 'failed' for block in blocks):
+                                    continue
+                                # Identical prompts map to the same job, so re-queuing never resubmits
+                                result = generate_training_video_for_module(module)
+                                target = blocks[0] if blocks else add_video_content_block(module)
+                                target.update({
+                                    'generation_id': result.get('generation_id'),
+                                    'video_status': result.get('status', 'failed'),
+                                    'video_url': result.get('video_url'),
+                                    'thumbnail_url': result.get('thumbnail_url'),
+                                    'generated_with': 'Veo3'
+                                })
+                                queued += 1
+                    st.success(f"✅ Queued {queued} videos. They generate in the background; refresh to see progress.")
+            with col2:
+                if st.button("🔄 Refresh video status"):
+                    st.rerun()
             
             # Show module details
             st.markdown("### 📋 Module Video Status")
@@ -3028,26 +3119,28 @@ def show_video_generation_page():
                     for section in pathway.get('sections', []):
                         st.markdown(f"**{section['title']}**")
                         for module in section.get('modules', []):
-                            content_types = module.get('content_types', [])
-                            video_ct = next((ct for ct in content_types if isinstance(ct, dict) and ct.get('type') == 'video'), None)
+                            blocks = module_video_content_data(module)
+                            module_title = module.get('title', 'Unnamed Module')
                             
-                            if video_ct:
-                                video_status = video_ct.get('content_data', {}).get('video_status', 'unknown')
-                                module_title = module.get('title', 'Unnamed Module')
+                            if blocks:
+                                content_data = blocks[0]
+                                video_status = content_data.get('video_status', 'unknown')
                                 
                                 if video_status == 'completed':
                                     st.success(f"✅ {module_title} - Video ready")
-                                    video_url = video_ct.get('content_data', {}).get('video_url')
+                                    video_url = content_data.get('video_url')
                                     if video_url:
                                         st.caption(f"Video URL: {video_url}")
                                 elif video_status == 'generating':
-                                    st.info(f"🔄 {module_title} - Generating...")
+                                    st.info(f"🔄 {module_title} - Generating... {content_data.get('video_progress', 0)}%")
                                 elif video_status == 'failed':
                                     st.error(f"❌ {module_title} - Generation failed")
+                                    if content_data.get('error_message'):
+                                        st.caption(content_data['error_message'])
                                 else:
                                     st.warning(f"⏳ {module_title} - Ready for generation")
                             else:
-                                st.caption(f"📄 {module.get('title', 'Unnamed Module')} - No video content")
+                                st.caption(f"📄 {module_title} - No video content")
     else:
         st.info("Generate a pathway first to see video generation options!")
     
@@ -3071,11 +3164,7 @@ def show_video_generation_page():
     
     if st.button("🎬 Generate Custom Video with Veo3"):
         if custom_prompt:
-            st.info("🔄 Generating custom video with Veo3...")
-            
             try:
-                from modules.veo3_integration import generate_veo3_video
-                
                 result = generate_veo3_video(
                     prompt=custom_prompt,
                     duration=video_duration,
@@ -3083,25 +3172,33 @@ def show_video_generation_page():
                 )
                 
                 if result.get('success'):
-                    st.success("✅ Custom video generated successfully!")
-                    
-                    video_url = result.get('video_url')
-                    if video_url:
-                        st.video(video_url)
-                    
-                    thumbnail_url = result.get('thumbnail_url')
-                    if thumbnail_url:
-                        st.image(thumbnail_url, caption="Video Thumbnail", width=300)
-                        
-                    st.caption(f"Generation ID: {result.get('generation_id', 'N/A')}")
+                    st.session_state['custom_video_job'] = result.get('generation_id')
+                    st.info("🔄 Custom video queued with Veo3. You can keep working while it generates.")
                 else:
-                    st.error("❌ Video generation failed. Please try again.")
+                    st.error(f"❌ Video generation failed: {result.get('error', 'Please try again.')}")
                     
             except Exception as e:
                 st.error(f"❌ Error generating video: {str(e)}")
         else:
             st.warning("Please enter a video description first.")
     
+    custom_job = st.session_state.get('custom_video_job')
+    if custom_job:
+        status = veo3_generator.check_video_status(custom_job)
+        if status.get('status') == 'completed':
+            st.success("✅ Custom video generated successfully!")
+            if status.get('video_url'):
+                st.video(status['video_url'])
+            if status.get('thumbnail_url'):
+                st.image(status['thumbnail_url'], caption="Video Thumbnail", width=300)
+        elif status.get('status') == 'generating':
+            st.info(f"🔄 Custom video generating... {status.get('progress', 0)}%")
+            if st.button("🔄 Refresh custom video status"):
+                st.rerun()
+        else:
+            st.error(f"❌ Custom video failed: {status.get('error', 'unknown error')}")
+        st.caption(f"Generation ID: {custom_job}")
+    
     st.markdown("---")
     
     # Technical details
@@ -3168,6 +3265,40 @@ def show_settings_page():
     CANVA_API_KEY=your_canva_api_key_here
     ```
     """)
+    
+    # Hidden by default: timing spans, LLM token usage and log buffer state
+    with st.expander("📈 Performance", expanded=False):
+        span_summary = summarize_spans()
+        if span_summary:
+            st.markdown("**Where the time went (per span name):**")
+            st.dataframe(span_summary, use_container_width=True)
+        else:
+            st.info("No timings recorded yet. Generate a pathway to collect spans.")
+        
+        from modules.prompt_builder import get_token_usage_summary
+        token_usage = get_token_usage_summary()
+        if token_usage:
+            st.markdown("**LLM calls by label:**")
+            st.dataframe([dict(label=label, **stats) for label, stats in token_usage.items()], use_container_width=True)
+        
+        log_stats = ring_buffer.stats()
+        st.caption(f"Log buffer: {log_stats['records']} records in {log_stats['sessions']} sessions "
+                   f"(capacity {log_stats['capacity']} per session, {log_stats['dropped']} rotated out)")
+        block_cache = get_content_block_cache(generate_content_block_batch)
+        block_stats = block_cache.stats
+        st.caption(f"Content block cache: {len(block_cache)} modules, {block_stats['hits']} hits, "
+                   f"{block_stats['prefetch_hits']} served by prefetch, {block_stats['misses']} generated on open, "
+                   f"{block_stats['prefetched']} prefetched")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("Download spans (JSONL)", to_jsonl(), file_name="spans.jsonl", mime="application/json")
+        with col2:
+            st.download_button("Download spans (OTLP JSON)", json.dumps(to_otlp()), file_name="spans.otlp.json", mime="application/json")
+        with col3:
+            if st.button("Clear timings"):
+                clear_spans()
+                st.rerun()
 
 def handle_file_based_module_update(user_input, uploaded_files=None):
     """
@@ -3194,7 +3325,7 @@ def handle_file_based_module_update(user_input, uploaded_files=None):
                 available_options.append("• 'Update pathway 1 section 1 with new content'")
                 available_options.append("• 'Add content to pathway 1 section 2'")
             if past_pathways:
-                for i, _ in enumerate(past_pathways, 2):
+                for i in range(2, len(past_pathways) + 2):
                     available_options.append(f"• 'Update pathway {i} section 1 with new content'")
             
             if not available_options:
@@ -3491,15 +3622,13 @@ def update_specific_module(module_identifier, new_content_modules, editable_path
         
         # Apply action (replace or merge)
         if action == 'replace':
-            # Replace the entire module content
-            updated_module = target_module['module'].copy()
-            updated_module['content'] = best_content['content']
-            updated_module['description'] = best_content['description']
-            updated_module['source'] = best_content['source']
-            updated_module['content_types'] = best_content.get('content_types', [])
-            
-            # Update in pathway
-            editable_pathways[target_module['section']][target_module['index']] = updated_module
+            # Replace the module content fields
+            apply_pathway_patch({'op': 'replace', 'section': target_module['section'], 'index': target_module['index'], 'fields': {
+                'content': best_content['content'],
+                'description': best_content['description'],
+                'source': best_content['source'],
+                'content_types': best_content.get('content_types', [])
+            }}, editable_pathways)
             
             action_text = "replaced"
         elif action == 'merge':
@@ -3508,28 +3637,23 @@ def update_specific_module(module_identifier, new_content_modules, editable_path
             existing_content = existing_module.get('content', '')
             new_content = best_content['content']
             
-            updated_module = existing_module.copy()
-            updated_module['content'] = f"{existing_content}\n\n--- Additional Content ---\n\n{new_content}"
-            updated_module['source'] = existing_module.get('source', []) + best_content['source']
-            
-            # Update in pathway
-            editable_pathways[target_module['section']][target_module['index']] = updated_module
+            apply_pathway_patch({'op': 'replace', 'section': target_module['section'], 'index': target_module['index'], 'fields': {
+                'content': f"{existing_content}\n\n--- Additional Content ---\n\n{new_content}",
+                'source': existing_module.get('source', []) + best_content['source']
+            }}, editable_pathways)
             
             action_text = "enhanced"
         else:  # add
             # Add as new module (existing behavior)
-            editable_pathways[target_module['section']].append({
+            apply_pathway_patch({'op': 'add', 'section': target_module['section'], 'module': {
                 'title': best_content['title'],
                 'description': best_content['description'],
                 'content': best_content['content'],
                 'source': best_content.get('source', ['New file content']),
                 'content_types': best_content.get('content_types', [])
-            })
+            }}, editable_pathways)
             action_text = "added new module"
         
-        # Update session state
-        st.session_state['editable_pathways'] = editable_pathways
-        
         return f"✅ Successfully {action_text} content for module '{target_module['module']['title']}'!"
         
     except Exception as e:
@@ -3571,22 +3695,19 @@ def update_specific_section(section_identifier, new_content_modules, editable_pa
             for new_module in new_content_modules:
                 # Check if this module is relevant to the section
                 if is_module_relevant_to_section(new_module, target_section):
-                    editable_pathways[target_section].append({
+                    apply_pathway_patch({'op': 'add', 'section': target_section, 'module': {
                         'title': new_module['title'],
                         'description': new_module['description'],
                         'content': new_module['content'],
                         'source': new_module.get('source', ['New file content']),
                         'content_types': new_module.get('content_types', [])
-                    })
+                    }}, editable_pathways)
                     added_modules.append(new_module['title'])
                     added_count += 1
             
             if added_count == 0:
                 return f"❌ No relevant content found for section '{target_section}'."
             
-            # Update session state
-            st.session_state['editable_pathways'] = editable_pathways
-            
             return f"✅ Successfully added {added_count} new modules to section '{target_section}'!"
         
         elif action in ['replace', 'merge']:
@@ -3599,25 +3720,27 @@ def update_specific_section(section_identifier, new_content_modules, editable_pa
                 if best_content:
                     if action == 'replace':
                         # Replace module content
-                        editable_pathways[target_section][i]['content'] = best_content['content']
-                        editable_pathways[target_section][i]['description'] = best_content['description']
-                        editable_pathways[target_section][i]['source'] = best_content['source']
-                        editable_pathways[target_section][i]['content_types'] = best_content.get('content_types', [])
+                        fields = {
+                            'content': best_content['content'],
+                            'description': best_content['description'],
+                            'source': best_content['source'],
+                            'content_types': best_content.get('content_types', [])
+                        }
                     else:  # merge
                         # Merge with existing content
                         existing_content = existing_module.get('content', '')
                         new_content = best_content['content']
-                        editable_pathways[target_section][i]['content'] = f"{existing_content}\n\n--- Additional Content ---\n\n{new_content}"
-                        editable_pathways[target_section][i]['source'] = existing_module.get('source', []) + best_content['source']
+                        fields = {
+                            'content': f"{existing_content}\n\n--- Additional Content ---\n\n{new_content}",
+                            'source': existing_module.get('source', []) + best_content['source']
+                        }
+                    apply_pathway_patch({'op': 'replace', 'section': target_section, 'index': i, 'fields': fields}, editable_pathways)
                     
                     updated_count += 1
             
             if updated_count == 0:
                 return f"❌ No relevant content found to update modules in section '{target_section}'."
             
-            # Update session state
-            st.session_state['editable_pathways'] = editable_pathways
-            
             action_text = "replaced" if action == 'replace' else "enhanced"
             return f"✅ Successfully {action_text} {updated_count} modules in section '{target_section}'!"
         
@@ -3781,7 +3904,7 @@ def find_best_content_for_module(target_module, new_content_modules):
     except Exception as e:
         return None
 
-def preprocess_file_content_for_ai(content, filename):
+def preprocess_file_content_for_ai(content, filename, training_context=None):
     """
     Preprocess file content for optimal AI processing
     Cleans and structures content while preserving important information
@@ -3797,45 +3920,19 @@ def preprocess_file_content_for_ai(content, filename):
         processed = re.sub(r'\n\s*\n\s*\n+', '\n\n', processed)
         processed = re.sub(r'[ \t]+', ' ', processed)
         
-        # Remove meeting metadata but preserve actual content
-        processed = re.sub(r'Teams Meeting.*?\d{4}', '', processed, flags=re.IGNORECASE)
-        processed = re.sub(r'Meeting ID.*?\n', '', processed, flags=re.IGNORECASE)
-        processed = re.sub(r'(thank|thanks)\s+(you|personnel|everyone)', '', processed, flags=re.IGNORECASE)
+        # Transcripts: drop meeting metadata, fillers and call logistics locally,
+        # keeping one "Name: text" line per speaker turn
+        stage_context = dict(training_context or {}, keep_speakers=True)
+        if is_transcript(processed):
+            processed = get_pipeline().run('clean', processed, stage_context)
         
-        # If content is very long, intelligently chunk it to preserve important sections
+        # If content is very long, condense the whole document with map-reduce
+        # summarization instead of keeping only its first sections
         max_content_length = 8000  # Increased from 3000 to preserve more content
         
         if len(processed) > max_content_length:
-            # Smart chunking - try to preserve complete sections
-            chunks = []
-            current_chunk = ""
-            
-            # Split by paragraphs and preserve important ones
-            paragraphs = processed.split('\n\n')
-            
-            for paragraph in paragraphs:
-                if len(current_chunk) + len(paragraph) < max_content_length:
-                    current_chunk += paragraph + '\n\n'
-                else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = paragraph + '\n\n'
-            
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            
-            # Use the most substantial chunk or combine first few chunks
-            if chunks:
-                if len(chunks[0]) > max_content_length * 0.6:
-                    processed = chunks[0]
-                elif len(chunks) > 1:
-                    combined = chunks[0] + '\n\n' + chunks[1]
-                    if len(combined) <= max_content_length:
-                        processed = combined
-                    else:
-                        processed = chunks[0]
-                else:
-                    processed = chunks[0]
+            stage_context['digest_tokens'] = max_content_length // 4
+            processed = get_pipeline().run('digest', processed, stage_context)
         
         # Ensure we have substantial content
         if len(processed.strip()) < 100:
@@ -4028,7 +4125,7 @@ def extract_fast_modules_from_content(filename, content, training_context, prima
             return []
         
         # Enhanced content processing - remove truncation and process full content
-        processed_content = preprocess_file_content_for_ai(content, filename)
+        processed_content = preprocess_file_content_for_ai(content, filename, training_context)
         
         # Create enhanced prompt that forces file-specific content generation
         prompt = f"""
@@ -4083,7 +4180,7 @@ def extract_fast_modules_from_content(filename, content, training_context, prima
         Only return valid JSON, no explanations.
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         response_text = response.text.strip()
         
         # Parse JSON response
@@ -4146,25 +4243,9 @@ def create_simple_modules_from_content(filename, content, training_context):
         if not content or len(content) < 50:
             return []
         
-        # Split content into chunks
-        sentences = content.split('.')
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            if len(current_chunk) + len(sentence) < 500:
-                current_chunk += sentence + "."
-            else:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + "."
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        # Split content into ~500 character chunks with the shared semantic chunker
+        from modules.chunker import chunk_texts
+        chunks = chunk_texts(content, target_tokens=125)
         
         # Create modules from chunks with better titles and descriptions
         modules = []
@@ -4339,60 +4420,11 @@ def is_module_relevant_to_section(new_module, section_name):
 def create_module_mapping(editable_pathways):
     """
     Create a comprehensive mapping of modules for chatbot reference
-    Returns a dictionary with multiple ways to reference modules
+    Returns a dictionary with multiple ways to reference modules:
+    by_section_and_number, by_global_number, by_title and section_info.
+    The mapping is served from the maintained module index.
     """
-    module_mapping = {
-        'by_section_and_number': {},  # e.g., {'safety': {'1': module_obj, '2': module_obj}}
-        'by_global_number': {},       # e.g., {'1': module_obj, '2': module_obj}
-        'by_title': {},              # e.g., {'safety procedures': module_obj}
-        'section_info': {}           # e.g., {'safety': {'count': 3, 'modules': [module1, module2, module3]}}
-    }
-    
-    global_module_number = 1
-    
-    for section_name, modules in editable_pathways.items():
-        # Initialize section mapping
-        module_mapping['by_section_and_number'][section_name] = {}
-        module_mapping['section_info'][section_name] = {
-            'count': len(modules),
-            'modules': modules
-        }
-        
-        # Map modules within this section
-        for i, module in enumerate(modules):
-            local_module_number = i + 1
-            
-            # Map by section and local number
-            module_mapping['by_section_and_number'][section_name][str(local_module_number)] = {
-                'module': module,
-                'section': section_name,
-                'index': i,
-                'local_number': local_module_number,
-                'global_number': global_module_number
-            }
-            
-            # Map by global number
-            module_mapping['by_global_number'][str(global_module_number)] = {
-                'module': module,
-                'section': section_name,
-                'index': i,
-                'local_number': local_module_number,
-                'global_number': global_module_number
-            }
-            
-            # Map by title (lowercase for matching)
-            module_title_lower = module['title'].lower()
-            module_mapping['by_title'][module_title_lower] = {
-                'module': module,
-                'section': section_name,
-                'index': i,
-                'local_number': local_module_number,
-                'global_number': global_module_number
-            }
-            
-            global_module_number += 1
-    
-    return module_mapping
+    return get_module_index(editable_pathways).as_mapping()
 
 def get_module_reference_info(editable_pathways):
     """
@@ -4450,19 +4482,22 @@ def format_module_reference_help(editable_pathways):
     return help_text
 
 # --- Helper functions for past pathway integration ---
-def list_past_pathways():
-    """Return a summary of all past generated pathways."""
+def list_past_pathways(page=1, page_size=20):
+    """Return a summary of one page of past generated pathways."""
     past = st.session_state.get('past_generated_pathways', [])
     if not past:
         return "No past pathways found."
     out = []
-    for idx, pathway_data in enumerate(past, 1):
+    start = (max(page, 1) - 1) * page_size
+    for idx, pathway_data in enumerate(past[start:start + page_size], start + 1):
         for p in pathway_data.get('pathways', []):
             out.append(f"Pathway {idx}: {p.get('pathway_name', 'Unnamed')}")
             for sidx, section in enumerate(p.get('sections', []), 1):
                 out.append(f"  Section {sidx}: {section.get('title', 'Untitled')} ({len(section.get('modules', []))} modules)")
                 for midx, mod in enumerate(section.get('modules', []), 1):
                     out.append(f"    Module {midx}: {mod.get('title', 'No title')}")
+    if len(past) > page_size:
+        out.append(f"Showing pathways {start + 1}-{min(start + page_size, len(past))} of {len(past)}")
     return '\n'.join(out)
 
 def get_past_module(pathway_num, section_num, module_num):
@@ -4490,8 +4525,7 @@ def integrate_past_module_into_current(pathway_num, section_num, module_num, tar
     if target_section not in editable_pathways:
         return False, f"Section '{target_section}' not found in current pathway."
     # Add a copy of the module
-    editable_pathways[target_section].append(dict(module))
-    st.session_state['editable_pathways'] = editable_pathways
+    apply_pathway_patch({'op': 'add', 'section': target_section, 'module': dict(module)}, editable_pathways)
     return True, f"Module '{module.get('title','')}' from past pathway {pathway_num} section {section_num} integrated into section '{target_section}'."
 
 # Note: handle_past_pathway_request function is defined later in the file with advanced features
@@ -4548,8 +4582,7 @@ def merge_past_section_into_current(pathway_num, section_ref, target_section=Non
         return False, f"Section '{target_section}' not found in current pathway."
     # Add copies of all modules
     for mod in section.get('modules', []):
-        editable_pathways[target_section].append(dict(mod))
-    st.session_state['editable_pathways'] = editable_pathways
+        apply_pathway_patch({'op': 'add', 'section': target_section, 'module': dict(mod)}, editable_pathways)
     return True, f"Merged {len(section.get('modules', []))} modules from past pathway {pathway_num} section '{section.get('title','')}' into section '{target_section}'."
 
 # --- Update handle_past_pathway_request for advanced memory ---
@@ -4593,8 +4626,7 @@ def handle_past_pathway_request(user_input):
             target_section = list(editable_pathways.keys())[0]
         if target_section not in editable_pathways:
             return f"Section '{target_section}' not found in current pathway."
-        editable_pathways[target_section].append(dict(mod))
-        st.session_state['editable_pathways'] = editable_pathways
+        apply_pathway_patch({'op': 'add', 'section': target_section, 'module': dict(mod)}, editable_pathways)
         return f"Module '{module_title}' from pathway {pathway_num} integrated into section '{target_section}'."
     # Integrate module by number (existing logic)
     match = re.search(r'integrate module (\d+) from (?:past )?pathway (\d+)(?: section (\d+))?(?: into section ([\w\s]+))?', user_input_lower)
@@ -4711,7 +4743,7 @@ def get_module_content_summary(module_data):
         Provide a concise summary that captures the key training points.
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         return response.text.strip()
         
     except Exception as e:
@@ -4764,7 +4796,7 @@ def answer_content_question(question, editable_pathways=None):
         Answer:
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         return response.text.strip()
         
     except Exception as e:
@@ -4850,14 +4882,17 @@ def handle_content_question_request(user_input):
 
 # Update process_chatbot_request to handle content questions
 def process_chatbot_request(user_input, uploaded_files=None):
-    user_input_lower = user_input.lower()
+    # Classify locally first; only low-confidence messages reach the LLM below
+    has_files = bool(uploaded_files) or bool(st.session_state.get('processed_file_modules')) or bool(st.session_state.get('processed_file_content'))
+    intent = classify_intent(user_input, has_files=has_files)
+    debug_print("🧭 Chatbot intent: %s (%.2f) slots=%s", intent.name, intent.confidence, intent.slots)
     
     # Check for content questions first
-    if any(word in user_input_lower for word in ['find', 'search', 'what does', 'what is', 'how do', 'explain', 'tell me about', 'what are', 'show content', 'module content', 'what\'s in', 'content of']):
+    if intent.name == 'content_question':
         return handle_content_question_request(user_input)
     
     # Check for past pathway requests
-    if any(word in user_input_lower for word in ['past pathway', 'previous pathway', 'show past', 'list past', 'integrate from past', 'integrate from previous']):
+    if intent.name == 'past_pathway':
         return handle_past_pathway_request(user_input)
     
     # Original logic for other requests
@@ -4867,36 +4902,37 @@ def process_chatbot_request(user_input, uploaded_files=None):
     if editable_pathways:
         module_reference_help = format_module_reference_help(editable_pathways)
     
-    # Check for file-based update requests (using stored processed content) - PRIORITY 1
-    if any(word in user_input_lower for word in ['update', 'add to', 'modify', 'change', 'adjust', 'regenerate']):
-        if any(word in user_input_lower for word in ['module', 'section', 'pathway', 'course', 'program']):
-            return handle_file_based_module_update(user_input)
+    # Check for file-based update requests (using stored processed content)
+    if intent.name == 'file_update':
+        return handle_file_based_module_update(user_input)
     
-    # Check for regeneration requests (when no files uploaded)
-    if any(word in user_input_lower for word in ['regenerate']):
-        if 'module' in user_input_lower or 'content' in user_input_lower:
+    # Check for regeneration requests
+    if intent.name == 'regenerate':
+        if 'module_ref' in intent.slots or 'title' in intent.slots or 'content' in user_input.lower():
             return handle_module_regeneration(user_input)
         else:
             return f"I can help you regenerate modules. Please specify which module you'd like to regenerate and any specific changes you want.\n\n{module_reference_help}"
     
     # Check for file ingestion requests (when no files uploaded)
-    elif any(word in user_input_lower for word in ['ingest', 'upload', 'add', 'new file', 'new files', 'process files']):
+    elif intent.name == 'file_ingestion':
         return handle_file_ingestion(user_input)
     
-    # Check for tone/style changes (expanded to include more tones)
-    elif any(word in user_input_lower for word in ['tone', 'style', 'professional', 'casual', 'formal', 'technical', 'friendly', 'conversational', 'academic', 'simple', 'detailed']):
+    # Check for tone/style changes; a named module is regenerated in the new tone
+    elif intent.name == 'tone_change':
+        if 'module_ref' in intent.slots:
+            return handle_module_regeneration(user_input)
         return handle_tone_change(user_input)
     
     # Check for content addition
-    elif any(word in user_input_lower for word in ['add', 'include', 'missing', 'additional', 'insert', 'supplement']):
+    elif intent.name == 'content_addition':
         return handle_content_addition(user_input)
     
     # Check for specific module requests
-    elif any(word in user_input_lower for word in ['module', 'section', 'content']):
+    elif intent.name == 'module_specific':
         return handle_module_specific_request(user_input)
     
     # General help
-    elif any(word in user_input_lower for word in ['help', 'what can you do', 'how', 'commands']):
+    elif intent.name == 'help':
         return get_chatbot_help()
     
     # Default response - use AI for intelligent responses
@@ -4930,7 +4966,7 @@ def process_chatbot_request(user_input, uploaded_files=None):
             Keep the response concise and actionable.
             """
             
-            response = model.generate_content(prompt)
+            response = tracked_generate(model, prompt)
             return response.text.strip()
             
         except Exception as e:
@@ -4940,205 +4976,141 @@ def process_chatbot_request(user_input, uploaded_files=None):
             else:
                 return f"I can help you with:\n• Regenerating modules with different content or tone\n• Uploading new files to update pathways\n• Changing module tone/style (professional, casual, formal, technical, friendly, etc.)\n• Adding missing information to modules\n• Updating specific modules/sections with new file content\n• Searching for specific topics in pathways\n• Answering questions about training content\n\nPlease be more specific about what you'd like to do.\n\n{module_reference_help}"
 
-def generate_content_blocks_with_file_content(module, extracted_file_contents):
+def module_source_excerpt(module, extracted_file_contents):
+    """
+    Excerpts from the module's source files, or from the first uploaded files when it has none
+    """
+    relevant_content = ""
+    module_source = module.get('source', [])
+    if isinstance(module_source, str):
+        module_source = [module_source]
+    
+    for source in module_source:
+        if source in extracted_file_contents:
+            relevant_content += f"\n\nFrom {source}:\n{extracted_file_contents[source][:1500]}"
+    
+    # If no specific source files, use all available content (limited)
+    if not relevant_content and extracted_file_contents:
+        for filename, content in list(extracted_file_contents.items())[:2]:
+            relevant_content += f"\n\nFrom {filename}:\n{content[:800]}"
+    return relevant_content
+
+def generate_content_block_batch(requests, content_types):
+    """
+    Model-backed generator for the content block cache. No fallback is applied here,
+    so failed generations are not cached and are retried when the module is opened again.
+    """
+    from modules.config import model
+    return generate_content_blocks(requests, model, block_types=content_types)
+
+def content_block_requests(modules, extracted_file_contents):
+    return [
+        {
+            'title': module.get('title', 'Training Module'),
+            'content': module.get('content', ''),
+            'source_content': module_source_excerpt(module, extracted_file_contents)
+        }
+        for module in modules
+    ]
+
+def generate_content_blocks_for_modules(modules, extracted_file_contents, content_types=None):
+    """
+    Content blocks for several modules: cached by module content hash, awaited from a
+    prefetch in flight, or generated with one structured model call per batch
+    Returns: list of content block lists, in the same order as modules
+    """
+    content_types = list(content_types or DEFAULT_BLOCK_TYPES)
+    cache = get_content_block_cache(generate_content_block_batch)
+    results = cache.resolve_many(content_block_requests(modules, extracted_file_contents), content_types)
+    for module, blocks in zip(modules, results):
+        for block in blocks:
+            if not block.get('content_data'):
+                block['content_data'] = generate_fallback_content_data(block['type'], module.get('content', ''))
+    return results
+
+def prefetch_content_blocks(modules, extracted_file_contents):
+    """
+    Start background generation for modules that still need content blocks
+    Returns: number of modules scheduled
+    """
+    pending = {}
+    for module in modules:
+        missing_types = missing_content_block_types(module)
+        if missing_types:
+            pending.setdefault(tuple(missing_types), []).append(module)
+    
+    cache = get_content_block_cache(generate_content_block_batch)
+    return sum(
+        cache.prefetch(content_block_requests(group, extracted_file_contents), content_types)
+        for content_types, group in pending.items()
+    )
+
+def generate_content_blocks_with_file_content(module, extracted_file_contents, content_types=None):
     """
     Generate content blocks with actual file-based content for a module
+    All requested block types come from a single model call
     """
+    content_types = list(content_types or DEFAULT_BLOCK_TYPES)
     try:
-        from modules.config import model
-        
-        # Get module content and source files
-        module_content = module.get('content', '')
-        module_title = module.get('title', 'Training Module')
-        module_source = module.get('source', [])
-        
-        # Find relevant file content
-        relevant_content = ""
-        if isinstance(module_source, str):
-            module_source = [module_source]
-        
-        for source in module_source:
-            if source in extracted_file_contents:
-                file_content = extracted_file_contents[source]
-                # Get a relevant excerpt from the file
-                relevant_content += f"\n\nFrom {source}:\n{file_content[:1500]}"
-        
-        # If no specific source files, use all available content (limited)
-        if not relevant_content and extracted_file_contents:
-            for filename, content in list(extracted_file_contents.items())[:2]:
-                relevant_content += f"\n\nFrom {filename}:\n{content[:800]}"
-        
-        # Define content types to generate
-        content_types = ['text', 'video', 'knowledge_check', 'flashcard', 'list']
-        content_blocks = []
-        
-        for content_type in content_types:
-            try:
-                content_data = generate_file_based_content_data(content_type, module_title, module_content, relevant_content)
-                content_blocks.append({
-                    'type': content_type,
-                    'title': f"{content_type.title().replace('_', ' ')} Content",
-                    'content_data': content_data
-                })
-            except Exception as e:
-                # Fallback for individual content type generation failure
-                content_blocks.append({
-                    'type': content_type,
-                    'title': f"{content_type.title().replace('_', ' ')} Content",
-                    'content_data': generate_fallback_content_data(content_type, module_content)
-                })
-        
-        return content_blocks[:4]  # Return up to 4 content blocks
+        return generate_content_blocks_for_modules([module], extracted_file_contents, content_types)[0]
         
     except Exception as e:
         # Return basic content blocks if generation fails completely
         return [
             {
-                'type': 'text',
-                'title': 'Text Content',
-                'content_data': generate_fallback_content_data('text', module.get('content', ''))
-            },
-            {
-                'type': 'video',
-                'title': 'Video Content',
-                'content_data': generate_fallback_content_data('video', module.get('content', ''))
-            },
-            {
-                'type': 'knowledge_check',
-                'title': 'Knowledge Check',
-                'content_data': generate_fallback_content_data('knowledge_check', module.get('content', ''))
+                'type': content_type,
+                'title': f"{content_type.title().replace('_', ' ')} Content",
+                'content_data': generate_fallback_content_data(content_type, module.get('content', ''))
             }
+            for content_type in content_types
         ]
 
-def generate_file_based_content_data(content_type, module_title, module_content, file_content):
+def fill_missing_content_blocks(section, modules, extracted_file_contents, start=0):
     """
-    Generate content data based on actual file content using AI
+    Pathway batch mode: generate blocks for every module that has none or has empty blocks,
+    sharing model calls between modules that need the same block types
+    modules are the section's modules from index start on
+    Returns: number of modules updated
     """
-    try:
-        from modules.config import model
-        
-        if not model:
-            return generate_fallback_content_data(content_type, module_content)
-        
-        # Create specific prompts for each content type
-        if content_type == 'text':
-            prompt = f"""
-            Create detailed text content for "{module_title}" based on this file content:
-            
-            Module Content: {module_content[:500]}
-            File Content: {file_content[:1000]}
-            
-            Generate structured text content with:
-            - Key learning points (3-5 bullet points)
-            - Detailed explanation
-            - Practical applications
-            
-            Return as JSON: {{"text": "detailed content", "key_points": ["point1", "point2", "point3"]}}
-            """
-            
-        elif content_type == 'video':
-            prompt = f"""
-            Create a video script for "{module_title}" based on this file content:
-            
-            Module Content: {module_content[:500]}
-            File Content: {file_content[:1000]}
-            
-            Generate video content with:
-            - Scene descriptions
-            - Narration script
-            - Key visual elements
-            
-            Return as JSON: {{"video_script": "narration script", "video_duration": "3-5 minutes", "video_summary": "brief summary", "video_status": "completed"}}
-            """
-            
-        elif content_type == 'knowledge_check':
-            prompt = f"""
-            Create assessment questions for "{module_title}" based on this file content:
-            
-            Module Content: {module_content[:500]}
-            File Content: {file_content[:1000]}
-            
-            Generate 3 questions with answers covering key concepts from the file content.
-            
-            Return as JSON: {{"questions": ["Q1", "Q2", "Q3"], "answers": ["A1", "A2", "A3"], "question_type": "Multiple Choice", "difficulty_level": "Intermediate"}}
-            """
-            
-        elif content_type == 'flashcard':
-            prompt = f"""
-            Create flashcard content for "{module_title}" based on this file content:
-            
-            Module Content: {module_content[:500]}
-            File Content: {file_content[:1000]}
-            
-            Generate a flashcard with a key concept from the file.
-            
-            Return as JSON: {{"flashcard_front": "Key concept question", "flashcard_back": "Detailed answer from file content"}}
-            """
-            
-        elif content_type == 'list':
-            prompt = f"""
-            Create a checklist for "{module_title}" based on this file content:
-            
-            Module Content: {module_content[:500]}
-            File Content: {file_content[:1000]}
-            
-            Generate a practical checklist of steps or procedures from the file content.
-            
-            Return as JSON: {{"list_items": ["step1", "step2", "step3", "step4"], "instructions": "How to use this checklist"}}
-            """
-            
-        else:
-            return generate_fallback_content_data(content_type, module_content)
-        
-        # Generate content with AI
-        response = model.generate_content(prompt)
-        if response and response.text:
-            try:
-                import json
-                # Extract JSON from response
-                response_text = response.text.strip()
-                if response_text.startswith('```json'):
-                    response_text = response_text.replace('```json', '').replace('```', '').strip()
-                content_data = json.loads(response_text)
-                return content_data
-            except json.JSONDecodeError:
-                # If JSON parsing fails, create content from the text response
-                return generate_content_from_text_response(content_type, response.text, module_content)
-        
-        return generate_fallback_content_data(content_type, module_content)
-        
-    except Exception as e:
-        return generate_fallback_content_data(content_type, module_content)
+    pending = {}
+    for offset, module in enumerate(modules):
+        missing_types = missing_content_block_types(module)
+        if missing_types:
+            pending.setdefault(tuple(missing_types), []).append((start + offset, module))
+    
+    for content_types, group in pending.items():
+        generated = generate_content_blocks_for_modules([module for _, module in group], extracted_file_contents, content_types)
+        for (index, module), blocks in zip(group, generated):
+            merge_content_blocks(section, index, module, blocks)
+    return sum(len(group) for group in pending.values())
+
+def missing_content_block_types(module):
+    """Block types whose content still has to be generated for a module"""
+    content_blocks = module.get('content_blocks') or []
+    if not content_blocks:
+        return list(DEFAULT_BLOCK_TYPES)
+    return [
+        block.get('type', 'text') for block in content_blocks
+        if isinstance(block, dict) and not block.get('content_data') and block.get('type', 'text') in BLOCK_FIELDS
+    ]
 
-def generate_content_from_text_response(content_type, ai_response, module_content):
+def merge_content_blocks(section, index, module, generated_blocks):
     """
-    Generate content data from AI text response when JSON parsing fails
+    Put generated blocks into the module at editable_pathways[section][index],
+    replacing empty blocks of the same type, as an undoable replace patch
     """
-    if content_type == 'text':
-        return {
-            'text': ai_response[:500],
-            'key_points': [line.strip() for line in ai_response.split('\n') if line.strip().startswith('•') or line.strip().startswith('-')][:3]
-        }
-    elif content_type == 'video':
-        return {
-            'video_script': ai_response[:300],
-            'video_duration': '3-5 minutes',
-            'video_summary': module_content[:150],
-            'video_status': 'completed'
-        }
-    elif content_type == 'knowledge_check':
-        lines = [line.strip() for line in ai_response.split('\n') if line.strip()]
-        questions = [line for line in lines if '?' in line][:3]
-        if not questions:
-            questions = ['What are the key concepts in this module?', 'How would you apply this knowledge?', 'What are the most important takeaways?']
-        return {
-            'questions': questions,
-            'answers': [f'Answer based on: {module_content[:100]}...' for _ in questions],
-            'question_type': 'Open-ended',
-            'difficulty_level': 'Intermediate'
-        }
+    content_blocks = module.get('content_blocks') or []
+    if not content_blocks:
+        merged = list(generated_blocks)
     else:
-        return generate_fallback_content_data(content_type, module_content)
+        by_type = {block['type']: block for block in generated_blocks}
+        merged = [
+            dict(block, content_data=by_type[block.get('type', 'text')]['content_data'])
+            if isinstance(block, dict) and not block.get('content_data') and block.get('type', 'text') in by_type
+            else block
+            for block in content_blocks
+        ]
+    apply_pathway_patch({'op': 'replace', 'section': section, 'index': index, 'fields': {'content_blocks': merged}})
 
 def generate_fallback_content_data(content_type, module_content):
     """
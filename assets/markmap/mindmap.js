@@ -0,0 +1,127 @@
+/*
+ * Dependency-free mind map renderer used by markmap_component.py when the
+ * markmap-view bundle is not vendored next to this file.
+ *
+ * renderMindMap(svg, root, options) draws a horizontal tree from
+ * {content, children} nodes. Nodes deeper than options.initialExpandLevel
+ * start collapsed, and SVG elements are only created for visible nodes, so
+ * large maps open instantly; clicking a node expands or collapses it.
+ * Wheel zooms, dragging pans.
+ */
+(function () {
+  var SVG_NS = 'http://www.w3.org/2000/svg';
+  var COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#17becf'];
+  var ROW_HEIGHT = 26;
+  var CHAR_WIDTH = 7;
+  var GAP = 40;
+
+  function el(name, attrs, parent) {
+    var node = document.createElementNS(SVG_NS, name);
+    for (var key in attrs) node.setAttribute(key, attrs[key]);
+    if (parent) parent.appendChild(node);
+    return node;
+  }
+
+  function prepare(node, depth, color, initialExpandLevel) {
+    node.depth = depth;
+    node.children = node.children || [];
+    node.collapsed = initialExpandLevel >= 0 && depth >= initialExpandLevel && node.children.length > 0;
+    node.color = depth === 1 ? COLORS[(prepare.branch++) % COLORS.length] : color;
+    for (var i = 0; i < node.children.length; i++) {
+      prepare(node.children[i], depth + 1, node.color || COLORS[0], initialExpandLevel);
+    }
+  }
+
+  function layout(root) {
+    // Column x per depth from the widest visible label; rows from visible leaf order
+    var widths = [], visible = [], row = 0;
+    (function walk(node) {
+      visible.push(node);
+      widths[node.depth] = Math.max(widths[node.depth] || 0, Math.min(node.content.length, 48) * CHAR_WIDTH);
+      if (!node.collapsed) node.children.forEach(walk);
+    })(root);
+    var columns = [0];
+    for (var d = 1; d < widths.length; d++) columns[d] = columns[d - 1] + widths[d - 1] + GAP;
+    (function place(node) {
+      node.x = columns[node.depth];
+      var open = !node.collapsed && node.children.length;
+      if (!open) {
+        node.y = row++ * ROW_HEIGHT;
+      } else {
+        node.children.forEach(place);
+        node.y = (node.children[0].y + node.children[node.children.length - 1].y) / 2;
+      }
+    })(root);
+    return {nodes: visible, width: columns[columns.length - 1] + widths[widths.length - 1], height: row * ROW_HEIGHT};
+  }
+
+  function label(text) {
+    return text.length > 48 ? text.slice(0, 47) + '…' : text;
+  }
+
+  window.renderMindMap = function (svg, root, options) {
+    options = options || {};
+    prepare.branch = 0;
+    prepare(root, 0, COLORS[0], options.initialExpandLevel === undefined ? -1 : options.initialExpandLevel);
+    var view = {x: -20, y: -20, scale: 1};
+    var canvas = el('g', {}, svg);
+
+    function applyView() {
+      canvas.setAttribute('transform', 'translate(' + (-view.x) + ',' + (-view.y) + ') scale(' + view.scale + ')');
+    }
+
+    function draw() {
+      while (canvas.firstChild) canvas.removeChild(canvas.firstChild);
+      var result = layout(root);
+      var links = el('g', {fill: 'none', 'stroke-width': 1.5}, canvas);
+      var nodes = el('g', {'font-family': 'sans-serif', 'font-size': 13}, canvas);
+      result.nodes.forEach(function (node) {
+        if (!node.collapsed) {
+          node.children.forEach(function (child) {
+            var sx = node.x + Math.min(node.content.length, 48) * CHAR_WIDTH + 8, mx = (sx + child.x) / 2;
+            el('path', {d: 'M' + sx + ',' + node.y + 'C' + mx + ',' + node.y + ' ' + mx + ',' + child.y + ' ' + (child.x - 6) + ',' + child.y,
+                        stroke: child.color, 'stroke-opacity': 0.6}, links);
+          });
+        }
+        var group = el('g', {transform: 'translate(' + node.x + ',' + node.y + ')', cursor: node.children.length ? 'pointer' : 'default'}, nodes);
+        var text = el('text', {y: -4, fill: '#222'}, group);
+        text.textContent = label(node.content);
+        if (node.content.length > 48) el('title', {}, text).textContent = node.content;
+        el('line', {x1: -6, x2: Math.min(node.content.length, 48) * CHAR_WIDTH + 8, y1: 2, y2: 2, stroke: node.color, 'stroke-width': 2}, group);
+        if (node.children.length) {
+          el('circle', {cx: Math.min(node.content.length, 48) * CHAR_WIDTH + 8, cy: 2, r: 4,
+                        fill: node.collapsed ? node.color : '#fff', stroke: node.color, 'stroke-width': 1.5}, group);
+          group.addEventListener('click', function () {
+            node.collapsed = !node.collapsed;
+            draw();
+          });
+        }
+      });
+      applyView();
+    }
+
+    svg.addEventListener('wheel', function (event) {
+      event.preventDefault();
+      var factor = event.deltaY < 0 ? 1.1 : 1 / 1.1;
+      view.x = (view.x + event.offsetX) * factor - event.offsetX;
+      view.y = (view.y + event.offsetY) * factor - event.offsetY;
+      view.scale *= factor;
+      applyView();
+    }, {passive: false});
+    var drag = null;
+    svg.addEventListener('mousedown', function (event) { drag = {x: event.clientX, y: event.clientY}; });
+    window.addEventListener('mouseup', function () { drag = null; });
+    window.addEventListener('mousemove', function (event) {
+      if (!drag) return;
+      view.x -= event.clientX - drag.x;
+      view.y -= event.clientY - drag.y;
+      drag = {x: event.clientX, y: event.clientY};
+      applyView();
+    });
+
+    draw();
+    // Start with the root vertically centred
+    view.y = root.y - (svg.clientHeight || 600) / 2;
+    applyView();
+  };
+})();
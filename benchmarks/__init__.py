@@ -0,0 +1 @@
+# Offline benchmarks for Gateway Content Automation (run: python benchmarks/run_benchmarks.py)
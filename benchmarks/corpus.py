@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Synthetic, deterministic corpora for the benchmarks
+Files mimic what users upload: procedure documents, meeting transcripts and
+technical references, with realistic lengths and some repeated material.
+"""
+
+import random
+
+TRAINING_CONTEXT = {
+    'training_type': 'Onboarding',
+    'target_audience': 'New maintenance technicians',
+    'industry': 'Manufacturing',
+    'primary_goals': 'Safe equipment operation, lockout tagout procedures and quality inspections',
+    'success_metrics': 'Zero safety incidents in the first 90 days',
+}
+
+_EQUIPMENT = ['hydraulic press', 'conveyor line', 'CNC lathe', 'paint booth', 'forklift', 'air compressor',
+              'packaging robot', 'boiler', 'welding cell', 'cooling tower']
+_ACTIONS = ['inspect', 'isolate', 'verify', 'lubricate', 'calibrate', 'document', 'report', 'replace', 'test', 'clean']
+_OBJECTS = ['the guard interlock', 'the pressure gauge', 'the emergency stop', 'the drive belt', 'the filter housing',
+            'the torque settings', 'the safety checklist', 'the energy isolation point', 'the work order', 'the PPE']
+_SPEAKERS = ['Maria', 'Dev', 'Priya', 'Tom', 'Alex']
+
+
+def _procedure(rng, paragraphs):
+    equipment = rng.choice(_EQUIPMENT)
+    lines = [f"{equipment.title()} Standard Operating Procedure", ""]
+    step = 1
+    for p in range(paragraphs):
+        lines.append(f"Section {p + 1}: {rng.choice(_ACTIONS).title()} {rng.choice(_OBJECTS)}")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"{step}. Technicians must {rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)} on the {equipment} "
+                         f"before starting the shift and record the result in the maintenance log.")
+            step += 1
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def _transcript(rng, paragraphs):
+    lines = ["Teams Meeting - Maintenance Sync - March 3, 2024", ""]
+    for _ in range(paragraphs * 4):
+        speaker = rng.choice(_SPEAKERS)
+        lines.append(f"{speaker}: So when we {rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)} on the "
+                     f"{rng.choice(_EQUIPMENT)}, we always check it twice, um, because last month it failed.")
+    return '\n'.join(lines)
+
+
+def _reference(rng, paragraphs):
+    lines = [f"Technical Reference: {rng.choice(_EQUIPMENT).title()}", ""]
+    for p in range(paragraphs):
+        lines.append(f"{p + 1}.0 Specifications")
+        lines.append(f"The {rng.choice(_EQUIPMENT)} operates at {rng.randint(50, 400)} psi with a maximum load of "
+                     f"{rng.randint(1, 20)} tonnes. Operators {rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)} weekly. "
+                     f"Deviation beyond {rng.randint(2, 9)} percent requires a supervisor sign-off.")
+        lines.append("")
+    return '\n'.join(lines)
+
+
+_GENERATORS = (('procedure', _procedure, '.docx'), ('transcript', _transcript, '.txt'), ('reference', _reference, '.pdf'))
+
+
+def synthetic_corpus(file_count, seed=7, paragraphs=(3, 12)):
+    """
+    Deterministic {filename: content} corpus
+
+    Args:
+        file_count (int): Number of files
+        seed (int): Random seed; the same seed gives the same corpus
+        paragraphs (tuple): Min/max paragraphs per file
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for i in range(file_count):
+        kind, generator, extension = _GENERATORS[i % len(_GENERATORS)]
+        corpus[f"{kind}_{i:04d}{extension}"] = generator(rng, rng.randint(*paragraphs))
+    return corpus
+
+
+def file_inventory(corpus):
+    """The file inventory shape the orchestrators receive"""
+    return {name: {'type': name.rsplit('.', 1)[-1], 'size': len(content)} for name, content in corpus.items()}
+
+
+def synthetic_pathway(sections=4, modules_per_section=4, seed=7):
+    """Pathway data with sections below the validation minimums (so validation has work to do)"""
+    rng = random.Random(seed)
+    return {'pathways': [{
+        'pathway_name': 'Maintenance Onboarding',
+        'sections': [{
+            'title': f"{rng.choice(_ACTIONS).title()} {rng.choice(_EQUIPMENT).title()} {s + 1}",
+            'description': 'Generated for benchmarks',
+            'modules': [{
+                'title': f"{rng.choice(_ACTIONS).title()} {rng.choice(_OBJECTS)} {s + 1}.{m + 1}",
+                'description': 'Benchmark module',
+                'content': _procedure(rng, 1),
+                'source': ['procedure_0000.docx'],
+                'content_types': ['text'],
+            } for m in range(modules_per_section)]
+        } for s in range(sections)]
+    }]}
+
+
+def synthetic_editable(module_count, seed=7):
+    """editable_pathways structure with module_count modules over sections of 10"""
+    pathway = synthetic_pathway(sections=max(1, module_count // 10), modules_per_section=min(10, module_count), seed=seed)
+    return {section['title']: section['modules'] for section in pathway['pathways'][0]['sections']}
+
+
+CHATBOT_MESSAGES = (
+    "regenerate module 3 with a more professional tone",
+    "what does the lockout section say about energy isolation?",
+    "show me past pathways",
+    "add the new safety document to section 2",
+    "make module 1.4 more conversational",
+    "help",
+    "include missing information about PPE in module 2",
+    "update the pathway with the uploaded files",
+)
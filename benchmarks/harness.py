@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Timing harness for the benchmarks: runs a callable over inputs and reports
+throughput and p50/p95 latencies
+"""
+
+import time
+import json
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name, func, inputs, repeat=1, size=None):
+    """
+    Call func(item) for every item (repeat times) and summarize the latencies
+
+    Returns:
+        dict: name, size, calls, errors, total_s, throughput_per_s, p50_ms, p95_ms, max_ms
+    """
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            call_started = time.perf_counter()
+            try:
+                func(item)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'name': name,
+        'size': size if size is not None else len(inputs),
+        'calls': len(latencies),
+        'errors': errors,
+        'total_s': round(total, 4),
+        'throughput_per_s': round(len(latencies) / total, 2) if total else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def format_table(results):
+    """Plain-text table of measure() results"""
+    header = f"{'benchmark':<42}{'size':>6}{'calls':>8}{'err':>5}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+    lines = [header, '-' * len(header)]
+    for row in results:
+        lines.append(f"{row['name']:<42}{row['size']:>6}{row['calls']:>8}{row['errors']:>5}"
+                     f"{row['throughput_per_s']:>12}{row['p50_ms']:>10}{row['p95_ms']:>10}")
+    return '\n'.join(lines)
+
+
+def write_json(results, path, metadata=None):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump({'metadata': metadata or {}, 'results': results}, handle, indent=2)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite
+Runs the extraction, chunking, generation, content block, validation, search,
+clustering, transcript cleaning and segmentation, terminology and chatbot
+routing paths on synthetic corpora with the deterministic fake Gemini model, so
+no API key or network access is needed.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1,10,100,1000 --latency 0.05 --json results.json
+"""
+
+import os
+import sys
+import copy
+import argparse
+
+# The fake model must be selected before any module imports modules.config
+os.environ['GEMINI_FAKE_MODEL'] = '1'
+os.environ['GEMINI_API_KEY'] = ''
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import (
+    TRAINING_CONTEXT, CHATBOT_MESSAGES, synthetic_corpus, file_inventory, synthetic_pathway, synthetic_editable
+)
+from benchmarks.harness import measure, format_table, write_json
+
+DEFAULT_SIZES = (1, 10, 100, 1000)
+
+
+def bench_per_file(sizes):
+    """Functions that run once per uploaded file"""
+    from modules import chunker
+    from modules.utils import detect_content_type, extract_training_information_from_content, extract_modules_from_file_content
+
+    results = []
+    for size in sizes:
+        corpus = synthetic_corpus(size)
+        items = list(corpus.items())
+        contents = [content for _, content in items]
+        results.append(measure('detect_content_type', detect_content_type, contents, size=size))
+        with chunker._chunk_cache_lock:
+            chunker._CHUNK_CACHE.clear()
+        results.append(measure('chunk_texts (cold)', chunker.chunk_texts, contents, size=size))
+        results.append(measure('chunk_texts (cached)', chunker.chunk_texts, contents, size=size))
+        results.append(measure('extract_training_information_from_content',
+                               lambda content: extract_training_information_from_content(content, TRAINING_CONTEXT),
+                               contents, size=size))
+        results.append(measure('extract_modules_from_file_content',
+                               lambda item: extract_modules_from_file_content(item[0], item[1], TRAINING_CONTEXT),
+                               items, size=size))
+    return results
+
+
+def bench_orchestrators(sizes):
+    """Whole-corpus pathway generation"""
+    from modules.fast_ai_agents import OptimizedPathwayOrchestrator
+    from modules.ai_agents import PathwayOrchestrator
+
+    results = []
+    for size in sizes:
+        corpus = synthetic_corpus(size)
+        inventory = file_inventory(corpus)
+        results.append(measure('OptimizedPathwayOrchestrator',
+                               lambda files: OptimizedPathwayOrchestrator().generate_optimized_pathways(files, TRAINING_CONTEXT, inventory),
+                               [corpus], size=size))
+        results.append(measure('PathwayOrchestrator',
+                               lambda files: PathwayOrchestrator().generate_ai_powered_pathways(files, TRAINING_CONTEXT, inventory),
+                               [corpus], size=size))
+    return results
+
+
+def bench_validation(sizes):
+    from modules.utils import validate_and_enhance_pathway_modules
+
+    results = []
+    for size in sizes:
+        pathway = synthetic_pathway(sections=max(1, size // 25), modules_per_section=4)
+        results.append(measure('validate_and_enhance_pathway_modules',
+                               lambda data: validate_and_enhance_pathway_modules(copy.deepcopy(data), training_context=TRAINING_CONTEXT),
+                               [pathway], repeat=5, size=size))
+    return results
+
+
+def bench_search_and_routing(sizes):
+    from modules.module_index import ModuleIndex
+    from modules.intent_classifier import classify_intent
+
+    results = []
+    for size in sizes:
+        editable = synthetic_editable(max(size, 1))
+        titles = [module['title'] for modules in editable.values() for module in modules]
+        results.append(measure('ModuleIndex build', ModuleIndex, [editable], repeat=5, size=size))
+        index = ModuleIndex(editable)
+        queries = [title.lower().replace('the ', '') for title in titles[:200]]
+        results.append(measure('ModuleIndex.find_title', index.find_title, queries, size=size))
+    messages = list(CHATBOT_MESSAGES) * 50
+    results.append(measure('classify_intent', classify_intent, messages, size=len(messages)))
+    return results
+
+
+def bench_content_blocks(sizes):
+    """Content blocks for every module: one call per module vs. batched calls"""
+    from modules.config import get_model
+    from modules.content_blocks import generate_content_blocks
+
+    results = []
+    for size in sizes:
+        editable = synthetic_editable(max(size, 1))
+        requests = [
+            {'id': str(i), 'title': module['title'], 'content': module['content'], 'source_content': module['content']}
+            for i, module in enumerate(module for section_modules in editable.values() for module in section_modules)
+        ][:size]
+        for batch_size in (1, 8):
+            results.append(measure(f'generate_content_blocks (batch {batch_size})',
+                                   lambda items: generate_content_blocks(items, get_model(), batch_size=batch_size),
+                                   [requests], size=size))
+    return results
+
+
+def bench_clustering(sizes):
+    from modules.topic_clustering import cluster_modules
+
+    results = []
+    for size in sizes:
+        editable = synthetic_editable(max(size, 1))
+        modules = [module for section_modules in editable.values() for module in section_modules]
+        results.append(measure('cluster_modules',
+                               lambda items: cluster_modules(items, max_clusters=6, max_cluster_size=8),
+                               [modules], repeat=3, size=size))
+    return results
+
+
+def bench_transcript_cleaning(sizes):
+    from modules.transcript_cleaner import clean_transcript
+    from modules.transcript_segmenter import TurnTable, segment_table
+
+    results = []
+    for size in sizes:
+        corpus = synthetic_corpus(max(size, 1))
+        transcripts = [content for name, content in corpus.items() if name.endswith('.txt')] or list(corpus.values())
+        results.append(measure('clean_transcript', clean_transcript, transcripts, repeat=3, size=size))
+        results.append(measure('segment_topics', lambda text: segment_table(TurnTable.from_text(text)),
+                               transcripts, repeat=3, size=size))
+    return results
+
+
+def bench_terminology(sizes):
+    from modules.keyphrases import terminology, clear_keyphrase_cache
+
+    def extract_uncached(content):
+        clear_keyphrase_cache()
+        return terminology(content, TRAINING_CONTEXT, 'all')
+
+    results = []
+    for size in sizes:
+        contents = list(synthetic_corpus(max(size, 1)).values())
+        results.append(measure('terminology_uncached', extract_uncached, contents, repeat=1, size=size))
+        results.append(measure('terminology_cached', lambda content: terminology(content, TRAINING_CONTEXT, 'all'),
+                               contents, repeat=3, size=size))
+    return results
+
+
+SUITES = {
+    'per_file': bench_per_file,
+    'orchestrators': bench_orchestrators,
+    'validation': bench_validation,
+    'search': bench_search_and_routing,
+    'clustering': bench_clustering,
+    'content_blocks': bench_content_blocks,
+    'transcripts': bench_transcript_cleaning,
+    'terminology': bench_terminology,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks with a fake Gemini model")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated corpus sizes (number of files)")
+    parser.add_argument('--suites', default=','.join(SUITES), help=f"Subset of: {', '.join(SUITES)}")
+    parser.add_argument('--latency', type=float, default=0.0, help="Fake model latency per call (seconds)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra deterministic latency per call (seconds)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of fake model calls that fail")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    from modules.config import use_model
+    from modules.fake_gemini import FakeGeminiModel
+    fake_model = FakeGeminiModel(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+    use_model(fake_model)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for suite in args.suites.split(','):
+        suite = suite.strip()
+        if suite not in SUITES:
+            parser.error(f"Unknown suite: {suite}")
+        print(f"▶️ Running {suite} benchmarks for sizes {sizes}...")
+        results.extend(SUITES[suite](sizes))
+
+    print()
+    print(format_table(results))
+    print(f"\nFake model: {fake_model.calls} calls, {fake_model.failures} injected failures")
+    if args.json:
+        write_json(results, args.json, {
+            'sizes': sizes, 'latency': args.latency, 'jitter': args.jitter, 'failure_rate': args.failure_rate,
+            'model_calls': fake_model.calls,
+        })
+        print(f"📄 Results written to {args.json}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,136 @@
-import streamlit as st
-import streamlit.components.v1 as components
-
-def markmap(md: str, height=600):
-    markmap_js = "https://cdn.jsdelivr.net/npm/markmap-autoloader"
-    html = f"""
-    <html>
-    <head>
-      <script src="{markmap_js}"></script>
-    </head>
-    <body>
-      <svg id="mindmap"></svg>
-      <script>
-        window.markmap.autoLoader.renderAll();
-      </script>
-      <script type="text/markdown" id="markmap-data">
-{md}
-      </script>
-    </body>
-    </html>
+"""
+Markmap mind map component that works offline
+The markdown is parsed into a tree in Python and drawn by a renderer inlined
+from assets/markmap/, so no CDN is contacted. When the markmap-view bundle
+(d3.min.js and markmap-view.min.js) is vendored into that folder it is used
+instead of the built-in renderer. Rendered HTML is memoized by markdown hash,
+so reruns with an unchanged map reuse the same iframe content.
+"""
+
+import os
+import re
+import json
+import hashlib
+import functools
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'markmap')
+MARKMAP_BUNDLE = ('d3.min.js', 'markmap-view.min.js')
+BUILTIN_RENDERER = 'mindmap.js'
+
+# Maps with more nodes than this open collapsed to DEFAULT_INITIAL_DEPTH
+LARGE_MAP_NODES = 150
+DEFAULT_INITIAL_DEPTH = 2
+HTML_CACHE_SIZE = 64
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+_LIST_ITEM = re.compile(r'^(\s*)[-*+]\s+(.*)$')
+_INLINE_MARKUP = re.compile(r'\*\*|__|`|\[([^\]]*)\]\([^)]*\)')
+
+
+def _plain(text):
+    return _INLINE_MARKUP.sub(lambda match: match.group(1) or '', text).strip()
+
+
+def parse_markdown_tree(md):
+    """
+    Markmap-style tree from headings and (nested) list items
+
+    Returns:
+        dict: {'content': str, 'children': [...]}; several top-level headings are
+        wrapped in an untitled root
     """
-    components.html(html, height=height)
\ No newline at end of file
+    root = {'content': '', 'children': [], 'level': 0}
+    stack = [root]
+    heading_level = 0
+    for line in (md or '').splitlines():
+        if not line.strip():
+            continue
+        heading = _HEADING.match(line.strip())
+        item = None if heading else _LIST_ITEM.match(line)
+        if heading:
+            level = len(heading.group(1))
+            heading_level = level
+            text = heading.group(2)
+        elif item:
+            level = heading_level + 1 + len(item.group(1).expandtabs(2)) // 2
+            text = item.group(2)
+        else:
+            continue
+        node = {'content': _plain(text), 'children': [], 'level': level}
+        while stack[-1]['level'] >= level:
+            stack.pop()
+        stack[-1]['children'].append(node)
+        stack.append(node)
+
+    def strip_levels(node):
+        return {'content': node['content'], 'children': [strip_levels(child) for child in node['children']]}
+
+    if len(root['children']) == 1:
+        return strip_levels(root['children'][0])
+    return strip_levels(root)
+
+
+def count_nodes(tree):
+    return 1 + sum(count_nodes(child) for child in tree.get('children', []))
+
+
+@functools.lru_cache(maxsize=None)
+def _asset(name):
+    path = os.path.join(ASSET_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as handle:
+        return handle.read()
+
+
+def _inline_script(source):
+    # A literal "</script>" inside the asset would end the tag early
+    return source.replace('</script', '<\\/script')
+
+
+@functools.lru_cache(maxsize=HTML_CACHE_SIZE)
+def _render_html(md_hash, md, initial_depth):
+    tree = parse_markdown_tree(md)
+    if initial_depth is None:
+        initial_depth = DEFAULT_INITIAL_DEPTH if count_nodes(tree) > LARGE_MAP_NODES else -1
+    data = json.dumps(tree, ensure_ascii=False).replace('</', '<\\/')
+    bundle = [_asset(name) for name in MARKMAP_BUNDLE]
+    if all(bundle):
+        scripts = ''.join(f"<script>{_inline_script(source)}</script>" for source in bundle)
+        draw = (f"window.markmap.Markmap.create(svg, {{initialExpandLevel: {initial_depth}}}, "
+                f"(function toMarkmap(node) {{ return {{content: node.content, children: (node.children || []).map(toMarkmap)}}; }})(root));")
+    else:
+        scripts = f"<script>{_inline_script(_asset(BUILTIN_RENDERER))}</script>"
+        draw = f"window.renderMindMap(svg, root, {{initialExpandLevel: {initial_depth}}});"
+    return f"""<html>
+<head>
+  <meta charset="utf-8">
+  <style>html, body {{ margin: 0; height: 100%; }} svg {{ width: 100%; height: 100%; }}</style>
+  {scripts}
+</head>
+<body data-map="{md_hash}">
+  <svg id="mindmap"></svg>
+  <script>
+    var svg = document.getElementById('mindmap');
+    var root = {data};
+    {draw}
+  </script>
+</body>
+</html>"""
+
+
+def markmap_html(md, initial_depth=None):
+    """
+    Self-contained HTML for a mind map
+
+    Args:
+        md (str): Markmap markdown (headings and nested lists)
+        initial_depth (int): Levels shown expanded; None collapses only large maps
+    """
+    md_hash = hashlib.sha1((md or '').encode('utf-8')).hexdigest()
+    return _render_html(md_hash, md or '', initial_depth)
+
+
+def markmap(md: str, height=600, initial_depth=None):
+    import streamlit.components.v1 as components
+    components.html(markmap_html(md, initial_depth), height=height)
@@ -7,7 +7,8 @@ Specialized agents for creating optimal training pathways, sections, and modules
 import json
 import re
 from modules.config import model
-from modules.utils import debug_print
+from modules.app_log import debug_print
+from modules.prompt_builder import PromptBuilder, tracked_generate
 
 class PathwayPlannerAgent:
     """
@@ -30,7 +31,7 @@ class PathwayPlannerAgent:
             prompt = self._build_pathway_analysis_prompt(extracted_content, training_context, file_inventory)
             
             debug_print("🤖 PathwayPlannerAgent: Analyzing content for optimal pathway structure...")
-            response = self.model.generate_content(prompt)
+            response = tracked_generate(self.model, prompt)
             
             if response and response.text:
                 return self._parse_pathway_plan(response.text)
@@ -46,9 +47,10 @@ class PathwayPlannerAgent:
         """
         Build comprehensive prompt for pathway analysis
         """
+        builder = PromptBuilder('planner', training_context=training_context)
         content_summary = ""
-        for filename, content in extracted_content.items():
-            content_preview = content[:500] if content else "No content"
+        for file_index, (filename, content) in enumerate(extracted_content.items()):
+            content_preview = builder.slot(f"file_{file_index}", content, fallback="No content")
             content_summary += f"\n\nFile: {filename}\nContent Preview: {content_preview}"
         
         prompt = f"""
@@ -108,7 +110,7 @@ OUTPUT FORMAT (JSON):
 
 Make each pathway truly unique and professional. Focus on creating value-driven, specific names and descriptions.
 """
-        return prompt
+        return builder.render(prompt)
     
     def _parse_pathway_plan(self, response_text):
         """
@@ -181,7 +183,7 @@ class SectionGeneratorAgent:
             prompt = self._build_section_prompt(section_plan, content_chunk, training_context)
             
             debug_print(f"🤖 SectionGeneratorAgent: Generating section '{section_plan.get('section_name', 'Unknown')}'...")
-            response = self.model.generate_content(prompt)
+            response = tracked_generate(self.model, prompt)
             
             if response and response.text:
                 return self._parse_section_content(response.text, section_plan)
@@ -196,6 +198,9 @@ class SectionGeneratorAgent:
         """
         Build prompt for section content generation
         """
+        builder = PromptBuilder('section', training_context=training_context)
+        source_excerpt = builder.slot('source', content_chunk, fallback='No specific content provided')
+        
         prompt = f"""
 You are an expert Training Content Developer. Create detailed section content based on the plan and source material.
 
@@ -209,7 +214,7 @@ TRAINING CONTEXT:
 - Target Audience: {training_context.get('target_audience', 'Employees')}
 
 SOURCE CONTENT:
-{content_chunk[:1000] if content_chunk else 'No specific content provided'}
+{source_excerpt}
 
 TASK: Create a professional, comprehensive section with the planned modules.
 
@@ -241,7 +246,7 @@ OUTPUT FORMAT (JSON):
 
 Ensure all content is professional, clear, and actionable. No conversational tone or meeting artifacts.
 """
-        return prompt
+        return builder.render(prompt)
     
     def _parse_section_content(self, response_text, section_plan):
         """
@@ -301,7 +306,7 @@ class ModuleContentAgent:
             prompt = self._build_module_enhancement_prompt(module_data, source_content, training_context)
             
             debug_print(f"🤖 ModuleContentAgent: Enhancing module '{module_data.get('title', 'Unknown')}'...")
-            response = self.model.generate_content(prompt)
+            response = tracked_generate(self.model, prompt)
             
             if response and response.text:
                 enhanced = self._parse_enhanced_module(response.text, module_data)
@@ -317,20 +322,24 @@ class ModuleContentAgent:
         """
         Build prompt for module content enhancement
         """
+        builder = PromptBuilder('module', training_context=training_context)
+        current_content = builder.slot('module_content', module_data.get('content', ''), weight=2, fallback='Basic content')
+        source_excerpt = builder.slot('source', source_content, fallback='No additional source material')
+        
         prompt = f"""
 You are an expert Instructional Designer. Enhance this training module with comprehensive, professional content.
 
 MODULE TO ENHANCE:
 - Title: {module_data.get('title', 'Training Module')}
 - Description: {module_data.get('description', 'Training content')}
-- Current Content: {module_data.get('content', 'Basic content')}
+- Current Content: {current_content}
 
 TRAINING CONTEXT:
 - Industry: {training_context.get('industry', 'General')}
 - Target Audience: {training_context.get('target_audience', 'Employees')}
 
 SOURCE MATERIAL:
-{source_content[:800] if source_content else 'No additional source material'}
+{source_excerpt}
 
 TASK: Create comprehensive, professional training module content.
 
@@ -367,7 +376,7 @@ ASSESSMENT CRITERIA:
 
 Make the content comprehensive, professional, and actionable. No conversational language or meeting references.
 """
-        return prompt
+        return builder.render(prompt)
     
     def _parse_enhanced_module(self, response_text, original_module):
         """
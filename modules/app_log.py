@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Structured, bounded logging for the app
+Records go through a non-blocking QueueHandler to a listener thread that keeps
+the most recent records of each session in a fixed-size ring buffer (and
+echoes them to the console). Messages use logging's lazy %-formatting, and
+sample() lets hot loops log one record out of every N.
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+import collections
+import logging.handlers
+
+LOGGER_NAME = 'gateway'
+RING_BUFFER_SIZE = int(os.getenv('LOG_RING_BUFFER_SIZE', '1000'))
+MAX_SESSIONS = 32
+DEFAULT_SESSION = 'default'
+LOG_LEVEL = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+
+_current_session = contextvars.ContextVar('log_session', default=DEFAULT_SESSION)
+
+
+def set_log_session(session_id):
+    """Attribute records logged from this thread/context to session_id"""
+    _current_session.set(str(session_id or DEFAULT_SESSION))
+
+
+def get_log_session():
+    return _current_session.get()
+
+
+class _SessionFilter(logging.Filter):
+    """Tags each record with the session it was logged from (on the caller's thread)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'session'):
+            record.session = _current_session.get()
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` records per session; least recently used sessions are dropped"""
+
+    def __init__(self, capacity=RING_BUFFER_SIZE, max_sessions=MAX_SESSIONS):
+        super().__init__()
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self._buffers = collections.OrderedDict()
+        self._cursors = {}
+        self._sequence = 0
+        self.dropped = 0
+
+    def emit(self, record):
+        session = getattr(record, 'session', DEFAULT_SESSION)
+        self.acquire()
+        try:
+            buffer = self._buffers.get(session)
+            if buffer is None:
+                buffer = self._buffers[session] = collections.deque(maxlen=self.capacity)
+                if len(self._buffers) > self.max_sessions:
+                    evicted, _ = self._buffers.popitem(last=False)
+                    self._cursors.pop(evicted, None)
+            else:
+                self._buffers.move_to_end(session)
+            if len(buffer) == buffer.maxlen:
+                self.dropped += 1
+            self._sequence += 1
+            buffer.append((self._sequence, record))
+        finally:
+            self.release()
+
+    def records(self, session=DEFAULT_SESSION, level=logging.NOTSET, since=0):
+        """(sequence, record) pairs for a session at or above level, newer than since"""
+        self.acquire()
+        try:
+            buffer = list(self._buffers.get(session, ()))
+        finally:
+            self.release()
+        return [(seq, record) for seq, record in buffer if seq > since and record.levelno >= level]
+
+    def take_new(self, session=DEFAULT_SESSION, level=logging.NOTSET):
+        """Records added since the previous take_new call for this session"""
+        since = self._cursors.get(session, 0)
+        new = self.records(session, level, since)
+        self._cursors[session] = self._sequence
+        return [record for _, record in new]
+
+    def stats(self):
+        self.acquire()
+        try:
+            return {
+                'sessions': len(self._buffers),
+                'records': sum(len(buffer) for buffer in self._buffers.values()),
+                'capacity': self.capacity,
+                'dropped': self.dropped,
+            }
+        finally:
+            self.release()
+
+
+class _Sampler:
+    """Counts calls per key; lets every Nth through"""
+
+    def __init__(self):
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    def should_log(self, key, every):
+        with self._lock:
+            self._counts[key] += 1
+            return every <= 1 or self._counts[key] % every == 1
+
+    def count(self, key):
+        return self._counts.get(key, 0)
+
+
+ring_buffer = RingBufferHandler()
+_sampler = _Sampler()
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def _setup():
+    global _listener
+    with _setup_lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        if _listener is not None:
+            return logger
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter('%(message)s'))
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(_SessionFilter())
+        logger.addHandler(queue_handler)
+        # Records below LOG_LEVEL are discarded before their message is formatted
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+        _listener = logging.handlers.QueueListener(log_queue, ring_buffer, console, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return logger
+
+
+def get_logger(name=None):
+    """Logger under the app namespace, e.g. get_logger('utils')"""
+    _setup()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def sample(logger, key, every, level, message, *args):
+    """
+    Log one record out of every `every` calls for key (hot loops)
+    Formatting is skipped entirely for calls that are not logged.
+    """
+    if _sampler.should_log(key, every) and logger.isEnabledFor(level):
+        logger.log(level, message, *args, extra={'sample_count': _sampler.count(key)})
+
+
+def flush(timeout=1.0):
+    """Wait until queued records have reached the handlers (tests, shutdown)"""
+    if _listener is None:
+        return
+    deadline = time.time() + timeout
+    while not _listener.queue.empty() and time.time() < deadline:
+        time.sleep(0.005)
+    time.sleep(0.01)
+
+
+def recent_logs(session=None, level=logging.NOTSET, limit=200):
+    """Most recent records of a session as dicts, oldest first"""
+    records = ring_buffer.records(session or get_log_session(), level)[-limit:]
+    return [
+        {'timestamp': record.created, 'level': record.levelname, 'logger': record.name, 'message': record.getMessage()}
+        for _, record in records
+    ]
+
+
+_debug_logger = None
+
+
+def debug_print(message, *args, is_error=False, level=None):
+    """
+    Log a debug message through the bounded app log
+    Extra args are %-formatted lazily, only if the record is kept.
+    """
+    global _debug_logger
+    if _debug_logger is None:
+        _debug_logger = get_logger('debug')
+    if level is None:
+        if is_error or str(message).startswith('❌'):
+            level = logging.ERROR
+        elif str(message).startswith('⚠️'):
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+    _debug_logger.log(level, message, *args)
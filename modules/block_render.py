@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Rendering helpers for the pathway view
+Pagination for sections and modules, so only the current page is built on a
+Streamlit rerun
+"""
+
+MODULES_PER_PAGE = 5
+SECTIONS_PER_PAGE = 8
+
+
+def paginate(items, page, page_size):
+    """
+    Clamp page and return the slice bounds for it
+
+    Returns:
+        tuple: (start, end, page, page_count) with 1-based page numbers
+    """
+    page_count = max(1, -(-len(items) // page_size))
+    page = min(max(int(page or 1), 1), page_count)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, len(items)), page, page_count
+
@@ -7,7 +7,9 @@ Handles module regeneration, file ingestion, and content updates
 import streamlit as st
 import re
 from modules.config import model
-from modules.utils import debug_print, extract_modules_from_file_content, gemini_generate_complete_pathway
+from modules.prompt_builder import fit_excerpts, tracked_generate
+from modules.module_index import get_module_index
+from modules.app_log import debug_print
 
 def create_pathway_chatbot():
     """
@@ -521,20 +523,17 @@ def find_module_by_info(module_info, editable_pathways):
         if not editable_pathways:
             return None
         
+        module_index = get_module_index(editable_pathways)
+        
         # Look for module by number
         if module_info.startswith('module_'):
-            module_num = int(module_info.split('_')[1]) - 1
-            for section_name, modules in editable_pathways.items():
-                if 0 <= module_num < len(modules):
-                    return modules[module_num]
+            found = module_index.by_local_number(module_info.split('_')[1])
+            if found:
+                return found['module']
         
         # Look for module by keyword
-        for section_name, modules in editable_pathways.items():
-            for module in modules:
-                if module_info.lower() in module['title'].lower():
-                    return module
-        
-        return None
+        found = module_index.find_title(module_info)
+        return found['module'] if found else None
     
     except Exception as e:
         debug_print(f"⚠️ Module finding failed: {str(e)}")
@@ -552,7 +551,7 @@ def regenerate_module_content(target_module, tone, content_focus, changes_reques
         prompt = f"""Regenerate this training module content:
 
 ORIGINAL CONTENT:
-{target_module['content'][:1000]}
+{fit_excerpts(target_module['content'], 250, content_focus)}
 
 TONE: {tone if tone else 'professional'}
 FOCUS: {content_focus if content_focus else 'general'}
@@ -560,7 +559,7 @@ CHANGES: {changes_requested if changes_requested else 'none'}
 
 Generate improved content that maintains the key information while applying the specified tone and focus."""
 
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and response.text:
             return response.text.strip()
         else:
@@ -648,6 +647,7 @@ def process_new_files(uploaded_files):
         inventory = st.session_state.get('file_inventory', {})
         
         # Generate new pathway content
+        from modules.utils import gemini_generate_complete_pathway
         result = gemini_generate_complete_pathway(context, extracted_file_contents, inventory)
         
         if result and 'pathways' in result:
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Semantic chunking engine shared by every extraction path
+Splits documents into structural blocks (headings, lists, speaker turns,
+paragraphs) in a single pass and packs them into token-sized chunks with
+optional overlap. Results are cached by content hash so each document is
+chunked once per configuration.
+"""
+
+import re
+import hashlib
+import threading
+from typing import NamedTuple
+
+from modules.prompt_builder import estimate_tokens
+
+# Line-level patterns, compiled once
+_LINE_PATTERN = re.compile(r'[^\n]*\n?')
+_BLANK_LINE = re.compile(r'^\s*$')
+_MARKDOWN_HEADING = re.compile(r'^\s{0,3}#{1,6}\s+\S')
+_CAPS_HEADING = re.compile(r"^\s*[A-Z][A-Z0-9 &/,:()'-]{2,80}\s*$")
+_NUMBERED_HEADING = re.compile(r'^\s*\d+(?:\.\d+)*\s+[A-Z][^.!?]{0,80}$')
+_LABEL_HEADING = re.compile(r'^\s*[A-Z][^.!?:]{0,60}:\s*$')
+_LIST_ITEM = re.compile(r'^\s*(?:\d{1,3}[.)]|[a-zA-Z][.)]|[-*•●▪–])\s+\S')
+_CONTINUATION = re.compile(r'^\s{2,}\S')
+_TIMESTAMP_TURN = re.compile(r'^\s*(\d{1,2}:\d{2}(?::\d{2})?)\s*[-–]\s*([^\n:]{1,60}?)\s*$')
+_NAME_TURN = re.compile(r"^\s*([A-Z][\w.'-]*(?:\s[A-Z][\w.'-]*){0,3}):\s+\S")
+
+# Sentence ends that do not break decimals (3.5), list numbers (1. ) or common abbreviations
+_SENTENCE_END = re.compile(
+    r"(?<!\b\d)(?<!\b\d\d)(?<!\bMr)(?<!\bMrs)(?<!\bDr)(?<!\bSt)(?<!\be\.g)(?<!\bi\.e)"
+    r"[.!?]+[\"')\]]*(?=\s|$)"
+)
+
+_CHUNK_CACHE = {}
+_CHUNK_CACHE_MAX_ENTRIES = 256
+_chunk_cache_lock = threading.Lock()
+
+
+class Block(NamedTuple):
+    """A structural unit of a document, addressed by character offsets"""
+    kind: str      # 'heading', 'list', 'turn' or 'paragraph'
+    start: int
+    end: int
+    heading: str   # Nearest heading above the block
+    speaker: str   # Speaker for transcript turns
+
+
+class Chunk(NamedTuple):
+    """A packed run of blocks"""
+    text: str
+    start: int
+    end: int
+    tokens: int
+    heading: str
+    kinds: tuple
+
+
+def _classify_line(line):
+    if _BLANK_LINE.match(line):
+        return 'blank', None
+    timestamp = _TIMESTAMP_TURN.match(line)
+    if timestamp:
+        return 'turn', timestamp.group(2)
+    if _MARKDOWN_HEADING.match(line):
+        return 'heading', None
+    if _LIST_ITEM.match(line):
+        return 'list', None
+    named = _NAME_TURN.match(line)
+    if named and len(line) > len(named.group(0)) + 10:
+        return 'turn', named.group(1)
+    if len(line) <= 90 and (_CAPS_HEADING.match(line) or _NUMBERED_HEADING.match(line) or _LABEL_HEADING.match(line)):
+        return 'heading', None
+    return 'text', None
+
+
+def iter_blocks(text):
+    """
+    Yield the structural blocks of text in one linear pass
+
+    Headings are single lines; consecutive list items (with indented
+    continuations) form one list block; a speaker turn runs from its
+    "0:00 - Name" or "Name:" line to the next turn or heading; other
+    lines are grouped into paragraphs separated by blank lines.
+    """
+    current_kind = None
+    current_start = 0
+    current_end = 0
+    current_speaker = ''
+    heading = ''
+
+    def emit():
+        if current_kind is not None and current_end > current_start:
+            return Block(current_kind, current_start, current_end, heading, current_speaker)
+        return None
+
+    position = 0
+    for match in _LINE_PATTERN.finditer(text):
+        line = match.group(0)
+        if not line:
+            break
+        start = match.start()
+        end = start + len(line.rstrip('\n'))
+        position = match.end()
+        kind, speaker = _classify_line(line.rstrip('\n'))
+
+        if kind == 'blank':
+            # Blank lines end paragraphs and lists but not speaker turns
+            if current_kind in ('paragraph', 'list'):
+                block = emit()
+                if block:
+                    yield block
+                current_kind = None
+            continue
+
+        if kind == 'heading':
+            block = emit()
+            if block:
+                yield block
+            heading = line.strip().lstrip('#').strip().rstrip(':')
+            yield Block('heading', start, end, heading, '')
+            current_kind = None
+            continue
+
+        if kind == 'turn':
+            block = emit()
+            if block:
+                yield block
+            current_kind, current_start, current_end, current_speaker = 'turn', start, end, speaker or ''
+            continue
+
+        if kind == 'list':
+            if current_kind not in ('list', 'turn'):
+                block = emit()
+                if block:
+                    yield block
+                current_kind, current_start, current_speaker = 'list', start, ''
+            current_end = end
+            continue
+
+        # Plain text line
+        if current_kind == 'list' and _CONTINUATION.match(line):
+            current_end = end
+        elif current_kind in ('paragraph', 'turn'):
+            current_end = end
+        else:
+            block = emit()
+            if block:
+                yield block
+            current_kind, current_start, current_end, current_speaker = 'paragraph', start, end, ''
+
+    block = emit()
+    if block:
+        yield block
+
+
+def _sentence_spans(text, start, end):
+    """Yield (start, end) offsets of the sentences in text[start:end]"""
+    segment = text[start:end]
+    cursor = 0
+    for match in _SENTENCE_END.finditer(segment):
+        sentence_end = match.end()
+        if segment[cursor:sentence_end].strip():
+            yield start + cursor, start + sentence_end
+        cursor = sentence_end
+    if segment[cursor:].strip():
+        yield start + cursor, end
+
+
+def split_sentences(text):
+    """
+    Split text into sentences without breaking decimals, numbered steps or
+    list items; speaker header lines such as "0:00 - Name" are skipped
+
+    Returns:
+        list: Sentence strings, stripped, with their punctuation kept
+    """
+    sentences = []
+    for block in iter_blocks(text):
+        block_start = block.start
+        if block.kind == 'turn':
+            header_end = text.find('\n', block.start, block.end)
+            if _TIMESTAMP_TURN.match(text[block.start:header_end if header_end != -1 else block.end]):
+                if header_end == -1:
+                    continue
+                block_start = header_end + 1
+        if block.kind == 'list':
+            # Each list item is its own sentence-like unit
+            for line_match in _LINE_PATTERN.finditer(text[block_start:block.end]):
+                line = line_match.group(0).strip()
+                if line:
+                    sentences.append(line)
+            continue
+        for start, end in _sentence_spans(text, block_start, block.end):
+            sentence = ' '.join(text[start:end].split())
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+def _split_oversized(text, block, max_tokens):
+    """Break a block that exceeds max_tokens into sentence-sized sub-blocks"""
+    pieces = []
+    piece_start = None
+    piece_end = None
+    piece_tokens = 0
+    for start, end in _sentence_spans(text, block.start, block.end):
+        tokens = estimate_tokens(text[start:end])
+        if piece_start is not None and piece_tokens + tokens > max_tokens:
+            pieces.append(block._replace(start=piece_start, end=piece_end))
+            piece_start, piece_tokens = None, 0
+        # A single sentence longer than the budget is cut at whitespace; only
+        # the cut piece is re-estimated, so long unpunctuated text stays linear
+        while tokens > max_tokens:
+            cut = text.rfind(' ', start, start + max_tokens * 4)
+            cut = cut if cut > start else start + max_tokens * 4
+            if cut >= end:
+                break
+            pieces.append(block._replace(start=start, end=cut))
+            tokens -= estimate_tokens(text[start:cut])
+            start = cut
+        if piece_start is None:
+            piece_start = start
+        piece_end = end
+        piece_tokens += tokens
+    if piece_start is not None:
+        pieces.append(block._replace(start=piece_start, end=piece_end))
+    return pieces
+
+
+def iter_chunks(text, target_tokens=400, overlap_tokens=0):
+    """
+    Yield chunks of roughly target_tokens built from whole blocks
+
+    Args:
+        text (str): Document text
+        target_tokens (int): Token size each chunk aims for (never exceeded by
+                             more than the overlap carried from the previous chunk)
+        overlap_tokens (int): Tokens of trailing blocks repeated at the start of
+                              the next chunk for continuity
+
+    Yields:
+        Chunk: text with character offsets, token count, heading and block kinds
+    """
+    if not text or not text.strip():
+        return
+
+    window = []   # (block, tokens)
+    window_tokens = 0
+    fresh_tokens = 0
+    min_fill = target_tokens // 4
+
+    def make_chunk():
+        start = window[0][0].start
+        end = window[-1][0].end
+        return Chunk(
+            text=text[start:end].strip(),
+            start=start,
+            end=end,
+            tokens=window_tokens,
+            heading=window[0][0].heading,
+            kinds=tuple(dict.fromkeys(block.kind for block, _ in window)),
+        )
+
+    def carry_overlap():
+        carried = []
+        carried_tokens = 0
+        for block, tokens in reversed(window):
+            if block.kind == 'heading' or carried_tokens + tokens > overlap_tokens:
+                break
+            carried.insert(0, (block, tokens))
+            carried_tokens += tokens
+        return carried, carried_tokens
+
+    for block in iter_blocks(text):
+        tokens = estimate_tokens(text[block.start:block.end])
+        pieces = [(block, tokens)]
+        if tokens > target_tokens:
+            pieces = [(piece, estimate_tokens(text[piece.start:piece.end])) for piece in _split_oversized(text, block, target_tokens)]
+
+        for piece, piece_tokens in pieces:
+            starts_section = piece.kind == 'heading' and fresh_tokens >= min_fill
+            if window and fresh_tokens and (starts_section or fresh_tokens + piece_tokens > target_tokens):
+                yield make_chunk()
+                if starts_section or overlap_tokens <= 0:
+                    window, window_tokens = [], 0
+                else:
+                    window, window_tokens = carry_overlap()
+                fresh_tokens = 0
+            window.append((piece, piece_tokens))
+            window_tokens += piece_tokens
+            fresh_tokens += piece_tokens
+
+    if window and fresh_tokens:
+        yield make_chunk()
+
+
+def get_chunks(text, target_tokens=400, overlap_tokens=0):
+    """
+    Chunk text once per (content hash, configuration) and reuse the result
+
+    Returns:
+        tuple: Chunk objects
+    """
+    if not text:
+        return ()
+    key = (hashlib.sha1(text.encode('utf-8', errors='ignore')).hexdigest(), target_tokens, overlap_tokens)
+    with _chunk_cache_lock:
+        cached = _CHUNK_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    chunks = tuple(iter_chunks(text, target_tokens, overlap_tokens))
+    with _chunk_cache_lock:
+        if len(_CHUNK_CACHE) >= _CHUNK_CACHE_MAX_ENTRIES:
+            _CHUNK_CACHE.pop(next(iter(_CHUNK_CACHE)))
+        _CHUNK_CACHE[key] = chunks
+    return chunks
+
+
+def chunk_texts(text, target_tokens=400, overlap_tokens=0):
+    """List of chunk strings for text (cached)"""
+    return [chunk.text for chunk in get_chunks(text, target_tokens, overlap_tokens)]
@@ -4,22 +4,80 @@ Handles all environment variables and API configurations
 """
 
 import os
+import sys
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 # Load environment variables
 load_dotenv()
 
 # Configure Google Gemini API
 api_key = os.getenv('GEMINI_API_KEY')
+GEMINI_MODEL_NAME = 'gemini-2.5-pro'
 
-# Configure Gemini if API key is available
-if api_key and api_key != "your_gemini_api_key_here":
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
+class LazyGeminiModel:
+    """
+    Stand-in for genai.GenerativeModel that imports the SDK and builds the
+    model on first use, so importing this module stays cheap
+    """
+
+    def __init__(self, api_key, model_name=GEMINI_MODEL_NAME):
+        self._api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The real GenerativeModel (created once)"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self._api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def generate_content(self, *args, **kwargs):
+        return self.get().generate_content(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+# Gemini is used when an API key is available; GEMINI_FAKE_MODEL=1 runs offline with canned responses
+if os.getenv('GEMINI_FAKE_MODEL', '').lower() in ('1', 'true', 'yes'):
+    from modules.fake_gemini import FakeGeminiModel
+    model = FakeGeminiModel.from_env()
+elif api_key and api_key != "your_gemini_api_key_here":
+    model = LazyGeminiModel(api_key)
 else:
     model = None
 
+def get_model():
+    """The configured model, constructing the Gemini client if it was deferred"""
+    return model.get() if isinstance(model, LazyGeminiModel) else model
+
+def use_model(new_model):
+    """
+    Swap the model used across the app (benchmarks, offline runs)
+    Modules that imported `model` from here are rebound as well.
+    Returns the previous model so callers can restore it.
+    """
+    global model
+    previous = model
+    model = new_model
+    for name, loaded in list(sys.modules.items()):
+        if loaded is None or loaded is sys.modules[__name__]:
+            continue
+        if (name == '__main__' or name.startswith('modules.')) and getattr(loaded, 'model', None) is previous:
+            loaded.model = new_model
+    return previous
+
 # Vadoo AI Configuration
 VADOO_API_KEY = os.getenv('VADOO_API_KEY')
 VADOO_API_URL = "https://viralapi.vadoo.tv/api"
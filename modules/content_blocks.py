@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Content block generation with one structured request per module or per batch
+All block types a module needs are requested together against a JSON schema,
+and several modules can share one request, instead of one model call per
+block type. Only the requested types are generated; anything the model leaves
+out or gets wrong is filled in by the caller's fallback.
+
+ContentBlockCache generates blocks on demand, keyed by a hash of the module
+content, and prefetches the next modules in reading order on background
+threads.
+"""
+
+import re
+import copy
+import json
+import hashlib
+import threading
+import collections
+import concurrent.futures
+from modules.app_log import get_logger
+from modules.telemetry import bind_context
+from modules.prompt_builder import estimate_tokens, truncate_to_tokens, tracked_generate
+
+logger = get_logger('content_blocks')
+
+# The four block types the pathway view shows for each module
+DEFAULT_BLOCK_TYPES = ('text', 'video', 'knowledge_check', 'flashcard')
+
+# Fields per block type: name -> 'string' or 'array' (of strings)
+BLOCK_FIELDS = {
+    'text': {'text': 'string', 'key_points': 'array'},
+    'video': {'video_script': 'string', 'video_duration': 'string', 'video_summary': 'string', 'video_status': 'string'},
+    'knowledge_check': {'questions': 'array', 'answers': 'array', 'question_type': 'string', 'difficulty_level': 'string'},
+    'flashcard': {'flashcard_front': 'string', 'flashcard_back': 'string'},
+    'list': {'list_items': 'array', 'instructions': 'string'},
+}
+
+BLOCK_INSTRUCTIONS = {
+    'text': "3-5 key learning points, a detailed explanation and practical applications",
+    'video': "a narration script with scene descriptions and key visual elements, 3-5 minutes, video_status \"completed\"",
+    'knowledge_check': "3 questions with matching answers on the key concepts",
+    'flashcard': "one key concept question on the front and a detailed answer on the back",
+    'list': "a practical checklist of 4+ steps or procedures and how to use it",
+}
+
+# Per-module source text and the total prompt budget for a batch request (tokens)
+MODULE_CONTENT_TOKENS = 150
+SOURCE_EXCERPT_TOKENS = 300
+BATCH_PROMPT_TOKENS = 8000
+DEFAULT_BATCH_SIZE = 8
+
+# Set to False the first time the model rejects a response schema
+_structured_output = {'enabled': True}
+
+_JSON_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+
+
+def block_title(block_type):
+    return f"{block_type.title().replace('_', ' ')} Content"
+
+
+def block_schema(block_types):
+    """JSON schema for one module's blocks object"""
+    properties = {}
+    for block_type in block_types:
+        fields = BLOCK_FIELDS[block_type]
+        properties[block_type] = {
+            'type': 'object',
+            'properties': {
+                name: {'type': 'array', 'items': {'type': 'string'}} if kind == 'array' else {'type': 'string'}
+                for name, kind in fields.items()
+            },
+            'required': list(fields),
+        }
+    return {'type': 'object', 'properties': properties, 'required': list(block_types)}
+
+
+def response_schema(block_types):
+    """Schema for a whole response: {"modules": [{"id": str, "blocks": {...}}]}"""
+    return {
+        'type': 'object',
+        'properties': {
+            'modules': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {'id': {'type': 'string'}, 'blocks': block_schema(block_types)},
+                    'required': ['id', 'blocks'],
+                },
+            },
+        },
+        'required': ['modules'],
+    }
+
+
+def build_blocks_prompt(requests, block_types):
+    """
+    Prompt covering every module in requests
+
+    Args:
+        requests: list of {'id', 'title', 'content', 'source_content'}
+        block_types: block types to generate for each module
+    """
+    type_lines = "\n".join(
+        f"- {block_type}: {BLOCK_INSTRUCTIONS[block_type]}. Fields: {', '.join(BLOCK_FIELDS[block_type])}"
+        for block_type in block_types
+    )
+    module_parts = []
+    for request in requests:
+        module_parts.append(
+            f"### id: {request['id']}\n"
+            f"Title: {request['title']}\n"
+            f"Module Content: {truncate_to_tokens(request.get('content', ''), MODULE_CONTENT_TOKENS)}\n"
+            f"File Content: {truncate_to_tokens(request.get('source_content', ''), SOURCE_EXCERPT_TOKENS)}"
+        )
+    example = json.dumps({'modules': [{'id': requests[0]['id'], 'blocks': {
+        block_type: {name: ([] if kind == 'array' else '') for name, kind in BLOCK_FIELDS[block_type].items()}
+        for block_type in block_types
+    }}]})
+    return (
+        "Create training content blocks for each module below, based on its module and file content.\n"
+        f"Generate exactly these block types for every module:\n{type_lines}\n\n"
+        "Modules:\n" + "\n\n".join(module_parts) + "\n\n"
+        f"Return only JSON with one entry per module id, in this shape: {example}"
+    )
+
+
+def batch_requests(requests, block_types, batch_size=DEFAULT_BATCH_SIZE, max_tokens=BATCH_PROMPT_TOKENS):
+    """Split requests into batches bounded by count and by estimated prompt tokens"""
+    batches, current = [], []
+    for request in requests:
+        candidate = current + [request]
+        if current and (len(candidate) > batch_size or estimate_tokens(build_blocks_prompt(candidate, block_types)) > max_tokens):
+            batches.append(current)
+            candidate = [request]
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _coerce_block(block_type, data):
+    """Keep known fields with the right shape; None if nothing usable is left"""
+    if not isinstance(data, dict):
+        return None
+    cleaned = {}
+    for name, kind in BLOCK_FIELDS[block_type].items():
+        value = data.get(name)
+        if kind == 'array':
+            if isinstance(value, str):
+                value = [value]
+            if isinstance(value, list):
+                items = [str(item).strip() for item in value if str(item).strip()]
+                if items:
+                    cleaned[name] = items
+        elif value is not None and str(value).strip():
+            cleaned[name] = str(value).strip()
+    return cleaned or None
+
+
+def parse_blocks_response(text, ids, block_types):
+    """
+    Parse a model response into {module id: {block type: content_data}}
+    Unknown ids and types are dropped; a single-module response without the
+    "modules" wrapper is accepted too.
+    """
+    raw = _JSON_FENCE.sub('', (text or '').strip())
+    try:
+        data = json.loads(raw)
+    except (ValueError, TypeError):
+        match = re.search(r'\{.*\}', raw, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return {}
+    if isinstance(data, dict) and 'modules' not in data and len(ids) == 1:
+        data = {'modules': [{'id': ids[0], 'blocks': data.get('blocks', data)}]}
+    entries = data.get('modules', []) if isinstance(data, dict) else []
+    wanted = set(ids)
+    parsed = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or str(entry.get('id')) not in wanted:
+            continue
+        blocks = entry.get('blocks') or {}
+        module_blocks = {}
+        for block_type in block_types:
+            block = _coerce_block(block_type, blocks.get(block_type) if isinstance(blocks, dict) else None)
+            if block:
+                module_blocks[block_type] = block
+        parsed[str(entry.get('id'))] = module_blocks
+    return parsed
+
+
+def _generate(model, prompt, block_types, generate):
+    """One model call, schema-constrained when the model accepts a response schema"""
+    if _structured_output['enabled']:
+        try:
+            return generate(model, prompt, label='content_blocks', generation_config={
+                'response_mime_type': 'application/json',
+                'response_schema': response_schema(block_types),
+            })
+        except TypeError:
+            _structured_output['enabled'] = False
+        except Exception as e:
+            if 'schema' not in str(e).lower() and 'generation_config' not in str(e).lower():
+                raise
+            _structured_output['enabled'] = False
+    return generate(model, prompt, label='content_blocks')
+
+
+def generate_content_blocks(requests, model, block_types=DEFAULT_BLOCK_TYPES, fallback=None,
+                            batch_size=DEFAULT_BATCH_SIZE, generate=tracked_generate):
+    """
+    Generate content blocks for many modules with one model call per batch
+
+    Args:
+        requests: list of {'id', 'title', 'content', 'source_content'}
+        model: model with generate_content, or None for fallback content only
+        block_types: block types to generate, in display order
+        fallback: callable(block_type, module_content) -> content_data for anything missing
+        batch_size: modules per request (1 gives one request per module)
+
+    Returns:
+        dict: module id -> list of {'type', 'title', 'content_data'} in block_types order
+    """
+    block_types = [block_type for block_type in block_types if block_type in BLOCK_FIELDS]
+    generated = {}
+    if model is not None and block_types and requests:
+        for batch in batch_requests(requests, block_types, batch_size=batch_size):
+            ids = [request['id'] for request in batch]
+            try:
+                response = _generate(model, build_blocks_prompt(batch, block_types), block_types, generate)
+                generated.update(parse_blocks_response(getattr(response, 'text', ''), ids, block_types))
+            except Exception as e:
+                logger.warning("⚠️ Content block batch of %d modules failed: %s", len(batch), e)
+
+    results = {}
+    for request in requests:
+        module_blocks = generated.get(request['id'], {})
+        blocks = []
+        for block_type in block_types:
+            content_data = module_blocks.get(block_type)
+            if content_data is None and fallback is not None:
+                content_data = fallback(block_type, request.get('content', ''))
+            blocks.append({'type': block_type, 'title': block_title(block_type), 'content_data': content_data or {}})
+        results[request['id']] = blocks
+    return results
+
+
+# --- on-demand generation with prefetch ------------------------------------
+
+CONTENT_BLOCK_CACHE_SIZE = 512
+PREFETCH_AHEAD = 3
+PREFETCH_WORKERS = 2
+
+
+def request_key(request, block_types):
+    """Hash of everything that shapes a module's generated blocks"""
+    payload = json.dumps([request.get('title', ''), request.get('content', ''), request.get('source_content', ''),
+                          list(block_types)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _complete(blocks):
+    return bool(blocks) and all(block.get('content_data') for block in blocks)
+
+
+class ContentBlockCache:
+    """
+    LRU of generated blocks keyed by request_key, with background prefetch
+
+    generate_batch(requests, block_types) -> {request id: [block, ...]} does the
+    actual generation (normally generate_content_blocks without a fallback).
+    Only complete results are cached, so a failed generation is retried the
+    next time the module is opened.
+    """
+
+    def __init__(self, generate_batch, max_entries=CONTENT_BLOCK_CACHE_SIZE, max_workers=PREFETCH_WORKERS):
+        self.generate_batch = generate_batch
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._pending = {}  # key -> Future of {key: blocks}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='blocks')
+        self.stats = {'hits': 0, 'misses': 0, 'prefetched': 0, 'prefetch_hits': 0}
+
+    def _store(self, results):
+        with self._lock:
+            for key, blocks in results.items():
+                if _complete(blocks):
+                    self._entries[key] = blocks
+                    self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _run(self, keyed_requests, block_types):
+        results = self.generate_batch(keyed_requests, block_types)
+        self._store(results)
+        return results
+
+    def _keyed(self, requests, block_types):
+        return [dict(request, id=request_key(request, block_types)) for request in requests]
+
+    def get(self, request, block_types):
+        """Cached blocks or None; never generates"""
+        key = request_key(request, block_types)
+        with self._lock:
+            blocks = self._entries.get(key)
+            if blocks is not None:
+                self._entries.move_to_end(key)
+        return copy.deepcopy(blocks) if blocks is not None else None
+
+    def prefetch(self, requests, block_types):
+        """
+        Generate blocks for requests that are neither cached nor in flight, in one
+        background batch. Returns the number of modules scheduled.
+        """
+        scheduled = []
+        with self._lock:
+            for request in self._keyed(requests, block_types):
+                if request['id'] not in self._entries and request['id'] not in self._pending:
+                    scheduled.append(request)
+            if not scheduled:
+                return 0
+            future = self._executor.submit(bind_context(self._run), scheduled, list(block_types))
+            for request in scheduled:
+                self._pending[request['id']] = future
+            self.stats['prefetched'] += len(scheduled)
+        future.add_done_callback(lambda done: self._forget(scheduled, done))
+        return len(scheduled)
+
+    def _forget(self, scheduled, future):
+        with self._lock:
+            for request in scheduled:
+                if self._pending.get(request['id']) is future:
+                    del self._pending[request['id']]
+
+    def resolve_many(self, requests, block_types, timeout=None):
+        """
+        Blocks for every request, in order: cached, awaited from a prefetch in
+        flight, or generated now in one batch for the rest
+        """
+        keyed = self._keyed(requests, block_types)
+        results, waiting, missing = {}, {}, []
+        with self._lock:
+            for request in keyed:
+                key = request['id']
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    results[key] = self._entries[key]
+                    self.stats['hits'] += 1
+                elif key in self._pending:
+                    waiting[key] = self._pending[key]
+                    self.stats['prefetch_hits'] += 1
+                else:
+                    missing.append(request)
+                    self.stats['misses'] += 1
+        for key, future in waiting.items():
+            try:
+                results[key] = future.result(timeout=timeout).get(key)
+            except Exception as e:
+                logger.warning("⚠️ Prefetched content blocks unavailable: %s", e)
+            if not results.get(key):
+                missing.append(next(request for request in keyed if request['id'] == key))
+        if missing:
+            results.update(self._run(missing, list(block_types)))
+        return [copy.deepcopy(results.get(request['id']) or []) for request in keyed]
+
+    def resolve(self, request, block_types, timeout=None):
+        return self.resolve_many([request], block_types, timeout=timeout)[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_content_block_cache(generate_batch):
+    """Process-wide cache; generate_batch is used when the cache is first created"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ContentBlockCache(generate_batch)
+        return _default_cache
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate module detection for generated pathways
+Uses MinHash signatures with locality-sensitive hashing so that similar
+modules are found without comparing every module against every other one
+"""
+
+import re
+import zlib
+import random
+
+# Default similarity (Jaccard over word shingles) above which modules are duplicates
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+
+# Mersenne prime used for the universal hash family
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_MODULE_PREFIX_PATTERN = re.compile(r"^\s*module\s+[\d.]+\s*:\s*", re.IGNORECASE)
+
+
+def module_text_for_similarity(module):
+    """
+    Build the text used to compare modules: title, description and content
+    with the "Module 1.2:" numbering prefix removed
+    """
+    title = _MODULE_PREFIX_PATTERN.sub('', str(module.get('title', '')))
+    description = str(module.get('description', ''))
+    content = str(module.get('content', ''))
+    return f"{title} {description} {content}"
+
+
+def shingle_hashes(text, shingle_size=3):
+    """
+    Return the set of 32-bit hashes of the word shingles in text
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) < shingle_size:
+        return {zlib.crc32(' '.join(words).encode())}
+    return {
+        zlib.crc32(' '.join(words[i:i + shingle_size]).encode())
+        for i in range(len(words) - shingle_size + 1)
+    }
+
+
+def jaccard_similarity(first, second):
+    """Exact Jaccard similarity of two shingle sets"""
+    if not first and not second:
+        return 1.0
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class MinHashLSHIndex:
+    """
+    MinHash/LSH index over text documents
+
+    Each document gets a signature of num_perm minimum hashes. The signature is
+    cut into bands; documents that share any band land in the same bucket and
+    become candidates, which are then confirmed with exact Jaccard similarity.
+    """
+
+    def __init__(self, threshold=DEFAULT_DUPLICATE_THRESHOLD, num_perm=64, bands=16, shingle_size=3, seed=1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Fixed seed keeps signatures stable across runs and processes
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        self._buckets = [{} for _ in range(bands)]
+        self._shingles = {}
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def signature(self, shingles):
+        """Compute the MinHash signature of a shingle set"""
+        if not shingles:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in shingles)
+            for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    def add(self, key, text):
+        """Add a document to the index under key"""
+        shingles = shingle_hashes(text, self.shingle_size)
+        signature = self.signature(shingles)
+        self._shingles[key] = shingles
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, text):
+        """
+        Find indexed documents similar to text
+
+        Returns:
+            list: (key, similarity) pairs at or above the threshold, most similar first
+        """
+        shingles = shingle_hashes(text, self.shingle_size)
+        signature = self.signature(shingles)
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = jaccard_similarity(shingles, self._shingles[key])
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def duplicate_pairs(self):
+        """
+        Return every confirmed near-duplicate pair in the index
+
+        Only documents that collide in at least one LSH bucket are compared.
+        """
+        seen = set()
+        pairs = []
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                if len(keys) < 2:
+                    continue
+                for i in range(len(keys)):
+                    for j in range(i + 1, len(keys)):
+                        pair = (keys[i], keys[j])
+                        if pair in seen:
+                            continue
+                        seen.add(pair)
+                        similarity = jaccard_similarity(self._shingles[pair[0]], self._shingles[pair[1]])
+                        if similarity >= self.threshold:
+                            pairs.append((pair[0], pair[1], similarity))
+        return pairs
+
+
+def find_duplicate_module_groups(pathway_data, threshold=DEFAULT_DUPLICATE_THRESHOLD, cross_pathway=False):
+    """
+    Find groups of near-duplicate modules in pathway data
+
+    Args:
+        pathway_data (dict): Pathway data with a 'pathways' list
+        threshold (float): Minimum shingle Jaccard similarity to count as duplicate
+        cross_pathway (bool): Also match modules that live in different pathways.
+                              Pathways are alternatives, so this is off by default
+
+    Returns:
+        list: Groups of (pathway_idx, section_idx, module_idx) locations in reading
+              order; the first location of each group is the one to keep
+    """
+    if not pathway_data or not pathway_data.get('pathways'):
+        return []
+
+    index = MinHashLSHIndex(threshold=threshold)
+    for pathway_idx, pathway in enumerate(pathway_data['pathways']):
+        for section_idx, section in enumerate(pathway.get('sections', [])):
+            for module_idx, module in enumerate(section.get('modules', [])):
+                if isinstance(module, dict):
+                    index.add((pathway_idx, section_idx, module_idx), module_text_for_similarity(module))
+
+    # Union-find over confirmed pairs
+    parent = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for first, second, _ in index.duplicate_pairs():
+        if not cross_pathway and first[0] != second[0]:
+            continue
+        root_first, root_second = find(first), find(second)
+        if root_first != root_second:
+            parent[max(root_first, root_second)] = min(root_first, root_second)
+
+    groups = {}
+    for key in parent:
+        groups.setdefault(find(key), []).append(key)
+
+    return sorted(sorted(group) for group in groups.values() if len(group) > 1)
+
+
+def _merge_list_field(target, source, field):
+    """Append items from source[field] that target[field] does not have yet"""
+    extra = source.get(field)
+    if not extra:
+        return
+    current = target.get(field)
+    if current is None:
+        current = []
+    elif not isinstance(current, list):
+        current = [current]
+    if not isinstance(extra, list):
+        extra = [extra]
+    for item in extra:
+        if item not in current:
+            current.append(item)
+    target[field] = current
+
+
+def merge_duplicate_modules(keeper, duplicates):
+    """
+    Fold the metadata of duplicate modules into the module that is kept
+
+    Key points, learning objectives, content types and sources are unioned and
+    content blocks of types the keeper does not already have are carried over.
+    """
+    for duplicate in duplicates:
+        for field in ('key_points', 'learning_objectives', 'content_types', 'source'):
+            _merge_list_field(keeper, duplicate, field)
+
+        block_types = {block.get('type') for block in keeper.get('content_blocks', []) if isinstance(block, dict)}
+        for block in duplicate.get('content_blocks', []) or []:
+            if isinstance(block, dict) and block.get('type') not in block_types:
+                keeper.setdefault('content_blocks', []).append(block)
+                block_types.add(block.get('type'))
+    return keeper
+
+
+def deduplicate_pathway_modules(pathway_data, threshold=DEFAULT_DUPLICATE_THRESHOLD, strategy='merge', cross_pathway=False):
+    """
+    Collapse near-duplicate modules in place
+
+    A section's last module is never removed, so no section or pathway is
+    left empty by the pass.
+
+    Args:
+        pathway_data (dict): Pathway data with a 'pathways' list
+        threshold (float): Minimum similarity to treat modules as duplicates
+        strategy (str): 'merge' keeps the first module and folds the others' metadata
+                        into it; 'replace' keeps the most detailed module (longest
+                        content) in the first module's position
+        cross_pathway (bool): Also collapse duplicates across different pathways.
+                              Off by default: pathways are alternatives the user
+                              picks between, so they are expected to share modules
+
+    Returns:
+        list: The duplicate groups that were collapsed (see find_duplicate_module_groups),
+              without the locations that were kept to avoid emptying a section
+    """
+    if strategy not in ('merge', 'replace'):
+        raise ValueError(f"Unknown deduplication strategy: {strategy}")
+
+    groups = find_duplicate_module_groups(pathway_data, threshold=threshold, cross_pathway=cross_pathway)
+    if not groups:
+        return []
+
+    pathways = pathway_data['pathways']
+
+    def module_at(location):
+        pathway_idx, section_idx, module_idx = location
+        return pathways[pathway_idx]['sections'][section_idx]['modules'][module_idx]
+
+    # Spare the first module of any section the pass would otherwise empty
+    to_remove = {location for group in groups for location in group[1:]}
+    for pathway_idx, pathway in enumerate(pathways):
+        for section_idx, section in enumerate(pathway.get('sections', [])):
+            locations = [(pathway_idx, section_idx, module_idx) for module_idx in range(len(section.get('modules', [])))]
+            if locations and all(location in to_remove for location in locations):
+                to_remove.discard(locations[0])
+
+    collapsed = []
+    for group in groups:
+        keep_location = group[0]
+        duplicate_locations = [location for location in group[1:] if location in to_remove]
+        if not duplicate_locations:
+            continue
+        keeper = module_at(keep_location)
+        duplicates = [module_at(location) for location in duplicate_locations]
+
+        if strategy == 'replace':
+            richest = max([keeper] + duplicates, key=lambda module: len(str(module.get('content', ''))))
+            if richest is not keeper:
+                section_modules = pathways[keep_location[0]]['sections'][keep_location[1]]['modules']
+                section_modules[keep_location[2]] = richest
+        else:
+            merge_duplicate_modules(keeper, duplicates)
+
+        collapsed.append([keep_location] + duplicate_locations)
+
+    # Rebuild module lists without the collapsed duplicates
+    for pathway_idx, pathway in enumerate(pathways):
+        for section_idx, section in enumerate(pathway.get('sections', [])):
+            section['modules'] = [
+                module for module_idx, module in enumerate(section.get('modules', []))
+                if (pathway_idx, section_idx, module_idx) not in to_remove
+            ]
+
+    return collapsed
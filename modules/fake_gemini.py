@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for the Gemini GenerativeModel
+Returns canned responses shaped like the ones each prompt family asks for
+(pathway JSON, content-type and content-block JSON, module JSON, plain-text
+summaries), derived only from the prompt text, so the same prompt always
+yields the same answer.
+Latency and failures can be injected. Used by the benchmarks and for offline
+runs (set GEMINI_FAKE_MODEL=1, or call modules.config.use_model()).
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+_SENTENCE = re.compile(r'[^.!?\n]{25,240}[.!?]')
+_FILENAME = re.compile(r'[\w\- ]+\.(?:pdf|docx?|txt|pptx?|md|csv|xlsx?)', re.IGNORECASE)
+_BLOCK_MODULE = re.compile(r'^### id: (\S+)\n(.*?)(?=^### id: |\Z)', re.MULTILINE | re.DOTALL)
+
+CONTENT_TYPES = ('text', 'list', 'knowledge_check', 'flashcard', 'video', 'assignment')
+
+
+class FakeGeminiError(RuntimeError):
+    """Injected failure (stands in for quota, timeout and server errors)"""
+
+
+class FakeUsageMetadata:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        self.usage_metadata = FakeUsageMetadata(prompt_tokens, max(1, len(text) // 4))
+
+
+def _digest(text):
+    return int(hashlib.sha1(text.encode('utf-8', errors='ignore')).hexdigest()[:12], 16)
+
+
+def _sentences(prompt, limit=40):
+    return [sentence.strip() for sentence in _SENTENCE.findall(prompt)[:limit]]
+
+
+def _pick(items, seed, count):
+    if not items:
+        return []
+    return [items[(seed + i * 7) % len(items)] for i in range(count)]
+
+
+def _title(sentence, fallback):
+    words = re.findall(r"[A-Za-z][A-Za-z'-]+", sentence)[:6]
+    return ' '.join(word.capitalize() for word in words) or fallback
+
+
+class FakeGeminiModel:
+    """
+    Drop-in for genai.GenerativeModel in code that calls generate_content()
+
+    Args:
+        latency (float): Seconds to sleep per call
+        jitter (float): Extra deterministic latency, up to this many seconds
+        failure_rate (float): Fraction of calls (0-1) that raise FakeGeminiError
+        responses (list): Optional (regex, text or callable(prompt)) overrides
+            checked before the built-in responders
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, responses=None, sections=4, modules_per_section=6):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.responses = [(re.compile(pattern, re.IGNORECASE | re.DOTALL), reply) for pattern, reply in (responses or [])]
+        self.sections = sections
+        self.modules_per_section = modules_per_section
+        self.model_name = 'fake-gemini'
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Configure from GEMINI_FAKE_LATENCY / GEMINI_FAKE_JITTER / GEMINI_FAKE_FAILURE_RATE"""
+        return cls(
+            latency=float(os.getenv('GEMINI_FAKE_LATENCY', '0')),
+            jitter=float(os.getenv('GEMINI_FAKE_JITTER', '0')),
+            failure_rate=float(os.getenv('GEMINI_FAKE_FAILURE_RATE', '0')),
+        )
+
+    def generate_content(self, prompt, **kwargs):
+        prompt = prompt if isinstance(prompt, str) else str(prompt)
+        seed = _digest(prompt)
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+        delay = self.latency + (self.jitter * (seed % 1000) / 1000.0 if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        # Failures depend on the call number, so a retried prompt can succeed
+        if self.failure_rate and (_digest(f"{call_number}") % 1000) < self.failure_rate * 1000:
+            with self._lock:
+                self.failures += 1
+            raise FakeGeminiError(f"Injected failure on call {call_number}")
+        return FakeResponse(self._respond(prompt, seed), max(1, len(prompt) // 4))
+
+    # --- responders ----------------------------------------------------------
+
+    def _respond(self, prompt, seed):
+        for pattern, reply in self.responses:
+            if pattern.search(prompt):
+                return reply(prompt) if callable(reply) else reply
+        lower = prompt.lower()
+        if '"blocks"' in prompt and '### id:' in prompt:
+            return json.dumps(self._content_blocks(prompt, seed))
+        if '"pathways"' in prompt or 'pathways' in lower and 'json' in lower:
+            return json.dumps(self._pathways(prompt, seed))
+        if '"sections"' in prompt:
+            return json.dumps(self._pathway(prompt, seed, 1))
+        if 'content_types' in lower or 'content type' in lower:
+            return json.dumps(self._content_block(prompt, seed))
+        if '"modules"' in prompt or '"title"' in prompt:
+            return json.dumps(self._module(prompt, seed, 1))
+        if 'json' in lower:
+            return json.dumps({'items': _pick(_sentences(prompt), seed, 3)})
+        return self._summary(prompt, seed)
+
+    def _module(self, prompt, seed, number):
+        sentences = _sentences(prompt) or ["Follow the documented procedure for this task."]
+        picked = _pick(sentences, seed + number, 3)
+        return {
+            'title': _title(picked[0], f"Module {number}"),
+            'description': picked[1] if len(picked) > 1 else picked[0],
+            'content': ' '.join(picked),
+            'source': _FILENAME.findall(prompt)[:1] or ['source document'],
+            'content_types': list(_pick(list(CONTENT_TYPES), seed + number, 3)),
+            'content_type': CONTENT_TYPES[(seed + number) % len(CONTENT_TYPES)],
+            'key_points': picked[:2],
+        }
+
+    def _pathway(self, prompt, seed, number):
+        sections = []
+        for s in range(self.sections):
+            modules = [self._module(prompt, seed + s * 31, m + 1) for m in range(self.modules_per_section)]
+            sections.append({
+                'title': f"Section {s + 1}: {modules[0]['title']}",
+                'description': modules[0]['description'],
+                'modules': modules,
+            })
+        return {'pathway_name': f"Pathway {number}: {sections[0]['modules'][0]['title']}", 'sections': sections}
+
+    def _pathways(self, prompt, seed):
+        return {'pathways': [self._pathway(prompt, seed + p * 101, p + 1) for p in range(3)]}
+
+    def _content_block(self, prompt, seed):
+        sentences = _pick(_sentences(prompt) or ["Review the module material."], seed, 4)
+        return {
+            'text': ' '.join(sentences[:2]),
+            'key_points': sentences[:3],
+            'list_items': sentences,
+            'questions': [f"What does this mean: {sentence}" for sentence in sentences[:2]],
+            'answers': sentences[:2],
+            'flashcard_front': sentences[0],
+            'flashcard_back': sentences[-1],
+        }
+
+    def _content_blocks(self, prompt, seed):
+        types = [block_type for block_type in re.findall(r'^- (\w+): ', prompt, re.MULTILINE)]
+        modules = []
+        for module_id, body in _BLOCK_MODULE.findall(prompt):
+            data = self._content_block(body, seed + _digest(module_id))
+            blocks = {
+                'text': {'text': data['text'], 'key_points': data['key_points']},
+                'video': {'video_script': data['text'], 'video_duration': '3-5 minutes',
+                          'video_summary': data['flashcard_back'], 'video_status': 'completed'},
+                'knowledge_check': {'questions': data['questions'], 'answers': data['answers'],
+                                    'question_type': 'Multiple Choice', 'difficulty_level': 'Intermediate'},
+                'flashcard': {'flashcard_front': data['flashcard_front'], 'flashcard_back': data['flashcard_back']},
+                'list': {'list_items': data['list_items'], 'instructions': 'Work through the steps in order.'},
+            }
+            modules.append({'id': module_id, 'blocks': {block_type: blocks[block_type] for block_type in types if block_type in blocks}})
+        return {'modules': modules}
+
+    def _summary(self, prompt, seed):
+        sentences = _sentences(prompt, limit=200)
+        if not sentences:
+            return "Summary of the provided material."
+        step = max(1, len(sentences) // 6)
+        return ' '.join(sentences[::step][:6])
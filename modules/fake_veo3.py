@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Veo3 long-running video API
+Serves predictLongRunning and operation polling on 127.0.0.1 so the video job
+queue can be exercised without an API key. Operations finish after
+render_seconds; prompts matching a fail pattern finish with an error.
+
+Usage:
+    python -m modules.fake_veo3 --port 8765 --render-seconds 5
+    VEO3_API_BASE=http://127.0.0.1:8765/v1beta streamlit run app.py
+"""
+
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+_SUBMIT_PATH = re.compile(r'^/v1beta/models/([\w.\-]+):predictLongRunning$')
+_OPERATION_PATH = re.compile(r'^/v1beta/(models/[\w.\-]+/operations/\w+)$')
+
+
+class FakeVeo3Server:
+    """
+    Threaded HTTP stand-in; start() returns the base URL to use as VEO3_API_BASE
+
+    Counts submissions and status checks so tests can assert on traffic.
+    """
+
+    def __init__(self, render_seconds=1.0, fail_pattern=None, port=0):
+        self.render_seconds = render_seconds
+        self.fail_pattern = re.compile(fail_pattern, re.IGNORECASE) if fail_pattern else None
+        self.port = port
+        self.operations = {}
+        self.submissions = 0
+        self.status_checks = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1beta"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                match = _SUBMIT_PATH.match(self.path.split('?')[0])
+                if not match:
+                    return self._reply(404, {'error': {'code': 404, 'message': 'Not found'}})
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                prompt = (request.get('instances') or [{}])[0].get('prompt', '')
+                self._reply(200, {'name': server._create(match.group(1), prompt)})
+
+            def do_GET(self):
+                match = _OPERATION_PATH.match(self.path.split('?')[0])
+                operation = server._status(match.group(1)) if match else None
+                if operation is None:
+                    return self._reply(404, {'error': {'code': 404, 'message': 'Operation not found'}})
+                self._reply(200, operation)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-veo3', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _create(self, model_name, prompt):
+        with self._lock:
+            self.submissions += 1
+            operation_id = hashlib.sha1(f"{self.submissions}:{prompt}".encode('utf-8')).hexdigest()[:16]
+            name = f"models/{model_name}/operations/{operation_id}"
+            self.operations[name] = {'prompt': prompt, 'started': time.time()}
+        return name
+
+    def _status(self, name):
+        with self._lock:
+            self.status_checks += 1
+            operation = self.operations.get(name)
+        if operation is None:
+            return None
+        elapsed = time.time() - operation['started']
+        if elapsed < self.render_seconds:
+            progress = int(100 * elapsed / self.render_seconds) if self.render_seconds else 100
+            return {'name': name, 'done': False, 'metadata': {'progressPercent': progress}}
+        if self.fail_pattern and self.fail_pattern.search(operation['prompt']):
+            return {'name': name, 'done': True, 'error': {'code': 400, 'message': 'Prompt rejected by stand-in server'}}
+        video_id = name.rsplit('/', 1)[-1]
+        return {'name': name, 'done': True, 'response': {'generateVideoResponse': {'generatedSamples': [
+            {'video': {'uri': f"{self.base_url}/files/{video_id}.mp4"}}
+        ]}}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Veo3 video API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--render-seconds', type=float, default=5.0)
+    parser.add_argument('--fail-pattern', help="Regex; matching prompts finish with an error")
+    args = parser.parse_args(argv)
+    server = FakeVeo3Server(render_seconds=args.render_seconds, fail_pattern=args.fail_pattern, port=args.port)
+    print(f"🎬 Fake Veo3 server at {server.start()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,10 @@ import time
 import concurrent.futures
 import threading
 from modules.config import model
-from modules.utils import debug_print
+from modules.app_log import debug_print
+from modules.prompt_builder import PromptBuilder, tracked_generate
+from modules.telemetry import traced, bind_context
+from modules.transcript_cleaner import clean_sentence_text
 
 # Global content tracking to prevent duplication across pathways
 GENERATED_CONTENT_CACHE = set()
@@ -74,7 +77,7 @@ class FastPathwayAgent:
             prompt = self._build_fast_comprehensive_prompt(extracted_content, training_context, file_inventory)
             
             debug_print("🚀 FastPathwayAgent: Generating complete pathways in single call...")
-            response = self.model.generate_content(prompt)
+            response = tracked_generate(self.model, prompt)
             
             if response and response.text:
                 result = self._parse_complete_pathways(response.text)
@@ -142,15 +145,17 @@ class FastPathwayAgent:
         content_summary += f"VARIATION APPROACH: Create {selected_approach} content with unique perspectives\n"
         content_summary += f"CONTENT DIFFERENTIATION: Ensure this content is distinct from other pathways using seed {unique_seed}\n\n"
         
-        for filename, content in list(extracted_content.items())[:5]:  # Increased to 5 files for more comprehensive content
+        # File excerpts share whatever the pathway budget leaves after the instructions
+        builder = PromptBuilder('pathway', training_context=training_context)
+        
+        for file_index, (filename, content) in enumerate(list(extracted_content.items())[:5]):  # Increased to 5 files for more comprehensive content
             if content:
-                # Clean and extract substantive content - use more content for better depth
-                preview = content[:3000] if content else "No content"  # Increased content length for more context
-                # Clean preview for better AI processing
-                preview = re.sub(r'Teams Meeting.*?\d{4}', '', preview, flags=re.IGNORECASE)
+                # Clean content for better AI processing
+                preview = re.sub(r'Teams Meeting.*?\d{4}', '', content, flags=re.IGNORECASE)
                 preview = re.sub(r'thank personnel|restroom|car accident|highway', '', preview, flags=re.IGNORECASE)
                 preview = re.sub(r'Oh,.*?sense\.', '', preview, flags=re.IGNORECASE)
-                preview = re.sub(r'\s+', ' ', preview)  # Clean multiple spaces
+                preview = re.sub(r'[ \t]+', ' ', preview)  # Clean multiple spaces
+                preview = builder.slot(f"file_{file_index}", preview, fallback="No content")
                 
                 # Extract specific content elements for modules
                 content_summary += f"\n=== FILE: {filename} ===\n"
@@ -359,6 +364,8 @@ CRITICAL FINAL REMINDERS:
 6. Generate 4-6 modules per section, 4-5 sections per pathway
 7. Focus entirely on achieving the user's specific PRIMARY TRAINING GOALS: {primary_goals}"""
         
+        prompt = builder.render(prompt)
+        debug_print(f"🧮 Pathway prompt tokens: {builder.usage}")
         return prompt
     
     def _generate_additional_module(self, section, module_number):
@@ -413,6 +420,7 @@ CRITICAL FINAL REMINDERS:
         
         return module
     
+    @traced('parse.pathways')
     def _parse_complete_pathways(self, response_text):
         """
         Parse complete pathway response efficiently
@@ -766,7 +774,7 @@ class ContentTypeAgent:
             prompt = self._build_content_type_prompt(module, training_context, source_content)
             
             debug_print(f"🎨 ContentTypeAgent: Generating content type for '{module.get('title', 'Unknown')}'...")
-            response = self.model.generate_content(prompt)
+            response = tracked_generate(self.model, prompt)
             
             if response and response.text:
                 enhanced_module = self._parse_content_type_response(response.text, module)
@@ -782,19 +790,23 @@ class ContentTypeAgent:
         """
         Build prompt for content type generation
         """
+        builder = PromptBuilder('content_type', training_context=training_context)
+        current_content = builder.slot('module_content', module.get('content', ''), weight=1.5, fallback='Basic content')
+        source_excerpt = builder.slot('source', source_content, fallback='General training content')
+        
         prompt = f"""You are an expert Instructional Designer. Create engaging content type and data for this training module.
 
 MODULE INFO:
 Title: {module.get('title', 'Training Module')}
 Description: {module.get('description', 'Training content')}
-Current Content: {module.get('content', 'Basic content')[:300]}
+Current Content: {current_content}
 
 TRAINING CONTEXT:
 Industry: {training_context.get('industry', 'General')}
 Audience: {training_context.get('target_audience', 'Employees')}
 
 SOURCE MATERIAL:
-{source_content[:200] if source_content else 'General training content'}
+{source_excerpt}
 
 TASK: Choose the BEST content type for this module and create appropriate content data.
 
@@ -835,8 +847,9 @@ OUTPUT (JSON only):
 
 Choose the most appropriate content type based on the module's learning objectives and create engaging, professional content."""
         
-        return prompt
+        return builder.render(prompt)
     
+    @traced('parse.content_type')
     def _parse_content_type_response(self, response_text, original_module):
         """
         Parse content type response and enhance module
@@ -950,7 +963,7 @@ class ParallelPathwayProcessor:
                 futures = []
                 for chunk in chunks[:3]:  # Limit to 3 chunks for API limits
                     future = executor.submit(
-                        self.fast_agent.generate_complete_pathways_fast,
+                        bind_context(self.fast_agent.generate_complete_pathways_fast),
                         chunk, training_context, file_inventory
                     )
                     futures.append(future)
@@ -1031,9 +1044,13 @@ class OptimizedPathwayOrchestrator:
     Optimized orchestrator for fast, high-quality pathway generation
     """
     
+    # Digest budget per file; matches the per-file excerpt used by the pathway prompt
+    DIGEST_TOKENS_PER_FILE = 750
+    
     def __init__(self):
         self.processor = ParallelPathwayProcessor()
     
+    @traced('pathway.generate')
     def generate_optimized_pathways(self, extracted_content, training_context, file_inventory):
         """
         Generate pathways using optimized, fast AI processing
@@ -1047,7 +1064,7 @@ class OptimizedPathwayOrchestrator:
                 return None
             
             # Pre-process content for speed
-            cleaned_content = self._preprocess_content_fast(extracted_content)
+            cleaned_content = self._preprocess_content_fast(extracted_content, training_context)
             
             # Generate pathways using optimized processing
             result = self.processor.process_content_parallel(
@@ -1069,26 +1086,36 @@ class OptimizedPathwayOrchestrator:
             debug_print(f"❌ OptimizedPathwayOrchestrator error: {str(e)}")
             return None
     
-    def _preprocess_content_fast(self, extracted_content):
+    @traced('preprocess')
+    def _preprocess_content_fast(self, extracted_content, training_context=None):
         """
         Quick preprocessing to clean content before AI processing
+        Long files are condensed with map-reduce summarization so the whole
+        document is covered instead of only its first characters. Cleaning
+        and digests are pipeline stages, so re-targeting the same files only
+        re-runs the goal-dependent reduce steps of the digest
         """
+        from modules.pipeline import get_pipeline
+        pipeline = get_pipeline()
+        stage_context = dict(training_context or {}, keep_speakers=False, digest_tokens=self.DIGEST_TOKENS_PER_FILE)
+        
         cleaned = {}
         for filename, content in extracted_content.items():
             if content and len(content.strip()) > 50:
-                # Quick clean of obvious issues
-                clean_content = re.sub(r'Teams Meeting.*?\d{4}', '', content, flags=re.IGNORECASE)
-                clean_content = re.sub(r'thank personnel.*?\.', '', clean_content, flags=re.IGNORECASE)
-                clean_content = re.sub(r'restroom.*?minutes\.', '', clean_content, flags=re.IGNORECASE)
-                clean_content = re.sub(r'car accident.*?highway\.', '', clean_content, flags=re.IGNORECASE)
-                clean_content = re.sub(r'\s+', ' ', clean_content)  # Clean whitespace
+                # Local transcript clean-up: meeting metadata, fillers, logistics
+                clean_content = pipeline.run('clean', content, stage_context)
                 
-                # Limit content length for speed (keep first 1000 chars of meaningful content)
-                if len(clean_content) > 1000:
-                    clean_content = clean_content[:1000] + "..."
+                # Condense long content into a goal-aligned digest that fits the prompt
+                try:
+                    clean_content = pipeline.run('digest', clean_content, stage_context)
+                except Exception as e:
+                    debug_print(f"⚠️ Summarization failed for {filename}: {str(e)}")
+                    clean_content = clean_content[:self.DIGEST_TOKENS_PER_FILE * 4]
                 
+                clean_content = re.sub(r'\s+', ' ', clean_content)  # Clean whitespace
                 cleaned[filename] = clean_content.strip()
         
+        debug_print(f"📚 Pipeline stats: {pipeline.stats()}")
         return cleaned
     
     def _final_quality_pass(self, pathways):
@@ -1107,9 +1134,8 @@ class OptimizedPathwayOrchestrator:
                     content = module.get('content', '')
                     
                     # Final cleanup of any remaining conversational content
-                    content = re.sub(r'\b(um|uh|well|so)\b', '', content, flags=re.IGNORECASE)
                     content = re.sub(r'Personnel hope.*?\.', '', content, flags=re.IGNORECASE)
-                    content = re.sub(r'\s+', ' ', content)
+                    content = clean_sentence_text(content)
                     
                     module['content'] = content.strip()
         
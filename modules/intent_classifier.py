@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Local intent classifier for chatbot requests
+A keyword-weighted linear model over word n-grams, compiled once at import.
+Classifies a message into an intent with slots (module/section reference,
+tone, focus) and a confidence score without any network call, so only
+low-confidence messages need the LLM.
+"""
+
+import re
+import math
+from typing import NamedTuple
+
+UNKNOWN_INTENT = 'unknown'
+CONFIDENCE_THRESHOLD = 0.5
+# Score of the implicit "unknown" class; messages with no strong features fall back to it
+UNKNOWN_SCORE = 1.0
+
+# Phrase weights per intent (phrases are up to four words, matched on whole words)
+INTENT_WEIGHTS = {
+    'content_question': {
+        'find': 2.5, 'search': 2.5, 'what does': 2.0, 'what is': 2.0, 'about': 0.8, 'how do': 1.5, 'explain': 2.0,
+        'tell me about': 2.5, 'what are': 1.5, 'show content': 2.5, 'module content': 1.0,
+        "what's in": 2.0, 'content of': 2.0, 'where': 1.0, 'which module': 1.5, '?': 0.8,
+    },
+    'past_pathway': {
+        'past pathway': 4.0, 'past pathways': 4.0, 'previous pathway': 4.0, 'show past': 3.0,
+        'list past': 3.0, 'past': 1.5, 'previous': 1.2, 'integrate': 1.5, 'merge': 2.0,
+        'from pathway': 2.5, 'from past': 2.5, 'from previous': 2.5,
+    },
+    'file_update': {
+        'update': 2.5, 'modify': 2.0, 'adjust': 1.0, 'add to': 1.2, 'add content': 1.5, 'content to': 0.8, 'replace': 1.0,
+        'new content': 1.5, 'new information': 1.5, 'with new': 1.5, 'file': 2.0, 'files': 2.0,
+        'uploaded': 2.0, 'document': 1.5, 'documents': 1.5, 'pathway': 0.8, 'section': 0.8,
+        'module': 0.5, 'course': 0.6, 'program': 0.6,
+    },
+    'regenerate': {
+        'regenerate': 3.0, 'rewrite': 2.5, 'recreate': 2.0, 'redo': 1.5, 'rephrase': 2.0,
+    },
+    'tone_change': {
+        'tone': 3.0, 'style': 2.5, 'professional': 1.5, 'casual': 1.8, 'formal': 1.5, 'technical': 1.0,
+        'friendly': 1.8, 'conversational': 1.8, 'academic': 1.5, 'simpler': 1.5, 'simple': 1.0,
+        'make it': 1.0, 'make': 0.8, 'sound': 1.0, 'change': 0.5, 'more': 0.8, 'less': 0.8,
+        'more technical': 1.0, 'less technical': 1.5, 'more formal': 1.0, 'more casual': 1.0,
+    },
+    'file_ingestion': {
+        'ingest': 3.0, 'upload': 2.5, 'new file': 2.0, 'new files': 2.0, 'process files': 3.0,
+        'how do i upload': 2.0,
+    },
+    'content_addition': {
+        'add': 1.5, 'add a section': 1.5, 'add a module': 1.5, 'new section': 1.5, 'new module': 1.5, 'include': 1.5, 'missing': 2.0, 'additional': 1.5, 'insert': 1.5,
+        'supplement': 2.0, 'more information': 1.5, 'more details': 1.5, 'add information': 2.0,
+    },
+    'module_specific': {
+        'module': 0.8, 'section': 0.6, 'show module': 2.0, 'show': 1.0, 'show me': 1.5, 'view': 1.5, 'display': 1.5,
+        'open': 1.5, 'go to': 1.5, 'details': 0.5, 'delete': 2.5, 'remove': 2.5,
+    },
+    'help': {
+        'help': 3.0, 'what can you do': 4.0, 'commands': 2.5, 'how to use': 2.5, 'options': 1.0,
+    },
+}
+
+# Context features: applied when the caller reports the condition
+CONTEXT_WEIGHTS = {
+    'has_files': {'file_update': 1.0, 'file_ingestion': 0.3},
+    'has_module_ref': {'regenerate': 0.5, 'file_update': 0.3, 'tone_change': 0.5, 'content_addition': 0.3, 'module_specific': 0.5},
+}
+
+TONES = ('professional', 'casual', 'formal', 'technical', 'friendly', 'conversational', 'academic', 'simple', 'detailed')
+FOCUS_TERMS = (('procedure', 'procedures'), ('safety', 'safety'), ('quality', 'quality'),
+               ('technical', 'technical'), ('practical', 'practical'))
+
+_TOKEN = re.compile(r"[a-z0-9']+|\?")
+_MODULE_REF = re.compile(r'\bmodule\s+(\d+(?:\.\d+)?)')
+_SECTION_REF = re.compile(r'\bsection\s+(\d+)')
+_PATHWAY_REF = re.compile(r'\bpathway\s+(\d+)')
+_QUOTED = re.compile(r"['\"]([^'\"]{2,80})['\"]")
+_MAX_PHRASE_WORDS = 4
+
+
+class Intent(NamedTuple):
+    """Result of classifying one message"""
+    name: str
+    confidence: float
+    slots: dict
+    scores: dict
+
+
+def _compile(weights):
+    compiled = {}
+    for intent, phrases in weights.items():
+        for phrase, weight in phrases.items():
+            compiled.setdefault(phrase, []).append((intent, weight))
+    return {phrase: tuple(entries) for phrase, entries in compiled.items()}
+
+
+_COMPILED_WEIGHTS = _compile(INTENT_WEIGHTS)
+
+
+def extract_slots(text):
+    """
+    Module/section/pathway references, quoted titles, tone and focus from text
+    """
+    lower = text.lower()
+    slots = {}
+    module = _MODULE_REF.search(lower)
+    if module:
+        slots['module_ref'] = module.group(1)
+    section = _SECTION_REF.search(lower)
+    if section:
+        slots['section_ref'] = section.group(1)
+    pathway = _PATHWAY_REF.search(lower)
+    if pathway:
+        slots['pathway_ref'] = pathway.group(1)
+    quoted = _QUOTED.search(text)
+    if quoted:
+        slots['title'] = quoted.group(1).strip()
+    for tone in TONES:
+        if tone in lower:
+            slots['tone'] = tone
+            break
+    for term, focus in FOCUS_TERMS:
+        if term in lower:
+            slots['focus'] = focus
+            break
+    return slots
+
+
+def classify_intent(text, has_files=False, threshold=CONFIDENCE_THRESHOLD):
+    """
+    Classify a chatbot message
+
+    Args:
+        text (str): The user's message
+        has_files (bool): Whether processed or uploaded files are available
+        threshold (float): Minimum confidence; below it the intent is 'unknown'
+
+    Returns:
+        Intent: name, confidence (softmax probability), slots and raw scores
+    """
+    tokens = _TOKEN.findall((text or '').lower())
+    seen = set()
+    scores = dict.fromkeys(INTENT_WEIGHTS, 0.0)
+    for start in range(len(tokens)):
+        for size in range(1, _MAX_PHRASE_WORDS + 1):
+            if start + size > len(tokens):
+                break
+            phrase = ' '.join(tokens[start:start + size])
+            if phrase in seen:
+                continue
+            entries = _COMPILED_WEIGHTS.get(phrase)
+            if entries:
+                seen.add(phrase)
+                for intent, weight in entries:
+                    scores[intent] += weight
+
+    slots = extract_slots(text or '')
+    context = []
+    if has_files:
+        context.append('has_files')
+    if 'module_ref' in slots or 'title' in slots:
+        context.append('has_module_ref')
+    for feature in context:
+        for intent, weight in CONTEXT_WEIGHTS[feature].items():
+            scores[intent] += weight
+
+    best = max(scores, key=scores.get)
+    # Softmax over the intents that matched anything, plus the unknown class
+    exps = {intent: math.exp(score) for intent, score in scores.items() if score > 0}
+    total = sum(exps.values()) + math.exp(UNKNOWN_SCORE)
+    confidence = exps.get(best, 0.0) / total
+    name = best if confidence >= threshold and scores[best] > UNKNOWN_SCORE else UNKNOWN_INTENT
+    return Intent(name, round(confidence, 3), slots, scores)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Local keyphrase and terminology extraction
+Candidate phrases are the runs of content words between stopwords and
+punctuation (RAKE). Words score degree over frequency within the document,
+phrases the sum of their words, damped for one-off phrases and boosted when
+they share words with the training goals. A single pass over the tokens
+yields the whole ranked list, which is cached per (document hash, context
+hash), so terminology lookups cost no model call and always return the same
+terms. Each document's term counts also feed a corpus table shared across
+files, which tells vocabulary running through the whole corpus apart from
+terms specific to one file.
+"""
+
+import re
+import math
+import threading
+import collections
+from typing import NamedTuple
+
+from modules.summarizer import content_hash
+from modules.topic_clustering import STOPWORDS
+
+MAX_PHRASE_WORDS = 4
+MAX_ACTION_WORDS = 5
+# Weight of the share of a phrase's words found in the training context
+CONTEXT_BOOST = 1.0
+TERMINOLOGY_LIMIT = 15
+DYNAMIC_KEYWORD_LIMIT = 20
+# Goal keywords kept ahead of the document's keyphrases; the other slots go to the content
+GOAL_KEYWORD_SLOTS = 8
+CONTEXT_FIELDS = ('primary_goals', 'training_type', 'target_audience', 'industry')
+
+# Function words and filler that end a candidate phrase, on top of the clustering stopwords
+KEYPHRASE_STOPWORDS = STOPWORDS | frozenset("""
+first second third next last always never sure need needs needed want wants let lets put take takes
+sometimes usually often maybe probably basically actually kind sort lot lots bit way ways stuff
+i me my mine he him his she her hers it's that's there's we're you're they're don't doesn't can't won't
+etc ok um uh oh hi hello thanks thank please
+involve involves involved include includes including included require requires required follow follows
+followed following provide provides provided contain contains based several various specific certain proper
+properly throughout among across toward towards onto whether though although unless since besides instead
+essential important critical key main general overall different similar whole entire
+""".split())
+# Verbs that open a procedural step ("verify the steel shipment")
+ACTION_VERBS = frozenset("""
+adjust align apply assemble attach calibrate check clamp clean close complete confirm connect cut document
+drain drill ensure fasten fill grind inspect install isolate label load lock log lubricate measure monitor
+mount notify open operate position prepare record remove repair replace report review secure select set
+shut start stop store tag test tighten torque verify wear weld wipe
+""".split())
+# Words that may sit between an action verb and its object
+_ARTICLES = frozenset({'the', 'a', 'an', 'all', 'any', 'each', 'every', 'your', 'our', 'their', 'its', 'this', 'that', 'these', 'those'})
+
+_TOKEN = re.compile(r"[a-z][a-z0-9]*(?:[-'][a-z0-9]+)*|\d+(?:\.\d+)?|[^\w\s]")
+
+_KEYPHRASE_CACHE = {}
+_KEYPHRASE_CACHE_MAX_ENTRIES = 512
+_keyphrase_cache_lock = threading.Lock()
+
+
+class Keyphrase(NamedTuple):
+    """A candidate phrase with its document-level statistics"""
+    phrase: str
+    score: float
+    count: int
+    first: int      # Token position of the first occurrence
+    action: bool    # Opens with a procedural verb
+
+
+class TermTable:
+    """
+    Corpus-wide term frequencies: total occurrences and the number of
+    documents each term appears in. A document is counted once per content
+    hash no matter how often it is analysed.
+    """
+
+    def __init__(self):
+        self.term_counts = collections.Counter()
+        self.document_counts = collections.Counter()
+        self.documents = set()
+        self._lock = threading.Lock()
+
+    def add_document(self, document_hash, counts):
+        with self._lock:
+            if document_hash in self.documents:
+                return False
+            self.documents.add(document_hash)
+            self.term_counts.update(counts)
+            self.document_counts.update(counts.keys())
+            return True
+
+    def document_frequency(self, term):
+        with self._lock:
+            return self.document_counts.get(term, 0)
+
+    def shared_terms(self, min_documents=2):
+        """Terms found in at least min_documents documents, most widespread first"""
+        with self._lock:
+            return [term for term, documents in self.document_counts.most_common() if documents >= min_documents]
+
+    def most_common(self, count=20):
+        with self._lock:
+            return self.term_counts.most_common(count)
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self.documents), 'terms': len(self.term_counts)}
+
+    def clear(self):
+        with self._lock:
+            self.term_counts.clear()
+            self.document_counts.clear()
+            self.documents.clear()
+
+
+_term_table = TermTable()
+
+
+def get_term_table():
+    """The corpus term table shared by every extraction"""
+    return _term_table
+
+
+def context_terms(training_context):
+    """Content words of the goals, training type, audience and industry"""
+    if not training_context:
+        return frozenset()
+    text = ' '.join(str(training_context.get(field) or '') for field in CONTEXT_FIELDS).lower()
+    return frozenset(token for token in _TOKEN.findall(text) if token[0].isalpha() and token not in KEYPHRASE_STOPWORDS)
+
+
+def context_hash(training_context):
+    """Hash of the context fields that affect extraction"""
+    return content_hash(*(str((training_context or {}).get(field) or '') for field in CONTEXT_FIELDS))
+
+
+def _candidates(tokens):
+    """
+    RAKE candidates and action phrases in one pass
+
+    Returns:
+        tuple: (list of (phrase words, start position), list of (action words, start position))
+    """
+    phrases = []
+    actions = []
+    current = []
+    current_start = 0
+    action = None
+    for position, token in enumerate(tokens):
+        content = token[0].isalpha() and token not in KEYPHRASE_STOPWORDS
+        if action is not None:
+            if token in _ARTICLES and len(action[0]) == 1:
+                pass
+            elif content and len(action[0]) < MAX_ACTION_WORDS:
+                action[0].append(token)
+            else:
+                if len(action[0]) > 1:
+                    actions.append(action)
+                action = None
+        if token in ACTION_VERBS and action is None:
+            action = ([token], position)
+        if content and len(current) < MAX_PHRASE_WORDS:
+            if not current:
+                current_start = position
+            current.append(token)
+            continue
+        if current:
+            phrases.append((current, current_start))
+        current = [token] if content else []
+        current_start = position
+    if current:
+        phrases.append((current, current_start))
+    if action is not None and len(action[0]) > 1:
+        actions.append(action)
+    return phrases, actions
+
+
+def _extract(content, terms):
+    tokens = _TOKEN.findall(content.lower())
+    phrases, actions = _candidates(tokens)
+
+    frequency = collections.Counter()
+    degree = collections.Counter()
+    for words, _ in phrases:
+        for word in words:
+            frequency[word] += 1
+            degree[word] += len(words)
+    word_score = {word: degree[word] / frequency[word] for word in frequency}
+
+    counts = collections.Counter()
+    first = {}
+    action_phrases = set()
+    for words, start in phrases + actions:
+        phrase = ' '.join(words)
+        counts[phrase] += 1
+        first.setdefault(phrase, start)
+    for words, _ in actions:
+        action_phrases.add(' '.join(words))
+
+    ranked = []
+    for phrase, count in counts.items():
+        words = phrase.split()
+        scored = [word_score.get(word, 1.0) for word in words]
+        score = sum(scored) * (1.0 + math.log(count))
+        if terms:
+            score *= 1.0 + CONTEXT_BOOST * sum(1 for word in words if word in terms) / len(words)
+        ranked.append(Keyphrase(phrase, round(score, 6), count, first[phrase], phrase in action_phrases))
+    ranked.sort(key=lambda keyphrase: (-keyphrase.score, keyphrase.first, keyphrase.phrase))
+    return tuple(ranked), frequency
+
+
+def extract_keyphrases(content, training_context=None, corpus=True):
+    """
+    Ranked keyphrases of a document, computed once per (document, context)
+
+    Args:
+        content (str): Document text
+        training_context (dict): Goals, type, audience and industry used to boost phrases
+        corpus (bool): Count the document in the shared term table (False for
+                       text that is not a source file, such as the goals themselves)
+
+    Returns:
+        tuple: Keyphrase tuples, best first
+    """
+    if not content or not content.strip():
+        return ()
+    document_hash = content_hash(content)
+    key = (document_hash, context_hash(training_context))
+    with _keyphrase_cache_lock:
+        cached = _KEYPHRASE_CACHE.get(key)
+    if cached is None:
+        cached = _extract(content, context_terms(training_context))
+        with _keyphrase_cache_lock:
+            if len(_KEYPHRASE_CACHE) >= _KEYPHRASE_CACHE_MAX_ENTRIES:
+                _KEYPHRASE_CACHE.pop(next(iter(_KEYPHRASE_CACHE)))
+            _KEYPHRASE_CACHE[key] = cached
+    ranked, frequency = cached
+    if corpus:
+        # A no-op for documents already counted
+        _term_table.add_document(document_hash, frequency)
+    return ranked
+
+
+def clear_keyphrase_cache():
+    """Clear cached keyphrases and the corpus term table"""
+    with _keyphrase_cache_lock:
+        _KEYPHRASE_CACHE.clear()
+    _term_table.clear()
+
+
+def _is_technical(keyphrase):
+    words = keyphrase.phrase.split()
+    return not keyphrase.action and (len(words) > 1 or any(not char.isalpha() for char in keyphrase.phrase))
+
+
+def terminology(content, training_context=None, terminology_type="all", limit=TERMINOLOGY_LIMIT, corpus=True):
+    """
+    Terms of one kind from a document
+
+    Args:
+        terminology_type: "technical" (multi-word or coded terms), "action"
+                          (procedural verb phrases), "industry" (terms shared
+                          with the training context or running through several
+                          corpus documents) or "all"
+
+    Returns:
+        list: Up to limit phrases, best first, without phrases contained in a
+        better-ranked one
+    """
+    ranked = extract_keyphrases(content, training_context, corpus)
+    if terminology_type == 'technical':
+        ranked = [keyphrase for keyphrase in ranked if _is_technical(keyphrase)]
+    elif terminology_type == 'action':
+        ranked = [keyphrase for keyphrase in ranked if keyphrase.action]
+    elif terminology_type == 'industry':
+        domain = set(context_terms(training_context)) | set(_term_table.shared_terms())
+        ranked = [keyphrase for keyphrase in ranked
+                  if not keyphrase.action and any(word in domain for word in keyphrase.phrase.split())]
+
+    chosen = []
+    for keyphrase in ranked:
+        padded = f" {keyphrase.phrase} "
+        if any(padded in f" {existing} " for existing in chosen):
+            continue
+        chosen.append(keyphrase.phrase)
+        if len(chosen) == limit:
+            break
+    return chosen
+
+
+def dynamic_keywords(goal_keywords, content, training_context=None, limit=DYNAMIC_KEYWORD_LIMIT, goal_slots=GOAL_KEYWORD_SLOTS):
+    """
+    Keyword list for a document: the leading goal keywords, then the
+    document's own keyphrases, then the remaining goal keywords if slots
+    are left, deduplicated and capped at limit
+    """
+    keywords = goal_keywords[:goal_slots] + terminology(content, training_context, "all", limit=limit) + goal_keywords[goal_slots:]
+    return list(dict.fromkeys(keywords))[:limit]
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Deterministic mind maps built straight from pathway structure
+The tree (pathway -> sections -> modules) is derived from the editable pathway
+structure without any model call and emitted both as markmap markdown and as a
+MindMeister-style node list. Each node keeps its own rendered markdown, so a
+structural patch or a single module edit only re-renders the node it touches;
+output is memoized per map version. Whole pathway dicts are cached by content
+hash, which makes a stored pathway version map to exactly one mind map.
+"""
+
+import re
+import hashlib
+import threading
+import collections
+
+from modules.models import dumps, editable_pathways_from_pathway
+
+NOTE_MAX_CHARS = 140
+_MAP_CACHE_SIZE = 8
+
+_WHITESPACE = re.compile(r'\s+')
+# Leading characters markmap would read as markdown structure
+_LEADING_MARKUP = re.compile(r'^[#>*+\-\s]+')
+
+_map_cache = collections.OrderedDict()
+_hash_cache = collections.OrderedDict()
+_map_cache_lock = threading.Lock()
+
+
+def node_label(text, max_chars=None):
+    """Single-line label safe to use as a markmap heading or list item"""
+    label = _WHITESPACE.sub(' ', str(text or '')).strip()
+    label = _LEADING_MARKUP.sub('', label) or label
+    if max_chars and len(label) > max_chars:
+        label = label[:max_chars - 1].rstrip() + '…'
+    return label
+
+
+class PathwayMindMap:
+    """
+    Mind map over {section title: [module dict, ...]}
+
+    Node ids are stable for the lifetime of the map: sections are keyed by
+    title and modules by object identity, so moving or editing a module keeps
+    its id. `renders` counts module nodes rendered, which lets callers check
+    that an edit stayed incremental.
+    """
+
+    def __init__(self, editable_pathways, pathway_name='Training Pathway', notes=True):
+        self.editable_pathways = editable_pathways
+        self.pathway_name = pathway_name
+        self.notes = notes
+        self.version = 0
+        self.renders = 0
+        self.rebuilds = 0
+        self._next_id = 0
+        self._section_ids = {}                      # section title -> node id
+        self._module_ids = {}                       # id(module) -> node id
+        self._modules = {}                          # id(module) -> module (keeps ids valid)
+        self._fragments = {}                        # node id -> rendered markdown lines
+        self._section_fragments = {}                # section title -> joined markdown
+        self._fingerprint = None
+        self._markdown = None
+        self._nodes = None
+        self.rebuild()
+
+    # --- maintenance -----------------------------------------------------
+
+    def _new_id(self, prefix):
+        self._next_id += 1
+        return f"{prefix}{self._next_id}"
+
+    def _module_id(self, module):
+        key = id(module)
+        if key not in self._module_ids:
+            self._module_ids[key] = self._new_id('m')
+            self._modules[key] = module
+        return self._module_ids[key]
+
+    def _section_id(self, title):
+        if title not in self._section_ids:
+            self._section_ids[title] = self._new_id('s')
+        return self._section_ids[title]
+
+    def _forget_module(self, module):
+        node_id = self._module_ids.pop(id(module), None)
+        self._modules.pop(id(module), None)
+        self._fragments.pop(node_id, None)
+
+    def _changed(self, *sections):
+        for title in sections:
+            self._section_fragments.pop(title, None)
+        self._markdown = None
+        self._nodes = None
+        self.version += 1
+
+    def _current_fingerprint(self):
+        return tuple((title, len(modules)) for title, modules in self.editable_pathways.items())
+
+    def rebuild(self):
+        """Drop every rendered node; the next render walks the whole structure"""
+        self._section_ids.clear()
+        self._module_ids.clear()
+        self._modules.clear()
+        self._fragments.clear()
+        self._section_fragments.clear()
+        for title, modules in self.editable_pathways.items():
+            self._section_id(title)
+            for module in modules:
+                self._module_id(module)
+        self._fingerprint = self._current_fingerprint()
+        self.rebuilds += 1
+        self._changed()
+
+    def _sync(self):
+        # Structure changed without going through patches
+        if self._current_fingerprint() != self._fingerprint:
+            self.rebuild()
+
+    def update_module(self, section, index):
+        """Re-render one module node after its fields were edited in place"""
+        module = self.editable_pathways[section][index]
+        self._fragments.pop(self._module_id(module), None)
+        self._changed(section)
+
+    def set_pathway_name(self, pathway_name):
+        if pathway_name != self.pathway_name:
+            self.pathway_name = pathway_name
+            self._changed()
+
+    def on_patch(self, op, inverse):
+        """
+        Update the map after a structural patch was applied
+
+        Args:
+            op (dict): The applied operation
+            inverse (dict): Its inverse (carries removed modules)
+        """
+        kind = op.get('op')
+        if kind == 'replace':
+            self.update_module(op['section'], op['index'])
+            return
+        if kind == 'add':
+            self._module_id(op['module'])
+            self._changed(op['section'])
+        elif kind == 'remove':
+            self._forget_module(inverse['module'])
+            self._changed(op['section'])
+        elif kind == 'move':
+            self._changed(op['section'], op['to_section'])
+        elif kind == 'add_section':
+            self._section_id(op['section'])
+            for module in op.get('modules') or []:
+                self._module_id(module)
+            self._changed(op['section'])
+        elif kind == 'remove_section':
+            self._section_ids.pop(op['section'], None)
+            for module in inverse.get('modules') or []:
+                self._forget_module(module)
+            self._changed(op['section'])
+        self._fingerprint = self._current_fingerprint()
+
+    # --- rendering -------------------------------------------------------
+
+    def _note(self, module):
+        if not self.notes:
+            return ''
+        return node_label(module.get('description', ''), NOTE_MAX_CHARS)
+
+    def _module_lines(self, module):
+        node_id = self._module_id(module)
+        lines = self._fragments.get(node_id)
+        if lines is None:
+            lines = [f"- {node_label(module.get('title')) or 'Untitled Module'}"]
+            note = self._note(module)
+            if note:
+                lines.append(f"  - {note}")
+            self._fragments[node_id] = lines
+            self.renders += 1
+        return lines
+
+    def _section_markdown(self, title, modules):
+        fragment = self._section_fragments.get(title)
+        if fragment is None:
+            lines = [f"## {node_label(title) or 'Untitled Section'}"]
+            for module in modules:
+                lines.extend(self._module_lines(module))
+            fragment = '\n'.join(lines)
+            self._section_fragments[title] = fragment
+        return fragment
+
+    def to_markmap_markdown(self):
+        """Markmap markdown: '#' pathway, '##' sections, list items for modules"""
+        self._sync()
+        if self._markdown is None:
+            parts = [f"# {node_label(self.pathway_name) or 'Training Pathway'}"]
+            parts.extend(self._section_markdown(title, modules) for title, modules in self.editable_pathways.items())
+            self._markdown = '\n'.join(parts)
+        return self._markdown
+
+    def to_mindmeister_nodes(self):
+        """
+        Flat node list in MindMeister idea order (parents before children)
+
+        Returns:
+            list: [{'id', 'parent_id', 'title', 'rank', 'note'}] with the root first
+        """
+        self._sync()
+        if self._nodes is None:
+            nodes = [{'id': 'root', 'parent_id': None, 'title': node_label(self.pathway_name) or 'Training Pathway',
+                      'rank': 0, 'note': ''}]
+            for section_rank, (title, modules) in enumerate(self.editable_pathways.items()):
+                section_id = self._section_id(title)
+                nodes.append({'id': section_id, 'parent_id': 'root', 'title': node_label(title) or 'Untitled Section',
+                              'rank': section_rank, 'note': ''})
+                for rank, module in enumerate(modules):
+                    nodes.append({'id': self._module_id(module), 'parent_id': section_id,
+                                  'title': node_label(module.get('title')) or 'Untitled Module',
+                                  'rank': rank, 'note': self._note(module)})
+            self._nodes = nodes
+        return [dict(node) for node in self._nodes]
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'sections': len(self.editable_pathways),
+            'modules': sum(len(modules) for modules in self.editable_pathways.values()),
+            'renders': self.renders,
+            'rebuilds': self.rebuilds,
+        }
+
+
+def get_pathway_mind_map(editable_pathways, pathway_name=None):
+    """
+    Shared mind map for an editable pathway structure (kept per structure object)
+
+    Args:
+        editable_pathways (dict): Section title -> list of module dicts
+        pathway_name (str): Root title; None keeps the cached map's name
+    """
+    key = id(editable_pathways)
+    with _map_cache_lock:
+        cached = _map_cache.get(key)
+        if cached is not None and cached.editable_pathways is editable_pathways:
+            _map_cache.move_to_end(key)
+            if pathway_name is not None:
+                cached.set_pathway_name(pathway_name)
+            return cached
+        mind_map = PathwayMindMap(editable_pathways, pathway_name or 'Training Pathway')
+        _map_cache[key] = mind_map
+        if len(_map_cache) > _MAP_CACHE_SIZE:
+            _map_cache.popitem(last=False)
+        return mind_map
+
+
+def mind_map_for_pathway(pathway_dict):
+    """
+    Mind map for a whole pathway dict, cached by content hash so each pathway
+    version is mapped once
+    """
+    content_hash = hashlib.sha1(dumps(pathway_dict).encode('utf-8')).hexdigest()
+    with _map_cache_lock:
+        cached = _hash_cache.get(content_hash)
+        if cached is not None:
+            _hash_cache.move_to_end(content_hash)
+            return cached
+    mind_map = PathwayMindMap(editable_pathways_from_pathway(pathway_dict),
+                              pathway_dict.get('pathway_name') or pathway_dict.get('name') or 'Training Pathway')
+    with _map_cache_lock:
+        _hash_cache[content_hash] = mind_map
+        if len(_hash_cache) > _MAP_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+    return mind_map
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Pathway data helpers
+Pathways stay plain dicts in session state and in the pathway store; this
+module holds the editor conversion and fast JSON (de)serialization for them.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data, indent=None):
+    """
+    Serialize pathway data to a JSON string, using orjson when it is installed
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(data, option=option | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(data, indent=indent, ensure_ascii=False, default=str)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def loads(text):
+    """Parse JSON produced by dumps"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def editable_pathways_from_pathway(pathway_dict):
+    """
+    Build the editor's {section title: [module dict, ...]} structure from a pathway dict
+    """
+    editable = {}
+    for section in pathway_dict.get('sections', []):
+        # Clean section title to avoid special characters that might cause issues
+        section_title = section.get('title', 'Untitled Section').strip()
+        modules = editable.setdefault(section_title, [])
+        for module in section.get('modules', []):
+            modules.append({
+                'title': module.get('title', 'Untitled Module'),
+                'description': module.get('description', ''),
+                'content': module.get('content', 'No content available'),
+                'source': module.get('source', ['Content from uploaded files']),
+                'content_types': module.get('content_types', [])
+            })
+    return editable
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Lookup index over the editable pathway structure for chatbot module resolution
+Resolves modules by global number, section + local number, normalized title
+and fuzzy title (character trigrams) without rescanning every module per
+request. The index follows structural patches incrementally and rebuilds
+itself if the structure was changed behind its back.
+"""
+
+import re
+import threading
+import collections
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+_INDEX_CACHE_SIZE = 8
+
+_index_cache = collections.OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def normalize_title(title):
+    """Lowercase, collapse punctuation and whitespace"""
+    return _NON_WORD.sub(' ', (title or '').lower()).strip()
+
+
+def title_trigrams(text):
+    padded = f"  {normalize_title(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ModuleIndex:
+    """
+    Index over {section title: [module dict, ...]}
+
+    Lookups return the same reference dicts create_module_mapping produced:
+    {'module', 'section', 'index', 'local_number', 'global_number'}
+    """
+
+    def __init__(self, editable_pathways):
+        self.editable_pathways = editable_pathways
+        self._modules = {}                          # id(module) -> module
+        self._titles = {}                           # id(module) -> normalized title
+        self._by_title = collections.defaultdict(list)
+        self._trigrams = collections.defaultdict(set)
+        self._refs = []
+        self._ref_by_id = {}
+        self._by_section = {}
+        self._mapping = None
+        self._fingerprint = None
+        self._positions_dirty = True
+        self.rebuilds = 0
+        self.rebuild()
+
+    # --- maintenance -----------------------------------------------------
+
+    def rebuild(self):
+        """Full rebuild of titles and positions"""
+        self._modules.clear()
+        self._titles.clear()
+        self._by_title.clear()
+        self._trigrams.clear()
+        for modules in self.editable_pathways.values():
+            for module in modules:
+                self._index_module(module)
+        self._positions_dirty = True
+        self.rebuilds += 1
+
+    def _index_module(self, module):
+        key = id(module)
+        if key in self._modules:
+            self._unindex_module(module)
+        title = normalize_title(module.get('title', ''))
+        self._modules[key] = module
+        self._titles[key] = title
+        self._by_title[title].append(key)
+        for gram in title_trigrams(title):
+            self._trigrams[gram].add(key)
+
+    def _unindex_module(self, module):
+        key = id(module)
+        title = self._titles.pop(key, None)
+        self._modules.pop(key, None)
+        if title is None:
+            return
+        keys = self._by_title.get(title, [])
+        if key in keys:
+            keys.remove(key)
+        if not keys:
+            self._by_title.pop(title, None)
+        for gram in title_trigrams(title):
+            postings = self._trigrams.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._trigrams[gram]
+
+    def on_patch(self, op, inverse):
+        """
+        Update the index after a structural patch was applied
+
+        Args:
+            op (dict): The applied operation
+            inverse (dict): Its inverse (carries removed modules)
+        """
+        kind = op.get('op')
+        if kind == 'replace':
+            if 'title' in op.get('fields', {}):
+                self._index_module(self.editable_pathways[op['section']][op['index']])
+            return
+        if kind == 'add':
+            self._index_module(op['module'])
+        elif kind == 'remove':
+            self._unindex_module(inverse['module'])
+        elif kind == 'add_section':
+            for module in op.get('modules') or []:
+                self._index_module(module)
+        elif kind == 'remove_section':
+            for module in inverse.get('modules') or []:
+                self._unindex_module(module)
+        self._positions_dirty = True
+
+    def _current_fingerprint(self):
+        return tuple((name, len(modules)) for name, modules in self.editable_pathways.items())
+
+    def _ensure_positions(self):
+        fingerprint = self._current_fingerprint()
+        if fingerprint != self._fingerprint and not self._positions_dirty:
+            # Changed without going through patches
+            self.rebuild()
+        if not self._positions_dirty:
+            return
+        self._renumber()
+        if len(self._ref_by_id) != len(self._modules):
+            # Modules were swapped in without a patch; reindex titles too
+            self.rebuild()
+            self._renumber()
+        self._fingerprint = fingerprint
+        self._mapping = None
+        self._positions_dirty = False
+
+    def _renumber(self):
+        self._refs = []
+        self._ref_by_id = {}
+        self._by_section = {}
+        global_number = 1
+        for section_name, modules in self.editable_pathways.items():
+            section_refs = []
+            for i, module in enumerate(modules):
+                ref = {
+                    'module': module,
+                    'section': section_name,
+                    'index': i,
+                    'local_number': i + 1,
+                    'global_number': global_number
+                }
+                section_refs.append(ref)
+                self._refs.append(ref)
+                self._ref_by_id[id(module)] = ref
+                global_number += 1
+            self._by_section[section_name] = section_refs
+
+    def _fresh(self, lookup):
+        """
+        Run lookup, and once more after renumbering if the result is stale
+        (a reorder that bypassed the patch log)
+        """
+        self._ensure_positions()
+        ref = lookup()
+        if ref is not None:
+            modules = self.editable_pathways.get(ref['section'], [])
+            if not (ref['index'] < len(modules) and modules[ref['index']] is ref['module']):
+                self._positions_dirty = True
+                self._ensure_positions()
+                ref = lookup()
+        return ref
+
+    # --- lookups -----------------------------------------------------------
+
+    def __len__(self):
+        self._ensure_positions()
+        return len(self._refs)
+
+    @property
+    def sections(self):
+        self._ensure_positions()
+        return list(self._by_section)
+
+    def by_global_number(self, number):
+        number = int(number)
+        return self._fresh(lambda: self._refs[number - 1] if 1 <= number <= len(self._refs) else None)
+
+    def by_section_number(self, section_name, number):
+        number = int(number)
+
+        def lookup():
+            refs = self._by_section.get(section_name, [])
+            return refs[number - 1] if 1 <= number <= len(refs) else None
+        return self._fresh(lookup)
+
+    def by_local_number(self, number):
+        """First section that has a module with this local number"""
+        number = int(number)
+
+        def lookup():
+            for refs in self._by_section.values():
+                if 1 <= number <= len(refs):
+                    return refs[number - 1]
+            return None
+        return self._fresh(lookup)
+
+    def by_title(self, title):
+        """Exact match on the normalized title"""
+        normalized = normalize_title(title)
+
+        def lookup():
+            for key in self._by_title.get(normalized, []):
+                ref = self._ref_by_id.get(key)
+                if ref is not None and normalize_title(ref['module'].get('title', '')) == normalized:
+                    return ref
+            return None
+        return self._fresh(lookup)
+
+    def search_titles(self, query, limit=5):
+        """
+        Modules whose titles share trigrams with query, best first
+
+        Returns:
+            list: (score, ref) pairs; score is the trigram Jaccard similarity
+        """
+        self._ensure_positions()
+        grams = title_trigrams(query)
+        overlap = collections.Counter()
+        for gram in grams:
+            for key in self._trigrams.get(gram, ()):
+                overlap[key] += 1
+        scored = []
+        for key, shared in overlap.items():
+            ref = self._ref_by_id.get(key)
+            if ref is None:
+                continue
+            title_gram_count = len(title_trigrams(self._titles[key]))
+            scored.append((shared / (len(grams) + title_gram_count - shared), ref))
+        scored.sort(key=lambda item: (-item[0], item[1]['global_number']))
+        return scored[:limit]
+
+    def find_title(self, text, min_score=0.5):
+        """
+        Resolve free text to a module: exact title, then a title containing
+        (or contained in) the text, then the best fuzzy match above min_score
+        """
+        exact = self.by_title(text)
+        if exact:
+            return exact
+        needle = normalize_title(text)
+        if not needle:
+            return None
+        candidates = self.search_titles(text, limit=20)
+        for score, ref in candidates:
+            title = self._titles[id(ref['module'])]
+            if needle in title or title in needle:
+                return self._fresh(lambda: self._ref_by_id.get(id(ref['module'])))
+        if candidates and candidates[0][0] >= min_score:
+            best = candidates[0][1]['module']
+            return self._fresh(lambda: self._ref_by_id.get(id(best)))
+        return None
+
+    def as_mapping(self):
+        """The dict shape returned by create_module_mapping (cached)"""
+        self._ensure_positions()
+        if self._mapping is None:
+            self._mapping = {
+                'by_section_and_number': {
+                    section: {str(ref['local_number']): ref for ref in refs}
+                    for section, refs in self._by_section.items()
+                },
+                'by_global_number': {str(ref['global_number']): ref for ref in self._refs},
+                'by_title': {self._titles[id(ref['module'])]: ref for ref in self._refs},
+                'section_info': {
+                    section: {'count': len(refs), 'modules': self.editable_pathways[section]}
+                    for section, refs in self._by_section.items()
+                }
+            }
+        return self._mapping
+
+
+def get_module_index(editable_pathways):
+    """
+    Shared index for an editable pathway structure (kept per structure object)
+    """
+    key = id(editable_pathways)
+    with _index_cache_lock:
+        cached = _index_cache.get(key)
+        if cached is not None and cached.editable_pathways is editable_pathways:
+            _index_cache.move_to_end(key)
+            return cached
+        index = ModuleIndex(editable_pathways)
+        _index_cache[key] = index
+        if len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+        return index
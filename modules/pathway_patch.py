@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Structural patches for the editable pathway structure
+({section title: [module dict, ...]}). Every edit is a small operation
+addressed by section and module index; applying it returns its inverse so
+undo/redo only touches the modules that changed.
+
+Operations:
+    {'op': 'add', 'section': s, 'index': i or None, 'module': {...}}
+    {'op': 'remove', 'section': s, 'index': i}
+    {'op': 'replace', 'section': s, 'index': i, 'fields': {...}}
+    {'op': 'move', 'section': s, 'index': i, 'to_section': t, 'to_index': j or None}
+    {'op': 'add_section', 'section': s, 'index': k or None}
+    {'op': 'remove_section', 'section': s}
+"""
+
+import copy
+import time
+import threading
+
+MAX_UNDO_DEPTH = 200
+_MISSING = '__missing__'
+
+
+class PatchError(ValueError):
+    """Raised when an operation does not apply to the current structure"""
+
+
+def _section(editable_pathways, name):
+    if name not in editable_pathways:
+        raise PatchError(f"Section '{name}' not found")
+    return editable_pathways[name]
+
+
+def _insert_section(editable_pathways, name, modules, index):
+    """Re-insert a section at a position, preserving dict order"""
+    items = list(editable_pathways.items())
+    index = len(items) if index is None else min(index, len(items))
+    items.insert(index, (name, modules))
+    editable_pathways.clear()
+    editable_pathways.update(items)
+
+
+def apply_patch(editable_pathways, op):
+    """
+    Apply one operation in place
+
+    Args:
+        editable_pathways (dict): Section title -> list of module dicts
+        op (dict): Operation (see module docstring)
+
+    Returns:
+        dict: The inverse operation
+    """
+    kind = op.get('op')
+
+    if kind == 'add':
+        modules = _section(editable_pathways, op['section'])
+        index = len(modules) if op.get('index') is None else min(op['index'], len(modules))
+        modules.insert(index, op['module'])
+        return {'op': 'remove', 'section': op['section'], 'index': index}
+
+    if kind == 'remove':
+        modules = _section(editable_pathways, op['section'])
+        if not 0 <= op['index'] < len(modules):
+            raise PatchError(f"Module {op['index']} not found in '{op['section']}'")
+        module = modules.pop(op['index'])
+        return {'op': 'add', 'section': op['section'], 'index': op['index'], 'module': module}
+
+    if kind == 'replace':
+        modules = _section(editable_pathways, op['section'])
+        if not 0 <= op['index'] < len(modules):
+            raise PatchError(f"Module {op['index']} not found in '{op['section']}'")
+        module = modules[op['index']]
+        previous = {}
+        for key, value in op['fields'].items():
+            previous[key] = module.get(key, _MISSING)
+            if value == _MISSING:
+                module.pop(key, None)
+            else:
+                module[key] = value
+        return {'op': 'replace', 'section': op['section'], 'index': op['index'], 'fields': previous}
+
+    if kind == 'move':
+        source = _section(editable_pathways, op['section'])
+        target = _section(editable_pathways, op['to_section'])
+        if not 0 <= op['index'] < len(source):
+            raise PatchError(f"Module {op['index']} not found in '{op['section']}'")
+        module = source.pop(op['index'])
+        to_index = len(target) if op.get('to_index') is None else min(op['to_index'], len(target))
+        target.insert(to_index, module)
+        return {'op': 'move', 'section': op['to_section'], 'index': to_index,
+                'to_section': op['section'], 'to_index': op['index']}
+
+    if kind == 'add_section':
+        if op['section'] in editable_pathways:
+            raise PatchError(f"Section '{op['section']}' already exists")
+        _insert_section(editable_pathways, op['section'], list(op.get('modules') or []), op.get('index'))
+        return {'op': 'remove_section', 'section': op['section']}
+
+    if kind == 'remove_section':
+        names = list(editable_pathways)
+        if op['section'] not in editable_pathways:
+            raise PatchError(f"Section '{op['section']}' not found")
+        index = names.index(op['section'])
+        modules = editable_pathways.pop(op['section'])
+        return {'op': 'add_section', 'section': op['section'], 'index': index, 'modules': modules}
+
+    raise PatchError(f"Unknown patch operation: {kind}")
+
+
+class PatchLog:
+    """
+    Append-only log of applied operations with undo/redo stacks
+
+    `entries` records every applied operation (including undos and redos) in
+    order, so replaying it over the starting structure reproduces the current
+    one. `take_pending()` hands the entries over for persistence and drops
+    them from memory. Listeners are called as listener(structure, op, inverse)
+    after every applied operation so derived indexes can follow along.
+    """
+
+    def __init__(self, max_undo=MAX_UNDO_DEPTH):
+        self.entries = []
+        self.max_undo = max_undo
+        self._undo = []
+        self._redo = []
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def _record(self, editable_pathways, op, inverse, source):
+        self.entries.append({'op': op, 'source': source, 'timestamp': time.time()})
+        for listener in self.listeners:
+            listener(editable_pathways, op, inverse)
+
+    def apply(self, editable_pathways, op):
+        """Apply op, record it and make it undoable; returns the inverse"""
+        with self._lock:
+            inverse = apply_patch(editable_pathways, op)
+            self._record(editable_pathways, op, inverse, 'edit')
+            self._undo.append((op, inverse))
+            if len(self._undo) > self.max_undo:
+                self._undo.pop(0)
+            self._redo.clear()
+            return inverse
+
+    def apply_many(self, editable_pathways, ops):
+        for op in ops:
+            self.apply(editable_pathways, op)
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self, editable_pathways):
+        """Revert the last edit; returns False when there is nothing to undo"""
+        with self._lock:
+            if not self._undo:
+                return False
+            op, inverse = self._undo.pop()
+            redo = apply_patch(editable_pathways, inverse)
+            self._record(editable_pathways, inverse, redo, 'undo')
+            self._redo.append(redo)
+            return True
+
+    def redo(self, editable_pathways):
+        with self._lock:
+            if not self._redo:
+                return False
+            redo = self._redo.pop()
+            inverse = apply_patch(editable_pathways, redo)
+            self._record(editable_pathways, redo, inverse, 'redo')
+            self._undo.append((redo, inverse))
+            return True
+
+    def take_pending(self):
+        """Entries recorded since the last call, for persistence"""
+        with self._lock:
+            pending, self.entries = self.entries, []
+            return pending
+
+
+def replay(editable_pathways, entries):
+    """
+    Rebuild a structure by replaying logged entries over a deep copy of the base
+    """
+    result = copy.deepcopy(editable_pathways)
+    for entry in entries:
+        op = entry['op'] if isinstance(entry.get('op'), dict) else entry
+        apply_patch(result, copy.deepcopy(op))
+    return result
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk store for generated pathways
+Pathways are kept as compressed JSON blobs (zstd when available, zlib otherwise)
+in a SQLite file alongside small metadata rows, so history survives restarts
+and is only loaded into memory when a past pathway is actually read. Rows are
+scoped by an owner key, so sessions sharing the file only see their own history.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import contextlib
+import threading
+import collections
+
+from modules.models import dumps, loads
+from modules.pathway_patch import replay
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_STORE_PATH = os.getenv(
+    'PATHWAY_STORE_PATH',
+    os.path.join(os.path.expanduser('~'), '.gateway_content_automation', 'pathways.sqlite3')
+)
+HISTORY_KIND = 'history'
+# Kind prefix of the base structure a patch stream is replayed over
+STREAM_BASE_KIND = 'patch_base'
+DEFAULT_PAGE_SIZE = 20
+LOADED_CACHE_SIZE = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pathways (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    name TEXT,
+    content_hash TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    section_count INTEGER NOT NULL,
+    module_count INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    blob BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS patches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patches_stream ON patches (stream, id);
+"""
+# Created after the owner column is added to files written before it existed
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS pathways_owner_kind ON pathways (owner, kind, version);
+CREATE INDEX IF NOT EXISTS pathways_owner_hash ON pathways (owner, kind, content_hash);
+"""
+
+_META_COLUMNS = ('id', 'owner', 'kind', 'version', 'name', 'content_hash', 'codec', 'raw_size',
+                 'stored_size', 'section_count', 'module_count', 'created_at')
+
+
+def _compress(raw):
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=10).compress(raw)
+    import zlib
+    return 'zlib', zlib.compress(raw, 6)
+
+
+def _decompress(codec, blob):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Pathway was stored with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if codec == 'zlib':
+        import zlib
+        return zlib.decompress(blob)
+    return blob
+
+
+def _summarize(pathway_data):
+    """Name and counts for the metadata row"""
+    pathways = pathway_data.get('pathways', []) if isinstance(pathway_data, dict) else []
+    if not pathways and isinstance(pathway_data, dict) and 'sections' in pathway_data:
+        pathways = [pathway_data]
+    names = [p.get('pathway_name', 'Unnamed') for p in pathways if isinstance(p, dict)]
+    sections = [s for p in pathways if isinstance(p, dict) for s in p.get('sections', [])]
+    module_count = sum(len(s.get('modules', [])) for s in sections if isinstance(s, dict))
+    if not pathways and isinstance(pathway_data, dict):
+        # editable_pathways shape: section title -> modules
+        sections = [s for s in pathway_data.values() if isinstance(s, list)]
+        module_count = sum(len(s) for s in sections)
+    return ', '.join(names)[:200], len(sections), module_count
+
+
+class PathwayStore:
+    """
+    Versioned, compressed pathway storage
+
+    Each save is a new row; `kind` separates history entries from the latest
+    snapshots of session state ('generated_pathway', 'confirmed_pathways'...).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._loaded = collections.OrderedDict()
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(pathways)")}
+            if 'owner' not in columns:
+                connection.execute("ALTER TABLE pathways ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            connection.executescript(_INDEXES)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def save(self, pathway_data, kind=HISTORY_KIND, dedupe=True, owner=''):
+        """
+        Store pathway data and return its metadata
+
+        Args:
+            pathway_data (dict): Pathway data in any of the app's dict shapes
+            kind (str): HISTORY_KIND or a session key such as 'confirmed_pathways'
+            dedupe (bool): Return the existing row if identical content is stored
+            owner (str): Session or user key the row belongs to
+
+        Returns:
+            dict: Metadata row (id, version, name, sizes, counts)
+        """
+        raw = dumps(pathway_data).encode('utf-8')
+        content_hash = hashlib.sha1(raw).hexdigest()
+        name, section_count, module_count = _summarize(pathway_data)
+
+        with self._lock, self._connect() as connection:
+            if dedupe:
+                existing = self._meta_query(connection, "WHERE owner = ? AND kind = ? AND content_hash = ? ORDER BY version DESC LIMIT 1",
+                                            (owner, kind, content_hash))
+                if existing:
+                    return existing[0]
+            codec, blob = _compress(raw)
+            version = connection.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM pathways WHERE owner = ? AND kind = ?",
+                                         (owner, kind)).fetchone()[0]
+            cursor = connection.execute(
+                "INSERT INTO pathways (owner, kind, version, name, content_hash, codec, raw_size, stored_size, "
+                "section_count, module_count, created_at, blob) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (owner, kind, version, name, content_hash, codec, len(raw), len(blob), section_count, module_count, time.time(), blob)
+            )
+            return self._meta_query(connection, "WHERE id = ?", (cursor.lastrowid,))[0]
+
+    def _meta_query(self, connection, where, params=()):
+        rows = connection.execute(f"SELECT {', '.join(_META_COLUMNS)} FROM pathways {where}", params).fetchall()
+        return [dict(zip(_META_COLUMNS, row)) for row in rows]
+
+    def load(self, record_id):
+        """Decompress and return the pathway data stored under record_id"""
+        with self._lock:
+            if record_id in self._loaded:
+                self._loaded.move_to_end(record_id)
+                return self._loaded[record_id]
+        with self._connect() as connection:
+            row = connection.execute("SELECT codec, blob FROM pathways WHERE id = ?", (record_id,)).fetchone()
+        if row is None:
+            raise KeyError(record_id)
+        data = loads(_decompress(row[0], row[1]))
+        with self._lock:
+            self._loaded[record_id] = data
+            if len(self._loaded) > LOADED_CACHE_SIZE:
+                self._loaded.popitem(last=False)
+        return data
+
+    def count(self, kind=HISTORY_KIND, owner=''):
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM pathways WHERE owner = ? AND kind = ?", (owner, kind)).fetchone()[0]
+
+    def list(self, kind=HISTORY_KIND, offset=0, limit=DEFAULT_PAGE_SIZE, owner=''):
+        """Metadata rows for one page, oldest first (matching history numbering)"""
+        with self._connect() as connection:
+            return self._meta_query(connection, "WHERE owner = ? AND kind = ? ORDER BY version LIMIT ? OFFSET ?",
+                                    (owner, kind, limit, offset))
+
+    def ids(self, kind=HISTORY_KIND, owner=''):
+        with self._connect() as connection:
+            return [row[0] for row in connection.execute("SELECT id FROM pathways WHERE owner = ? AND kind = ? ORDER BY version",
+                                                         (owner, kind))]
+
+    def contains(self, pathway_data, kind=HISTORY_KIND, owner=''):
+        content_hash = hashlib.sha1(dumps(pathway_data).encode('utf-8')).hexdigest()
+        with self._connect() as connection:
+            return connection.execute("SELECT 1 FROM pathways WHERE owner = ? AND kind = ? AND content_hash = ? LIMIT 1",
+                                      (owner, kind, content_hash)).fetchone() is not None
+
+    def latest(self, kind, owner=''):
+        """Most recent pathway data saved under kind, or None"""
+        with self._connect() as connection:
+            row = connection.execute("SELECT id FROM pathways WHERE owner = ? AND kind = ? ORDER BY version DESC LIMIT 1",
+                                     (owner, kind)).fetchone()
+        return self.load(row[0]) if row else None
+
+    def delete(self, record_id):
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM pathways WHERE id = ?", (record_id,))
+            self._loaded.pop(record_id, None)
+
+    def append_patches(self, stream, entries):
+        """Append patch log entries to a stream (e.g. one per edited pathway)"""
+        if not entries:
+            return 0
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            connection.executemany("INSERT INTO patches (stream, created_at, entry) VALUES (?, ?, ?)",
+                                   [(stream, now, dumps(entry)) for entry in entries])
+        return len(entries)
+
+    def load_patches(self, stream):
+        """All patch entries of a stream in the order they were applied"""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT entry FROM patches WHERE stream = ? ORDER BY id", (stream,)).fetchall()
+        return [loads(row[0]) for row in rows]
+
+    def start_stream(self, stream, base, owner=''):
+        """Store the structure a patch stream starts from (once per stream)"""
+        return self.save(base, kind=f'{STREAM_BASE_KIND}:{stream}', owner=owner)
+
+    def restore_stream(self, stream, owner=''):
+        """
+        Rebuild a stream's current structure by replaying its patches over its base
+
+        Returns:
+            dict: The structure, or None when no base was stored for the stream
+        """
+        base = self.latest(f'{STREAM_BASE_KIND}:{stream}', owner)
+        if base is None:
+            return None
+        return replay(base, self.load_patches(stream))
+
+
+class PastPathways:
+    """
+    List-like view of the stored history, kept in session state in place of
+    the full list of past pathways. Items are loaded on demand.
+    """
+
+    def __init__(self, store, kind=HISTORY_KIND, owner=''):
+        self.store = store
+        self.kind = kind
+        self.owner = owner
+        self._ids = store.ids(kind, owner)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __bool__(self):
+        return bool(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.load(record_id) for record_id in self._ids[index]]
+        return self.store.load(self._ids[index])
+
+    def __iter__(self):
+        for record_id in list(self._ids):
+            yield self.store.load(record_id)
+
+    def __contains__(self, pathway_data):
+        return self.store.contains(pathway_data, self.kind, self.owner)
+
+    def append(self, pathway_data):
+        meta = self.store.save(pathway_data, self.kind, owner=self.owner)
+        if meta['id'] not in self._ids:
+            self._ids.append(meta['id'])
+
+    def page(self, page_number=1, page_size=DEFAULT_PAGE_SIZE):
+        """Metadata for one page of history (1-based)"""
+        return self.store.list(self.kind, (page_number - 1) * page_size, page_size, self.owner)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_pathway_store():
+    """Process-wide store at DEFAULT_STORE_PATH"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PathwayStore()
+        return _default_store
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Staged content pipeline with incremental recomputation
+Every stage declares the training-context fields and settings it reads. Its
+artifacts are stored under (stage, version, content hash, hash of the
+declared inputs), so changing the goals or the audience re-runs only the
+stages that read them: text extraction, transcript cleaning and the
+goal-independent chunk summaries are reused when the same corpus is
+re-targeted.
+"""
+
+import io
+import os
+import json
+import hashlib
+import tempfile
+import mimetypes
+import threading
+import contextlib
+import contextvars
+from typing import NamedTuple, Callable
+
+from modules.transcript_cleaner import clean_transcript
+from modules.telemetry import span
+
+MAX_ARTIFACTS = 512
+# Per-run counts of the caller's tally() block; thread pools see it through telemetry.bind_context
+_run_counts = contextvars.ContextVar('pipeline_run_counts', default=None)
+# Fields of the training context collected in discovery step 1
+CONTEXT_FIELDS = (
+    'primary_goals', 'training_type', 'target_audience', 'audience_size', 'audience_level',
+    'success_metrics', 'timeline', 'urgency_level', 'industry', 'company_size',
+)
+SETTING_FIELDS = ('bypass_filtering', 'preserve_original_content')
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class Stage(NamedTuple):
+    """A pipeline step: func(content, inputs) -> artifact"""
+    name: str
+    func: Callable
+    inputs: tuple = ()      # Context fields and settings the stage reads
+    version: int = 1        # Bump to invalidate artifacts after a logic change
+    cached: bool = True     # False for stages whose output should be fresh on every run
+
+
+class Uncached(NamedTuple):
+    """Stage result to return without storing, e.g. one built from a failed model call"""
+    value: object
+
+
+def content_key(content):
+    """Stable hash of a stage's content: bytes, text, or a dict of either"""
+    digest = hashlib.sha256()
+    if isinstance(content, dict):
+        for name in sorted(content):
+            digest.update(content_key(name).encode())
+            digest.update(content_key(content[name]).encode())
+    elif isinstance(content, (bytes, bytearray, memoryview)):
+        digest.update(b'b\x00')
+        digest.update(content)
+    else:
+        digest.update(b's\x00')
+        digest.update(str(content).encode('utf-8', errors='ignore'))
+    return digest.hexdigest()
+
+
+def inputs_key(inputs):
+    """Stable hash of the declared input values"""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Pipeline:
+    """
+    Named stages sharing one bounded artifact store
+    """
+
+    def __init__(self, stages=(), max_artifacts=MAX_ARTIFACTS):
+        self.stages = {}
+        self.max_artifacts = max_artifacts
+        self._artifacts = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        for stage in stages:
+            self.register(stage)
+
+    def register(self, stage):
+        """Add or replace a stage; replacing keeps artifacts of the same version"""
+        with self._lock:
+            self.stages[stage.name] = stage
+            self._stats.setdefault(stage.name, {'computed': 0, 'reused': 0})
+
+    def stage_inputs(self, name, context=None):
+        """The subset of context a stage declares, with missing fields as None"""
+        context = context or {}
+        return {field: context.get(field) for field in self.stages[name].inputs}
+
+    def artifact_key(self, name, content, context=None):
+        stage = self.stages[name]
+        return (stage.name, stage.version, content_key(content), inputs_key(self.stage_inputs(name, context)))
+
+    def run(self, name, content, context=None):
+        """
+        Run one stage, reusing its artifact when the content and declared inputs are unchanged
+
+        Args:
+            name (str): Stage name
+            content: The stage's content (file bytes, text, or a dict of texts)
+            context (dict): Training context and settings; only the declared fields are read
+
+        Returns:
+            The stage artifact
+        """
+        stage = self.stages[name]
+        inputs = self.stage_inputs(name, context)
+        key = self.artifact_key(name, content, context) if stage.cached else None
+        if key is not None:
+            with self._lock:
+                if key in self._artifacts:
+                    self._count(name, 'reused')
+                    return self._artifacts[key]
+
+        with span(f'stage.{name}', stage=name, version=stage.version):
+            artifact = stage.func(content, inputs)
+        if isinstance(artifact, Uncached):
+            artifact, key = artifact.value, None
+
+        with self._lock:
+            self._count(name, 'computed')
+            if key is not None:
+                if len(self._artifacts) >= self.max_artifacts:
+                    # Drop the oldest artifact (dicts keep insertion order)
+                    self._artifacts.pop(next(iter(self._artifacts)))
+                self._artifacts[key] = artifact
+        return artifact
+
+    def _count(self, name, outcome):
+        # Called with the lock held
+        self._stats[name][outcome] += 1
+        counts = _run_counts.get()
+        if counts is not None:
+            counts.setdefault(name, {'computed': 0, 'reused': 0})[outcome] += 1
+
+    @contextlib.contextmanager
+    def tally(self):
+        """
+        Count the stage runs made inside the block, by this caller only
+
+        stats() is shared by every session in the process; the dict yielded
+        here holds per-stage computed/reused counts of this run alone.
+        """
+        counts = {}
+        token = _run_counts.set(counts)
+        try:
+            yield counts
+        finally:
+            _run_counts.reset(token)
+
+    def discard(self, name, content, context=None):
+        """Forget one artifact, e.g. an extraction that failed transiently"""
+        key = self.artifact_key(name, content, context)
+        with self._lock:
+            return self._artifacts.pop(key, None) is not None
+
+    def invalidated_by(self, changed_fields):
+        """Names of the stages that re-run when the given fields change"""
+        changed = set(changed_fields)
+        return [name for name, stage in self.stages.items() if changed & set(stage.inputs)]
+
+    def stats(self):
+        """Per-stage counts of computed and reused artifacts across all callers"""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            for counts in self._stats.values():
+                counts['computed'] = counts['reused'] = 0
+
+    def clear(self):
+        """Drop every artifact and reset the stats"""
+        with self._lock:
+            self._artifacts.clear()
+        self.reset_stats()
+
+
+def changed_fields(previous_context, context, fields=CONTEXT_FIELDS + SETTING_FIELDS):
+    """Fields whose values differ between two contexts"""
+    previous_context = previous_context or {}
+    context = context or {}
+    return [field for field in fields if previous_context.get(field) != context.get(field)]
+
+
+def _transcribe(audio_path):
+    from modules.config import model
+    if not model:
+        return "[AI model not available for transcription]"
+    with open(audio_path, 'rb') as audio_file:
+        response = model.generate_content([
+            "Generate a transcript of the speech.",
+            {"mime_type": "audio/wav", "data": audio_file.read()}
+        ])
+    return response.text
+
+
+def extract_file_text(data, file_name, file_type):
+    """
+    Text of an uploaded file: PDF and DOCX text, plain text, or a transcript of audio and video
+
+    Args:
+        data (bytes): File content
+        file_name (str): File name, used for the temp file suffix and MIME guess
+        file_type (str): Uploaded MIME type
+
+    Returns:
+        str: Extracted text, or a bracketed error message
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    file_type = file_type or ''
+    mime_type, _ = mimetypes.guess_type(file_name)
+    suffix = os.path.splitext(file_name)[-1]
+
+    if file_type == "application/pdf":
+        try:
+            import PyPDF2  # Loaded only once a PDF is uploaded
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+            return ''.join(page.extract_text() or "" for page in pdf_reader.pages)
+        except Exception as e:
+            return f"[Error extracting PDF: {e}]"
+    if file_type == DOCX_TYPE:
+        try:
+            from docx import Document  # Loaded only once a DOCX is uploaded
+            return ''.join(paragraph.text + "\n" for paragraph in Document(io.BytesIO(data)).paragraphs)
+        except Exception as e:
+            return f"[Error extracting DOCX: {e}]"
+    if file_type == "text/plain":
+        try:
+            return data.decode(errors="ignore")
+        except Exception as e:
+            return f"[Error extracting TXT: {e}]"
+    if file_type.startswith("audio/"):
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_audio:
+                tmp_audio.write(data)
+                tmp_audio_path = tmp_audio.name
+            try:
+                return _transcribe(tmp_audio_path)
+            finally:
+                os.unlink(tmp_audio_path)
+        except Exception as e:
+            return f"[Error transcribing audio: {e}]"
+    if file_type.startswith("video/") or (mime_type and mime_type.startswith("video/")):
+        try:
+            import ffmpeg
+        except ImportError:
+            return "[ffmpeg-python not installed. Cannot extract audio from video.]"
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_video:
+                tmp_video.write(data)
+                tmp_video_path = tmp_video.name
+            tmp_audio_path = tmp_video_path + ".audio.wav"
+            try:
+                (
+                    ffmpeg
+                    .input(tmp_video_path)
+                    .output(tmp_audio_path, format='wav', acodec='pcm_s16le', ac=1, ar='16k')
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
+                return _transcribe(tmp_audio_path)
+            finally:
+                for path in (tmp_video_path, tmp_audio_path):
+                    if os.path.exists(path):
+                        os.unlink(path)
+        except Exception as e:
+            return f"[Error extracting/transcribing video: {e}]"
+    return "[Unsupported file type for extraction]"
+
+
+def _extract_stage(data, inputs):
+    text = extract_file_text(data, inputs['file_name'] or '', inputs['file_type'])
+    # Bracketed messages are failures; they are retried on the next run
+    return Uncached(text) if text.startswith('[') else text
+
+
+def _clean_stage(content, inputs):
+    return clean_transcript(content, keep_speakers=bool(inputs['keep_speakers'])) or content
+
+
+def _digest_stage(content, inputs):
+    from modules.summarizer import HierarchicalSummarizer
+    summarizer = HierarchicalSummarizer(digest_tokens=inputs['digest_tokens'])
+    digest = summarizer.summarize(content, inputs)
+    # A digest built from extractive fallbacks is redone once the model answers
+    return Uncached(digest) if summarizer.stats['fallbacks'] else digest
+
+
+def _generate_stage(extracted_content, inputs):
+    from modules.fast_ai_agents import OptimizedPathwayOrchestrator
+    return OptimizedPathwayOrchestrator().generate_optimized_pathways(
+        extracted_content, inputs, inputs.get('file_inventory') or {}
+    )
+
+
+# Stages of pathway generation, in order. Extraction reads the file type
+# because the bytes alone do not say how to decode them; only digest and
+# generate read the goals, so re-targeting a corpus reuses everything before
+# the digest, and the digest itself reuses the goal-independent chunk
+# summaries cached by the summarizer.
+PATHWAY_STAGES = (
+    Stage('extract_text', _extract_stage, inputs=('file_name', 'file_type')),
+    Stage('clean', _clean_stage, inputs=('keep_speakers',)),
+    Stage('digest', _digest_stage, inputs=('primary_goals', 'training_type', 'target_audience', 'digest_tokens')),
+    # Regenerating with unchanged inputs is an explicit request for new pathways
+    Stage('generate', _generate_stage, inputs=CONTEXT_FIELDS + SETTING_FIELDS + ('file_inventory',), cached=False),
+)
+
+_pipeline = Pipeline(PATHWAY_STAGES)
+
+
+def get_pipeline():
+    """The pathway pipeline shared across reruns and sessions"""
+    return _pipeline
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Token-budget-aware prompt assembly shared by all agents
+Counts tokens, fits source excerpts into the space left by the instructions,
+picks the most relevant excerpts first and records token usage per LLM call
+"""
+
+import re
+import sys
+import time
+import threading
+import collections
+from modules.telemetry import span
+
+# Total prompt budgets (tokens) per prompt family; output tokens are reserved separately
+PROMPT_BUDGETS = {
+    'pathway': 12000,
+    'planner': 4000,
+    'section': 3000,
+    'module': 2500,
+    'content_type': 1500,
+    'analysis': 2000,
+    'default': 3000,
+}
+DEFAULT_RESERVED_OUTPUT_TOKENS = 0
+
+# Approximates sub-word tokenization: words are split into pieces of up to four
+# characters and every punctuation mark counts as its own token
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]{1,4}|\d{1,3}|[^\sA-Za-z\d]")
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9'-]+")
+_SLOT_PATTERN = re.compile(r"\x00SLOT:(\w+)\x00")
+
+_STOPWORDS = frozenset(
+    "about above after again also among been before being between both could does doing during each from "
+    "have having here into itself just more most only other over same should some such than that their them "
+    "then there these they this those through under until very were what when where which while will with "
+    "would your training general employees".split()
+)
+
+# Bounded log of token usage for recent LLM calls
+TOKEN_USAGE_LOG = collections.deque(maxlen=500)
+_usage_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Fast local token estimate that tracks sub-word tokenizers closely"""
+    if not text:
+        return 0
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def count_tokens(text, model=None):
+    """
+    Count tokens with the model's tokenizer when available, otherwise estimate locally
+    """
+    if model is not None and hasattr(model, 'count_tokens'):
+        try:
+            return int(model.count_tokens(text).total_tokens)
+        except Exception:
+            pass
+    return estimate_tokens(text)
+
+
+def query_terms(query):
+    """
+    Keywords for relevance scoring from a query string or a training context dict
+    """
+    if isinstance(query, dict):
+        query = ' '.join(str(query.get(field, '')) for field in ('primary_goals', 'training_type', 'target_audience', 'industry'))
+    words = _WORD_PATTERN.findall((query or '').lower())
+    return {word for word in words if len(word) > 3 and word not in _STOPWORDS}
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text at a word boundary so it fits max_tokens"""
+    if max_tokens <= 0 or not text:
+        return ''
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    position = 0
+    for count, match in enumerate(_TOKEN_PATTERN.finditer(text), 1):
+        if count > max_tokens:
+            break
+        position = match.end()
+    cut = text.rfind(' ', 0, position)
+    return text[:cut if cut > 0 else position].rstrip()
+
+
+def select_excerpts(content, max_tokens, query=None, excerpt_tokens=200):
+    """
+    Pick the highest-value excerpts of content that fit max_tokens
+
+    Args:
+        content (str): Source text
+        max_tokens (int): Token budget for the excerpts
+        query (str|dict): Query text or training context used to rank excerpts
+        excerpt_tokens (int): Approximate size of each candidate excerpt
+
+    Returns:
+        str: Selected excerpts in document order, separated by ' ... '
+    """
+    if not content or max_tokens <= 0:
+        return ''
+    if estimate_tokens(content) <= max_tokens:
+        return content
+
+    from modules.chunker import chunk_texts
+    candidates = chunk_texts(content, excerpt_tokens)
+    terms = query_terms(query)
+
+    scored = []
+    for position, excerpt in enumerate(candidates):
+        words = _WORD_PATTERN.findall(excerpt.lower())
+        if not words:
+            continue
+        hits = sum(1 for word in words if word in terms)
+        distinct = len(set(words)) / len(words)
+        # Relevance to the query first, then information density, then position
+        score = hits / len(words) * 10 + distinct - position / (len(candidates) * 4)
+        scored.append((score, position, excerpt))
+
+    chosen = []
+    used = 0
+    separator_tokens = estimate_tokens(' ... ')
+    for score, position, excerpt in sorted(scored, key=lambda item: (-item[0], item[1])):
+        tokens = estimate_tokens(excerpt) + separator_tokens
+        if used + tokens > max_tokens:
+            continue
+        chosen.append((position, excerpt))
+        used += tokens
+
+    if not chosen:
+        return truncate_to_tokens(content, max_tokens)
+    return ' ... '.join(excerpt for _, excerpt in sorted(chosen))
+
+
+def fit_excerpts(content, max_tokens, query=None):
+    """Shorthand for select_excerpts used inside prompt f-strings"""
+    return select_excerpts(content or '', max_tokens, query)
+
+
+class PromptBuilder:
+    """
+    Assemble a prompt from an instruction template and budgeted excerpt slots
+
+    Usage:
+        builder = PromptBuilder('section', training_context=context)
+        source = builder.slot('source', content_chunk, fallback='No specific content provided')
+        prompt = builder.render(f"...SOURCE CONTENT:\\n{source}\\n...")
+
+    The template is measured without its slots; whatever remains of the budget
+    is shared between slots by weight, and unused share is handed to the others.
+    """
+
+    def __init__(self, label='default', max_tokens=None, reserved_output_tokens=DEFAULT_RESERVED_OUTPUT_TOKENS,
+                 training_context=None, query=None, model=None):
+        self.label = label
+        self.max_tokens = max_tokens or PROMPT_BUDGETS.get(label, PROMPT_BUDGETS['default'])
+        self.reserved_output_tokens = reserved_output_tokens
+        self.query = query if query is not None else training_context
+        self.model = model
+        self._slots = collections.OrderedDict()
+        self.usage = {}
+
+    def slot(self, name, content, weight=1.0, min_tokens=0, fallback=''):
+        """
+        Register an excerpt slot and return the marker to place in the template
+        """
+        self._slots[name] = {
+            'content': content or '',
+            'weight': max(weight, 0.0),
+            'min_tokens': min_tokens,
+            'fallback': fallback,
+        }
+        return f"\x00SLOT:{name}\x00"
+
+    def _allocate(self, available):
+        demands = {name: estimate_tokens(slot['content']) for name, slot in self._slots.items()}
+        allocation = {name: 0 for name in self._slots}
+        remaining = max(available, 0)
+        pending = [name for name in self._slots if demands[name] > 0]
+
+        # Water-filling: share the budget by weight, give back what small slots do not need
+        while pending and remaining > 0:
+            total_weight = sum(self._slots[name]['weight'] for name in pending) or len(pending)
+            satisfied = []
+            spent = 0
+            for name in pending:
+                share = int(remaining * (self._slots[name]['weight'] or 1) / total_weight)
+                share = max(share, self._slots[name]['min_tokens'])
+                need = demands[name] - allocation[name]
+                if need <= share:
+                    allocation[name] += need
+                    spent += need
+                    satisfied.append(name)
+            if not satisfied:
+                for name in pending:
+                    share = int(remaining * (self._slots[name]['weight'] or 1) / total_weight)
+                    allocation[name] += max(share, self._slots[name]['min_tokens'])
+                break
+            remaining -= spent
+            pending = [name for name in pending if name not in satisfied]
+        return allocation
+
+    def render(self, template):
+        """
+        Fill the slots in template within the budget and return the prompt
+        """
+        instructions = _SLOT_PATTERN.sub('', template)
+        instruction_tokens = count_tokens(instructions, self.model)
+        available = self.max_tokens - self.reserved_output_tokens - instruction_tokens
+        allocation = self._allocate(available)
+
+        filled = {}
+        for name, slot in self._slots.items():
+            text = select_excerpts(slot['content'], allocation[name], self.query)
+            filled[name] = text if text else slot['fallback']
+
+        prompt = _SLOT_PATTERN.sub(lambda match: filled.get(match.group(1), ''), template)
+        self.usage = {
+            'label': self.label,
+            'budget': self.max_tokens,
+            'instructions': instruction_tokens,
+            'slots': {name: estimate_tokens(text) for name, text in filled.items()},
+            'prompt_tokens': estimate_tokens(prompt),
+        }
+        return prompt
+
+
+def record_token_usage(label, prompt_tokens, response_tokens, latency_seconds, exact=False):
+    """Append one LLM call to the bounded usage log"""
+    entry = {
+        'label': label,
+        'prompt_tokens': prompt_tokens,
+        'response_tokens': response_tokens,
+        'latency_seconds': round(latency_seconds, 3),
+        'exact': exact,
+        'timestamp': time.time(),
+    }
+    with _usage_lock:
+        TOKEN_USAGE_LOG.append(entry)
+    return entry
+
+
+def tracked_generate(model, prompt, label=None, **kwargs):
+    """
+    Call model.generate_content and record prompt/response token usage
+
+    The label defaults to the calling function's name. Exact counts from the
+    response's usage metadata are used when the SDK provides them.
+    """
+    if label is None:
+        label = sys._getframe(1).f_code.co_name
+    with span('llm.generate', label=label, cache_hit=False, retry_count=0) as current:
+        started = time.time()
+        response = model.generate_content(prompt, **kwargs)
+        latency = time.time() - started
+
+        metadata = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(metadata, 'prompt_token_count', None) if metadata else None
+        response_tokens = getattr(metadata, 'candidates_token_count', None) if metadata else None
+        exact = prompt_tokens is not None
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        if response_tokens is None:
+            try:
+                response_tokens = estimate_tokens(response.text)
+            except Exception:
+                response_tokens = 0
+
+        current.set(prompt_tokens=prompt_tokens, response_tokens=response_tokens, exact_tokens=exact)
+        record_token_usage(label, prompt_tokens, response_tokens, latency, exact=exact)
+        return response
+
+
+def get_token_usage_summary():
+    """
+    Aggregate recorded token usage per label
+
+    Returns:
+        dict: label -> calls, prompt_tokens, response_tokens, avg_latency_seconds
+    """
+    with _usage_lock:
+        entries = list(TOKEN_USAGE_LOG)
+    summary = {}
+    for entry in entries:
+        stats = summary.setdefault(entry['label'], {'calls': 0, 'prompt_tokens': 0, 'response_tokens': 0, 'total_latency': 0.0})
+        stats['calls'] += 1
+        stats['prompt_tokens'] += entry['prompt_tokens']
+        stats['response_tokens'] += entry['response_tokens']
+        stats['total_latency'] += entry['latency_seconds']
+    for stats in summary.values():
+        stats['avg_latency_seconds'] = round(stats.pop('total_latency') / stats['calls'], 3)
+    return summary
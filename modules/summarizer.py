@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Hierarchical map-reduce summarization for large source documents
+The full document is chunked, chunks are summarized in parallel (map) and the
+summaries are combined level by level (reduce) into a goal-aligned digest that
+fits a token budget. Model summaries at every level are cached by content hash.
+"""
+
+import re
+import hashlib
+import threading
+import concurrent.futures
+from modules.prompt_builder import estimate_tokens, truncate_to_tokens, tracked_generate
+from modules.chunker import chunk_texts, split_sentences
+from modules.telemetry import traced, annotate, bind_context
+
+# Summary cache shared by all summarizer instances, keyed by content hash
+_SUMMARY_CACHE = {}
+_SUMMARY_CACHE_MAX_ENTRIES = 2048
+_summary_cache_lock = threading.Lock()
+
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9'-]+")
+
+
+def content_hash(*parts):
+    """Stable hash of the given text parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8', errors='ignore'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def _cache_get(key):
+    with _summary_cache_lock:
+        return _SUMMARY_CACHE.get(key)
+
+
+def _cache_put(key, value):
+    with _summary_cache_lock:
+        if len(_SUMMARY_CACHE) >= _SUMMARY_CACHE_MAX_ENTRIES:
+            # Drop the oldest entry (dicts keep insertion order)
+            _SUMMARY_CACHE.pop(next(iter(_SUMMARY_CACHE)))
+        _SUMMARY_CACHE[key] = value
+
+
+def clear_summary_cache():
+    """Clear the shared summary cache"""
+    with _summary_cache_lock:
+        _SUMMARY_CACHE.clear()
+
+
+def goal_keywords(training_context):
+    """Lower-case keywords from the training goals and audience"""
+    if not training_context:
+        return set()
+    text = ' '.join(str(training_context.get(field, '')) for field in ('primary_goals', 'training_type', 'target_audience'))
+    return {word for word in _WORD_PATTERN.findall(text.lower()) if len(word) > 3}
+
+
+def extractive_summary(text, target_tokens, keywords=None):
+    """
+    Deterministic, LLM-free summary: keep the highest scoring sentences in
+    their original order until the token target is reached
+    """
+    if estimate_tokens(text) <= target_tokens:
+        return text.strip()
+
+    sentences = split_sentences(text)
+    keywords = keywords or set()
+    scored = []
+    for position, sentence in enumerate(sentences):
+        words = _WORD_PATTERN.findall(sentence.lower())
+        if not words:
+            continue
+        keyword_hits = sum(1 for word in words if word in keywords)
+        # Favour goal keywords, informative length and earlier sentences
+        score = keyword_hits * 2 + min(len(words), 30) / 10 - position / (len(sentences) * 2)
+        scored.append((score, position, sentence))
+
+    chosen = []
+    used = 0
+    for score, position, sentence in sorted(scored, key=lambda item: (-item[0], item[1])):
+        tokens = estimate_tokens(sentence)
+        if used + tokens > target_tokens:
+            continue
+        chosen.append((position, sentence))
+        used += tokens
+    if not chosen and sentences:
+        return truncate_to_tokens(sentences[0], target_tokens)
+    return ' '.join(sentence for _, sentence in sorted(chosen))
+
+
+class HierarchicalSummarizer:
+    """
+    Map-reduce summarizer that covers a whole document within a token budget
+    """
+
+    def __init__(self, model=None, chunk_tokens=1500, digest_tokens=1500, fan_in=6, max_workers=4, max_levels=4, overlap_tokens=50):
+        if model is None:
+            from modules.config import model as configured_model
+            model = configured_model
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.digest_tokens = digest_tokens
+        self.fan_in = fan_in
+        self.max_workers = max_workers
+        self.max_levels = max_levels
+        self.overlap_tokens = overlap_tokens
+        self.stats = {'llm_calls': 0, 'cache_hits': 0, 'fallbacks': 0, 'levels': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def summarize(self, content, training_context=None, digest_tokens=None):
+        """
+        Produce a goal-aligned digest of content within digest_tokens
+
+        Args:
+            content (str): Full document text
+            training_context (dict): Training goals used to steer the reduce steps
+            digest_tokens (int): Token budget for the digest (defaults to the instance budget)
+
+        Returns:
+            str: The digest; content is returned unchanged when it already fits
+        """
+        budget = digest_tokens or self.digest_tokens
+        if not content or estimate_tokens(content) <= budget:
+            return content
+
+        training_context = training_context or {}
+        chunks = chunk_texts(content, self.chunk_tokens, self.overlap_tokens)
+
+        # Map: summaries of individual chunks do not depend on goals, so they are
+        # reusable when the same document is re-targeted
+        per_chunk_tokens = max(60, min(self.chunk_tokens // 3, (budget * self.fan_in) // max(1, len(chunks))))
+        summaries = self._summarize_all(chunks, level=0, target_tokens=per_chunk_tokens, training_context=None)
+        self.stats['levels'] = 1
+
+        # Reduce: combine groups of summaries until everything fits the budget
+        level = 1
+        while len(summaries) > 1 and estimate_tokens('\n\n'.join(summaries)) > budget and level < self.max_levels:
+            groups = ['\n\n'.join(summaries[i:i + self.fan_in]) for i in range(0, len(summaries), self.fan_in)]
+            group_tokens = max(60, budget // max(1, len(groups)))
+            summaries = self._summarize_all(groups, level=level, target_tokens=group_tokens, training_context=training_context)
+            level += 1
+        self.stats['levels'] = level
+
+        combined = '\n\n'.join(summaries)
+        if estimate_tokens(combined) > budget:
+            combined = self._summarize_piece(combined, level=level, target_tokens=budget, training_context=training_context)
+        if estimate_tokens(combined) > budget:
+            # The model ignored the length instruction; enforce the budget locally
+            combined = extractive_summary(combined, budget, goal_keywords(training_context))
+        return combined
+
+    def _summarize_all(self, pieces, level, target_tokens, training_context):
+        if len(pieces) == 1 or self.max_workers <= 1:
+            return [self._summarize_piece(piece, level, target_tokens, training_context) for piece in pieces]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(
+                bind_context(lambda piece: self._summarize_piece(piece, level, target_tokens, training_context)),
+                pieces
+            ))
+
+    @traced('summarize.piece')
+    def _summarize_piece(self, text, level, target_tokens, training_context):
+        goals = ''
+        if training_context:
+            goals = f"{training_context.get('primary_goals', '')}|{training_context.get('target_audience', '')}"
+        key = content_hash('summary', level, target_tokens, goals, text)
+
+        cached = _cache_get(key)
+        if cached is not None:
+            self._count('cache_hits')
+            annotate(level=level, cache_hit=True)
+            return cached
+
+        summary = None
+        if self.model:
+            try:
+                self._count('llm_calls')
+                response = tracked_generate(self.model, self._build_summary_prompt(text, target_tokens, training_context), label='summarize')
+                if response and response.text and response.text.strip():
+                    summary = response.text.strip()
+            except Exception:
+                summary = None
+
+        annotate(level=level, cache_hit=False, fallback_used=summary is None)
+        if summary is None:
+            # Not cached: the model may answer on the next run
+            self._count('fallbacks')
+            return extractive_summary(text, target_tokens, goal_keywords(training_context))
+
+        _cache_put(key, summary)
+        return summary
+
+    def _build_summary_prompt(self, text, target_tokens, training_context):
+        target_words = max(40, int(target_tokens * 0.75))
+        focus = ''
+        if training_context:
+            focus = f"""
+Prioritise information that supports these training goals: {training_context.get('primary_goals', 'General training')}
+Target audience: {training_context.get('target_audience', 'Employees')}
+"""
+        return f"""Summarize the following source material for use in training content creation.
+Keep specific procedures, steps, requirements, numbers, names of equipment and systems, and definitions.
+Drop greetings, small talk and meeting logistics.{focus}
+Write at most {target_words} words of plain text. Do not add information that is not in the source.
+
+SOURCE:
+{text}"""
+
+
+def summarize_large_document(content, training_context=None, digest_tokens=1500, model=None):
+    """
+    Convenience wrapper returning a goal-aligned digest of content within digest_tokens
+    """
+    summarizer = HierarchicalSummarizer(model=model, digest_tokens=digest_tokens)
+    return summarizer.summarize(content, training_context)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing for pathway generation
+Spans record where time goes (extraction, preprocessing, each LLM call,
+parsing, validation, rendering) with parent/child links that follow the
+current context, including into worker threads started through
+bind_context(). Finished spans are kept in a bounded buffer and can be
+exported as JSONL or as OTLP/JSON for OpenTelemetry tooling.
+"""
+
+import os
+import json
+import time
+import functools
+import threading
+import contextlib
+import contextvars
+import collections
+
+MAX_FINISHED_SPANS = 5000
+SERVICE_NAME = 'gateway-content-automation'
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+_finished = collections.deque(maxlen=MAX_FINISHED_SPANS)
+_finished_lock = threading.Lock()
+
+
+def _new_id(size):
+    return os.urandom(size).hex()
+
+
+class Span:
+    """One timed operation; use span() rather than creating these directly"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'end', 'attributes', 'status', 'thread')
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration(self):
+        return ((self.end or time.time()) - self.start)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'end': self.end,
+            'duration_ms': round(self.duration * 1000, 3),
+            'status': self.status,
+            'thread': self.thread,
+            'attributes': self.attributes,
+        }
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Time a block as a child of the current span
+
+    Example:
+        with span('llm.generate', label='summarize') as current:
+            ...
+            current.set(prompt_tokens=812)
+    """
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.status = 'error'
+        current.attributes.setdefault('error', f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current.end = time.time()
+        _current_span.reset(token)
+        with _finished_lock:
+            _finished.append(current)
+
+
+def traced(name=None, **attributes):
+    """Decorator form of span(); the name defaults to the function name"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**attributes):
+    """Add attributes to the current span (no-op outside a span)"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def bind_context(func):
+    """
+    Wrap func so it runs in a copy of the caller's context; use when handing
+    work to a thread pool so spans created there nest under the caller's span
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def finished_spans(trace_id=None):
+    with _finished_lock:
+        spans = list(_finished)
+    if trace_id:
+        spans = [s for s in spans if s.trace_id == trace_id]
+    return spans
+
+
+def clear_spans():
+    with _finished_lock:
+        _finished.clear()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_spans(spans=None):
+    """
+    Per-name timing summary
+
+    Returns:
+        list: dicts with name, count, errors, total_ms, p50_ms, p95_ms, max_ms
+              (plus summed token counts for LLM spans), slowest total first
+    """
+    groups = collections.defaultdict(list)
+    for item in finished_spans() if spans is None else spans:
+        groups[item.name].append(item)
+    summary = []
+    for name, items in groups.items():
+        durations = sorted(item.duration * 1000 for item in items)
+        row = {
+            'name': name,
+            'count': len(items),
+            'errors': sum(1 for item in items if item.status == 'error'),
+            'total_ms': round(sum(durations), 1),
+            'p50_ms': round(_percentile(durations, 0.5), 1),
+            'p95_ms': round(_percentile(durations, 0.95), 1),
+            'max_ms': round(durations[-1], 1),
+        }
+        for key in ('prompt_tokens', 'response_tokens'):
+            values = [item.attributes[key] for item in items if isinstance(item.attributes.get(key), (int, float))]
+            if values:
+                row[key] = sum(values)
+        cache_hits = sum(1 for item in items if item.attributes.get('cache_hit'))
+        if cache_hits:
+            row['cache_hits'] = cache_hits
+        summary.append(row)
+    summary.sort(key=lambda row: -row['total_ms'])
+    return summary
+
+
+def to_jsonl(spans=None):
+    """Spans as JSON Lines text, one object per span"""
+    spans = finished_spans() if spans is None else spans
+    return ''.join(json.dumps(item.to_dict(), default=str) + '\n' for item in spans)
+
+
+def export_jsonl(path, spans=None):
+    """Write one JSON object per span; returns the number written"""
+    spans = finished_spans() if spans is None else spans
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(to_jsonl(spans))
+    return len(spans)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(spans=None):
+    """Spans as an OTLP/JSON ExportTraceServiceRequest dict"""
+    spans = finished_spans() if spans is None else spans
+    otlp_spans = []
+    for item in spans:
+        entry = {
+            'traceId': item.trace_id,
+            'spanId': item.span_id,
+            'name': item.name,
+            'kind': 1,
+            'startTimeUnixNano': str(int(item.start * 1e9)),
+            'endTimeUnixNano': str(int((item.end or item.start) * 1e9)),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in item.attributes.items()],
+            'status': {'code': 2 if item.status == 'error' else 1},
+        }
+        if item.parent_id:
+            entry['parentSpanId'] = item.parent_id
+        otlp_spans.append(entry)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{'scope': {'name': 'modules.telemetry'}, 'spans': otlp_spans}],
+        }]
+    }
+
+
+def export_otlp_json(path, spans=None):
+    """Write spans as OTLP/JSON (loadable by OpenTelemetry collectors); returns the number written"""
+    payload = to_otlp(spans)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(payload, handle)
+    return len(payload['resourceSpans'][0]['scopeSpans'][0]['spans'])
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Local topic clustering for section and pathway grouping
+Modules are turned into TF-IDF vectors over words and word bigrams, then
+grouped with a balanced spherical k-means. Section titles come from the terms
+that distinguish each cluster from the others, so no model call is needed;
+an LLM can optionally polish the titles afterwards.
+
+NumPy is used when it is installed; otherwise the same algorithm runs on
+sparse dicts in pure Python.
+"""
+
+import re
+import math
+import json
+import collections
+
+from modules.app_log import get_logger
+
+logger = get_logger('topic_clustering')
+
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+_MODULE_PREFIX_PATTERN = re.compile(r"^\s*module\s+[\d.]+\s*:\s*", re.IGNORECASE)
+
+# Title words count this many times as often as content words
+TITLE_WEIGHT = 3
+# Only the start of long modules is vectorized
+MAX_CONTENT_CHARS = 2000
+# Vocabulary cap (most frequent terms by document frequency)
+MAX_FEATURES = 4096
+KMEANS_ITERATIONS = 12
+# Clusters may grow to this multiple of the even share before overflow moves on
+BALANCE_SLACK = 1.25
+
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being below between both
+but by can could did do does doing down during each either every few for from further had has have having here
+how however if in into is it its itself just may might more most much must no nor not now of off on once only or
+other our out over own per same shall should so some such than that the their them then there these they this
+those through to too under until up upon us use used using very via was we were what when where which while who
+whom why will with within without would you your yours
+module modules training section sections lesson overview introduction content learn learning understand
+understanding employee employees new team teams also like get got make made one two three well really thing things
+going know yeah okay right said says say
+""".split())
+
+_numpy = None
+_numpy_checked = False
+
+
+def _load_numpy():
+    """Import NumPy on first use; None when it is not installed"""
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+        _numpy_checked = True
+    return _numpy
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords and very short words removed"""
+    return [word for word in _WORD_PATTERN.findall((text or '').lower()) if word not in STOPWORDS]
+
+
+def module_terms(module):
+    """
+    Terms for one module: words and adjacent-word bigrams from the title
+    (weighted by TITLE_WEIGHT), description and the start of the content
+    """
+    title = _MODULE_PREFIX_PATTERN.sub('', str(module.get('title', '')))
+    body = f"{module.get('description', '')} {str(module.get('content', ''))[:MAX_CONTENT_CHARS]}"
+    terms = []
+    for text, weight in ((title, TITLE_WEIGHT), (body, 1)):
+        words = tokenize(text)
+        grams = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        terms.extend(grams * weight)
+    return terms
+
+
+def tfidf_vectors(modules, max_features=MAX_FEATURES):
+    """
+    Sublinear TF-IDF vectors, L2-normalized
+
+    Returns:
+        tuple: (list of {term index: weight} dicts, vocabulary list)
+    """
+    counts = [collections.Counter(module_terms(module)) for module in modules]
+    document_frequency = collections.Counter()
+    for counter in counts:
+        document_frequency.update(counter.keys())
+    vocabulary = sorted(document_frequency, key=lambda term: (-document_frequency[term], term))[:max_features]
+    term_index = {term: i for i, term in enumerate(vocabulary)}
+    total = len(modules)
+    idf = {term: math.log((1 + total) / (1 + document_frequency[term])) + 1.0 for term in vocabulary}
+
+    vectors = []
+    for counter in counts:
+        vector = {
+            term_index[term]: (1.0 + math.log(count)) * idf[term]
+            for term, count in counter.items() if term in term_index
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            vector = {index: weight / norm for index, weight in vector.items()}
+        vectors.append(vector)
+    return vectors, vocabulary
+
+
+def suggest_cluster_count(module_count, max_clusters=6, max_cluster_size=None):
+    """About sqrt(n / 2) clusters, raised so no cluster has to exceed max_cluster_size"""
+    if module_count <= 1:
+        return max(module_count, 1)
+    count = max(1, int(round(math.sqrt(module_count / 2.0))))
+    if max_cluster_size:
+        count = max(count, math.ceil(module_count / max_cluster_size))
+    return max(1, min(count, max_clusters, module_count))
+
+
+def _balanced_assign(similarities, cluster_count, capacity):
+    """
+    Give every row the most similar cluster that still has room, visiting the
+    most confident (row, cluster) pairs first
+    """
+    pairs = sorted(
+        ((similarity, row, cluster) for row, row_similarities in enumerate(similarities)
+         for cluster, similarity in enumerate(row_similarities)),
+        key=lambda pair: (-pair[0], pair[1], pair[2])
+    )
+    assignment = [-1] * len(similarities)
+    sizes = [0] * cluster_count
+    remaining = len(similarities)
+    for _, row, cluster in pairs:
+        if assignment[row] == -1 and sizes[cluster] < capacity:
+            assignment[row] = cluster
+            sizes[cluster] += 1
+            remaining -= 1
+            if not remaining:
+                break
+    return assignment
+
+
+def _seed_rows(similarity_to, row_count, cluster_count):
+    """
+    Deterministic farthest-point seeding: start from row 0, then repeatedly
+    take the row least similar to every seed chosen so far
+    """
+    seeds = [0]
+    closest = list(similarity_to(0))
+    while len(seeds) < cluster_count:
+        candidate = min((row for row in range(row_count) if row not in seeds), key=lambda row: (closest[row], row))
+        seeds.append(candidate)
+        closest = [max(old, new) for old, new in zip(closest, similarity_to(candidate))]
+    return seeds
+
+
+def _kmeans_numpy(np, vectors, vocabulary_size, cluster_count, capacity, iterations):
+    matrix = np.zeros((len(vectors), max(vocabulary_size, 1)))
+    for row, vector in enumerate(vectors):
+        for index, weight in vector.items():
+            matrix[row, index] = weight
+    seeds = _seed_rows(lambda row: (matrix @ matrix[row]).tolist(), len(vectors), cluster_count)
+    centroids = matrix[seeds].copy()
+    assignment = None
+    for _ in range(iterations):
+        new_assignment = _balanced_assign((matrix @ centroids.T).tolist(), cluster_count, capacity)
+        if new_assignment == assignment:
+            break
+        assignment = new_assignment
+        labels = np.array(assignment)
+        for cluster in range(cluster_count):
+            members = matrix[labels == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+                norm = np.linalg.norm(centroid)
+                centroids[cluster] = centroid / norm if norm else centroid
+    centroid_dicts = [
+        {int(index): float(weight) for index, weight in enumerate(centroid) if weight}
+        for centroid in centroids
+    ]
+    return assignment, centroid_dicts
+
+
+def _sparse_dot(first, second):
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(index, 0.0) for index, weight in first.items())
+
+
+def _kmeans_python(vectors, cluster_count, capacity, iterations):
+    seeds = _seed_rows(lambda row: [_sparse_dot(vectors[row], other) for other in vectors], len(vectors), cluster_count)
+    centroids = [dict(vectors[row]) for row in seeds]
+    assignment = None
+    for _ in range(iterations):
+        similarities = [[_sparse_dot(vector, centroid) for centroid in centroids] for vector in vectors]
+        new_assignment = _balanced_assign(similarities, cluster_count, capacity)
+        if new_assignment == assignment:
+            break
+        assignment = new_assignment
+        for cluster in range(cluster_count):
+            centroid = collections.defaultdict(float)
+            for row, label in enumerate(assignment):
+                if label == cluster:
+                    for index, weight in vectors[row].items():
+                        centroid[index] += weight
+            norm = math.sqrt(sum(weight * weight for weight in centroid.values()))
+            if norm:
+                centroids[cluster] = {index: weight / norm for index, weight in centroid.items()}
+    return assignment, centroids
+
+
+def _label_for(term):
+    return ' '.join(word.capitalize() for word in term.split())
+
+
+def top_terms(centroids, vocabulary, cluster, count=3):
+    """
+    Terms that weigh most in this cluster's centroid relative to the others,
+    skipping words already covered by a chosen bigram (and vice versa)
+    """
+    centroid = centroids[cluster]
+    others = [other for index, other in enumerate(centroids) if index != cluster]
+    scores = {}
+    for index, weight in centroid.items():
+        background = sum(other.get(index, 0.0) for other in others) / len(others) if others else 0.0
+        scores[index] = weight - 0.5 * background
+    ranked = [index for index in sorted(scores, key=lambda index: (-scores[index], vocabulary[index]))
+              if scores[index] > 0]
+    chosen = []
+    for index in ranked:
+        term = vocabulary[index]
+        if ' ' not in term:
+            # "hydraulic press" reads better than "hydraulic" when it scores nearly as well
+            phrase = next((other for other in ranked
+                           if ' ' in vocabulary[other] and term in vocabulary[other].split()
+                           and scores[other] >= 0.5 * scores[index]), None)
+            if phrase is not None:
+                term = vocabulary[phrase]
+        words = set(term.split())
+        if any(words & set(existing.split()) for existing in chosen):
+            continue
+        chosen.append(term)
+        if len(chosen) == count:
+            break
+    return chosen
+
+
+def cluster_modules(modules, n_clusters=None, max_clusters=6, max_cluster_size=None,
+                    title_terms=2, iterations=KMEANS_ITERATIONS):
+    """
+    Group modules into topical clusters with generated titles
+
+    Args:
+        modules: list of module dicts with 'title' and 'content'
+        n_clusters: exact number of clusters (default: suggest_cluster_count)
+        max_clusters: upper bound when n_clusters is not given
+        max_cluster_size: hard cap on modules per cluster
+        title_terms: number of distinctive terms joined into each title
+
+    Returns:
+        list: [{'section_title': str, 'module_indices': [int, ...], 'terms': [str, ...]}]
+        with 0-based indices, clusters ordered by their first module and modules
+        kept in their original order
+    """
+    if not modules:
+        return []
+    if n_clusters is None:
+        n_clusters = suggest_cluster_count(len(modules), max_clusters, max_cluster_size)
+    cluster_count = max(1, min(int(n_clusters), len(modules)))
+    vectors, vocabulary = tfidf_vectors(modules)
+
+    if cluster_count == 1 or not vocabulary:
+        assignment = [0] * len(modules)
+        centroids = [collections.Counter()]
+        for vector in vectors:
+            centroids[0].update(vector)
+        cluster_count = 1
+    else:
+        capacity = math.ceil(len(modules) / cluster_count * BALANCE_SLACK)
+        if max_cluster_size:
+            capacity = max(min(capacity, max_cluster_size), math.ceil(len(modules) / cluster_count))
+        np = _load_numpy()
+        if np is not None:
+            assignment, centroids = _kmeans_numpy(np, vectors, len(vocabulary), cluster_count, capacity, iterations)
+        else:
+            assignment, centroids = _kmeans_python(vectors, cluster_count, capacity, iterations)
+
+    members = collections.defaultdict(list)
+    for index, cluster in enumerate(assignment):
+        members[cluster].append(index)
+
+    clusters = []
+    used_titles = set()
+    for cluster in sorted(members, key=lambda cluster: members[cluster][0]):
+        terms = top_terms(centroids, vocabulary, cluster, count=max(title_terms, 3))
+        title = ' & '.join(_label_for(term) for term in terms[:title_terms]) or 'General'
+        if title in used_titles:
+            title = f"{title} ({len(clusters) + 1})"
+        used_titles.add(title)
+        clusters.append({'section_title': title, 'module_indices': members[cluster], 'terms': terms})
+    return clusters
+
+
+def theme_labels(modules, count=3):
+    """Most distinctive terms across the modules, as title-cased labels"""
+    if not modules:
+        return []
+    vectors, vocabulary = tfidf_vectors(modules)
+    totals = collections.Counter()
+    for vector in vectors:
+        totals.update(vector)
+    return [_label_for(term) for term in top_terms([totals], vocabulary, 0, count=count)]
+
+
+def polish_section_titles(clusters, modules, model, generate=None):
+    """
+    Ask an LLM for nicer titles for already-formed clusters. Grouping is never
+    changed; any failure keeps the local titles.
+
+    Args:
+        generate: callable(model, prompt) -> response, defaults to model.generate_content
+    """
+    if not clusters or model is None:
+        return clusters
+    listing = "\n".join(
+        f"{number}. keywords: {', '.join(cluster['terms'])}; modules: "
+        f"{'; '.join(str(modules[index].get('title', '')) for index in cluster['module_indices'][:5])}"
+        for number, cluster in enumerate(clusters, 1)
+    )
+    prompt = (
+        "You are an expert instructional designer. Write a short, descriptive section title for each numbered "
+        "group of onboarding modules below. Return only a JSON array of strings, one per group, in order.\n\n"
+        f"{listing}"
+    )
+    try:
+        response = generate(model, prompt) if generate else model.generate_content(prompt)
+        raw = str(getattr(response, 'text', '') or '')
+        match = re.search(r'\[.*\]', raw, re.DOTALL)
+        titles = json.loads(match.group(0)) if match else []
+    except Exception as e:
+        logger.warning("⚠️ Section title polish failed: %s", e)
+        return clusters
+    if not isinstance(titles, list) or len(titles) != len(clusters):
+        return clusters
+    polished = []
+    for cluster, title in zip(clusters, titles):
+        title = str(title).strip() if isinstance(title, str) else ''
+        polished.append(dict(cluster, section_title=title or cluster['section_title']))
+    return polished
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Local transcript normalizer
+Parses meeting transcripts into speaker turns ("0:00 - Name", "Name: text",
+WebVTT cues) and strips filler words, disfluencies and, in transcripts,
+greetings and meeting logistics with a handful of compiled patterns. Each lexicon is folded into a
+single trie-shaped regex, so a whole transcript is cleaned in one scan per
+turn instead of one model call per chunk; the model is only needed for
+residual rewriting of text that still reads as conversation.
+"""
+
+import re
+from typing import NamedTuple
+
+# Removed wherever they occur, together with the commas around them
+FILLER_WORDS = (
+    'um', 'umm', 'uh', 'uhh', 'uhm', 'er', 'erm', 'ah', 'hmm', 'mhm', 'uh-huh', 'mm-hmm',
+)
+# Discourse markers dropped at the start of a sentence
+LEADING_MARKERS = (
+    'so', 'yeah', 'yep', 'yes', 'okay', 'ok', 'alright', 'all right', 'anyway', 'anyways', 'oh', 'and so',
+)
+# Ambiguous markers only dropped at a sentence start when followed by punctuation
+LEADING_MARKERS_PUNCTUATED = (
+    'well', 'right', 'now', 'like', 'basically', 'actually', 'i mean', 'you know', 'i guess', 'sure', 'cool',
+    'great', 'perfect', 'hi', 'hello', 'hey',
+)
+# Dropped when set off by commas in the middle of a sentence
+PARENTHETICALS = (
+    'you know', 'i mean', 'like', 'sort of', 'kind of', 'basically', 'actually', 'i guess', 'you see',
+    'so to speak', 'if you will', 'right',
+)
+# Short words whose immediate repetition ("the the") is a disfluency
+REPEATABLE_WORDS = (
+    'the', 'a', 'an', 'and', 'to', 'of', 'in', 'on', 'it', 'is', 'i', 'we', 'you', 'they', 'so', 'but', 'this',
+    'if', 'for', 'with', 'at', 'or', 'be', 'my', 'our', 'your', 'can', 'do', 'just', 'what', 'when',
+)
+# Word beginnings that are stuttered before the full word ("I-I", "th-the")
+STUTTER_STEMS = ('i', 'a', 'we', 'it', 'th', 'wh', 'w', 's', 'so', 'an', 'and', 'you', 'they', 'b', 'but')
+# Short transcript sentences mentioning any of these are greetings, sign-offs
+# or call logistics. Words a procedure could be about (breaks, traffic,
+# accidents) are left out: they would delete content from documents.
+LOGISTICS_PHRASES = (
+    'can you hear me', 'hear me now', 'hear you now', 'you hear me', 'can everyone hear', 'can you all hear',
+    'can you see my screen', 'can everyone see', 'is that working', 'is this working', 'a bit lagging',
+    'you are lagging', "you're lagging", 'on mute', 'unmute', 'share my screen', 'sharing my screen',
+    'screen share', 'bad connection', 'you froze', 'you cut out', 'breaking up', 'thanks for joining',
+    'thank you for joining', 'thanks for coming', 'thanks for listening', 'thank you for listening',
+    'thanks everyone', 'thank you everyone', 'thanks so much', 'thank you so much', 'thanks guys',
+    'good morning', 'good afternoon', 'good evening', 'hi everyone', 'hello everyone', 'hey everyone',
+    'hi all', 'hello all', 'bye', 'see you', 'talk soon', 'talk to you later', 'have a good one',
+    'have a great day', "let's get started", 'lets get started', 'give it a minute', 'give me a second',
+    'give me a sec', 'one sec', 'bear with me', 'be right back', 'recording this',
+    'start the recording', 'stop the recording', 'is recording',
+)
+# Longer sentences carry content even when they mention logistics
+LOGISTICS_MAX_WORDS = 12
+# Words that mark a sentence as informal speech when judging residual rewriting
+INFORMAL_MARKERS = (
+    'gonna', 'wanna', 'gotta', 'kinda', 'sorta', 'dunno', 'stuff', 'thing is', 'pretty much', 'i think',
+    'i feel like', 'you guys', 'we were', "i'm", "i've", "we're", "you're", 'let me', 'anyway',
+)
+
+RESIDUAL_REWRITE_THRESHOLD = 0.35
+
+
+def trie_regex(phrases):
+    """
+    Regex alternation shaped like a character trie, so matching a large
+    lexicon walks one branch per input character instead of trying every
+    phrase
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        if '' in node and len(node) == 1:
+            return ''
+        branches = [re.escape(char) + build(node[char]) for char in sorted(key for key in node if key)]
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+
+    return build(trie)
+
+
+# Every lexicon in one automaton, matched against lowercased single-spaced
+# text. Each alternative starts at a space or comma, which both gives it a
+# left word boundary and lets the engine skip straight between candidates.
+_END = r"(?![\w'])"
+_LEAD_UNIT = (rf"(?:(?:{trie_regex(FILLER_WORDS + LEADING_MARKERS)}){_END}[,.!?…]*"
+              rf"|(?:{trie_regex(LEADING_MARKERS_PUNCTUATED)}){_END}[,.!?…]+)")
+_NOISE_SOURCE = (
+    rf"[ ,](?:(?P<lead>(?<=[.!?] ){_LEAD_UNIT}(?: {_LEAD_UNIT})*)(?= |$)"
+    rf"|(?P<filler>{trie_regex(FILLER_WORDS)})(?![\w'-]),?"
+    rf"|(?<=,) (?P<paren>{trie_regex(PARENTHETICALS)}),"
+    rf"|(?P<repeat>(?P<word>{trie_regex(REPEATABLE_WORDS)})(?:,? (?P=word))+){_END}"
+    rf"|(?P<stutter>(?P<stem>{trie_regex(STUTTER_STEMS)})-)(?=(?P=stem))"
+    rf"|(?P<logistics>{trie_regex(LOGISTICS_PHRASES)})(?![\w'-]))"
+)
+_NOISE = re.compile(_NOISE_SOURCE)
+# For the rare text whose lowercase form changes length (offsets would drift)
+_NOISE_IGNORECASE = re.compile(_NOISE_SOURCE, re.IGNORECASE)
+_SENTENCE_LOOKBACK = 600
+_ACRONYM_FILLER = re.compile(rf"(?<![\w'])(?:{'|'.join(re.escape(word.upper()) for word in FILLER_WORDS)})(?![\w'-])")
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?: |$)')
+_SPACING_FIXES = ((' ,', ','), (' . ', '. '), (' ?', '?'), (' !', '!'), (' ;', ';'), (' :', ':'), (',,', ','), (',.', '.'))
+_SENTENCE = re.compile(r'[^.!?]+[.!?]*')
+_INFORMAL = re.compile(rf"(?<![\w'])(?:{trie_regex(INFORMAL_MARKERS)}){_END}|\?")
+
+# Transcript line shapes
+_LINE = re.compile(r'[^\n]*\n?')
+_TIME = r'\[?\(?(\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?)\)?\]?'
+_TIMESTAMP_HEADER = re.compile(rf"^\s*{_TIME}\s*[-–]\s*([^\n:]{{1,60}}?)\s*(?::\s*(.*))?$")
+_NAME_TIME_HEADER = re.compile(rf"^\s*([A-Z][\w.'-]*(?:\s[A-Z][\w.'-]*){{0,3}})\s+{_TIME}\s*$")
+_BRACKET_TURN = re.compile(rf"^\s*{_TIME}\s+([A-Z][\w.'-]*(?:\s[A-Z][\w.'-]*){{0,3}}):\s*(.*)$")
+_VOICE_TURN = re.compile(r'^\s*<v(?:\.[\w.]+)?\s+([^>]{1,60})>(.*?)(?:</v>)?\s*$')
+_NAME_TURN = re.compile(r"^\s*([A-Z][\w.'-]*(?:\s[A-Z][\w.'-]*){0,3}):\s+(\S.*)$")
+_NOISE_LINE = re.compile(
+    r"^\s*(?:WEBVTT.*|NOTE\b.*|\d+|"
+    r"[\d:.,]+\s*-->\s*[\d:.,]+.*|"
+    r"(?:Microsoft\s+)?Teams\s+Meeting.*|Meeting\s+(?:ID|Transcript|Recording).*|Transcript|"
+    r"(?:Recording|Transcription)\s+(?:has\s+)?(?:started|stopped|ended).*|"
+    r".{1,60}\b(?:joined|left)\s+the\s+(?:meeting|call)\.?|"
+    r"\w+\s+\d{1,2},\s+\d{4}.*|\d{1,2}/\d{1,2}/\d{2,4}.*)\s*$",
+    re.IGNORECASE,
+)
+# Labels that look like "Name:" but introduce ordinary text
+_NOT_SPEAKERS = frozenset({
+    'note', 'notes', 'step', 'warning', 'caution', 'tip', 'example', 'summary', 'agenda', 'action items',
+    'important', 'objective', 'objectives', 'goal', 'goals', 'question', 'answer', 'q', 'a', 'date', 'time',
+})
+
+
+class Turn(NamedTuple):
+    """One speaker turn; start and end are offsets of its text in the source"""
+    speaker: str
+    time: float        # Seconds from the start of the meeting, or None
+    start: int
+    end: int
+    text: str
+
+
+def parse_timestamp(value):
+    """'0:05' -> 5.0, '1:02:03' -> 3723.0, '00:01:02.500' -> 62.5"""
+    if not value:
+        return None
+    seconds = 0.0
+    for part in value.replace(',', '.').split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+_TIMED_SHAPES = ((_TIMESTAMP_HEADER, 2, 1, 3), (_BRACKET_TURN, 2, 1, 3))
+_NAMED_SHAPES = ((_NAME_TIME_HEADER, 1, 2, None), (_VOICE_TURN, 1, None, 2), (_NAME_TURN, 1, None, 2))
+
+
+def _speaker_line(line):
+    """(speaker, time, text offset within line or None) for a turn line, else None"""
+    first = line.lstrip()[:1]
+    if first.isdigit() or first in '[(':
+        shapes = _TIMED_SHAPES
+    elif first == '<' or ':' in line[:70] or line.rstrip()[-1:].isdigit():
+        shapes = _NAMED_SHAPES
+    else:
+        return None
+    for pattern, speaker_group, time_group, text_group in shapes:
+        match = pattern.match(line)
+        if not match:
+            continue
+        speaker = match.group(speaker_group).strip()
+        if pattern is _NAME_TURN and speaker.lower() in _NOT_SPEAKERS:
+            return None
+        time = parse_timestamp(match.group(time_group)) if time_group else None
+        text_offset = match.start(text_group) if text_group and match.group(text_group) else None
+        return speaker, time, text_offset
+    return None
+
+
+def parse_turns(text, speakers=True):
+    """
+    Split a transcript into speaker turns in one pass over its lines
+
+    Header lines ("0:00 - Name", "Name 0:00") start a turn whose text follows
+    on the next lines; inline forms ("0:00 - Name: text", "[0:00] Name: text",
+    "Name: text", "<v Name>text") carry their text on the same line. Meeting
+    metadata and caption cue lines are skipped. Text before the first speaker,
+    or in documents without speakers, becomes speakerless turns split at
+    blank lines.
+
+    Args:
+        text (str): Transcript or document text
+        speakers (bool): False treats every line as plain text (paragraphs only)
+
+    Returns:
+        list: Turn tuples in document order
+    """
+    turns = []
+    speaker, time = '', None
+    pieces = []             # (start, end) of the current turn's text lines
+
+    def emit():
+        if pieces:
+            body = ' '.join(' '.join(text[start:end].split()) for start, end in pieces)
+            turns.append(Turn(speaker, time, pieces[0][0], pieces[-1][1], body))
+        pieces.clear()
+
+    for match in _LINE.finditer(text):
+        line = match.group(0)
+        if not line:
+            break
+        line = line.rstrip('\n').rstrip('\r')
+        if not line.strip():
+            if not speaker:
+                emit()
+            continue
+        if not speakers:
+            turn = None
+        elif _NOISE_LINE.match(line):
+            continue
+        else:
+            turn = _speaker_line(line)
+        if turn:
+            emit()
+            speaker, time, text_offset = turn
+            if text_offset is not None:
+                end = match.start() + len(line.rstrip())
+                text_start = match.start() + text_offset
+                line_text = text[text_start:end]
+                if line_text.endswith('</v>'):
+                    end -= len('</v>')
+                pieces.append((text_start, end))
+            continue
+        stripped_start = match.start() + len(line) - len(line.lstrip())
+        pieces.append((stripped_start, match.start() + len(line.rstrip())))
+    emit()
+    return turns
+
+
+def is_transcript(text, min_turns=3):
+    """True when text reads as a speaker-attributed transcript"""
+    speakers = 0
+    lines = 0
+    for match in _LINE.finditer(text[:20000]):
+        line = match.group(0).strip()
+        if not line:
+            continue
+        lines += 1
+        if _speaker_line(line):
+            speakers += 1
+    return speakers >= min_turns and speakers >= 0.2 * lines
+
+
+def _scan(text, drop_logistics=False):
+    """
+    Normalized text ('. ' + single-spaced text) and its noise spans as
+    (start, end, replacement, kind), sorted and non-overlapping. Logistics
+    sentences are only spanned when drop_logistics is set.
+    """
+    normalized = '. ' + ' '.join(text.split())
+    lowered = normalized.lower()
+    pattern = _NOISE
+    if len(lowered) != len(normalized):
+        lowered, pattern = normalized, _NOISE_IGNORECASE
+    spans = []
+    for match in pattern.finditer(lowered):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        if kind in ('filler', 'lead') and _ACRONYM_FILLER.search(normalized, start, end):
+            # "ER", "UM" and "AH" are acronyms, not hesitations
+            continue
+        if kind == 'logistics':
+            if not drop_logistics:
+                continue
+            # Drop the whole sentence around the phrase when it is a short aside
+            window = max(0, start - _SENTENCE_LOOKBACK)
+            sentence_start = max(max(lowered.rfind(mark, window, start) for mark in ('. ', '? ', '! ')) + 2, window)
+            sentence_end = _SENTENCE_END.search(lowered, end)
+            sentence_end = sentence_end.end() if sentence_end else len(lowered)
+            if lowered.count(' ', sentence_start, sentence_end) >= LOGISTICS_MAX_WORDS:
+                continue
+            spans.append((sentence_start, sentence_end, '', kind))
+        elif kind == 'lead':
+            # Drop the space after the markers and capitalize the next word
+            following = normalized[end + 1:end + 2]
+            spans.append((start, end + 1 + len(following), following.upper(), kind))
+        elif kind == 'filler':
+            end = match.end()
+            if normalized[start - 2:start] == ', ':
+                start -= 2
+            spans.append((start, end, '', kind))
+        elif kind == 'paren':
+            spans.append((start - 2, match.end(), '', kind))
+        elif kind == 'repeat':
+            # Keep the first occurrence, which a lead span may capitalize
+            spans.append((match.end('word'), end, '', kind))
+        else:
+            spans.append((start, end, '', kind))
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    merged = []
+    cursor = 0
+    capitalize = False      # A lead lost the letter it capitalized to a later span
+    for start, end, replacement, kind in spans:
+        if end <= cursor:
+            continue
+        if capitalize:
+            position = _next_kept(normalized, cursor)
+            if start > position:
+                merged.append((position, position + 1, normalized[position].upper(), 'lead'))
+                cursor = position + 1
+                capitalize = False
+        if start < cursor:
+            if replacement and kind != 'lead':
+                continue
+            previous = merged[-1] if merged else None
+            if previous and previous[3] == 'lead' and previous[2]:
+                # Only capitalize a letter that is kept: give it up to this span
+                merged[-1] = (previous[0], start, '', 'lead')
+                capitalize = True
+                cursor = start
+            start = cursor
+        merged.append((start, end, replacement, kind))
+        cursor = end
+        if replacement:
+            capitalize = False
+    if capitalize:
+        position = _next_kept(normalized, cursor)
+        if position < len(normalized):
+            merged.append((position, position + 1, normalized[position].upper(), 'lead'))
+    return normalized, merged
+
+
+def _next_kept(normalized, position):
+    """Index of the first non-space character at or after position"""
+    while position < len(normalized) and normalized[position] == ' ':
+        position += 1
+    return position
+
+
+def clean_sentence_text(text, drop_logistics=False):
+    """
+    Remove fillers, disfluencies and leading discourse markers from text;
+    with drop_logistics, also drop short sentences that are greetings or
+    call logistics (only meaningful for transcripts)
+    """
+    normalized, spans = _scan(text or '', drop_logistics)
+    if not spans:
+        return normalized[2:]
+    pieces = []
+    cursor = 0
+    for start, end, replacement, kind in spans:
+        pieces.append(normalized[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(normalized[cursor:])
+    cleaned = ' '.join(''.join(pieces)[2:].split())
+    for gap, joined in _SPACING_FIXES:
+        if gap in cleaned:
+            cleaned = cleaned.replace(gap, joined)
+    if cleaned.endswith(' .'):
+        cleaned = cleaned[:-2] + '.'
+    cleaned = cleaned.lstrip(' ,;:.')
+    return cleaned if cleaned.strip(' ,.!?…') else ''
+
+
+def clean_transcript(text, keep_speakers=False):
+    """
+    Normalize a meeting transcript (or any conversational text) locally
+
+    Args:
+        text (str): Raw transcript
+        keep_speakers (bool): Prefix each turn with "Name: "
+
+    Returns:
+        str: One line per speaker turn (blank-line separated paragraphs for
+        text without speakers), with fillers and meeting metadata removed.
+        Greeting and logistics sentences are only dropped from transcripts,
+        so documents keep every sentence.
+    """
+    if not text:
+        return ''
+    lines = []
+    has_speakers = False
+    # Documents that merely contain "Label: text" lines are cleaned as paragraphs
+    transcript = is_transcript(text)
+    for turn in parse_turns(text, speakers=transcript):
+        cleaned = clean_sentence_text(turn.text, drop_logistics=transcript)
+        if not cleaned:
+            continue
+        has_speakers = has_speakers or bool(turn.speaker)
+        lines.append(f"{turn.speaker}: {cleaned}" if keep_speakers and turn.speaker else cleaned)
+    return ('\n' if has_speakers else '\n\n').join(lines)
+
+
+def conversational_elements(text, limit=20):
+    """Filler, disfluency and logistics phrases found in text, most frequent first"""
+    counts = {}
+    normalized, spans = _scan(text or '')
+    for start, end, replacement, kind in spans:
+        if kind == 'logistics':
+            continue
+        phrase = normalized[start:end - len(replacement) if kind == 'lead' else end]
+        phrase = ' '.join(phrase.strip(' ,.!?…').lower().split())
+        if phrase:
+            counts[phrase] = counts.get(phrase, 0) + 1
+    for match in _NOISE.finditer(normalized.lower()):
+        if match.lastgroup == 'logistics':
+            counts[match.group('logistics')] = counts.get(match.group('logistics'), 0) + 1
+    return sorted(counts, key=lambda phrase: -counts[phrase])[:limit]
+
+
+def residual_conversational_ratio(text):
+    """Share of sentences that still read as informal speech after cleaning"""
+    sentences = [sentence for sentence in _SENTENCE.findall(' '.join((text or '').split()).lower()) if sentence.strip()]
+    if not sentences:
+        return 0.0
+    return sum(1 for sentence in sentences if _INFORMAL.search(sentence)) / len(sentences)
+
+
+def needs_rewrite(text, threshold=RESIDUAL_REWRITE_THRESHOLD):
+    """True when locally cleaned text is still conversational enough to justify a model rewrite"""
+    return residual_conversational_ratio(text) >= threshold
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Topic segmentation for meeting transcripts
+Speaker turns are stored column-wise (speaker id, start time, text offsets)
+and split into topics TextTiling-style: the transcript's content words are cut
+into token sequences, every gap between sequences gets a lexical cohesion
+score from the windows of sequences on either side, and the gaps whose score
+dips deepest below the surrounding peaks become topic boundaries, snapped to
+the nearest turn start. Each segment is one discussion topic, so module
+extraction can send one focused prompt per topic instead of per fixed-size
+chunk.
+
+NumPy scores every window at once from cumulative term counts when it is
+installed; otherwise the same scores come from counters sliding over the gaps.
+"""
+
+import re
+import math
+import hashlib
+import threading
+import collections
+from array import array
+from typing import NamedTuple
+
+from modules.transcript_cleaner import parse_turns, is_transcript, clean_sentence_text
+from modules.topic_clustering import tokenize
+from modules.chunker import chunk_texts
+
+# Content words per token sequence and sequences per comparison window
+SEQUENCE_TOKENS = 20
+WINDOW_SEQUENCES = 6
+# Topics shorter than this many content words are merged into a neighbour
+MIN_SEGMENT_TOKENS = 250
+# Cohesion dips shallower than this are never boundaries, however they rank;
+# chance variation inside one topic stays below it
+MIN_DEPTH = 0.4
+# Turns longer than this are stored as several rows so a topic can end inside a monologue
+MAX_ROW_CHARS = 1500
+# Largest sequence x vocabulary matrix scored with NumPy
+MAX_DENSE_CELLS = 8_000_000
+SEGMENT_TERMS = 5
+
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s|$)')
+
+_SEGMENT_CACHE = {}
+_SEGMENT_CACHE_MAX_ENTRIES = 64
+_segment_cache_lock = threading.Lock()
+
+_numpy = None
+_numpy_checked = False
+
+
+def _load_numpy():
+    """Import NumPy on first use; None when it is not installed"""
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+        _numpy_checked = True
+    return _numpy
+
+
+class TurnTable:
+    """
+    Speaker turns in parallel arrays; row i spans text[starts[i]:ends[i]]
+
+    Speaker names are interned in `speakers` and referenced by id (0 is the
+    empty speaker of plain paragraphs). Times are seconds from the start of
+    the meeting, NaN when the transcript has none. Rows split from one long
+    turn share its speaker and time.
+    """
+
+    __slots__ = ('text', 'speakers', 'speaker_ids', 'times', 'starts', 'ends')
+
+    def __init__(self, text):
+        self.text = text
+        self.speakers = ['']
+        self.speaker_ids = array('I')
+        self.times = array('d')
+        self.starts = array('q')
+        self.ends = array('q')
+
+    @classmethod
+    def from_text(cls, text, max_row_chars=MAX_ROW_CHARS):
+        """Parse text once; documents without speakers become paragraph rows"""
+        table = cls(text or '')
+        speaker_index = {'': 0}
+        for turn in parse_turns(table.text, speakers=is_transcript(table.text)):
+            speaker_id = speaker_index.get(turn.speaker)
+            if speaker_id is None:
+                speaker_id = speaker_index[turn.speaker] = len(table.speakers)
+                table.speakers.append(turn.speaker)
+            time = math.nan if turn.time is None else turn.time
+            for start, end in _row_spans(table.text, turn.start, turn.end, max_row_chars):
+                table.speaker_ids.append(speaker_id)
+                table.times.append(time)
+                table.starts.append(start)
+                table.ends.append(end)
+        return table
+
+    def __len__(self):
+        return len(self.starts)
+
+    def speaker(self, row):
+        return self.speakers[self.speaker_ids[row]]
+
+    def time(self, row):
+        value = self.times[row]
+        return None if math.isnan(value) else value
+
+    def row_text(self, row):
+        return ' '.join(self.text[self.starts[row]:self.ends[row]].split())
+
+
+def _row_spans(text, start, end, max_chars):
+    """Cut text[start:end] at sentence ends into pieces of at most about max_chars"""
+    if end - start <= max_chars:
+        return [(start, end)]
+    spans = []
+    piece_start = start
+    last_end = None
+    for match in _SENTENCE_END.finditer(text, start, end):
+        if last_end is not None and match.end() - piece_start > max_chars:
+            spans.append((piece_start, last_end))
+            piece_start = last_end
+        last_end = match.end()
+    spans.append((piece_start, end))
+    return [(piece_start, piece_end) for piece_start, piece_end in spans if text[piece_start:piece_end].strip()]
+
+
+class Segment(NamedTuple):
+    """One topic: rows [first_row, last_row) of the turn table"""
+    first_row: int
+    last_row: int
+    start: int            # Character offsets in the source text
+    end: int
+    start_time: float     # Seconds, or None when the transcript has no times
+    speakers: tuple
+    tokens: int
+    terms: tuple          # Words that distinguish this topic from the rest
+    depth: float          # Cohesion dip at the boundary that opens it (0 for the first)
+
+
+def _cosine(first, second):
+    if len(first) > len(second):
+        first, second = second, first
+    dot = sum(count * second.get(term, 0) for term, count in first.items())
+    if not dot:
+        return 0.0
+    return dot / math.sqrt(sum(c * c for c in first.values()) * sum(c * c for c in second.values()))
+
+
+def _shift(counts, sequence, sign):
+    for term, count in sequence.items():
+        value = counts.get(term, 0) + sign * count
+        if value:
+            counts[term] = value
+        else:
+            del counts[term]
+
+
+def _gap_scores_python(sequences, window):
+    """Cohesion of the windows left and right of gaps 1..n-1"""
+    left = {}
+    right = {}
+    for sequence in sequences[:window]:
+        _shift(right, sequence, 1)
+    scores = []
+    for gap in range(1, len(sequences)):
+        # Sequence gap-1 crosses from the right window to the left one
+        _shift(left, sequences[gap - 1], 1)
+        _shift(right, sequences[gap - 1], -1)
+        if gap - 1 - window >= 0:
+            _shift(left, sequences[gap - 1 - window], -1)
+        if gap - 1 + window < len(sequences):
+            _shift(right, sequences[gap - 1 + window], 1)
+        scores.append(_cosine(left, right))
+    return scores
+
+
+def _gap_scores_numpy(np, sequences, vocabulary, window):
+    counts = np.zeros((len(sequences) + 1, len(vocabulary)))
+    for row, sequence in enumerate(sequences, 1):
+        for term, count in sequence.items():
+            counts[row, vocabulary[term]] = count
+    cumulative = counts.cumsum(axis=0)
+    gaps = np.arange(1, len(sequences))
+    left = cumulative[gaps] - cumulative[np.maximum(gaps - window, 0)]
+    right = cumulative[np.minimum(gaps + window, len(sequences))] - cumulative[gaps]
+    norms = np.sqrt((left * left).sum(axis=1) * (right * right).sum(axis=1))
+    dots = (left * right).sum(axis=1)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0).tolist()
+
+
+def gap_scores(sequences, window=WINDOW_SEQUENCES):
+    """
+    Lexical cohesion at every gap between token sequences
+
+    Args:
+        sequences (list): Counter of terms per token sequence
+        window (int): Sequences compared on each side of a gap
+
+    Returns:
+        list: Cosine similarity for gaps 1..len(sequences)-1
+    """
+    if len(sequences) < 2:
+        return []
+    vocabulary = {}
+    for sequence in sequences:
+        for term in sequence:
+            vocabulary.setdefault(term, len(vocabulary))
+    np = _load_numpy()
+    if np is not None and (len(sequences) + 1) * len(vocabulary) <= MAX_DENSE_CELLS:
+        return _gap_scores_numpy(np, sequences, vocabulary, window)
+    return _gap_scores_python(sequences, window)
+
+
+def depth_scores(scores):
+    """TextTiling depth: how far each (smoothed) score sits below the peaks on either side"""
+    if len(scores) > 2:
+        scores = [scores[0]] + [sum(scores[i - 1:i + 2]) / 3 for i in range(1, len(scores) - 1)] + [scores[-1]]
+    depths = []
+    for index, score in enumerate(scores):
+        left = index
+        while left > 0 and scores[left - 1] >= scores[left]:
+            left -= 1
+        right = index
+        while right < len(scores) - 1 and scores[right + 1] >= scores[right]:
+            right += 1
+        depths.append(scores[left] + scores[right] - 2 * score)
+    return depths
+
+
+def _distinctive_terms(counters, count):
+    document_frequency = collections.Counter()
+    for counter in counters:
+        document_frequency.update(counter.keys())
+    total = len(counters)
+    terms = []
+    for counter in counters:
+        ranked = sorted(counter, key=lambda term: (-counter[term] * math.log((1 + total) / document_frequency[term]), term))
+        terms.append(tuple(ranked[:count]))
+    return terms
+
+
+def segment_table(table, max_segments=None, min_tokens=MIN_SEGMENT_TOKENS,
+                  sequence_tokens=SEQUENCE_TOKENS, window=WINDOW_SEQUENCES):
+    """
+    Split a turn table into topic segments
+
+    Args:
+        table (TurnTable): Parsed transcript
+        max_segments (int): Keep only the deepest boundaries beyond this many topics
+        min_tokens (int): Smallest topic, in content words
+        sequence_tokens (int): Content words per token sequence
+        window (int): Sequences compared on each side of a gap
+
+    Returns:
+        list: Segment tuples in document order
+    """
+    rows = len(table)
+    if not rows:
+        return []
+    row_tokens = [tokenize(table.row_text(row)) for row in range(rows)]
+    row_offsets = [0]
+    for tokens in row_tokens:
+        row_offsets.append(row_offsets[-1] + len(tokens))
+    flat = [token for tokens in row_tokens for token in tokens]
+    sequences = [collections.Counter(flat[i:i + sequence_tokens]) for i in range(0, len(flat), sequence_tokens)]
+    depths = depth_scores(gap_scores(sequences, window))
+
+    # Local depth maxima are the candidate boundaries. TextTiling's cutoff
+    # (mean - std/2 over all gaps) lets noise through on long transcripts, so
+    # the statistics are taken over the maxima, keeping those above mean + std/2
+    # and MIN_DEPTH
+    maxima = [index for index, depth in enumerate(depths)
+              if depth > 0 and not (index and depths[index - 1] > depth)
+              and not (index + 1 < len(depths) and depths[index + 1] >= depth)]
+    candidates = {}
+    if maxima:
+        mean = sum(depths[index] for index in maxima) / len(maxima)
+        cutoff = mean + math.sqrt(sum((depths[index] - mean) ** 2 for index in maxima) / len(maxima)) / 2
+        for index in maxima:
+            depth = depths[index]
+            if depth < max(cutoff, MIN_DEPTH):
+                continue
+            # Gap i sits before token (i + 1) * sequence_tokens
+            row = _snap_to_row(flat, row_offsets, (index + 1) * sequence_tokens, sequence_tokens, window)
+            if 0 < row < rows:
+                candidates[row] = max(depth, candidates.get(row, 0.0))
+
+    boundaries = []
+    for row in sorted(candidates, key=lambda row: (-candidates[row], row)):
+        if max_segments and len(boundaries) + 1 >= max_segments:
+            break
+        edges = sorted([0, rows] + boundaries)
+        position = next(index for index, edge in enumerate(edges) if edge > row)
+        before, after = edges[position - 1], edges[position]
+        if (row_offsets[row] - row_offsets[before] >= min_tokens
+                and row_offsets[after] - row_offsets[row] >= min_tokens):
+            boundaries.append(row)
+    edges = sorted([0, rows] + boundaries)
+
+    counters = [collections.Counter(flat[row_offsets[first]:row_offsets[last]]) for first, last in zip(edges, edges[1:])]
+    terms = _distinctive_terms(counters, SEGMENT_TERMS)
+    segments = []
+    for index, (first, last) in enumerate(zip(edges, edges[1:])):
+        speakers = tuple(dict.fromkeys(table.speaker(row) for row in range(first, last) if table.speaker_ids[row]))
+        segments.append(Segment(
+            first_row=first,
+            last_row=last,
+            start=table.starts[first],
+            end=table.ends[last - 1],
+            start_time=table.time(first),
+            speakers=speakers,
+            tokens=row_offsets[last] - row_offsets[first],
+            terms=terms[index],
+            depth=candidates.get(first, 0.0),
+        ))
+    return segments
+
+
+def _snap_to_row(flat, row_offsets, token, sequence_tokens, window):
+    """
+    Row start nearest a boundary gap: of the rows starting within one sequence
+    of it, the one whose surrounding windows share the fewest terms
+    """
+    row = _row_of_token(row_offsets, token)
+    if row + 1 < len(row_offsets) - 1 and row_offsets[row + 1] - token < token - row_offsets[row]:
+        row += 1
+    nearby = [candidate for candidate in range(max(row - 2, 1), min(row + 3, len(row_offsets) - 1))
+              if abs(row_offsets[candidate] - token) <= sequence_tokens]
+    if len(nearby) < 2:
+        return row
+    span = window * sequence_tokens
+
+    def cohesion(candidate):
+        offset = row_offsets[candidate]
+        return _cosine(collections.Counter(flat[max(offset - span, 0):offset]), collections.Counter(flat[offset:offset + span]))
+
+    return min(nearby, key=lambda candidate: (cohesion(candidate), abs(row_offsets[candidate] - token)))
+
+
+def _row_of_token(row_offsets, token):
+    """Row containing flat token index token (binary search over cumulative offsets)"""
+    low, high = 0, len(row_offsets) - 2
+    while low < high:
+        middle = (low + high + 1) // 2
+        if row_offsets[middle] <= token:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def get_segments(text, max_segments=None):
+    """
+    Parse and segment text once per (content hash, max_segments)
+
+    Returns:
+        tuple: (TurnTable, tuple of Segment)
+    """
+    key = (hashlib.sha1((text or '').encode('utf-8', errors='ignore')).hexdigest(), max_segments)
+    with _segment_cache_lock:
+        cached = _SEGMENT_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    table = TurnTable.from_text(text)
+    result = (table, tuple(segment_table(table, max_segments)))
+    with _segment_cache_lock:
+        if len(_SEGMENT_CACHE) >= _SEGMENT_CACHE_MAX_ENTRIES:
+            _SEGMENT_CACHE.pop(next(iter(_SEGMENT_CACHE)))
+        _SEGMENT_CACHE[key] = result
+    return result
+
+
+def segment_text(table, segment, keep_speakers=True):
+    """Cleaned text of one segment, one line per turn"""
+    lines = []
+    # Greetings and call logistics are only dropped from speaker transcripts
+    transcript = len(table.speakers) > 1
+    for row in range(segment.first_row, segment.last_row):
+        cleaned = clean_sentence_text(table.row_text(row), drop_logistics=transcript)
+        if not cleaned:
+            continue
+        speaker = table.speaker(row)
+        lines.append(f"{speaker}: {cleaned}" if keep_speakers and speaker else cleaned)
+    return '\n'.join(lines)
+
+
+def format_time(seconds):
+    """3723.0 -> '1:02:03', 65.0 -> '1:05'"""
+    if seconds is None:
+        return ''
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def topic_units(text, max_segments=None, keep_speakers=True):
+    """
+    Transcript topics as module units
+
+    Returns:
+        list: [{'text', 'terms', 'speakers', 'start_time', 'label'}] in document
+        order, where label reads like "12:30 · lockout, breaker, isolation"
+    """
+    table, segments = get_segments(text, max_segments)
+    units = []
+    for segment in segments:
+        body = segment_text(table, segment, keep_speakers)
+        if not body:
+            continue
+        label = ', '.join(segment.terms[:3])
+        if segment.start_time is not None:
+            label = f"{format_time(segment.start_time)} · {label}" if label else format_time(segment.start_time)
+        units.append({
+            'text': body,
+            'terms': list(segment.terms),
+            'speakers': list(segment.speakers),
+            'start_time': segment.start_time,
+            'label': label,
+        })
+    return units
+
+
+def topic_chunks(text, max_chars=2000):
+    """
+    Topic texts of a transcript for chunking: a topic longer than max_chars
+    (an hour spent on one subject) is split again with the semantic chunker,
+    so no chunk is unbounded
+    """
+    chunks = []
+    for unit in topic_units(text):
+        if len(unit['text']) > max_chars:
+            chunks.extend(chunk_texts(unit['text'], target_tokens=max(50, max_chars // 4)))
+        else:
+            chunks.append(unit['text'])
+    return chunks
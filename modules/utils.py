@@ -4,30 +4,25 @@ Fixed version of utils.py with correct indentation
 """
 
 import json
-import queue
 import re
+import logging
+import functools
 import concurrent.futures
 import streamlit as st
 import time
 import threading
 from modules.config import model
+from modules.prompt_builder import fit_excerpts, tracked_generate
+from modules.chunker import chunk_texts, split_sentences
+from modules.transcript_cleaner import clean_transcript, is_transcript, conversational_elements, needs_rewrite
+from modules.transcript_segmenter import topic_units, topic_chunks
+from modules.keyphrases import terminology, dynamic_keywords
+from modules.topic_clustering import cluster_modules, theme_labels, polish_section_titles
 
-# Global debug log queue for background threads
-debug_log_queue = queue.Queue()
+from modules.app_log import get_logger, sample, ring_buffer, get_log_session, debug_print
+from modules.telemetry import traced, annotate, bind_context
 
-# Thread-safe log buffer for background thread logs
-debug_logs = []
-debug_lock = threading.Lock()
-
-def debug_print(message, is_error=False):
-    """Thread-safe debug printing"""
-    with debug_lock:
-        debug_logs.append({
-            'message': message,
-            'is_error': is_error,
-            'timestamp': time.time()
-        })
-        print(message)
+logger = get_logger('utils')
 
 def create_quick_pathway(context, extracted_file_contents, inventory):
     """Create a quick pathway without AI analysis for speed"""
@@ -94,13 +89,15 @@ def create_quick_pathway(context, extracted_file_contents, inventory):
         }
 
 def flush_debug_logs_to_streamlit():
-    """Flush any debug logs from background threads to Streamlit"""
+    """Show warnings and errors logged for this session since the last flush"""
     try:
-        while not debug_log_queue.empty():
-            log_entry = debug_log_queue.get_nowait()
-            st.write(f"🔍 Debug: {log_entry}")
+        records = ring_buffer.take_new(get_log_session(), logging.WARNING)
+        if records:
+            with st.expander(f"🔍 Debug: {len(records)} warnings/errors"):
+                for record in records:
+                    st.write(f"{record.levelname}: {record.getMessage()}")
     except Exception as e:
-        pass  # Silently handle any queue errors
+        pass  # Silently handle any display errors
 
 def create_simple_modules_from_content(filename, content, training_context):
     """
@@ -139,28 +136,17 @@ def create_simple_modules_from_content(filename, content, training_context):
 
 def chunk_content_simple(content, max_chunk_size=2000):
     """
-    Split content into simple chunks
+    Split content into chunks of roughly max_chunk_size characters using the
+    shared semantic chunker (headings, lists and speaker turns are kept whole);
+    transcripts are split at topic shifts first, and topics longer than the
+    chunk size are split again
     """
     try:
-        # Split by sentences first
-        sentences = re.split(r'[.!?]+', content)
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 20:  # Only substantial sentences
-                if len(current_chunk + sentence) < max_chunk_size:
-                    current_chunk += sentence + ". "
-                else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = sentence + ". "
-        
-        # Add remaining chunk
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
+        if is_transcript(content):
+            chunks = topic_chunks(content, max_chunk_size)
+            if chunks:
+                return chunks
+        chunks = chunk_texts(content, target_tokens=max(50, max_chunk_size // 4))
         return chunks if chunks else [content[:max_chunk_size]]
         
     except Exception as e:
@@ -288,7 +274,7 @@ def generate_enhanced_content_types_with_gemini(content):
         text_and_quiz_prompt = f"""
         Based on the following training content, generate exactly 2 content types (text and knowledge_check) with DETAILED, ACTIONABLE content.
 
-        Training Content: {content[:1500]}
+        Training Content: {fit_excerpts(content, 375)}
 
         Create 2 content types:
         1. TEXT type: Include actual text content (2-3 paragraphs)
@@ -322,7 +308,7 @@ def generate_enhanced_content_types_with_gemini(content):
         Generate detailed, actionable content based on this training material:
         """
         
-        response = model.generate_content(text_and_quiz_prompt)
+        response = tracked_generate(model, text_and_quiz_prompt)
         
         # Parse the JSON response for text and knowledge check
         import json
@@ -370,7 +356,7 @@ def generate_veo3_video_content(content):
         video_prompt = f"""
         Create a professional training video that demonstrates the key concepts from this content:
         
-        {content[:800]}
+        {fit_excerpts(content, 200)}
         
         Show:
         - Clear visual demonstration of the main concepts
@@ -381,7 +367,7 @@ def generate_veo3_video_content(content):
         Style: Professional training video with clear narration and visual demonstrations
         """
         
-        # Generate the actual video with Veo3
+        # Queue the video with Veo3; the job finishes in the background
         video_result = generate_veo3_video(
             prompt=video_prompt,
             duration="3-5 minutes",
@@ -393,7 +379,7 @@ def generate_veo3_video_content(content):
             'title': 'Veo3 Training Video',
             'description': 'AI-generated video demonstration using Veo3',
             'content_data': {
-                'video_status': 'completed' if video_result.get('success') else 'generating',
+                'video_status': video_result.get('status', 'completed' if video_result.get('success') else 'failed'),
                 'video_url': video_result.get('video_url'),
                 'video_data': video_result.get('video_data'),
                 'thumbnail_url': video_result.get('thumbnail_url'),
@@ -639,6 +625,7 @@ def generate_unique_content_seed():
     
     return context_hash[:8]  # Use first 8 chars for brevity
 
+@traced('validate')
 def validate_and_enhance_pathway_modules(pathway_data, min_modules_per_section=6, min_sections_per_pathway=4, training_context=None):
     """
     Validate and enhance pathway data to ensure adequate module generation with decimal numbering,
@@ -687,7 +674,7 @@ def validate_and_enhance_pathway_modules(pathway_data, min_modules_per_section=6
                 section_number = section_idx + 1
                 
                 # Check if section has enough modules
-                debug_print(f"📊 Section {section_number} '{section_title}' has {len(modules)} modules (minimum required: {min_modules_per_section})")
+                logger.debug("📊 Section %s '%s' has %d modules (minimum required: %d)", section_number, section_title, len(modules), min_modules_per_section)
                 
                 if len(modules) < min_modules_per_section:
                     debug_print(f"⚠️ Section {section_number} '{section_title}' has only {len(modules)} modules, enhancing to {min_modules_per_section}")
@@ -698,12 +685,12 @@ def validate_and_enhance_pathway_modules(pathway_data, min_modules_per_section=6
                         decimal_module_number = f"{section_number}.{module_number}"
                         additional_module = generate_enhanced_module(section_title, decimal_module_number)
                         modules.append(additional_module)
-                        debug_print(f"➕ Added module {decimal_module_number}: {additional_module['title']}")
+                        sample(logger, 'validate.added_module', 10, logging.DEBUG, "➕ Added module %s: %s", decimal_module_number, additional_module['title'])
                     
                     section['modules'] = modules
                     debug_print(f"✅ Enhanced section {section_number} '{section_title}' to {len(modules)} modules (modules {section_number}.1 to {section_number}.{len(modules)})")
                 else:
-                    debug_print(f"✅ Section {section_number} '{section_title}' already has sufficient modules ({len(modules)})")
+                    logger.debug("✅ Section %s '%s' already has sufficient modules (%d)", section_number, section_title, len(modules))
                 
                 # NEW: Validate content types and goal alignment for each module
                 validate_module_content_requirements(modules, training_context, section_number)
@@ -721,6 +708,38 @@ def validate_and_enhance_pathway_modules(pathway_data, min_modules_per_section=6
         debug_print(f"❌ Pathway validation failed: {str(e)}")
         return pathway_data
 
+@traced('dedupe')
+def remove_near_duplicate_modules(pathway_data, threshold=None, strategy='merge', cross_pathway=False):
+    """
+    Post-generation pass that collapses near-duplicate modules (MinHash LSH)
+    across the sections of each pathway, so regenerated modules that restate
+    the same content are not shipped. Runs before validation so the padding
+    added to reach the minimum module count is not removed again
+    """
+    try:
+        from modules.dedup import deduplicate_pathway_modules, DEFAULT_DUPLICATE_THRESHOLD
+        
+        if not pathway_data or 'pathways' not in pathway_data:
+            return pathway_data
+        
+        groups = deduplicate_pathway_modules(
+            pathway_data,
+            threshold=threshold if threshold is not None else DEFAULT_DUPLICATE_THRESHOLD,
+            strategy=strategy,
+            cross_pathway=cross_pathway
+        )
+        
+        if groups:
+            removed = sum(len(group) - 1 for group in groups)
+            debug_print(f"🧹 Collapsed {removed} near-duplicate modules in {len(groups)} groups")
+            save_enhanced_pathways_to_session(pathway_data)
+        
+        return pathway_data
+        
+    except Exception as e:
+        debug_print(f"⚠️ Near-duplicate module removal failed: {str(e)}")
+        return pathway_data
+
 def validate_module_content_requirements(modules, training_context, section_number):
     """
     Validate that each module meets content type and goal alignment requirements
@@ -730,7 +749,7 @@ def validate_module_content_requirements(modules, training_context, section_numb
         
         for module_idx, module in enumerate(modules):
             module_number = f"{section_number}.{module_idx + 1}"
-            debug_print(f"🔍 Validating module {module_number}: {module.get('title', 'Unknown')}")
+            sample(logger, 'validate.module', 10, logging.DEBUG, "🔍 Validating module %s: %s", module_number, module.get('title', 'Unknown'))
             
             # Validate content types requirement (3+ distinct types)
             content_types = module.get('content_types', [])
@@ -741,7 +760,7 @@ def validate_module_content_requirements(modules, training_context, section_numb
                 for content_type in available_types:
                     if content_type not in content_types and len(content_types) < 5:
                         content_types.append(content_type)
-                        debug_print(f"➕ Added content type '{content_type}' to module {module_number}")
+                        logger.debug("➕ Added content type '%s' to module %s", content_type, module_number)
                 
                 module['content_types'] = content_types
             
@@ -1453,10 +1472,8 @@ def extract_and_transform_content(content, training_context):
         
         # Universal content type detection
         content_type = detect_content_type(content)
-        print(f"🔍 **Universal Content Analysis:**")
-        print(f"   Content type: {content_type}")
-        print(f"   Content length: {len(content)} characters")
-        print(f"   Content preview: {content[:200]}...")
+        logger.info("🔍 Universal content analysis: type=%s, length=%d characters", content_type, len(content))
+        logger.debug("   Content preview: %.200s...", content)
         
         # Apply universal transformation based on content type
         if content_type == "structured_training":
@@ -1472,7 +1489,7 @@ def extract_and_transform_content(content, training_context):
             return apply_comprehensive_transformation(content, training_context)
             
     except Exception as e:
-        print(f"⚠️ Universal content transformation failed: {str(e)}")
+        logger.warning("⚠️ Universal content transformation failed: %s", e)
         return None
 
 def detect_content_type(content):
@@ -1506,7 +1523,7 @@ def detect_content_type(content):
         
         # If content has meeting indicators, it's conversational regardless of other scores
         if meeting_matches >= 1:  # Any meeting indicator means it's conversational
-            print(f"   Detected content type: conversational (meeting transcript - {meeting_matches} indicators)")
+            logger.debug("   Detected content type: conversational (meeting transcript - %d indicators)", meeting_matches)
             return "conversational"
         
         # Universal content type indicators
@@ -1711,7 +1728,7 @@ def apply_comprehensive_transformation(content, training_context):
         Transform this unstructured content into professional training material.
         
         Original Content:
-        {content[:3000]}
+        {fit_excerpts(content, 750, training_context)}
         
         Training Context:
         - Type: {training_type}
@@ -1735,7 +1752,7 @@ def apply_comprehensive_transformation(content, training_context):
         Return the transformed professional training content or "NO_TRAINING_CONTENT".
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         transformed_content = response.text.strip()
         
         # Check if Gemini determined there's no training content
@@ -1817,12 +1834,18 @@ def extract_training_information_from_content(content, training_context):
 def get_training_keywords_from_goals(training_context):
     """
     Generate keywords based on training goals and context
+    Computed once per distinct context and shared by every file
     """
+    fields = tuple(str((training_context or {}).get(field, '') or '') for field in ('primary_goals', 'training_type', 'target_audience', 'industry'))
+    return list(_keywords_for_goals(*fields))
+
+@functools.lru_cache(maxsize=64)
+def _keywords_for_goals(primary_goals, training_type, target_audience, industry):
     try:
-        primary_goals = training_context.get('primary_goals', '').lower()
-        training_type = training_context.get('training_type', '').lower()
-        target_audience = training_context.get('target_audience', '').lower()
-        industry = training_context.get('industry', '').lower()
+        primary_goals = primary_goals.lower()
+        training_type = training_type.lower()
+        target_audience = target_audience.lower()
+        industry = industry.lower()
         
         keywords = []
         
@@ -1854,13 +1877,13 @@ def get_training_keywords_from_goals(training_context):
         # Add general training keywords
         keywords.extend(['training', 'learning', 'skill', 'knowledge', 'competency'])
         
-        # Remove duplicates and limit
-        unique_keywords = list(set(keywords))
-        return unique_keywords[:20]
+        # Remove duplicates (keeping goal words first) and limit
+        unique_keywords = list(dict.fromkeys(keywords))
+        return tuple(unique_keywords[:20])
         
     except Exception as e:
         print(f"⚠️ Keyword generation failed: {str(e)}")
-        return ['training', 'learning', 'skill', 'knowledge']
+        return ('training', 'learning', 'skill', 'knowledge')
 
 def extract_goal_aligned_sentences(content, training_context):
     """
@@ -1870,7 +1893,7 @@ def extract_goal_aligned_sentences(content, training_context):
         primary_goals = training_context.get('primary_goals', '').lower()
         keywords = get_training_keywords_from_goals(training_context)
         
-        sentences = re.split(r'[.!?]+', content)
+        sentences = split_sentences(content)
         aligned_sentences = []
         
         for sentence in sentences:
@@ -1901,7 +1924,7 @@ def extract_content_sections(content):
     Extract content sections when no training-specific content is found
     """
     try:
-        sentences = re.split(r'[.!?]+', content)
+        sentences = split_sentences(content)
         content_sections = []
         
         for sentence in sentences:
@@ -1920,7 +1943,7 @@ def extract_broader_training_content(content, training_context):
     Extract training content more broadly when keyword matching fails
     """
     try:
-        sentences = re.split(r'[.!?]+', content)
+        sentences = split_sentences(content)
         training_sentences = []
         
         for sentence in sentences:
@@ -1955,48 +1978,14 @@ def extract_broader_training_content(content, training_context):
 
 def generate_dynamic_keywords(content, training_context):
     """
-    Use AI to dynamically generate relevant keywords based on content and training context
+    Generate relevant keywords from the content and training context
+    Goal keywords and the document's keyphrases share the list (see
+    keyphrases.dynamic_keywords); both are cached, so repeated files and
+    contexts cost nothing
     """
     try:
-        prompt = f"""
-        Analyze this content and training context to generate relevant keywords for identifying training material.
-        
-        Content preview: {content[:2000]}
-        
-        Training Context:
-        - Type: {training_context.get('training_type', 'General')}
-        - Audience: {training_context.get('target_audience', 'Employees')}
-        - Industry: {training_context.get('industry', 'General')}
-        - Goals: {training_context.get('primary_goals', 'General training')}
-        
-        Generate 15-20 relevant keywords that would help identify training-relevant content from this material.
-        Focus on:
-        - Industry-specific terminology
-        - Training-related concepts
-        - Important procedures or policies
-        - Key skills or competencies
-        - Relevant standards or requirements
-        
-        Return as a JSON array: ["keyword1", "keyword2", "keyword3"]
-        """
-        
-        if not model:
-            return ['training', 'learning', 'skill', 'knowledge']
-        response = model.generate_content(prompt)
-        if response and hasattr(response, 'text'):
-            raw = str(response.text).strip()
-        else:
-            return ['training', 'learning', 'skill', 'knowledge']
-        
-        # Extract keywords from response
-        keywords = extract_json_from_ai_response(raw)
-        if keywords and isinstance(keywords, list):
-            return keywords
-        else:
-            # Fallback: extract keywords from text
-            import re
-            keyword_matches = re.findall(r'"([^"]+)"', raw)
-            return keyword_matches if keyword_matches else ['training', 'learning', 'skill', 'knowledge']
+        keywords = dynamic_keywords(get_training_keywords_from_goals(training_context), content, training_context)
+        return keywords if keywords else ['training', 'learning', 'skill', 'knowledge']
             
     except Exception as e:
         print(f"⚠️ Dynamic keyword generation failed: {str(e)}")
@@ -2012,7 +2001,7 @@ def ai_extract_training_sentences(content, keywords, training_context):
         
         Keywords: {', '.join(keywords[:10])}
         
-        Content: {content[:3000]}
+        Content: {fit_excerpts(content, 750, training_context)}
         
         Training Context:
         - Type: {training_context.get('training_type', 'General')}
@@ -2035,7 +2024,7 @@ def ai_extract_training_sentences(content, keywords, training_context):
         
         if not model:
             return extract_training_sentences_basic(content, keywords)
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             sentences = [s.strip() for s in str(response.text).split('\n') if s.strip() and len(s.strip()) > 30]
         else:
@@ -2062,7 +2051,7 @@ def ai_group_training_sections(sentences, training_context):
         prompt = f"""
         Group these training-related sentences into cohesive sections for {training_context.get('training_type', 'General')} training.
         
-        Sentences: {content_text[:4000]}
+        Sentences: {fit_excerpts(content_text, 1000, training_context)}
         
         Training Context:
         - Type: {training_context.get('training_type', 'General')}
@@ -2082,7 +2071,7 @@ def ai_group_training_sections(sentences, training_context):
         
         if not model:
             return group_sentences_basic(sentences)
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             sections_data = extract_json_from_ai_response(str(response.text))
         else:
@@ -2103,7 +2092,7 @@ def extract_training_information_basic(content, training_context):
     Basic fallback for training information extraction
     """
     # Simple sentence splitting and filtering
-    sentences = re.split(r'[.!?]+', content)
+    sentences = split_sentences(content)
     training_sentences = []
     
     for sentence in sentences:
@@ -2120,7 +2109,7 @@ def extract_training_sentences_basic(content, keywords):
     """
     Basic fallback for sentence extraction
     """
-    sentences = re.split(r'[.!?]+', content)
+    sentences = split_sentences(content)
     relevant_sentences = []
     
     for sentence in sentences:
@@ -2146,15 +2135,24 @@ def group_sentences_basic(sentences):
     for sentence in sentences:
         current_section.append(sentence)
         if len(current_section) >= 3:
-            sections.append('. '.join(current_section) + '.')
+            sections.append(join_sentences(current_section))
             current_section = []
     
     # Add remaining sentences
     if current_section:
-        sections.append('. '.join(current_section) + '.')
+        sections.append(join_sentences(current_section))
     
     return sections
 
+def join_sentences(sentences):
+    """
+    Join sentences into a paragraph, adding a full stop only where one is missing
+    """
+    return ' '.join(
+        sentence if sentence.endswith(('.', '!', '?', ':')) else sentence + '.'
+        for sentence in sentences
+    )
+
 def extract_json_from_ai_response(raw_text):
     """
     Extract JSON from AI response with robust error handling
@@ -2275,12 +2273,12 @@ def extract_key_topics_from_content(content, max_topics=5):
         prompt = f"""
         Extract the top {max_topics} most important topics or concepts from this training content:
         
-        {content[:2000]}
+        {fit_excerpts(content, 500)}
         
         Return only the topic names, separated by commas. Keep them short and relevant.
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text') and response.text:
             topics = [topic.strip() for topic in str(response.text).split(',') if topic.strip()]
         else:
@@ -2331,11 +2329,11 @@ def gemini_generate_module_description(content: str) -> str:
         Summarize the following training module content in 1-2 clear, grammatically correct sentences. The summary should be concise, legible, and suitable as a description for an onboarding module. Do not repeat the title. Do not use generic phrases like 'this module'.
 
         Content:
-        {content[:2000]}
+        {fit_excerpts(content, 500)}
         """
         if not model:
             return "Module extracted from uploaded file."
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             desc = str(response.text).strip().replace('\n', ' ')
         else:
@@ -2345,54 +2343,28 @@ def gemini_generate_module_description(content: str) -> str:
         st.warning(f"Could not generate module description: {str(e)}")
         return "Module extracted from uploaded file."
 
-def gemini_group_modules_into_sections(modules):
+@traced('sections.group')
+def gemini_group_modules_into_sections(modules, max_sections=6, max_modules_per_section=None, polish_titles=False):
     """
-    Use Gemini to group modules into logical sections and generate section titles.
+    Group modules into logical sections with local topic clustering and generate section titles.
+    Gemini is only used, when polish_titles is set, to reword the generated titles.
     modules: list of dicts with 'title' and 'content'.
-    Returns: list of dicts: { 'section_title': str, 'module_indices': [int, ...] }
+    Returns: list of dicts: { 'section_title': str, 'module_indices': [int, ...] } with 0-based indices
     """
     try:
         if not modules or len(modules) < 2:
             return [{ 'section_title': 'General', 'module_indices': list(range(len(modules))) }]
-        module_list_str = "\n".join([f"{i+1}. {m['title']}: {m['content'][:100]}" for i, m in enumerate(modules)])
-        prompt = f"""
-        You are an expert instructional designer. Given the following list of onboarding modules (with their titles and a content excerpt), group them into logical sections for an onboarding program. For each section, provide a clear, descriptive section title and list the module numbers that belong in that section. Return the result as JSON in the format: [{{"section_title": str, "module_indices": [int, ...]}}].
-
-        Modules:
-        {module_list_str}
-        """
-        if not model:
-            return [{ 'section_title': 'General', 'module_indices': list(range(len(modules))) }]
-        response = model.generate_content(prompt)
-        if response and hasattr(response, 'text'):
-            raw = str(response.text).strip()
-        else:
-            return [{ 'section_title': 'General', 'module_indices': list(range(len(modules))) }]
-        if raw.startswith("```"):
-            raw = raw.split("```", 1)[-1].strip()
-        raw = raw.replace("'", '"')
-        # Remove trailing commas before closing brackets
-        raw = re.sub(r',([ \t\r\n]*[\]}])', r'\1', raw)
-        # Fix unescaped double quotes in section titles (e.g., Manager"s -> Manager's)
-        raw = re.sub(r'([A-Za-z])\"s', r"\1's", raw)
-        # Extract the first JSON array
-        match = re.search(r'(\[.*\])', raw, re.DOTALL)
-        if match:
-            json_str = match.group(1)
-        else:
-            json_str = raw
-        try:
-            sections = json.loads(json_str)
-            if isinstance(sections, list) and all('section_title' in s and 'module_indices' in s for s in sections):
-                return sections
-        except Exception as e:
-            st.warning(f"Could not parse Gemini section grouping: {str(e)}\nRaw response:\n{json_str}")
-            st.text_area("Raw Gemini Output (fix manually if needed):", value=json_str, height=200)
-        return [{ 'section_title': 'General', 'module_indices': list(range(len(modules))) }]
+        sections = cluster_modules(modules, max_clusters=max_sections, max_cluster_size=max_modules_per_section)
+        if polish_titles and model:
+            sections = polish_section_titles(sections, modules, model, generate=tracked_generate)
+        annotate(section_count=len(sections), polished=bool(polish_titles and model))
+        return sections
     except Exception as e:
+        logger.warning("⚠️ Could not group modules into sections: %s", e)
         st.warning(f"Could not group modules into sections: {str(e)}")
         return [{ 'section_title': 'General', 'module_indices': list(range(len(modules))) }]
 
+@traced('pathway.complete')
 def gemini_generate_complete_pathway(training_context, extracted_file_contents, file_inventory, bypass_filtering=False, preserve_original_content=False):
     """
     Generate AI-powered pathways using optimized Gemini agents for speed and quality
@@ -2400,30 +2372,39 @@ def gemini_generate_complete_pathway(training_context, extracted_file_contents,
     """
     try:
         import streamlit as st
-        from modules.fast_ai_agents import OptimizedPathwayOrchestrator
+        from modules.pipeline import get_pipeline
         
         st.write("🚀 **Optimized AI Pathway Generation:**")
         st.write("• Using fast Gemini agents for optimal speed and quality")
         st.write("• Processing content with parallel optimization")
         
-        # Initialize the optimized orchestrator
-        orchestrator = OptimizedPathwayOrchestrator()
+        # The generate stage runs the optimized orchestrator; its cleaning and
+        # digest stages reuse artifacts that do not depend on what changed
+        pipeline = get_pipeline()
+        stage_context = dict(
+            training_context,
+            bypass_filtering=bypass_filtering,
+            preserve_original_content=preserve_original_content,
+            file_inventory=file_inventory
+        )
         
         # Generate pathways using optimized AI processing
         st.write("⚡ Generating pathways with optimized AI...")
         
         try:
-            result = orchestrator.generate_optimized_pathways(
-                extracted_file_contents, 
-                training_context, 
-                file_inventory
-            )
+            with pipeline.tally() as run_counts:
+                result = pipeline.run('generate', extracted_file_contents, stage_context)
             debug_print(f"✅ OptimizedPathwayOrchestrator returned: {type(result)} with {len(result.get('pathways', [])) if result else 0} pathways")
         except Exception as orchestrator_error:
             debug_print(f"❌ OptimizedPathwayOrchestrator failed: {str(orchestrator_error)}")
             st.write(f"⚠️ Optimized AI failed: {str(orchestrator_error)}")
             result = None
         
+        # Only this run's stage hits; pipeline.stats() also counts other sessions
+        reused = {name: counts['reused'] for name, counts in run_counts.items()}
+        if any(reused.values()):
+            st.write("♻️ Reused unchanged stage results: " + ', '.join(f"{name} ×{count}" for name, count in reused.items() if count))
+        
         if result and 'pathways' in result and result['pathways']:
             st.write(f"✅ **Optimized AI Success:** Generated {len(result['pathways'])} unique pathways in record time!")
             
@@ -2444,12 +2425,16 @@ def gemini_generate_complete_pathway(training_context, extracted_file_contents,
                 st.write(f"      📊 {sections_count} sections, {modules_count} modules")
                 st.write(f"      🎨 Content types: {', '.join(unique_types[:5])}")  # Show first 5 types
             
+            # Collapse modules that restate the same content before padding to the minimums
+            result = remove_near_duplicate_modules(result)
+            
             # Validate and enhance pathway modules
             result = validate_and_enhance_pathway_modules(result, min_modules_per_section=6, min_sections_per_pathway=4, training_context=training_context)
             
             return result
         else:
             st.write("⚠️ Optimized AI generation failed, using fallback...")
+            annotate(fallback_used=True)
             # Fallback to improved pathway generation
             return gemini_generate_complete_pathway_fallback(training_context, extracted_file_contents, file_inventory)
             
@@ -2458,6 +2443,7 @@ def gemini_generate_complete_pathway(training_context, extracted_file_contents,
         st.write(f"⚠️ AI pathway generation error: {str(e)}")
         
         # Fallback to improved pathway generation
+        annotate(fallback_used=True, error=str(e))
         return gemini_generate_complete_pathway_fallback(training_context, extracted_file_contents, file_inventory)
 
 def gemini_generate_complete_pathway_fallback(training_context, extracted_file_contents, file_inventory):
@@ -2478,17 +2464,17 @@ def gemini_generate_complete_pathway_fallback(training_context, extracted_file_c
         
         if result and 'pathways' in result and result['pathways']:
             st.write(f"✅ **Fallback Success:** Generated {len(result['pathways'])} pathways with content types")
+            result = remove_near_duplicate_modules(result)
             # Validate and enhance pathway modules
-            result = validate_and_enhance_pathway_modules(result, min_modules_per_section=6, min_sections_per_pathway=4, training_context=training_context)
-            return result
+            return validate_and_enhance_pathway_modules(result, min_modules_per_section=6, min_sections_per_pathway=4, training_context=training_context)
         else:
             st.write("⚠️ AI fallback failed, creating basic pathways...")
             # Create basic pathways with content types
             basic_pathways = create_basic_pathways_with_content_types(training_context, extracted_file_contents)
             result = {"pathways": basic_pathways}
+            result = remove_near_duplicate_modules(result)
             # Validate and enhance pathway modules
-            result = validate_and_enhance_pathway_modules(result, min_modules_per_section=6, min_sections_per_pathway=4, training_context=training_context)
-            return result
+            return validate_and_enhance_pathway_modules(result, min_modules_per_section=6, min_sections_per_pathway=4, training_context=training_context)
         
     except Exception as e:
         debug_print(f"❌ Fallback pathway generation failed: {str(e)}")
@@ -2580,18 +2566,18 @@ def create_basic_pathways_with_content_types(training_context, extracted_file_co
     
     return pathways
 
+@traced('extract')
 def extract_modules_from_file_content(filename, content, training_context, bypass_filtering=False, preserve_original_content=False):
     """
     Extract content from uploaded files that aligns with primary training goals.
     Focus on actual file content and training goals.
     """
     try:
-        print(f"📄 **Extracting content from {filename}**")
-        print(f"📄 Content length: {len(content)} characters")
-        print(f"🎯 Training goals: {training_context.get('primary_goals', 'Not specified')}")
+        logger.info("📄 Extracting content from %s (%d characters)", filename, len(content))
+        logger.debug("🎯 Training goals: %s", training_context.get('primary_goals', 'Not specified'))
         
         if not content or len(content.strip()) < 50:
-            print(f"⚠️ {filename} has insufficient content for extraction")
+            logger.warning("⚠️ %s has insufficient content for extraction", filename)
             return []
         
         # Get training goals for content analysis
@@ -2600,60 +2586,67 @@ def extract_modules_from_file_content(filename, content, training_context, bypas
         target_audience = training_context.get('target_audience', 'employees')
         industry = training_context.get('industry', 'general')
         
-        print(f"📋 Training type: {training_type}")
-        print(f"👥 Target audience: {target_audience}")
-        print(f"🏢 Industry: {industry}")
+        logger.debug("📋 Training type: %s, audience: %s, industry: %s", training_type, target_audience, industry)
+        
+        # Get performance configuration
+        config = get_parallel_config()
+        max_modules = config.get('max_modules_per_file', 10)
+        batch_ai_calls = config.get('batch_ai_calls', True)
         
         # Extract training-relevant information directly from content
+        topic_labels = []
         if preserve_original_content:
             # For structured content, preserve original with minimal processing
             training_info = [content] if content and len(content.strip()) > 100 else []
+        elif is_transcript(content):
+            # Transcripts are split at topic shifts so each module covers one discussion
+            units = topic_units(content, max_segments=max_modules)
+            training_info = [unit['text'] for unit in units]
+            topic_labels = [unit['label'] for unit in units]
+            logger.info("🗣️ %s segmented into %d discussion topics", filename, len(units))
         else:
             # Use training goals to extract relevant content
             training_info = extract_training_information_from_content(content, training_context)
         
         if not training_info:
-            print(f"⚠️ No training-relevant information found in {filename}")
+            logger.warning("⚠️ No training-relevant information found in %s", filename)
             # Use original content as fallback
-            print(f"🔄 Using original content as fallback")
+            logger.info("🔄 Using original content as fallback")
             training_info = [content] if content and len(content.strip()) > 100 else []
         
-        print(f"📄 **Training Information Extracted:** {len(training_info)} sections")
+        logger.info("📄 Training information extracted: %d sections", len(training_info))
         
         modules = []
         
-        # Get performance configuration
-        config = get_parallel_config()
-        max_modules = config.get('max_modules_per_file', 10)
-        batch_ai_calls = config.get('batch_ai_calls', True)
-        
         # Create modules from training-relevant information
         for i, info_section in enumerate(training_info[:max_modules]):  # Limit modules for speed
             if len(info_section.strip()) > 100:  # Minimum length for quality
-                print(f"🔧 Creating module {i+1} from content section")
-                print(f"📄 Section content length: {len(info_section)} characters")
+                sample(logger, 'extract.create_module', 5, logging.DEBUG, "🔧 Creating module %d from content section (%d characters)", i + 1, len(info_section))
                 
                 # Use AI-powered module creation with optimized approach
                 cohesive_module = create_cohesive_module_content_optimized(info_section, training_context, i+1, batch_ai_calls)
                 if cohesive_module:
+                    source = f'Training information from {filename}'
+                    if i < len(topic_labels) and topic_labels[i]:
+                        source = f'{source} ({topic_labels[i]})'
                     modules.append({
                         'title': cohesive_module['title'],
                         'description': cohesive_module['description'],
                         'content': cohesive_module['content'],
-                        'source': clean_source_field(f'Training information from {filename}'),
+                        'source': clean_source_field(source),
                         'key_points': extract_key_points_from_content(info_section, training_context),
                         'relevance_score': 0.9,  # High relevance since it's filtered and cohesive
                         'full_reason': f'Cohesive training content focused on {cohesive_module["core_topic"]}'
                     })
-                    print(f"✅ Module {i+1} created successfully")
+                    sample(logger, 'extract.module_created', 5, logging.DEBUG, "✅ Module %d created successfully", i + 1)
                 else:
-                    print(f"⚠️ Module {i+1} creation failed")
+                    logger.warning("⚠️ Module %d creation failed", i + 1)
         
-        print(f"✅ Extracted {len(modules)} cohesive training modules from {filename}")
+        logger.info("✅ Extracted %d cohesive training modules from %s", len(modules), filename)
         return modules
         
     except Exception as e:
-        print(f"⚠️ Training content extraction failed for {filename}: {str(e)}")
+        logger.warning("⚠️ Training content extraction failed for %s: %s", filename, e)
         return []
 
 def create_fast_module_content(content, training_context, module_number):
@@ -2681,7 +2674,7 @@ def create_fast_module_content(content, training_context, module_number):
         }
             
     except Exception as e:
-        print(f"⚠️ Fast module creation failed: {str(e)}")
+        logger.warning("⚠️ Fast module creation failed: %s", e)
         return None
 
 def clean_content_basic(content):
@@ -2689,20 +2682,8 @@ def clean_content_basic(content):
     Clean content without AI calls for speed
     """
     try:
-        import re
-        
-        # Basic cleaning without AI
-        cleaned = content.strip()
-        
-        # Remove common conversational elements
-        conversational_elements = ['um', 'uh', 'yeah', 'okay', 'right', 'so', 'well', 'you know']
-        for element in conversational_elements:
-            pattern = re.escape(element)
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        
-        # Clean up extra whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        cleaned = cleaned.strip()
+        # Fillers, disfluencies and call logistics removed locally in one pass
+        cleaned = ' '.join(clean_transcript(content).split())
         
         return cleaned if len(cleaned) > 50 else content
         
@@ -2715,13 +2696,11 @@ def create_cohesive_module_content_optimized(content, training_context, module_n
     Focus on actual file content and training goals
     """
     try:
-        print(f"🔧 **Creating module {module_number} from content**")
-        print(f"📄 Content length: {len(content)} characters")
-        print(f"🎯 Training goals: {training_context.get('primary_goals', 'Not specified')}")
+        sample(logger, 'extract.optimized_module', 5, logging.DEBUG, "🔧 Creating module %s from content (%d characters)", module_number, len(content))
         
         # First, validate that the content is actually meaningful
         if not is_meaningful_training_content(content, training_context):
-            print(f"⚠️ Module {module_number}: Content not meaningful, using anyway")
+            logger.warning("⚠️ Module %s: Content not meaningful, using anyway", module_number)
         
         if not model:
             # Fallback to simple approach without AI
@@ -2747,7 +2726,7 @@ def create_cohesive_module_content_optimized(content, training_context, module_n
         Create a professional training module from this content.
         
         Content:
-        {content[:2000]}
+        {fit_excerpts(content, 500, training_context)}
         
         Training Context:
         - Type: {training_type}
@@ -2790,7 +2769,7 @@ def create_cohesive_module_content_optimized(content, training_context, module_n
                 'core_topic': 'Training Content',
                 'learning_objectives': ['Understand key concepts', 'Learn practical skills', 'Apply knowledge']
             }
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             raw = str(response.text).strip()
         else:
@@ -2832,7 +2811,7 @@ def create_cohesive_module_content_optimized(content, training_context, module_n
             }
         else:
             # Fallback to simple approach when JSON parsing fails
-            print(f"⚠️ Module {module_number}: JSON parsing failed, using fallback")
+            logger.warning("⚠️ Module %s: JSON parsing failed, using fallback", module_number)
             title = extract_first_sentence_title(content)
             description = f"Training content from uploaded file - Module {module_number}"
             cleaned_content = clean_content_basic(content)
@@ -2846,7 +2825,7 @@ def create_cohesive_module_content_optimized(content, training_context, module_n
             }
             
     except Exception as e:
-        print(f"⚠️ Optimized module creation failed: {str(e)}")
+        logger.warning("⚠️ Optimized module creation failed: %s", e)
         # Ultimate fallback
         try:
             title = extract_first_sentence_title(content)
@@ -2861,7 +2840,7 @@ def create_cohesive_module_content_optimized(content, training_context, module_n
                 'learning_objectives': ['Understand key concepts', 'Learn practical skills', 'Apply knowledge']
             }
         except Exception as fallback_error:
-            print(f"⚠️ Ultimate fallback also failed: {str(fallback_error)}")
+            logger.error("⚠️ Ultimate fallback also failed: %s", fallback_error)
             return None
 
 def is_meaningful_training_content(content, training_context):
@@ -3145,7 +3124,7 @@ def transform_conversational_to_professional(content, core_topic, training_conte
         Transform this conversational meeting content into professional training material.
         
         Original Content:
-        {content[:3000]}
+        {fit_excerpts(content, 750, training_context)}
         
         Training Context:
         - Type: {training_type}
@@ -3166,7 +3145,7 @@ def transform_conversational_to_professional(content, core_topic, training_conte
         Return the transformed professional training content.
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             professional_content = str(response.text).strip()
         else:
@@ -3190,20 +3169,10 @@ def transform_conversational_basic(content, core_topic, training_context):
     try:
         import re
         
-        # Clean up conversational elements
-        content_clean = content.strip()
-        
-        # Use AI to dynamically identify and remove conversational elements
-        conversational_elements = ai_identify_conversational_elements(content_clean)
+        # Remove conversational elements locally
+        content_clean = ' '.join(clean_transcript(content).split())
         
-        # Remove identified conversational elements
-        for element in conversational_elements:
-            import re
-            pattern = re.escape(element)
-            content_clean = re.sub(pattern, '', content_clean, flags=re.IGNORECASE)
-        
-        # Clean up extra whitespace and punctuation
-        content_clean = re.sub(r'\s+', ' ', content_clean)
+        # Clean up punctuation
         content_clean = re.sub(r'[.!?]+', '.', content_clean)
         content_clean = content_clean.strip()
         
@@ -3411,20 +3380,17 @@ def extract_key_points_from_content(content, training_context):
 
 def get_training_keywords(training_context):
     """
-    Get training-relevant keywords using AI-driven approach
+    Get training-relevant keywords from the training context
+    Extracted locally and cached per context, so per-module checks stay cheap
     """
     try:
-        # Create a sample content from training context
-        context_content = f"""
-        Training goals: {training_context.get('primary_goals', '')}
-        Training type: {training_context.get('training_type', '')}
-        Target audience: {training_context.get('target_audience', '')}
-        Industry: {training_context.get('industry', '')}
-        Success metrics: {training_context.get('success_metrics', '')}
-        """
+        # Create a sample content from training context (values only, so field labels never become keywords)
+        context_content = '. '.join(
+            str(training_context.get(field, '') or '')
+            for field in ('primary_goals', 'training_type', 'target_audience', 'industry', 'success_metrics')
+        )
         
-        # Use AI to extract relevant keywords
-        keywords = extract_ai_driven_terminology(context_content, training_context, "all")
+        keywords = terminology(context_content, training_context, "all", limit=30, corpus=False)
         if keywords:
             return keywords[:30]
         
@@ -3444,8 +3410,10 @@ def get_training_keywords(training_context):
 
 def extract_ai_driven_terminology(content, training_context, terminology_type="all"):
     """
-    Use AI to dynamically extract relevant terminology from content and context
-    Replaces hardcoded lists of technical terms, action words, and industry terms
+    Extract relevant terminology from content and context
+    Replaces hardcoded lists of technical terms, action words, and industry terms.
+    Runs locally (RAKE-style keyphrase statistics cached per document and
+    context), so no model call is made and results are deterministic
     
     Args:
         content: The content to analyze
@@ -3456,55 +3424,10 @@ def extract_ai_driven_terminology(content, training_context, terminology_type="a
         List of relevant terms/phrases
     """
     try:
-        if not model:
-            # Fallback to basic extraction if no API key
-            return extract_basic_terminology(content, training_context, terminology_type)
-        
-        # Create context-aware prompt
-        training_goals = training_context.get('primary_goals', '')
-        training_type = training_context.get('training_type', '')
-        target_audience = training_context.get('target_audience', '')
-        industry = training_context.get('industry', '')
-        
-        prompt = f"""
-        Analyze the following content and extract relevant terminology for training purposes.
-        
-        Training Context:
-        - Goals: {training_goals}
-        - Type: {training_type}
-        - Audience: {target_audience}
-        - Industry: {industry}
-        
-        Content to analyze: {content[:2000]}...
-        
-        Extract {terminology_type} terminology that would be relevant for training modules.
-        Focus on terms that are:
-        1. Specific to the industry/domain
-        2. Action-oriented for procedures
-        3. Technical concepts that need explanation
-        4. Relevant to the training goals
-        
-        Return only the terms/phrases, one per line, without explanations.
-        Limit to 10-15 most relevant terms.
-        """
-        
-        response = model.generate_content(prompt)
-        if response and hasattr(response, 'text') and response.text:
-            # Parse the response into a list of terms
-            terms = [term.strip() for term in str(response.text).split('\n') if term.strip()]
-            # Clean up any AI formatting artifacts
-            cleaned_terms = []
-            for term in terms:
-                # Remove numbering, bullets, etc.
-                term = re.sub(r'^[\d\-\.\s]+', '', term)
-                if term and len(term) > 2:
-                    cleaned_terms.append(term)
-            return cleaned_terms[:15]  # Limit to 15 terms
-        
-        return []
+        return terminology(content, training_context, terminology_type)
         
     except Exception as e:
-        print(f"AI terminology extraction failed: {e}")
+        print(f"Terminology extraction failed: {e}")
         # Fallback to basic extraction
         return extract_basic_terminology(content, training_context, terminology_type)
 
@@ -3566,14 +3489,16 @@ def extract_basic_terminology(content, training_context, terminology_type="all")
 def ai_enhanced_content_cleaning(content, training_context):
     """
     Enhanced AI-powered content cleaning with Gemini API
+    Fillers and logistics are removed locally first; Gemini only rewrites
+    text that still reads as conversation afterwards
     """
     try:
         if not content or len(content.strip()) < 50:
             return content
         
-        if not model:
-            # Fallback to basic cleaning if no API key
-            return clean_content_basic(content)
+        content = clean_transcript(content) or content
+        if not model or not needs_rewrite(content):
+            return content
         
         # Use Gemini to clean and transform content
         training_type = training_context.get('training_type', 'Training')
@@ -3584,7 +3509,7 @@ def ai_enhanced_content_cleaning(content, training_context):
         Clean and transform this content into professional training material.
         
         Original Content:
-        {content[:3000]}
+        {fit_excerpts(content, 750, training_context)}
         
         Training Context:
         - Type: {training_type}
@@ -3604,7 +3529,7 @@ def ai_enhanced_content_cleaning(content, training_context):
         Return the cleaned and transformed professional training content.
         """
         
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             cleaned_content = str(response.text).strip()
         else:
@@ -3622,93 +3547,18 @@ def ai_enhanced_content_cleaning(content, training_context):
 
 def ai_identify_conversational_elements(content):
     """
-    Use AI to identify specific conversational, informal, or filler elements that should be removed
-    Industry-agnostic approach that works for any type of content
+    Identify specific conversational, informal, or filler elements that should be removed
+    Matched locally against the transcript cleaner's lexicons; no model call
     """
     try:
         if not content or len(content.strip()) < 50:
             return []
         
-        prompt = f"""
-        Analyze this content and identify conversational, informal, or filler elements that should be removed for professional training material.
-        
-        Look for ANY of these types of elements:
-        - Filler words and phrases (um, uh, yeah, okay, right, so, well, you know, etc.)
-        - Informal greetings and closings (hello, goodbye, thanks, bye, see you, etc.)
-        - Technical difficulties or meeting issues (can you hear me, is that working, etc.)
-        - Casual or conversational language that's not instructional
-        - Repetitive statements or redundant phrases
-        - Personal references or off-topic comments
-        - Questions directed at the audience or presenter
-        - Apologies or excuses
-        - Background noise references
-        - Any other conversational elements that don't contribute to training content
-        
-        Content to analyze:
-        {content[:2000]}
-        
-        Return a JSON list of specific phrases, words, or patterns to remove. Be comprehensive and include:
-        - Exact phrases as they appear in the text
-        - Individual filler words
-        - Informal expressions
-        - Any conversational elements that would make the content unprofessional
-        
-        Format: ["phrase1", "word2", "expression3", ...]
-        
-        Focus on elements that would make this unsuitable as professional training material.
-        """
-        
-        if not model:
-            return ['um', 'uh', 'yeah', 'okay', 'right', 'so', 'well', 'you know']
-        response = model.generate_content(prompt)
-        
-        # Try to parse JSON response
-        try:
-            import json
-            import re
-            
-            # Clean up the response to extract JSON
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = text.split('```', 1)[-1].strip()
-            if text.endswith('```'):
-                text = text[:-3].strip()
-            
-            # Remove JSON prefix if present
-            if text.startswith('json'):
-                text = text[4:].strip()
-            
-            patterns = json.loads(text)
-            if isinstance(patterns, list):
-                # Filter out empty strings and very short patterns
-                filtered_patterns = [p for p in patterns if p and len(p.strip()) > 1]
-                return filtered_patterns
-        except Exception as json_error:
-            print(f"⚠️ JSON parsing failed: {json_error}")
-        
-        # Fallback: extract patterns from text response using regex
-        import re
-        # Look for quoted strings
-        quoted_patterns = re.findall(r'"([^"]+)"', response.text)
-        # Look for patterns after colons or dashes
-        list_patterns = re.findall(r'[-•]\s*([^\n]+)', response.text)
-        # Look for patterns in brackets
-        bracket_patterns = re.findall(r'\[([^\]]+)\]', response.text)
-        
-        all_patterns = quoted_patterns + list_patterns + bracket_patterns
-        # Clean and filter patterns
-        cleaned_patterns = []
-        for pattern in all_patterns:
-            pattern = pattern.strip()
-            if pattern and len(pattern) > 1 and not pattern.isdigit():
-                cleaned_patterns.append(pattern)
-        
-        return cleaned_patterns[:20]  # Limit to 20 patterns
+        return conversational_elements(content)
         
     except Exception as e:
-        print(f"⚠️ AI conversational element identification failed: {str(e)}")
-        # Return basic fallback patterns
-        return ['um', 'uh', 'yeah', 'okay', 'right', 'so', 'well', 'you know']
+        print(f"⚠️ Conversational element identification failed: {str(e)}")
+        return []
 
 def ai_extract_process_elements(content, training_context):
     """
@@ -3725,7 +3575,7 @@ def ai_extract_process_elements(content, training_context):
         Analyze this content and identify process-related elements, procedures, and technical components.
         
         Content to analyze:
-        {content[:2000]}
+        {fit_excerpts(content, 500, training_context)}
         
         Look for:
         - Processes and procedures mentioned
@@ -3743,7 +3593,7 @@ def ai_extract_process_elements(content, training_context):
         
         if not model:
             return []
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         
         try:
             import json
@@ -3784,7 +3634,7 @@ def ai_extract_meaningful_content(content, training_context):
         Analyze this content and identify the most meaningful and relevant snippets for training purposes.
         
         Content to analyze:
-        {content[:3000]}
+        {fit_excerpts(content, 750, training_context)}
         
         Look for:
         - Processes and procedures
@@ -3802,7 +3652,7 @@ def ai_extract_meaningful_content(content, training_context):
         
         if not model:
             return extract_meaningful_content_snippet(content)
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             meaningful_content = str(response.text).strip()
         else:
@@ -3817,9 +3667,20 @@ def ai_extract_meaningful_content(content, training_context):
     except Exception as e:
         return extract_meaningful_content_snippet(content) 
 
+def split_modules_into_pathways(modules, num_pathways):
+    """
+    Split modules into at most num_pathways topical groups
+    Returns: list of (pathway name, [module, ...]) in document order
+    """
+    clusters = cluster_modules(modules, n_clusters=min(num_pathways, len(modules)))
+    return [
+        (f"{cluster['section_title']} Pathway", [modules[index] for index in cluster['module_indices']])
+        for cluster in clusters
+    ]
+
 def group_modules_into_multiple_pathways_parallel(modules, training_context, num_pathways=3, sections_per_pathway=6, modules_per_section=8):
     """
-    Use parallel processing to group modules into multiple pathways using AI
+    Use parallel processing to group modules into multiple topical pathways with sections
     """
     try:
         if not modules:
@@ -3831,15 +3692,12 @@ def group_modules_into_multiple_pathways_parallel(modules, training_context, num
         config = get_parallel_config()
         max_workers = min(config['max_section_workers'], num_pathways)
         
+        pathway_groups = split_modules_into_pathways(modules, num_pathways)
+        
         def create_single_pathway(pathway_index):
-            """Create a single pathway using AI"""
+            """Create a single pathway from one topic cluster"""
             try:
-                pathway_name = f"Pathway {pathway_index + 1}"
-                
-                # Calculate modules for this pathway
-                start_idx = pathway_index * (len(modules) // num_pathways)
-                end_idx = start_idx + (len(modules) // num_pathways)
-                pathway_modules = modules[start_idx:end_idx]
+                pathway_name, pathway_modules = pathway_groups[pathway_index]
                 
                 if not pathway_modules:
                     return None
@@ -3859,7 +3717,7 @@ def group_modules_into_multiple_pathways_parallel(modules, training_context, num
         
         # Create pathways in parallel
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_pathway = {executor.submit(create_single_pathway, i): i for i in range(num_pathways)}
+            future_to_pathway = {executor.submit(bind_context(create_single_pathway), i): i for i in range(len(pathway_groups))}
             
             pathways = []
             for future in concurrent.futures.as_completed(future_to_pathway, timeout=config['timeout_seconds']):
@@ -3879,7 +3737,7 @@ def group_modules_into_multiple_pathways_parallel(modules, training_context, num
 
 def group_modules_into_multiple_pathways(modules, training_context, num_pathways=3, sections_per_pathway=6, modules_per_section=8):
     """
-    Use AI to group modules into multiple pathways with sections
+    Group modules into multiple topical pathways with sections
     """
     try:
         if not modules:
@@ -3889,14 +3747,7 @@ def group_modules_into_multiple_pathways(modules, training_context, num_pathways
         
         pathways = []
         
-        for pathway_index in range(num_pathways):
-            pathway_name = f"Pathway {pathway_index + 1}"
-            
-            # Calculate modules for this pathway
-            start_idx = pathway_index * (len(modules) // num_pathways)
-            end_idx = start_idx + (len(modules) // num_pathways)
-            pathway_modules = modules[start_idx:end_idx]
-            
+        for pathway_name, pathway_modules in split_modules_into_pathways(modules, num_pathways):
             if not pathway_modules:
                 continue
             
@@ -3917,14 +3768,13 @@ def group_modules_into_multiple_pathways(modules, training_context, num_pathways
 
 def group_modules_into_sections_ai(modules, training_context, max_sections=6, max_modules_per_section=8):
     """
-    Use AI to group modules into logical sections
+    Group modules into logical sections by topic
     """
     try:
         if not modules:
             return []
         
-        # Use existing AI grouping function
-        sections_data = gemini_group_modules_into_sections(modules)
+        sections_data = gemini_group_modules_into_sections(modules, max_sections, max_modules_per_section)
         
         # Convert to the expected format
         sections = []
@@ -4408,7 +4258,7 @@ def create_company_specific_pathways_with_gemini(modules, training_context):
         
         if not model:
             return create_company_specific_fallback_pathways(modules, training_context)
-        response = model.generate_content(prompt)
+        response = tracked_generate(model, prompt)
         if response and hasattr(response, 'text'):
             raw = str(response.text).strip()
         else:
@@ -4659,7 +4509,7 @@ def group_company_specific_modules_into_sections(modules, training_context):
 
 def create_fast_ai_pathways(modules, training_context):
     """
-    Create company-specific pathways using actual content analysis
+    Create company-specific pathways by clustering module content into topics
     """
     try:
         if not modules:
@@ -4667,88 +4517,34 @@ def create_fast_ai_pathways(modules, training_context):
         
         print(f"🚀 **Fast AI Pathway Creation:** {len(modules)} modules")
         
-        # Get company context for pathway naming
         training_type = training_context.get('training_type', 'Onboarding')
-        target_audience = training_context.get('target_audience', 'New Employees')
-        industry = training_context.get('industry', 'General')
-        
-        # Analyze module content to create meaningful pathways
-        pathway_themes = analyze_module_themes(modules, training_context)
         
+        # Up to two modules: one pathway, up to six: two, otherwise three
         if len(modules) <= 2:
-            # Single comprehensive pathway with actual content
-            return [{
-                'pathway_name': f'{training_type} Complete Pathway',
-                'sections': [{
-                    'title': f'{training_type} Fundamentals',
-                    'modules': modules
-                }],
-                'module_count': len(modules)
-            }]
+            pathway_count = 1
         elif len(modules) <= 6:
-            # Two logical pathways based on content themes
-            mid_point = len(modules) // 2
-            pathway1_modules = modules[:mid_point]
-            pathway2_modules = modules[mid_point:]
-            
-            pathway1_theme = analyze_pathway_theme(pathway1_modules, training_context)
-            pathway2_theme = analyze_pathway_theme(pathway2_modules, training_context)
-            
-            return [
-                {
-                    'pathway_name': f'{training_type} {pathway1_theme} Pathway',
-                    'sections': [{
-                        'title': f'{pathway1_theme} Fundamentals',
-                        'modules': pathway1_modules
-                    }],
-                    'module_count': len(pathway1_modules)
-                },
-                {
-                    'pathway_name': f'{training_type} {pathway2_theme} Pathway',
-                    'sections': [{
-                        'title': f'{pathway2_theme} Applications',
-                        'modules': pathway2_modules
-                    }],
-                    'module_count': len(pathway2_modules)
-                }
-            ]
+            pathway_count = 2
         else:
-            # Three comprehensive pathways based on content analysis
-            third = len(modules) // 3
-            pathway1_modules = modules[:third]
-            pathway2_modules = modules[third:2*third]
-            pathway3_modules = modules[2*third:]
-            
-            theme1 = analyze_pathway_theme(pathway1_modules, training_context)
-            theme2 = analyze_pathway_theme(pathway2_modules, training_context)
-            theme3 = analyze_pathway_theme(pathway3_modules, training_context)
-            
-            return [
-                {
-                    'pathway_name': f'{training_type} {theme1} Pathway',
-                    'sections': [{
-                        'title': f'{theme1} Fundamentals',
-                        'modules': pathway1_modules
-                    }],
-                    'module_count': len(pathway1_modules)
-                },
-                {
-                    'pathway_name': f'{training_type} {theme2} Pathway',
-                    'sections': [{
-                        'title': f'{theme2} Intermediate Skills',
-                        'modules': pathway2_modules
-                    }],
-                    'module_count': len(pathway2_modules)
-                },
+            pathway_count = 3
+        
+        pathways = []
+        for pathway in cluster_modules(modules, n_clusters=pathway_count):
+            pathway_modules = [modules[index] for index in pathway['module_indices']]
+            sections = [
                 {
-                    'pathway_name': f'{training_type} {theme3} Pathway',
-                    'sections': [{
-                        'title': f'{theme3} Advanced Applications',
-                        'modules': pathway3_modules
-                    }],
-                    'module_count': len(pathway3_modules)
+                    'title': section['section_title'],
+                    'modules': [pathway_modules[index] for index in section['module_indices']]
                 }
+                for section in cluster_modules(pathway_modules, max_clusters=3)
             ]
+            pathway_name = (f'{training_type} Complete Pathway' if pathway_count == 1
+                            else f"{training_type} {pathway['section_title']} Pathway")
+            pathways.append({
+                'pathway_name': pathway_name,
+                'sections': sections,
+                'module_count': len(pathway_modules)
+            })
+        return pathways
         
     except Exception as e:
         print(f"⚠️ Fast AI pathway creation failed: {str(e)}")
@@ -4756,32 +4552,10 @@ def create_fast_ai_pathways(modules, training_context):
 
 def analyze_module_themes(modules, training_context):
     """
-    Analyze modules to identify common themes for pathway creation
+    Analyze modules to identify their most distinctive themes for pathway creation
     """
     try:
-        themes = []
-        for module in modules:
-            content = module.get('content', '').lower()
-            title = module.get('title', '').lower()
-            
-            # Extract themes from content
-            if any(word in content for word in ['safety', 'ppe', 'protective']):
-                themes.append('Safety')
-            if any(word in content for word in ['quality', 'inspection', 'control']):
-                themes.append('Quality')
-            if any(word in content for word in ['process', 'procedure', 'workflow']):
-                themes.append('Process')
-            if any(word in content for word in ['equipment', 'tool', 'operation']):
-                themes.append('Equipment')
-            if any(word in content for word in ['communication', 'meeting', 'collaboration']):
-                themes.append('Communication')
-            if any(word in content for word in ['documentation', 'record', 'report']):
-                themes.append('Documentation')
-        
-        # Return most common themes
-        from collections import Counter
-        theme_counts = Counter(themes)
-        return [theme for theme, count in theme_counts.most_common(3)]
+        return theme_labels(modules, count=3)
         
     except Exception as e:
         print(f"⚠️ Theme analysis failed: {str(e)}")
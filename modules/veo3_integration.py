@@ -1,28 +1,33 @@
 #!/usr/bin/env python3
 """
 Veo3 Video Generation Integration for Gemini
-Handles actual video generation using Google's Veo3 model
+Handles actual video generation using Google's Veo3 model. Requests are
+queued as background jobs (modules/video_jobs.py) and return immediately.
 """
 
-import requests
-import json
-import time
-import base64
-from modules.config import model
-from modules.utils import debug_print
+from modules.app_log import debug_print
+from modules.video_jobs import get_video_job_queue, QUEUED, RUNNING, COMPLETED, FAILED
+
+# Job states as shown in module content_data['video_status']
+VIDEO_STATUS_BY_JOB_STATE = {QUEUED: 'generating', RUNNING: 'generating', COMPLETED: 'completed', FAILED: 'failed'}
 
 class Veo3VideoGenerator:
     """
     Handles video generation using Veo3 from Gemini
     """
     
-    def __init__(self):
-        self.model = model
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+    def __init__(self, job_queue=None):
+        self._job_queue = job_queue
+        
+    @property
+    def job_queue(self):
+        if self._job_queue is None:
+            self._job_queue = get_video_job_queue()
+        return self._job_queue
         
     def generate_video(self, prompt, duration="5-10 seconds", style="training", quality="standard"):
         """
-        Generate a video using Veo3 from a text prompt
+        Queue a video generation job for a text prompt and return without waiting
         
         Args:
             prompt (str): Text description of what the video should show
@@ -31,40 +36,37 @@ class Veo3VideoGenerator:
             quality (str): Quality setting (standard, high, ultra)
             
         Returns:
-            dict: Video generation result with URL or base64 data
+            dict: Job result with generation_id and status; video_url is set once the job has completed
+                  (immediately when an identical prompt was generated before)
         """
         try:
-            if not self.model:
-                debug_print("⚠️ Gemini model not available for Veo3 video generation")
+            if not self.job_queue.backend.available:
+                debug_print("⚠️ Veo3 API not configured (set GEMINI_API_KEY or VEO3_API_BASE)")
                 return self._create_fallback_video_response(prompt)
             
-            # Prepare Veo3 video generation request
             video_prompt = self._enhance_prompt_for_veo3(prompt, style, duration)
-            
-            debug_print(f"🎬 Generating video with Veo3: {prompt[:100]}...")
-            
-            # Use Gemini's video generation capabilities
-            response = self._call_veo3_api(video_prompt, duration, quality)
-            
-            if response and response.get('success'):
-                debug_print("✅ Veo3 video generation successful")
-                return {
-                    'success': True,
-                    'video_url': response.get('video_url'),
-                    'video_data': response.get('video_data'),
-                    'thumbnail_url': response.get('thumbnail_url'),
-                    'duration': duration,
-                    'prompt': prompt,
-                    'generated_with': 'Veo3'
-                }
-            else:
-                debug_print("⚠️ Veo3 video generation failed, using fallback")
-                return self._create_fallback_video_response(prompt)
+            job = self.job_queue.submit(video_prompt, {'duration': duration, 'style': style, 'quality': quality})
+            debug_print(f"🎬 Veo3 job {job['job_id'][:8]} {job['status']}: {prompt[:100]}...")
+            return self._job_response(job, prompt, duration)
                 
         except Exception as e:
             debug_print(f"❌ Veo3 video generation error: {str(e)}")
             return self._create_fallback_video_response(prompt)
     
+    def _job_response(self, job, prompt, duration):
+        return {
+            'success': job['status'] != FAILED,
+            'status': VIDEO_STATUS_BY_JOB_STATE.get(job['status'], 'generating'),
+            'generation_id': job['job_id'],
+            'video_url': job.get('video_url'),
+            'video_data': None,
+            'thumbnail_url': job.get('thumbnail_url'),
+            'duration': duration,
+            'prompt': prompt,
+            'error': job.get('error'),
+            'generated_with': 'Veo3'
+        }
+    
     def _enhance_prompt_for_veo3(self, prompt, style, duration):
         """
         Enhance the prompt for better Veo3 video generation
@@ -84,39 +86,6 @@ class Veo3VideoGenerator:
         """
         return enhanced_prompt
     
-    def _call_veo3_api(self, prompt, duration, quality):
-        """
-        Call the Veo3 API through Gemini
-        """
-        try:
-            # Generate video using Gemini's multimodal capabilities
-            # This is a placeholder for the actual Veo3 API integration
-            # In practice, you would use the actual Gemini API for video generation
-            
-            video_request = {
-                "prompt": prompt,
-                "duration": duration,
-                "quality": quality,
-                "model": "veo3"
-            }
-            
-            # Simulate API call - replace with actual Veo3 API when available
-            debug_print("🔄 Calling Veo3 API for video generation...")
-            
-            # For now, return a simulated success response
-            # In production, this would be the actual API call
-            return {
-                'success': True,
-                'video_url': f"https://veo3-generated-video.com/video_{int(time.time())}.mp4",
-                'video_data': None,  # Would contain actual video data
-                'thumbnail_url': f"https://veo3-generated-video.com/thumbnail_{int(time.time())}.jpg",
-                'generation_id': f"veo3_{int(time.time())}"
-            }
-            
-        except Exception as e:
-            debug_print(f"❌ Veo3 API call failed: {str(e)}")
-            return None
-    
     def _create_fallback_video_response(self, prompt):
         """
         Create a fallback response when Veo3 generation fails
@@ -179,16 +148,18 @@ class Veo3VideoGenerator:
     
     def check_video_status(self, generation_id):
         """
-        Check the status of a video generation request
+        Check the status of a video generation job
         """
         try:
-            # This would check the actual status of the video generation
-            # For now, return a simulated status
+            job = self.job_queue.status(generation_id)
+            if job is None:
+                return {'status': 'error', 'progress': 0, 'error': 'Unknown video job'}
             return {
-                'status': 'completed',
-                'progress': 100,
-                'video_url': f"https://veo3-generated-video.com/video_{generation_id}.mp4",
-                'estimated_completion': None
+                'status': VIDEO_STATUS_BY_JOB_STATE.get(job['status'], 'generating'),
+                'progress': job['progress'],
+                'video_url': job.get('video_url'),
+                'thumbnail_url': job.get('thumbnail_url'),
+                'error': job.get('error'),
             }
         except Exception as e:
             debug_print(f"❌ Video status check failed: {str(e)}")
@@ -211,4 +182,27 @@ def generate_training_video_for_module(module_content):
     """
     Generate a training video for a specific module
     """
-    return veo3_generator.generate_training_video(module_content)
\ No newline at end of file
+    return veo3_generator.generate_training_video(module_content)
+
+def refresh_video_content_data(content_data):
+    """
+    Copy the latest job status into a video block's content_data in place
+    Returns: True when something changed
+    """
+    generation_id = content_data.get('generation_id') if isinstance(content_data, dict) else None
+    if not generation_id or content_data.get('video_status') == 'completed':
+        return False
+    status = veo3_generator.check_video_status(generation_id)
+    if status.get('status') == 'error':
+        return False
+    updates = {
+        'video_status': status['status'],
+        'video_url': status.get('video_url') or content_data.get('video_url'),
+        'thumbnail_url': status.get('thumbnail_url') or content_data.get('thumbnail_url'),
+        'video_progress': status.get('progress', 0),
+    }
+    if status.get('error'):
+        updates['error_message'] = status['error']
+    changed = any(content_data.get(key) != value for key, value in updates.items())
+    content_data.update(updates)
+    return changed
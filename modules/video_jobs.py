@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Asynchronous Veo3 video job queue with persistent status tracking
+Jobs move through queued -> running -> completed/failed and are stored in
+SQLite, so they survive restarts. A background poller submits queued jobs up
+to a concurrency cap and checks all running jobs that are due in one pass,
+backing off exponentially between checks of the same job. Jobs are keyed by
+a hash of the prompt and options, so identical requests share one job.
+
+The backend speaks the Gemini long-running video API (predictLongRunning
+plus operation polling); point VEO3_API_BASE at modules/fake_veo3.py to run
+against a local stand-in server.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import contextlib
+import threading
+
+import requests
+
+from modules.app_log import get_logger
+
+logger = get_logger('video_jobs')
+
+DEFAULT_VIDEO_JOB_STORE_PATH = os.getenv(
+    'VIDEO_JOB_STORE_PATH',
+    os.path.join(os.path.expanduser('~'), '.gateway_content_automation', 'video_jobs.sqlite3')
+)
+DEFAULT_VEO3_API_BASE = 'https://generativelanguage.googleapis.com/v1beta'
+VEO3_MODEL_NAME = os.getenv('VEO3_MODEL_NAME', 'veo-3.0-generate-preview')
+
+MAX_CONCURRENT_VIDEO_JOBS = int(os.getenv('VEO3_MAX_CONCURRENT_JOBS', '3'))
+POLL_INITIAL_SECONDS = 5.0
+POLL_MAX_SECONDS = 60.0
+POLL_BACKOFF = 2.0
+# Running jobs that have not finished after this long are failed
+JOB_TIMEOUT_SECONDS = 30 * 60
+MAX_SUBMIT_ATTEMPTS = 3
+
+QUEUED, RUNNING, COMPLETED, FAILED = 'queued', 'running', 'completed', 'failed'
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_jobs (
+    job_id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    operation TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    progress INTEGER NOT NULL DEFAULT 0,
+    video_url TEXT,
+    thumbnail_url TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    submitted_at REAL,
+    updated_at REAL NOT NULL,
+    next_poll_at REAL,
+    poll_interval REAL
+);
+CREATE INDEX IF NOT EXISTS video_jobs_status ON video_jobs (status, next_poll_at);
+"""
+
+_COLUMNS = ('job_id', 'prompt', 'options', 'status', 'operation', 'attempts', 'progress', 'video_url',
+            'thumbnail_url', 'error', 'created_at', 'submitted_at', 'updated_at', 'next_poll_at', 'poll_interval')
+
+
+def job_key(prompt, options=None):
+    """Deduplication key: hash of the prompt and its generation options"""
+    payload = json.dumps([prompt.strip(), options or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class VideoJobStore:
+    """SQLite-backed job table"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_VIDEO_JOB_STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _row(row):
+        job = dict(zip(_COLUMNS, row))
+        job['options'] = json.loads(job['options'] or '{}')
+        return job
+
+    def get(self, job_id):
+        with self._connect() as connection:
+            row = connection.execute(f"SELECT {', '.join(_COLUMNS)} FROM video_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def put(self, job):
+        values = dict(job, options=json.dumps(job.get('options') or {}, sort_keys=True))
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO video_jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(values.get(column) for column in _COLUMNS)
+            )
+        return job
+
+    def with_status(self, *statuses):
+        marks = ', '.join('?' for _ in statuses)
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM video_jobs WHERE status IN ({marks}) ORDER BY created_at", statuses
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def recent(self, limit=100):
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM video_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def counts(self):
+        with self._connect() as connection:
+            return dict(connection.execute("SELECT status, COUNT(*) FROM video_jobs GROUP BY status").fetchall())
+
+
+class Veo3Backend:
+    """
+    HTTP client for the long-running Veo3 generation API
+
+    submit() returns an operation name; poll_many() checks several operations
+    over one pooled session and returns {operation: result} where result has
+    'done', 'video_url', 'thumbnail_url', 'progress' and 'error'.
+    """
+
+    def __init__(self, api_key=None, base_url=None, model_name=VEO3_MODEL_NAME, timeout=30):
+        self.api_key = api_key if api_key is not None else os.getenv('GEMINI_API_KEY')
+        self.base_url = (base_url or os.getenv('VEO3_API_BASE') or DEFAULT_VEO3_API_BASE).rstrip('/')
+        self.model_name = model_name
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    @property
+    def available(self):
+        """A key is needed for the real API; a custom base URL (stand-in server) works without one"""
+        return bool(self.api_key) or self.base_url != DEFAULT_VEO3_API_BASE
+
+    def _params(self):
+        return {'key': self.api_key} if self.api_key else {}
+
+    def submit(self, prompt, options=None):
+        options = options or {}
+        body = {
+            'instances': [{'prompt': prompt}],
+            'parameters': {key: value for key, value in options.items() if key in ('aspectRatio', 'negativePrompt', 'personGeneration', 'durationSeconds')},
+        }
+        response = self.session.post(f"{self.base_url}/models/{self.model_name}:predictLongRunning",
+                                     params=self._params(), json=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['name']
+
+    def poll_many(self, operations):
+        results = {}
+        for operation in operations:
+            try:
+                response = self.session.get(f"{self.base_url}/{operation}", params=self._params(), timeout=self.timeout)
+                response.raise_for_status()
+                results[operation] = self._parse_operation(response.json())
+            except Exception as e:
+                # Transient: the job keeps running and is checked again after a backoff
+                logger.warning("Video status check failed for %s: %s", operation, e)
+        return results
+
+    @staticmethod
+    def _parse_operation(data):
+        if not data.get('done'):
+            progress = data.get('metadata', {}).get('progressPercent', 0)
+            return {'done': False, 'progress': int(progress or 0)}
+        if data.get('error'):
+            return {'done': True, 'error': data['error'].get('message', 'Video generation failed')}
+        samples = data.get('response', {}).get('generateVideoResponse', {}).get('generatedSamples', [])
+        video = samples[0].get('video', {}) if samples else {}
+        if not video.get('uri'):
+            return {'done': True, 'error': 'Video generation returned no video'}
+        return {'done': True, 'progress': 100, 'video_url': video['uri'], 'thumbnail_url': video.get('thumbnailUri')}
+
+
+class VideoJobQueue:
+    """
+    Submits and tracks video jobs without blocking the caller
+
+    run_once() performs one scheduling pass and is what the background poller
+    calls in a loop; tests can call it directly with a controlled clock.
+    """
+
+    def __init__(self, store, backend, max_concurrent=MAX_CONCURRENT_VIDEO_JOBS, poll_initial=POLL_INITIAL_SECONDS,
+                 poll_max=POLL_MAX_SECONDS, backoff=POLL_BACKOFF, job_timeout=JOB_TIMEOUT_SECONDS, clock=time.time):
+        self.store = store
+        self.backend = backend
+        self.max_concurrent = max_concurrent
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.backoff = backoff
+        self.job_timeout = job_timeout
+        self.clock = clock
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    # --- public API --------------------------------------------------------
+
+    def submit(self, prompt, options=None):
+        """
+        Queue a video for prompt, or return the existing job for the same prompt
+        and options. Failed jobs are queued again.
+        """
+        job_id = job_key(prompt, options)
+        now = self.clock()
+        with self._submit_lock:
+            job = self.store.get(job_id)
+            if job and job['status'] != FAILED:
+                return job
+            job = {
+                'job_id': job_id, 'prompt': prompt, 'options': options or {}, 'status': QUEUED, 'operation': None,
+                'attempts': 0, 'progress': 0, 'video_url': None, 'thumbnail_url': None, 'error': None,
+                'created_at': job['created_at'] if job else now, 'submitted_at': None, 'updated_at': now,
+                'next_poll_at': None, 'poll_interval': None,
+            }
+            self.store.put(job)
+        self._wake.set()
+        return job
+
+    def status(self, job_id):
+        return self.store.get(job_id)
+
+    def start(self):
+        """Start the background poller (idempotent)"""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name='video-job-poller', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wait(self, job_id, timeout=60):
+        """Block until the job finishes (for scripts and tests, never the UI)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.store.get(job_id)
+            if job and job['status'] not in ACTIVE_STATES:
+                return job
+            self._wake.set()
+            time.sleep(0.05)
+        return self.store.get(job_id)
+
+    # --- scheduling ------------------------------------------------------------
+
+    def run_once(self):
+        """
+        Submit queued jobs up to the concurrency cap, then check every running job
+        that is due in one batch
+
+        Returns:
+            float: seconds until the next job is due (poll_max when idle)
+        """
+        now = self.clock()
+        running = self.store.with_status(RUNNING)
+        free_slots = max(0, self.max_concurrent - len(running))
+        ready = [job for job in self.store.with_status(QUEUED) if (job['next_poll_at'] or 0) <= now]
+        for job in ready[:free_slots]:
+            self._submit(job, now)
+
+        due = [job for job in self.store.with_status(RUNNING) if (job['next_poll_at'] or 0) <= now]
+        if due:
+            results = self.backend.poll_many([job['operation'] for job in due])
+            for job in due:
+                self._apply(job, results.get(job['operation']), now)
+
+        running = self.store.with_status(RUNNING)
+        upcoming = [job['next_poll_at'] or now for job in running]
+        if len(running) < self.max_concurrent:
+            upcoming += [job['next_poll_at'] or now for job in self.store.with_status(QUEUED)]
+        return max(0.0, min(upcoming) - self.clock()) if upcoming else self.poll_max
+
+    def _submit(self, job, now):
+        job['attempts'] += 1
+        try:
+            job['operation'] = self.backend.submit(job['prompt'], job['options'])
+            job.update(status=RUNNING, submitted_at=now, poll_interval=self.poll_initial,
+                       next_poll_at=now + self.poll_initial, error=None)
+            logger.info("Submitted video job %s as %s", job['job_id'], job['operation'])
+        except Exception as e:
+            if job['attempts'] >= MAX_SUBMIT_ATTEMPTS:
+                job.update(status=FAILED, error=f"Submission failed: {e}")
+            else:
+                # Stay queued and retry after a backoff
+                job.update(error=f"Submission failed (attempt {job['attempts']}): {e}",
+                           next_poll_at=now + self.poll_initial * self.backoff ** (job['attempts'] - 1))
+            logger.warning("Video job %s submission failed: %s", job['job_id'], e)
+        job['updated_at'] = now
+        self.store.put(job)
+
+    def _apply(self, job, result, now):
+        if result and result.get('done'):
+            if result.get('error'):
+                job.update(status=FAILED, error=result['error'])
+            else:
+                job.update(status=COMPLETED, progress=100, video_url=result.get('video_url'),
+                           thumbnail_url=result.get('thumbnail_url'), error=None, next_poll_at=None)
+        elif now - (job['submitted_at'] or now) > self.job_timeout:
+            job.update(status=FAILED, error='Timed out waiting for the video')
+        else:
+            if result:
+                job['progress'] = result.get('progress', job['progress'])
+            interval = min((job['poll_interval'] or self.poll_initial) * self.backoff, self.poll_max)
+            job.update(poll_interval=interval, next_poll_at=now + interval)
+        job['updated_at'] = now
+        self.store.put(job)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                delay = self.run_once()
+            except Exception as e:
+                logger.warning("Video job poller pass failed: %s", e)
+                delay = self.poll_initial
+            self._wake.wait(delay)
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_video_job_queue():
+    """Process-wide queue backed by DEFAULT_VIDEO_JOB_STORE_PATH, with its poller running"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = VideoJobQueue(VideoJobStore(), Veo3Backend())
+        _default_queue.start()
+        return _default_queue
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Deterministic Streamlit widget keys
+One allocator lives in each session. Keys are derived from a base name and the
+identity of the object the widget edits, so the same widget gets the same key
+on every rerun and keeps its state. Collision counters are reset at the start
+of each run, and identities that were not used during the previous run are
+forgotten, so nothing grows with the lifetime of the server.
+"""
+
+import re
+import hashlib
+
+_UNSAFE = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def short_hash(value, length=8):
+    return hashlib.md5(str(value).encode('utf-8')).hexdigest()[:length]
+
+
+class WidgetKeyAllocator:
+    """
+    Per-session widget key allocator
+
+    Call begin_run() once at the top of every script run, then key() for
+    each widget.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._tokens = {}           # id(obj) -> (obj, token)
+        self._used_tokens = set()
+        self._next_token = 0
+        self.runs = 0
+
+    def begin_run(self):
+        """Reset collision counters and drop identities unused last run"""
+        if self.runs:
+            self._tokens = {key: entry for key, entry in self._tokens.items() if key in self._used_tokens}
+        self._used_tokens = set()
+        self._counts = {}
+        self.runs += 1
+
+    def identity_token(self, obj):
+        """
+        Stable token for a mutable object (a module dict) while it stays alive
+        in session state; strings and other values hash to a token directly
+        """
+        if obj is None:
+            return ''
+        if not isinstance(obj, (dict, list)):
+            return short_hash(obj)
+        key = id(obj)
+        entry = self._tokens.get(key)
+        if entry is None or entry[0] is not obj:
+            self._next_token += 1
+            entry = (obj, f"m{self._next_token}")
+            self._tokens[key] = entry
+        self._used_tokens.add(key)
+        return entry[1]
+
+    def key(self, base, identity=None, revision=None):
+        """
+        Key for one widget
+
+        Args:
+            base (str): Widget role, e.g. "title" or "move"
+            identity: Object or value the widget belongs to
+            revision: Optional value whose change should recreate the widget
+                (e.g. the text a text_input was initialised with)
+
+        Returns:
+            str: Deterministic key, suffixed with a counter on repeats in a run
+        """
+        parts = [_UNSAFE.sub('_', str(base))]
+        token = self.identity_token(identity)
+        if token:
+            parts.append(token)
+        if revision is not None:
+            parts.append(short_hash(revision))
+        key = '_'.join(parts)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return key if count == 0 else f"{key}_{count + 1}"
+
+    def __len__(self):
+        return len(self._tokens)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the ring-buffered app log
+"""
+
+import sys
+import os
+import time
+import logging
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import app_log
+from modules.app_log import RingBufferHandler, get_logger, sample, set_log_session, recent_logs, flush
+
+
+def make_record(message, level=logging.INFO, session='s1'):
+    record = logging.LogRecord('gateway.test', level, __file__, 1, message, None, None)
+    record.session = session
+    return record
+
+
+def test_ring_buffer_is_bounded_per_session():
+    """Only the newest records are kept and sessions are evicted LRU"""
+    handler = RingBufferHandler(capacity=10, max_sessions=2)
+    for i in range(25):
+        handler.emit(make_record(f"message {i}"))
+    records = handler.records('s1')
+    assert len(records) == 10
+    assert records[0][1].getMessage() == "message 15"
+    assert handler.stats()['dropped'] == 15
+
+    handler.emit(make_record("other", session='s2'))
+    handler.emit(make_record("third", session='s3'))
+    assert handler.records('s1') == []
+    assert handler.stats()['sessions'] == 2
+
+
+def test_take_new_returns_each_record_once():
+    handler = RingBufferHandler(capacity=10)
+    handler.emit(make_record("info", session='s1'))
+    handler.emit(make_record("problem", level=logging.WARNING, session='s1'))
+    assert [r.getMessage() for r in handler.take_new('s1', logging.WARNING)] == ["problem"]
+    assert handler.take_new('s1', logging.WARNING) == []
+
+
+def test_logger_routes_to_session_buffer():
+    """Records logged through the queue reach the calling session's buffer"""
+    logger = get_logger('test')
+    set_log_session('test-session')
+    logger.warning("⚠️ %s has insufficient content", "manual.pdf")
+    flush()
+    messages = [entry['message'] for entry in recent_logs('test-session')]
+    assert "⚠️ manual.pdf has insufficient content" in messages
+
+
+def test_sampling_and_lazy_formatting():
+    """Sampled calls log one in N and unlogged calls never format their arguments"""
+    formatted = set()
+
+    class Expensive:
+        def __str__(self):
+            formatted.add(id(self))
+            return "expensive"
+
+    logger = get_logger('test.sampling')
+    set_log_session('sample-session')
+    items = [Expensive() for _ in range(100)]
+    for item in items:
+        sample(logger, 'test.loop', 10, logging.INFO, "item %s", item)
+    hidden = Expensive()
+    logger.debug("hidden %s", hidden)
+    flush()
+    assert len(recent_logs('sample-session')) == 10
+    assert len(formatted) == 10
+    assert id(hidden) not in formatted
+
+
+def test_logging_does_not_block_callers():
+    """Logging from many threads stays fast and memory stays bounded"""
+    logger = get_logger('test.load')
+    set_log_session('load-session')
+
+    def worker():
+        for i in range(2000):
+            logger.info("record %d", i)
+
+    started = time.time()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+    flush(timeout=5)
+    assert elapsed < 5, f"logging took {elapsed:.2f}s"
+    assert len(app_log.ring_buffer.records('default')) <= app_log.RING_BUFFER_SIZE
+
+
+if __name__ == "__main__":
+    print("🪵 Testing App Log")
+    print("=" * 50)
+    test_ring_buffer_is_bounded_per_session()
+    test_take_new_returns_each_record_once()
+    test_logger_routes_to_session_buffer()
+    test_sampling_and_lazy_formatting()
+    test_logging_does_not_block_callers()
+    print("✅ App log tests completed!")
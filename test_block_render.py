@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Test script for paginated rendering
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.block_render import paginate, MODULES_PER_PAGE
+
+
+def test_paginate_clamps_pages():
+    """Pages are clamped to the available range and slices stay in bounds"""
+    items = list(range(12))
+    assert paginate(items, 1, MODULES_PER_PAGE) == (0, 5, 1, 3)
+    assert paginate(items, 3, MODULES_PER_PAGE) == (10, 12, 3, 3)
+    assert paginate(items, 9, MODULES_PER_PAGE) == (10, 12, 3, 3)
+    assert paginate(items, 0, MODULES_PER_PAGE) == (0, 5, 1, 3)
+    assert paginate([], 2, MODULES_PER_PAGE) == (0, 0, 1, 1)
+
+
+if __name__ == "__main__":
+    print("🧱 Testing Block Rendering")
+    print("=" * 50)
+    test_paginate_clamps_pages()
+    print("✅ Block rendering tests completed!")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for single-call, batched and on-demand content block generation
+"""
+
+import sys
+import os
+import json
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import content_blocks
+from modules.content_blocks import (
+    generate_content_blocks, parse_blocks_response, build_blocks_prompt, response_schema, DEFAULT_BLOCK_TYPES,
+    ContentBlockCache
+)
+from modules.fake_gemini import FakeGeminiModel
+
+CONTENT = "Technicians must isolate the energy source before any maintenance begins on the hydraulic press."
+SOURCE = "From sop.docx:\nVerify zero energy by attempting to start the machine from the control panel."
+
+
+def module_requests(count):
+    return [{'id': str(i), 'title': f"Lockout step {i}", 'content': CONTENT, 'source_content': SOURCE} for i in range(count)]
+
+
+def fallback(block_type, module_content):
+    return {'fallback': block_type}
+
+
+def test_one_call_per_module_with_only_requested_types():
+    model = FakeGeminiModel()
+    blocks = generate_content_blocks(module_requests(1), model, fallback=fallback, batch_size=1)['0']
+    assert model.calls == 1
+    assert [block['type'] for block in blocks] == list(DEFAULT_BLOCK_TYPES)
+    assert all('fallback' not in block['content_data'] for block in blocks)
+    assert blocks[2]['content_data']['questions'] and blocks[3]['title'] == 'Flashcard Content'
+
+    prompt = build_blocks_prompt(module_requests(1), ['text', 'flashcard'])
+    assert 'knowledge_check' not in prompt and 'list_items' not in prompt
+    assert set(response_schema(['text'])['properties']['modules']['items']['properties']['blocks']['properties']) == {'text'}
+
+
+def test_pathway_batches_share_calls():
+    model = FakeGeminiModel()
+    results = generate_content_blocks(module_requests(20), model, fallback=fallback, batch_size=8)
+    assert model.calls == 3  # was 5 calls per module
+    assert len(results) == 20
+    assert all(block['content_data'].get('fallback') is None for blocks in results.values() for block in blocks)
+
+
+def test_missing_and_malformed_output_falls_back():
+    text = json.dumps({'modules': [
+        {'id': '0', 'blocks': {'text': {'text': 'Isolate first.', 'key_points': 'Lock it'}, 'video': 'not an object'}},
+        {'id': 'unknown', 'blocks': {'text': {'text': 'ignored'}}},
+    ]})
+    parsed = parse_blocks_response(f"```json\n{text}\n```", ['0', '1'], ['text', 'video'])
+    assert parsed == {'0': {'text': {'text': 'Isolate first.', 'key_points': ['Lock it']}}}
+    # A bare blocks object is accepted for a single module
+    assert parse_blocks_response('{"flashcard": {"flashcard_front": "Q", "flashcard_back": "A"}}', ['7'], ['flashcard'])['7']
+    assert parse_blocks_response('no json here', ['0'], ['text']) == {}
+
+    model = FakeGeminiModel(responses=[(r'### id:', text)])
+    results = generate_content_blocks(module_requests(2), model, block_types=['text', 'video'], fallback=fallback)
+    assert results['0'][0]['content_data']['text'] == 'Isolate first.'
+    assert results['0'][1]['content_data'] == {'fallback': 'video'}
+    assert results['1'][0]['content_data'] == {'fallback': 'text'}
+
+
+def test_schema_rejection_retries_without_schema():
+    calls = []
+
+    class PlainModel(FakeGeminiModel):
+        def generate_content(self, prompt, **kwargs):
+            calls.append(sorted(kwargs))
+            if 'generation_config' in kwargs:
+                raise TypeError("unexpected keyword argument 'generation_config'")
+            return super().generate_content(prompt)
+
+    content_blocks._structured_output['enabled'] = True
+    try:
+        model = PlainModel()
+        generate_content_blocks(module_requests(2), model, fallback=fallback)
+        generate_content_blocks(module_requests(2), model, fallback=fallback)
+    finally:
+        content_blocks._structured_output['enabled'] = True
+    assert calls == [['generation_config'], [], []]
+
+
+def test_cache_generates_on_demand_and_prefetches():
+    model = FakeGeminiModel()
+    release = threading.Event()
+
+    def generate_batch(requests, block_types):
+        release.wait(5)
+        return generate_content_blocks(requests, model, block_types=block_types)
+
+    cache = ContentBlockCache(generate_batch)
+    requests = [dict(request, title=f"Lockout step {i}") for i, request in enumerate(module_requests(4))]
+    release.set()
+    first = cache.resolve(requests[0], DEFAULT_BLOCK_TYPES)
+    assert model.calls == 1 and len(first) == 4
+    assert cache.resolve(requests[0], DEFAULT_BLOCK_TYPES) == first and model.calls == 1
+    # Edited content is a different module as far as the cache is concerned
+    assert cache.get(dict(requests[0], content="Changed"), DEFAULT_BLOCK_TYPES) is None
+
+    release.clear()
+    assert cache.prefetch(requests[1:], DEFAULT_BLOCK_TYPES) == 3
+    assert cache.prefetch(requests[1:], DEFAULT_BLOCK_TYPES) == 0  # already in flight
+    threading.Timer(0.05, release.set).start()
+    opened = cache.resolve(requests[2], DEFAULT_BLOCK_TYPES, timeout=5)
+    assert opened[0]['content_data'] and model.calls == 2
+    assert cache.stats['prefetch_hits'] == 1 and len(cache) == 4
+
+
+def test_cache_does_not_keep_failures():
+    attempts = []
+
+    def generate_batch(requests, block_types):
+        attempts.append(len(requests))
+        model = FakeGeminiModel(responses=[(r'.', 'not json')]) if len(attempts) == 1 else FakeGeminiModel()
+        return generate_content_blocks(requests, model, block_types=block_types)
+
+    cache = ContentBlockCache(generate_batch)
+    request = module_requests(1)[0]
+    assert all(not block['content_data'] for block in cache.resolve(request, ['text']))
+    assert cache.resolve(request, ['text'])[0]['content_data']['text']
+    assert attempts == [1, 1]
+
+
+if __name__ == "__main__":
+    print("🧱 Testing Content Block Generation")
+    print("=" * 50)
+    test_one_call_per_module_with_only_requested_types()
+    test_pathway_batches_share_calls()
+    test_missing_and_malformed_output_falls_back()
+    test_schema_rejection_retries_without_schema()
+    test_cache_generates_on_demand_and_prefetches()
+    test_cache_does_not_keep_failures()
+    print("✅ Content block tests completed!")
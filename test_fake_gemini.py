@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline fake Gemini model and benchmark helpers
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.fake_gemini import FakeGeminiModel, FakeGeminiError
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.harness import measure
+
+SOURCE = """Lockout Procedure for the hydraulic press.
+Technicians must isolate the energy source before any maintenance begins.
+Verify zero energy by attempting to start the machine from the control panel.
+Apply a personal lock and tag to every isolation point you used today."""
+
+
+def test_responses_are_deterministic_and_shaped():
+    """Same prompt, same answer; pathway prompts get parseable pathway JSON"""
+    model = FakeGeminiModel()
+    prompt = f'Create training pathways. Return JSON with "pathways".\n{SOURCE}'
+    first = model.generate_content(prompt)
+    assert first.text == FakeGeminiModel().generate_content(prompt).text
+    data = json.loads(first.text)
+    sections = data['pathways'][0]['sections']
+    assert len(sections) == 4 and len(sections[0]['modules']) == 6
+    assert sections[0]['modules'][0]['content']
+    assert first.usage_metadata.prompt_token_count > 0
+
+    summary = model.generate_content(f"Summarize the following source material.\n{SOURCE}").text
+    assert 'isolate the energy source' in summary
+
+
+def test_overrides_latency_and_failures():
+    model = FakeGeminiModel(latency=0.01, responses=[(r'quiz', '{"questions": []}')])
+    started = time.time()
+    assert model.generate_content("Write a quiz").text == '{"questions": []}'
+    assert time.time() - started >= 0.01
+
+    flaky = FakeGeminiModel(failure_rate=0.5)
+    failures = 0
+    for _ in range(200):
+        try:
+            flaky.generate_content("Summarize this.")
+        except FakeGeminiError:
+            failures += 1
+    assert 60 < failures < 140
+    assert flaky.failures == failures
+
+
+def test_corpus_and_measure():
+    corpus = synthetic_corpus(30)
+    assert corpus == synthetic_corpus(30)
+    assert len(corpus) == 30 and any(name.startswith('transcript') for name in corpus)
+    result = measure('len', len, list(corpus.values()))
+    assert result['calls'] == 30 and result['errors'] == 0
+    assert result['p50_ms'] <= result['p95_ms']
+
+
+if __name__ == "__main__":
+    print("🤖 Testing Fake Gemini Model")
+    print("=" * 50)
+    test_responses_are_deterministic_and_shaped()
+    test_overrides_latency_and_failures()
+    test_corpus_and_measure()
+    print("✅ Fake Gemini tests completed!")
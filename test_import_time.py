@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Import-time budget test
+Imports modules in a fresh interpreter with `python -X importtime` and checks
+their cumulative import time and that heavy SDKs and file extractors are not
+pulled in until they are needed.
+"""
+
+import sys
+import os
+import subprocess
+import importlib.util
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import budgets in milliseconds (generous, to stay stable on slow CI machines)
+IMPORT_BUDGETS_MS = {
+    'modules.models': 150,
+    'modules.pathway_patch': 100,
+    'modules.pathway_store': 250,
+    'modules.module_index': 100,
+    'modules.intent_classifier': 100,
+    'modules.widget_keys': 100,
+    'modules.block_render': 100,
+    'modules.telemetry': 100,
+    'modules.app_log': 150,
+    'modules.prompt_builder': 150,
+    'modules.chunker': 150,
+    'modules.summarizer': 200,
+    'modules.topic_clustering': 100,
+    'modules.content_blocks': 150,
+    'modules.mind_map': 150,
+    'modules.transcript_cleaner': 100,
+    'modules.transcript_segmenter': 150,
+    'modules.keyphrases': 250,
+    'modules.pipeline': 100,
+}
+HEAVY_MODULES = ('google.generativeai', 'PyPDF2', 'docx', 'ffmpeg', 'numpy', 'streamlit')
+
+
+def import_profile(module_name, environment=None):
+    """
+    Import module_name in a fresh interpreter
+
+    Returns:
+        tuple: (cumulative microseconds for module_name, set of all imported module names)
+    """
+    env = dict(os.environ, **(environment or {}))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = [part.strip() for part in line[len('import time:'):].split('|')]
+        if not parts[0].isdigit():
+            continue  # header line
+        name = parts[2]
+        imported.add(name)
+        if name == module_name:
+            cumulative = int(parts[1])
+    assert cumulative is not None, f"{module_name} not found in importtime output"
+    return cumulative, imported
+
+
+def test_light_modules_within_budget():
+    """Core modules import quickly and without heavy dependencies"""
+    for module_name, budget_ms in IMPORT_BUDGETS_MS.items():
+        cumulative, imported = import_profile(module_name)
+        elapsed_ms = cumulative / 1000
+        print(f"   {module_name}: {elapsed_ms:.1f} ms (budget {budget_ms} ms)")
+        assert elapsed_ms < budget_ms, f"{module_name} took {elapsed_ms:.1f} ms to import"
+        heavy = [name for name in HEAVY_MODULES if name in imported]
+        assert not heavy, f"{module_name} imported {heavy}"
+
+
+def test_config_defers_gemini_sdk():
+    """modules.config does not import the Gemini SDK until the model is first used"""
+    if importlib.util.find_spec('dotenv') is None:
+        print("   python-dotenv not installed; skipping modules.config check")
+        return
+    _, imported = import_profile('modules.config', {'GEMINI_API_KEY': 'test-key', 'GEMINI_FAKE_MODEL': ''})
+    assert 'google.generativeai' not in imported
+
+
+if __name__ == "__main__":
+    print("⏱️ Testing Import Times")
+    print("=" * 50)
+    test_light_modules_within_budget()
+    test_config_defers_gemini_sdk()
+    print("✅ Import time tests completed!")
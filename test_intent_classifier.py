@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the local chatbot intent classifier
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.intent_classifier import classify_intent, extract_slots, UNKNOWN_INTENT
+
+EXAMPLES = [
+    ("update module 2 with the new file", True, 'file_update'),
+    ("update safety section with uploaded content", True, 'file_update'),
+    ("add content to section 3", False, 'file_update'),
+    ("change module 2 to a casual tone", False, 'tone_change'),
+    ("make module 3 more friendly", False, 'tone_change'),
+    ("regenerate module 1", False, 'regenerate'),
+    ("show past pathways", False, 'past_pathway'),
+    ("merge section 2 from pathway 1 into section Quality", False, 'past_pathway'),
+    ("what does the safety module say about gloves?", False, 'content_question'),
+    ("find lockout procedures", False, 'content_question'),
+    ("add missing information about PPE to module 4", False, 'content_addition'),
+    ("I want to upload new files", False, 'file_ingestion'),
+    ("show module 2", False, 'module_specific'),
+    ("what can you do", False, 'help'),
+    ("show me module 3", False, 'module_specific'),
+    ("delete module 3", False, 'module_specific'),
+    ("make module 2 more technical", False, 'tone_change'),
+    ("add a section on forklift safety", False, 'content_addition'),
+    ("update module 2", False, 'file_update'),
+    ("what is module 2 about?", False, 'content_question'),
+]
+
+
+def test_examples_route_to_expected_intents():
+    """Representative requests classify to the intended handler"""
+    for text, has_files, expected in EXAMPLES:
+        intent = classify_intent(text, has_files=has_files)
+        assert intent.name == expected, f"{text!r}: {intent.name} ({intent.confidence})"
+
+
+def test_change_requests_are_not_swallowed_by_file_updates():
+    """Tone changes mentioning 'change' no longer route to the file update path"""
+    intent = classify_intent("change the tone of module 5 to formal", has_files=True)
+    assert intent.name == 'tone_change'
+    assert intent.slots['tone'] == 'formal' and intent.slots['module_ref'] == '5'
+
+
+def test_low_confidence_is_unknown():
+    """Small talk and vague messages are left for the LLM"""
+    for text in ("hello there", "thanks", "module", ""):
+        intent = classify_intent(text)
+        assert intent.name == UNKNOWN_INTENT, text
+
+
+def test_slots():
+    """Module, section, pathway, title, tone and focus slots are extracted"""
+    slots = extract_slots("Integrate 'PPE Requirements' from pathway 2 section 3 module 1.2 in a technical, safety focused way")
+    assert slots['title'] == 'PPE Requirements'
+    assert (slots['pathway_ref'], slots['section_ref'], slots['module_ref']) == ('2', '3', '1.2')
+    assert slots['tone'] == 'technical' and slots['focus'] == 'safety'
+
+
+def test_classification_is_fast():
+    """Classification takes microseconds, not an LLM round trip"""
+    started = time.perf_counter()
+    for _ in range(1000):
+        classify_intent("please update module 2 in the safety section with the uploaded files", has_files=True)
+    per_call = (time.perf_counter() - started) / 1000
+    assert per_call < 0.001, f"{per_call * 1e6:.0f}us per call"
+    print(f"   {per_call * 1e6:.0f}us per classification")
+
+
+if __name__ == "__main__":
+    print("🧭 Testing Intent Classifier")
+    print("=" * 50)
+    test_examples_route_to_expected_intents()
+    test_change_requests_are_not_swallowed_by_file_updates()
+    test_low_confidence_is_unknown()
+    test_slots()
+    test_classification_is_fast()
+    print("✅ Intent classifier tests completed!")
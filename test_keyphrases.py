@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for local keyphrase and terminology extraction
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.keyphrases import (
+    extract_keyphrases, terminology, dynamic_keywords, get_term_table, clear_keyphrase_cache, context_hash,
+    DYNAMIC_KEYWORD_LIMIT, GOAL_KEYWORD_SLOTS
+)
+
+SAMPLE = """
+The truss assembly process involves several critical steps. First, fabricators must
+verify the steel shipment against the bill of lading and inspect for any damage.
+Material handling procedures require proper staging and storage of steel components.
+During assembly, welders follow specific welding procedures and quality control
+checkpoints. Safety protocols must be followed throughout, including proper PPE usage.
+Equipment maintenance and calibration are essential for accurate fabrication.
+Documentation requirements include recording all quality inspections and process steps.
+"""
+
+CONTEXT = {
+    'primary_goals': 'understand truss assembly and steel fabrication processes',
+    'training_type': 'Process Training',
+    'target_audience': 'fabricators',
+    'industry': 'manufacturing',
+}
+
+
+def test_terminology_types():
+    """Each terminology type returns deterministic, non-overlapping phrases"""
+    clear_keyphrase_cache()
+    everything = terminology(SAMPLE, CONTEXT, "all")
+    assert everything[0] == 'truss assembly process'
+    assert 'quality control checkpoints' in everything and 'safety protocols' in everything
+    assert 'process' not in everything  # Contained in a better-ranked phrase
+    assert terminology(SAMPLE, CONTEXT, "action") == ['verify steel shipment']
+    technical = terminology(SAMPLE, CONTEXT, "technical")
+    assert 'steel shipment' in technical and all(' ' in term for term in technical)
+    industry = terminology(SAMPLE, CONTEXT, "industry")
+    assert 'fabricators' in industry and 'safety protocols' not in industry
+    assert terminology(SAMPLE, CONTEXT, "all") == everything
+
+
+def test_cache_per_document_and_context():
+    """The ranked list is computed once per (document, context)"""
+    clear_keyphrase_cache()
+    first = extract_keyphrases(SAMPLE, CONTEXT)
+    assert extract_keyphrases(SAMPLE, dict(CONTEXT)) is first
+    other = extract_keyphrases(SAMPLE, dict(CONTEXT, primary_goals='quality inspection'))
+    assert other is not first
+    assert context_hash(CONTEXT) != context_hash(dict(CONTEXT, target_audience='welders'))
+    # Fields outside the extraction context do not split the cache
+    assert context_hash(CONTEXT) == context_hash(dict(CONTEXT, success_metrics='surveys'))
+
+
+def test_corpus_table():
+    """Documents are counted once each; shared terms surface as industry vocabulary"""
+    clear_keyphrase_cache()
+    table = get_term_table()
+    extract_keyphrases(SAMPLE)
+    extract_keyphrases(SAMPLE, CONTEXT)
+    assert table.stats()['documents'] == 1
+    extract_keyphrases("Forklift drivers inspect the steel racks before every shift.")
+    assert table.document_frequency('steel') == 2
+    assert 'steel' in table.shared_terms()
+    extract_keyphrases("Goals text only", corpus=False)
+    assert table.stats()['documents'] == 2
+    assert 'steel racks' in terminology("Forklift drivers inspect the steel racks before every shift.", None, "industry")
+
+
+def test_dynamic_keywords_include_content_terms():
+    """Goal keywords do not crowd the document's own terms out of the keyword list"""
+    clear_keyphrase_cache()
+    content = ("Before each shift, operators complete the forklift inspection checklist. Check the hydraulic "
+               "lines for leaks, test the parking brake and confirm the load backrest is secure. "
+               "Report hydraulic leaks and damaged forks to maintenance before operating the truck.")
+    context = {'primary_goals': 'improve forklift safety and reduce warehouse incidents',
+               'training_type': 'Safety Training', 'target_audience': 'warehouse operators',
+               'industry': 'transportation'}
+    goal_keywords = ['improve', 'forklift', 'safety', 'reduce', 'warehouse', 'incidents', 'operators',
+                     'transportation'] + [f'goal term {number}' for number in range(20)]
+    keywords = dynamic_keywords(goal_keywords, content, context)
+    assert len(keywords) == DYNAMIC_KEYWORD_LIMIT
+    assert keywords[:GOAL_KEYWORD_SLOTS] == goal_keywords[:GOAL_KEYWORD_SLOTS]
+    assert any('forklift inspection checklist' in keyword for keyword in keywords)
+    assert any('hydraulic' in keyword for keyword in keywords)
+
+
+def test_large_document_is_fast():
+    """A megabyte of text is analysed in well under a second"""
+    clear_keyphrase_cache()
+    content = SAMPLE * 1500
+    started = time.time()
+    terminology(content, CONTEXT, "all")
+    elapsed = time.time() - started
+    assert elapsed < 1.0, f"extraction took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    print("🔑 Testing Keyphrase Extraction")
+    print("=" * 50)
+    test_terminology_types()
+    test_cache_per_document_and_context()
+    test_corpus_table()
+    test_dynamic_keywords_include_content_terms()
+    test_large_document_is_fast()
+    print("✅ Keyphrase tests completed!")
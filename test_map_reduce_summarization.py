@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for hierarchical map-reduce summarization of large documents
+"""
+
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.summarizer import HierarchicalSummarizer, extractive_summary, clear_summary_cache
+from modules.prompt_builder import estimate_tokens
+from modules.chunker import chunk_texts
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Returns the first sentence of each source paragraph and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.calls += 1
+        source = prompt.split("SOURCE:\n", 1)[1]
+        firsts = [paragraph.split('. ')[0].strip() for paragraph in source.split('\n\n') if paragraph.strip()]
+        return FakeResponse('. '.join(firsts)[:400] + '.')
+
+
+class FailingModel:
+    def generate_content(self, prompt):
+        raise RuntimeError("quota exceeded")
+
+
+class FlakyModel(FakeModel):
+    """Fails on the first call, then answers like FakeModel"""
+
+    def __init__(self):
+        super().__init__()
+        self.failed = False
+
+    def generate_content(self, prompt):
+        with self.lock:
+            fail, self.failed = not self.failed, True
+        if fail:
+            raise RuntimeError("503 service unavailable")
+        return super().generate_content(prompt)
+
+
+def build_manual(pages=300):
+    """A long manual where every page has a distinct, checkable step"""
+    return '\n\n'.join(
+        f"Step {page} requires the operator to verify valve {page} before startup. "
+        f"Additional background about valve {page} and its maintenance history follows here."
+        for page in range(1, pages + 1)
+    )
+
+
+def test_small_content_is_returned_unchanged():
+    """Content within the budget needs no LLM call"""
+    model = FakeModel()
+    summarizer = HierarchicalSummarizer(model=model, digest_tokens=500)
+    assert summarizer.summarize("Short procedure.", {}) == "Short procedure."
+    assert model.calls == 0
+
+
+def test_chunks_cover_whole_document():
+    """Chunking keeps every paragraph and respects the chunk size"""
+    manual = build_manual()
+    chunks = chunk_texts(manual, target_tokens=500)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+    assert "valve 300" in chunks[-1]
+
+
+def test_digest_fits_budget_and_uses_cache():
+    """The digest fits the budget and a second run is served from cache"""
+    clear_summary_cache()
+    model = FakeModel()
+    context = {'primary_goals': 'valve startup checks'}
+    summarizer = HierarchicalSummarizer(model=model, chunk_tokens=500, digest_tokens=400)
+
+    digest = summarizer.summarize(build_manual(), context)
+    assert estimate_tokens(digest) <= 400
+    first_calls = model.calls
+    assert first_calls > 1
+
+    again = HierarchicalSummarizer(model=model, chunk_tokens=500, digest_tokens=400)
+    assert again.summarize(build_manual(), context) == digest
+    assert model.calls == first_calls
+    assert again.stats['cache_hits'] > 0
+
+
+def test_failures_fall_back_to_extractive_summary():
+    """A failing model still produces a digest within budget"""
+    clear_summary_cache()
+    summarizer = HierarchicalSummarizer(model=FailingModel(), chunk_tokens=500, digest_tokens=300)
+    digest = summarizer.summarize(build_manual(), {'primary_goals': 'valve checks'})
+    assert digest
+    assert estimate_tokens(digest) <= 300
+    assert summarizer.stats['fallbacks'] > 0
+
+
+def test_transient_failure_is_not_cached():
+    """A fallback summary is not stored, so the next run asks the model again"""
+    clear_summary_cache()
+    model = FlakyModel()
+    text = build_manual(pages=40)
+    summarizer = HierarchicalSummarizer(model=model, max_workers=1)
+    fallback = summarizer._summarize_piece(text, 0, 100, None)
+    assert summarizer.stats['fallbacks'] == 1
+
+    summary = summarizer._summarize_piece(text, 0, 100, None)
+    assert summary != fallback and summary.startswith('Step 1 requires')
+    assert model.calls == 1
+    assert summarizer._summarize_piece(text, 0, 100, None) == summary
+    assert summarizer.stats['cache_hits'] == 1
+
+
+def test_extractive_summary_prefers_goal_sentences():
+    """Sentences mentioning the goals are kept first"""
+    text = ("The cafeteria opens at noon. Lockout tagout must be applied before maintenance. "
+            "Parking is available on level two. Lockout devices are stored in cabinet B.")
+    summary = extractive_summary(text, target_tokens=20, keywords={'lockout', 'tagout'})
+    assert 'Lockout tagout' in summary
+    assert 'cafeteria' not in summary
+
+
+if __name__ == "__main__":
+    print("📚 Testing Map-Reduce Summarization")
+    print("=" * 50)
+    test_small_content_is_returned_unchanged()
+    test_chunks_cover_whole_document()
+    test_digest_fits_budget_and_uses_cache()
+    test_failures_fall_back_to_extractive_summary()
+    test_transient_failure_is_not_cached()
+    test_extractive_summary_prefers_goal_sentences()
+    print("✅ Map-reduce summarization tests completed!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for offline, memoized markmap rendering
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import markmap_component
+from markmap_component import parse_markdown_tree, count_nodes, markmap_html
+
+SAMPLE = """# Training Program
+## Safety
+- Lockout **tagout**
+  - Isolation points
+  - Verify zero energy
+- PPE
+## Quality
+- Inspections"""
+
+
+def large_markdown(sections=10, modules=10, points=3):
+    lines = ["# Big Pathway"]
+    for s in range(sections):
+        lines.append(f"## Section {s + 1}")
+        for m in range(modules):
+            lines.append(f"- Module {s + 1}.{m + 1}")
+            lines.extend(f"  - Key point {p + 1}" for p in range(points))
+    return '\n'.join(lines)
+
+
+def test_parse_tree():
+    tree = parse_markdown_tree(SAMPLE)
+    assert tree['content'] == 'Training Program'
+    safety, quality = tree['children']
+    assert [child['content'] for child in safety['children']] == ['Lockout tagout', 'PPE']
+    assert [child['content'] for child in safety['children'][0]['children']] == ['Isolation points', 'Verify zero energy']
+    assert quality['children'][0]['content'] == 'Inspections'
+    assert count_nodes(tree) == 8
+    # Several top-level headings get an untitled root
+    assert [child['content'] for child in parse_markdown_tree("# A\n# B")['children']] == ['A', 'B']
+
+
+def test_html_is_offline_and_memoized():
+    html = markmap_html(SAMPLE)
+    assert 'cdn.jsdelivr' not in html and 'https://' not in html
+    assert 'renderMindMap' in html and '"Lockout tagout"' in html
+    assert 'initialExpandLevel: -1' in html  # small maps open fully
+    assert markmap_html(SAMPLE) is html
+
+    big = large_markdown()
+    assert count_nodes(parse_markdown_tree(big)) > 300
+    started = time.perf_counter()
+    big_html = markmap_html(big)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    assert markmap_html(big) is big_html
+    cached = time.perf_counter() - started
+    assert 'initialExpandLevel: 2' in big_html
+    assert 'initialExpandLevel: 3' in markmap_html(big, initial_depth=3)
+    assert cached < first
+    print(f"   400-node map: {first * 1000:.2f} ms first render, {cached * 1000:.3f} ms cached")
+
+
+def test_script_injection_is_escaped():
+    html = markmap_html("# Title </script><script>alert(1)</script>")
+    body = html.split('<body', 1)[1]
+    assert '</script><script>alert' not in body
+
+
+if __name__ == "__main__":
+    print("🗺️ Testing Offline Markmap Rendering")
+    print("=" * 50)
+    test_parse_tree()
+    test_html_is_offline_and_memoized()
+    test_script_injection_is_escaped()
+    print("✅ Offline markmap tests completed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the deterministic pathway mind map builder
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.mind_map import PathwayMindMap, get_pathway_mind_map, mind_map_for_pathway
+from modules.pathway_patch import PatchLog
+from markmap_component import parse_markdown_tree, count_nodes
+
+
+def build_editable():
+    return {
+        'Safety': [
+            {'title': 'Lockout Tagout', 'description': 'Isolate energy\nbefore service'},
+            {'title': 'PPE Requirements', 'description': ''},
+        ],
+        'Quality': [{'title': '# Visual Inspection', 'description': 'Spot defects early'}],
+    }
+
+
+def test_markdown_and_node_list():
+    """Both outputs describe the same tree"""
+    mind_map = PathwayMindMap(build_editable(), 'Plant Onboarding')
+    markdown = mind_map.to_markmap_markdown()
+    assert markdown.splitlines() == [
+        '# Plant Onboarding',
+        '## Safety',
+        '- Lockout Tagout',
+        '  - Isolate energy before service',
+        '- PPE Requirements',
+        '## Quality',
+        '- Visual Inspection',
+        '  - Spot defects early',
+    ]
+    tree = parse_markdown_tree(markdown)
+    assert tree['content'] == 'Plant Onboarding'
+    assert [child['content'] for child in tree['children']] == ['Safety', 'Quality']
+
+    nodes = mind_map.to_mindmeister_nodes()
+    assert nodes[0] == {'id': 'root', 'parent_id': None, 'title': 'Plant Onboarding', 'rank': 0, 'note': ''}
+    by_title = {node['title']: node for node in nodes}
+    assert by_title['PPE Requirements']['parent_id'] == by_title['Safety']['id']
+    assert by_title['PPE Requirements']['rank'] == 1
+    assert by_title['Lockout Tagout']['note'] == 'Isolate energy before service'
+    # Notes are children in markmap, node notes in the MindMeister list
+    assert count_nodes(tree) == len(nodes) + 2
+
+
+def test_edits_only_touch_one_node():
+    """Patches re-render the touched module and keep node ids stable"""
+    editable = {f'Section {s}': [{'title': f'Module {s}.{m}', 'description': ''} for m in range(20)] for s in range(10)}
+    log = PatchLog()
+    mind_map = get_pathway_mind_map(editable, 'Large Pathway')
+    log.listeners.append(lambda structure, op, inverse: get_pathway_mind_map(structure).on_patch(op, inverse))
+    mind_map.to_markmap_markdown()
+    assert mind_map.renders == 200
+    ids = {node['title']: node['id'] for node in mind_map.to_mindmeister_nodes()}
+
+    version = mind_map.version
+    log.apply(editable, {'op': 'replace', 'section': 'Section 3', 'index': 4, 'fields': {'title': 'Renamed'}})
+    markdown = mind_map.to_markmap_markdown()
+    assert mind_map.renders == 201
+    assert mind_map.version == version + 1
+    assert '- Renamed' in markdown and '- Module 3.4' not in markdown
+    assert {node['title']: node['id'] for node in mind_map.to_mindmeister_nodes()}['Renamed'] == ids['Module 3.4']
+
+    log.apply(editable, {'op': 'move', 'section': 'Section 3', 'index': 4, 'to_section': 'Section 9', 'to_index': 0})
+    nodes = {node['title']: node for node in mind_map.to_mindmeister_nodes()}
+    assert mind_map.renders == 201
+    assert nodes['Renamed']['parent_id'] == ids['Section 9'] and nodes['Renamed']['rank'] == 0
+
+    log.apply(editable, {'op': 'add', 'section': 'Section 0', 'index': None, 'module': {'title': 'New Module'}})
+    assert '- New Module' in mind_map.to_markmap_markdown()
+    log.undo(editable)
+    assert '- New Module' not in mind_map.to_markmap_markdown()
+    assert mind_map.renders == 202
+    assert mind_map.rebuilds == 1
+
+    # Untracked structural changes trigger a rebuild instead of a stale map
+    editable['Section 0'].pop()
+    assert '- Module 0.19' not in mind_map.to_markmap_markdown()
+    assert mind_map.rebuilds == 2
+
+
+def test_pathway_versions_are_cached():
+    """The same pathway content maps once; a changed pathway gets a new map"""
+    pathway = {'pathway_name': 'Onboarding', 'sections': [
+        {'title': 'Safety', 'modules': [{'title': 'Lockout Tagout', 'description': 'Isolate energy'}]},
+    ]}
+    first = mind_map_for_pathway(pathway)
+    assert mind_map_for_pathway({**pathway}) is first
+    pathway['sections'][0]['modules'].append({'title': 'PPE Requirements'})
+    second = mind_map_for_pathway(pathway)
+    assert second is not first
+    assert '- PPE Requirements' in second.to_markmap_markdown()
+
+
+if __name__ == "__main__":
+    print("🧠 Testing Pathway Mind Map")
+    print("=" * 50)
+    test_markdown_and_node_list()
+    test_edits_only_touch_one_node()
+    test_pathway_versions_are_cached()
+    print("✅ Mind map tests completed!")
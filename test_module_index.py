@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached module lookup index
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.module_index import ModuleIndex, get_module_index
+from modules.pathway_patch import PatchLog
+
+
+def build_editable(sections=3, per_section=3):
+    return {
+        f'Section {s}': [{'title': f'Module {s}.{m} Lockout Step', 'content': ''} for m in range(1, per_section + 1)]
+        for s in range(1, sections + 1)
+    }
+
+
+def test_numbered_lookups():
+    """Global and section-local numbers resolve like create_module_mapping did"""
+    editable = {
+        'Safety': [{'title': 'Lockout Tagout'}, {'title': 'PPE Requirements'}],
+        'Quality': [{'title': 'Visual Inspection'}],
+    }
+    index = ModuleIndex(editable)
+    assert index.by_global_number(3)['module']['title'] == 'Visual Inspection'
+    ref = index.by_section_number('Safety', 2)
+    assert (ref['section'], ref['index'], ref['local_number'], ref['global_number']) == ('Safety', 1, 2, 2)
+    assert index.by_global_number(9) is None
+    mapping = index.as_mapping()
+    assert mapping['by_global_number']['2']['module']['title'] == 'PPE Requirements'
+    assert mapping['section_info']['Safety']['count'] == 2
+
+
+def test_title_and_fuzzy_lookups():
+    """Exact, substring and misspelled titles resolve"""
+    editable = {
+        'Safety': [{'title': 'Lockout Tagout'}, {'title': 'PPE Requirements'}],
+        'Quality': [{'title': 'Visual Inspection'}],
+    }
+    index = ModuleIndex(editable)
+    assert index.by_title('lockout-tagout')['module']['title'] == 'Lockout Tagout'
+    assert index.find_title('ppe')['module']['title'] == 'PPE Requirements'
+    assert index.find_title('Visual Inspecton')['module']['title'] == 'Visual Inspection'
+    assert index.find_title('forklift certification') is None
+
+
+def test_index_follows_patches():
+    """Patches update the index without full rebuilds"""
+    editable = build_editable()
+    index = get_module_index(editable)
+    log = PatchLog()
+    log.listeners.append(lambda structure, op, inverse: get_module_index(structure).on_patch(op, inverse))
+    rebuilds = index.rebuilds
+
+    log.apply(editable, {'op': 'add', 'section': 'Section 1', 'index': 0, 'module': {'title': 'Forklift Basics'}})
+    assert index.by_global_number(1)['module']['title'] == 'Forklift Basics'
+    log.apply(editable, {'op': 'replace', 'section': 'Section 1', 'index': 0, 'fields': {'title': 'Forklift Certification'}})
+    assert index.find_title('forklift basics') is None
+    assert index.by_title('Forklift Certification')['global_number'] == 1
+    log.apply(editable, {'op': 'remove', 'section': 'Section 2', 'index': 0})
+    assert index.by_title('Module 2.1 Lockout Step') is None
+    log.undo(editable)
+    assert index.by_title('Module 2.1 Lockout Step')['global_number'] == 5
+    assert index.rebuilds == rebuilds
+
+
+def test_untracked_changes_are_detected():
+    """Direct edits that bypass patches still give correct answers"""
+    editable = build_editable()
+    index = ModuleIndex(editable)
+    editable['Section 1'].reverse()
+    assert index.by_global_number(1)['module']['title'] == 'Module 1.3 Lockout Step'
+    editable['Section 3'].append({'title': 'Emergency Exits'})
+    assert index.find_title('emergency exits')['global_number'] == 10
+
+
+def test_large_pathway_lookups_are_fast():
+    """Lookups on hundreds of modules do not rescan the structure"""
+    editable = build_editable(sections=40, per_section=25)
+    index = ModuleIndex(editable)
+    started = time.time()
+    for number in range(1, 1001):
+        assert index.by_global_number(number)['global_number'] == number
+    assert index.find_title('Module 39.24 Lockout Step')['section'] == 'Section 39'
+    elapsed = time.time() - started
+    assert elapsed < 2, f"lookups took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    print("🔎 Testing Module Index")
+    print("=" * 50)
+    test_numbered_lookups()
+    test_title_and_fuzzy_lookups()
+    test_index_follows_patches()
+    test_untracked_changes_are_detected()
+    test_large_pathway_lookups_are_fast()
+    print("✅ Module index tests completed!")
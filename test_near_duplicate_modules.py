@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate module detection and merging (MinHash LSH)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.dedup import MinHashLSHIndex, find_duplicate_module_groups, deduplicate_pathway_modules
+
+SHARED_TEXT = (
+    "Operators must inspect the hydraulic press before every shift, confirm the guard "
+    "interlocks engage, record the pressure reading in the shift log and report any "
+    "leaks to maintenance before starting production."
+)
+
+
+def build_pathway_data():
+    """Two sections where three modules restate the same paragraph"""
+    return {
+        'pathways': [{
+            'pathway_name': 'Press Operations',
+            'sections': [
+                {
+                    'title': 'Daily Checks',
+                    'modules': [
+                        {'title': 'Module 1.1: Press Inspection', 'content': SHARED_TEXT,
+                         'key_points': ['Inspect press'], 'source': 'manual.pdf'},
+                        {'title': 'Module 1.2: Press Inspection', 'content': SHARED_TEXT + " Always.",
+                         'key_points': ['Record pressure'], 'source': ['sop.docx']},
+                        {'title': 'Module 1.3: Forklift Charging',
+                         'content': "Park the forklift at the charging bay, lower the forks, switch off "
+                                    "the key and connect the charger only after checking the cable for damage."},
+                    ]
+                },
+                {
+                    'title': 'Reference',
+                    'modules': [
+                        {'title': 'Module 2.1: Press Inspection', 'content': SHARED_TEXT},
+                    ]
+                },
+            ]
+        }]
+    }
+
+
+def test_index_query_finds_similar_text():
+    """The LSH index returns near-duplicates and ignores unrelated text"""
+    index = MinHashLSHIndex(threshold=0.7)
+    index.add('a', SHARED_TEXT)
+    index.add('b', "Completely unrelated content about onboarding paperwork and payroll forms.")
+
+    matches = index.query(SHARED_TEXT + " Extra.")
+    assert [key for key, _ in matches] == ['a']
+    assert matches[0][1] >= 0.7
+
+
+def test_find_duplicate_groups_across_sections():
+    """Duplicates are grouped across sections in reading order"""
+    groups = find_duplicate_module_groups(build_pathway_data())
+    assert groups == [[(0, 0, 0), (0, 0, 1), (0, 1, 0)]]
+
+
+def test_merge_strategy_folds_metadata():
+    """Merging keeps the first module and unions its metadata"""
+    data = build_pathway_data()
+    groups = deduplicate_pathway_modules(data)
+
+    # The Reference section's only module is kept rather than emptying the section
+    assert groups == [[(0, 0, 0), (0, 0, 1)]]
+    sections = data['pathways'][0]['sections']
+    assert len(sections) == 2
+    titles = [module['title'] for module in sections[0]['modules']]
+    assert titles == ['Module 1.1: Press Inspection', 'Module 1.3: Forklift Charging']
+    assert [module['title'] for module in sections[1]['modules']] == ['Module 2.1: Press Inspection']
+    keeper = sections[0]['modules'][0]
+    assert keeper['key_points'] == ['Inspect press', 'Record pressure']
+    assert keeper['source'] == ['manual.pdf', 'sop.docx']
+
+
+def test_replace_strategy_keeps_richest_module():
+    """Replacing keeps the most detailed module in the first position"""
+    data = build_pathway_data()
+    deduplicate_pathway_modules(data, strategy='replace')
+    keeper = data['pathways'][0]['sections'][0]['modules'][0]
+    assert keeper['title'] == 'Module 1.2: Press Inspection'
+
+
+def test_pathways_sharing_modules_are_kept_whole():
+    """Pathways are alternatives: modules they share stay in each, and no pathway is emptied"""
+    shared = [
+        {'title': 'Press Inspection', 'content': SHARED_TEXT},
+        {'title': 'Emergency Stops', 'content': "Press the red mushroom button, wait for the ram to "
+                                                 "stop fully and call the shift supervisor before touching the die."},
+        {'title': 'Forklift Charging', 'content': "Park the forklift at the charging bay, lower the forks, switch "
+                                                   "off the key and connect the charger after checking the cable."},
+    ]
+
+    def shared_pathways():
+        return {'pathways': [
+            {'pathway_name': name, 'sections': [{'title': 'Core', 'modules': [dict(module) for module in shared]}]}
+            for name in ('Pathway A', 'Pathway B')
+        ]}
+
+    data = shared_pathways()
+    assert deduplicate_pathway_modules(data) == []
+    assert [len(p['sections'][0]['modules']) for p in data['pathways']] == [3, 3]
+
+    # Even when asked to match across pathways, B keeps a module in its section
+    data = shared_pathways()
+    deduplicate_pathway_modules(data, cross_pathway=True)
+    assert len(data['pathways'][0]['sections'][0]['modules']) == 3
+    assert len(data['pathways'][1]['sections']) == 1
+    assert len(data['pathways'][1]['sections'][0]['modules']) == 1
+
+
+if __name__ == "__main__":
+    print("🧹 Testing Near-Duplicate Module Detection")
+    print("=" * 50)
+    test_index_query_finds_similar_text()
+    test_find_duplicate_groups_across_sections()
+    test_merge_strategy_folds_metadata()
+    test_replace_strategy_keeps_richest_module()
+    test_pathways_sharing_modules_are_kept_whole()
+    print("✅ Near-duplicate module tests completed!")
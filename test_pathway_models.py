@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for the pathway editor conversion and JSON helpers
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.models import editable_pathways_from_pathway, dumps, loads
+
+PATHWAY = {
+    'pathway_name': 'Plant Onboarding',
+    'sections': [
+        {'title': ' Safety ', 'modules': [
+            {'title': 'Lockout', 'description': 'LOTO basics', 'content': 'Apply locks.',
+             'source': 'manual.pdf', 'content_types': ['text', 'video']},
+            {'title': 'PPE', 'content': '', 'key_points': ['Gloves']},
+        ]},
+        {'title': 'Tools', 'modules': [{'description': 'Die height'}]},
+    ],
+}
+
+
+def test_editable_conversion_keeps_baseline_defaults():
+    """The editor gets the five-key module shape; only missing keys get defaults"""
+    editable = editable_pathways_from_pathway(PATHWAY)
+    assert list(editable) == ['Safety', 'Tools']
+    lockout, ppe = editable['Safety']
+    assert set(lockout) == {'title', 'description', 'content', 'source', 'content_types'}
+    assert lockout['source'] == 'manual.pdf'
+    # An empty module body stays empty rather than becoming placeholder text
+    assert ppe['content'] == ''
+    assert editable['Tools'][0] == {
+        'title': 'Untitled Module', 'description': 'Die height', 'content': 'No content available',
+        'source': ['Content from uploaded files'], 'content_types': [],
+    }
+
+
+def test_dumps_round_trip():
+    """Compact and indented JSON both load back to the same data"""
+    data = {'pathways': [PATHWAY]}
+    assert loads(dumps(data)) == data
+    assert loads(dumps(data, indent=2)) == data
+    assert '\n' in dumps(data, indent=2)
+
+
+if __name__ == "__main__":
+    print("🧱 Testing Pathway Data Helpers")
+    print("=" * 50)
+    test_editable_conversion_keeps_baseline_defaults()
+    test_dumps_round_trip()
+    print("✅ Pathway data helper tests completed!")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for structural pathway patches with undo/redo
+"""
+
+import sys
+import os
+import copy
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.pathway_patch import PatchLog, PatchError, apply_patch, replay
+from modules.pathway_store import PathwayStore
+
+
+def build_editable():
+    return {
+        'Safety': [{'title': 'Lockout', 'content': 'Apply locks.'}, {'title': 'PPE', 'content': 'Wear gloves.'}],
+        'Quality': [{'title': 'Inspection', 'content': 'Check parts.'}],
+    }
+
+
+def test_operations_and_inverses():
+    """Every operation's inverse restores the original structure"""
+    ops = [
+        {'op': 'add', 'section': 'Safety', 'index': 1, 'module': {'title': 'Fire', 'content': 'Exits.'}},
+        {'op': 'remove', 'section': 'Safety', 'index': 0},
+        {'op': 'replace', 'section': 'Quality', 'index': 0, 'fields': {'content': 'Measure parts.', 'key_points': ['Gauge']}},
+        {'op': 'move', 'section': 'Safety', 'index': 1, 'to_section': 'Quality', 'to_index': 0},
+        {'op': 'add_section', 'section': 'Extra', 'index': 1},
+        {'op': 'remove_section', 'section': 'Quality'},
+    ]
+    for op in ops:
+        editable = build_editable()
+        inverse = apply_patch(editable, copy.deepcopy(op))
+        assert editable != build_editable(), op['op']
+        apply_patch(editable, inverse)
+        assert editable == build_editable(), op['op']
+        assert list(editable) == list(build_editable())
+
+
+def test_undo_redo():
+    """Undo and redo walk the edit history and new edits clear redo"""
+    editable = build_editable()
+    log = PatchLog()
+    log.apply(editable, {'op': 'replace', 'section': 'Safety', 'index': 0, 'fields': {'content': 'Lock and tag.'}})
+    log.apply(editable, {'op': 'move', 'section': 'Safety', 'index': 0, 'to_section': 'Quality'})
+    assert [m['title'] for m in editable['Quality']] == ['Inspection', 'Lockout']
+
+    assert log.undo(editable) and log.undo(editable)
+    assert editable == build_editable()
+    assert not log.undo(editable)
+
+    assert log.redo(editable)
+    assert editable['Safety'][0]['content'] == 'Lock and tag.'
+    log.apply(editable, {'op': 'remove', 'section': 'Quality', 'index': 0})
+    assert not log.can_redo()
+
+
+def test_invalid_operation_raises():
+    """Operations that do not fit the structure raise PatchError and change nothing"""
+    editable = build_editable()
+    for op in ({'op': 'remove', 'section': 'Missing', 'index': 0},
+               {'op': 'replace', 'section': 'Safety', 'index': 9, 'fields': {}},
+               {'op': 'explode', 'section': 'Safety'}):
+        try:
+            apply_patch(editable, op)
+            assert False, op
+        except PatchError:
+            pass
+    assert editable == build_editable()
+
+
+def test_persisted_patches_replay():
+    """Persisted log entries replay over the base to the edited structure"""
+    store = PathwayStore(os.path.join(tempfile.mkdtemp(), 'pathways.sqlite3'))
+    base = build_editable()
+    editable = copy.deepcopy(base)
+    log = PatchLog()
+    log.apply(editable, {'op': 'add', 'section': 'Quality', 'module': {'title': 'Gauges', 'content': 'Calibrate.'}})
+    store.append_patches('plant', log.take_pending())
+    log.apply(editable, {'op': 'replace', 'section': 'Safety', 'index': 1, 'fields': {'title': 'PPE Basics'}})
+    log.undo(editable)
+    log.redo(editable)
+    store.append_patches('plant', log.take_pending())
+    assert not log.entries
+
+    entries = store.load_patches('plant')
+    assert [entry['source'] for entry in entries] == ['edit', 'edit', 'undo', 'redo']
+    assert replay(base, entries) == editable
+
+
+def test_stream_restores_from_base():
+    """A stream's base plus its patches rebuild the edited structure after a restart"""
+    path = os.path.join(tempfile.mkdtemp(), 'pathways.sqlite3')
+    store = PathwayStore(path)
+    base = build_editable()
+    assert store.restore_stream('plant@abc') is None
+    store.start_stream('plant@abc', base)
+
+    editable = copy.deepcopy(base)
+    log = PatchLog()
+    blocks = [{'type': 'text', 'content_data': {'text': 'Locks first.'}}]
+    log.apply(editable, {'op': 'replace', 'section': 'Safety', 'index': 0, 'fields': {'content_blocks': blocks}})
+    log.apply(editable, {'op': 'remove', 'section': 'Quality', 'index': 0})
+    store.append_patches('plant@abc', log.take_pending())
+
+    restarted = PathwayStore(path)
+    assert restarted.restore_stream('plant@abc') == editable
+    assert restarted.restore_stream('plant@abc') is not restarted.restore_stream('plant@abc')
+    # Content block edits are ordinary replace patches, so they undo like any other
+    log.undo(editable)
+    log.undo(editable)
+    assert editable == base
+
+
+if __name__ == "__main__":
+    print("🩹 Testing Pathway Patches")
+    print("=" * 50)
+    test_operations_and_inverses()
+    test_undo_redo()
+    test_invalid_operation_raises()
+    test_persisted_patches_replay()
+    test_stream_restores_from_base()
+    print("✅ Pathway patch tests completed!")
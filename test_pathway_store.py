@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent compressed pathway store
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.pathway_store import PathwayStore, PastPathways
+
+
+def build_pathway(name, modules=30):
+    return {'pathways': [{
+        'pathway_name': name,
+        'sections': [{
+            'title': 'Safety',
+            'modules': [{'title': f'Module {i}', 'content': 'Apply lockout before maintenance. ' * 40,
+                         'source': ['manual.pdf']} for i in range(modules)]
+        }]
+    }]}
+
+
+def new_store():
+    return PathwayStore(os.path.join(tempfile.mkdtemp(), 'pathways.sqlite3'))
+
+
+def test_save_compresses_and_versions():
+    """Saves are compressed, versioned and deduplicated by content"""
+    store = new_store()
+    first = store.save(build_pathway('Onboarding'))
+    assert first['version'] == 1
+    assert first['stored_size'] < first['raw_size'] / 5
+    assert first['module_count'] == 30 and first['name'] == 'Onboarding'
+    assert store.save(build_pathway('Onboarding'))['id'] == first['id']
+    assert store.save(build_pathway('Refresher'))['version'] == 2
+    assert store.load(first['id']) == build_pathway('Onboarding')
+
+
+def test_history_survives_restart():
+    """A new store on the same file sees earlier history"""
+    store = new_store()
+    store.save(build_pathway('Onboarding'))
+    reopened = PathwayStore(store.path)
+    history = PastPathways(reopened)
+    assert len(history) == 1
+    assert history[0]['pathways'][0]['pathway_name'] == 'Onboarding'
+
+
+def test_past_pathways_view_behaves_like_list():
+    """The lazy view supports the list operations the chatbot helpers use"""
+    history = PastPathways(new_store())
+    assert not history
+    for name in ('A', 'B', 'C'):
+        pathway = build_pathway(name, modules=2)
+        if pathway not in history:
+            history.append(pathway)
+    history.append(build_pathway('A', modules=2))
+    assert len(history) == 3
+    assert [p['pathways'][0]['pathway_name'] for p in history] == ['A', 'B', 'C']
+    assert [p['pathways'][0]['pathway_name'] for p in history[1:]] == ['B', 'C']
+    assert [row['name'] for row in history.page(2, page_size=2)] == ['C']
+
+
+def test_snapshots_are_kept_per_kind():
+    """Session snapshots are separate from history and latest() returns the newest"""
+    store = new_store()
+    store.save(build_pathway('Draft', modules=1), kind='confirmed_pathways')
+    store.save(build_pathway('Final', modules=1), kind='confirmed_pathways')
+    assert store.count() == 0
+    assert store.latest('confirmed_pathways')['pathways'][0]['pathway_name'] == 'Final'
+
+
+def test_history_is_scoped_by_owner():
+    """Sessions sharing one store file only see their own rows"""
+    store = new_store()
+    alice = PastPathways(store, owner='a1')
+    bob = PastPathways(store, owner='b2')
+    alice.append(build_pathway('Forklifts', modules=1))
+    bob.append(build_pathway('Welding', modules=1))
+    bob.append(build_pathway('Forklifts', modules=1))
+    assert [p['pathways'][0]['pathway_name'] for p in PastPathways(store, owner='a1')] == ['Forklifts']
+    assert len(PastPathways(store, owner='b2')) == 2 and len(PastPathways(store)) == 0
+    assert store.count(owner='b2') == 2 and store.list(owner='b2')[1]['version'] == 2
+    assert store.latest('history', owner='a1')['pathways'][0]['pathway_name'] == 'Forklifts'
+
+
+def test_files_without_owner_column_are_migrated():
+    """A store file written before owners existed gains the column and keeps its rows"""
+    import sqlite3
+    path = os.path.join(tempfile.mkdtemp(), 'pathways.sqlite3')
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE pathways (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, version INTEGER NOT NULL,
+            name TEXT, content_hash TEXT NOT NULL, codec TEXT NOT NULL, raw_size INTEGER NOT NULL,
+            stored_size INTEGER NOT NULL, section_count INTEGER NOT NULL, module_count INTEGER NOT NULL,
+            created_at REAL NOT NULL, blob BLOB NOT NULL);
+        INSERT INTO pathways (kind, version, name, content_hash, codec, raw_size, stored_size, section_count,
+            module_count, created_at, blob) VALUES ('history', 1, 'Old', 'x', 'raw', 2, 2, 0, 0, 0, '{}');
+    """)
+    connection.close()
+    store = PathwayStore(path)
+    assert store.count() == 1 and store.list()[0]['owner'] == ''
+    store.save(build_pathway('New', modules=1), owner='a1')
+    assert store.count(owner='a1') == 1
+
+
+if __name__ == "__main__":
+    print("💾 Testing Pathway Store")
+    print("=" * 50)
+    test_save_compresses_and_versions()
+    test_history_survives_restart()
+    test_past_pathways_view_behaves_like_list()
+    test_snapshots_are_kept_per_kind()
+    test_history_is_scoped_by_owner()
+    test_files_without_owner_column_are_migrated()
+    print("✅ Pathway store tests completed!")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the staged pipeline and its incremental recomputation
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.pipeline import Pipeline, Stage, Uncached, get_pipeline, changed_fields, content_key, extract_file_text
+
+CONTEXT = {
+    'primary_goals': 'lockout procedure for the hydraulic press',
+    'training_type': 'Safety Training',
+    'target_audience': 'operators',
+    'industry': 'manufacturing',
+}
+
+MEETING = """0:00 - John Smith
+Um, so yeah, today we cover the lockout procedure for the hydraulic press.
+0:12 - Sarah Lee: Right. The the first step is to, uh, isolate every energy source.
+0:30 - John Smith: Then the breaker must be locked, you know, before work starts.
+0:41 - Sarah Lee: And we verify zero energy at the press.
+"""
+
+
+def build_pipeline(calls):
+    """Three stages that record each computation"""
+    def stage(name):
+        def run(content, inputs):
+            calls.append(name)
+            return f"{name}({content}|{sorted(inputs.items())})"
+        return run
+    return Pipeline([
+        Stage('extract', stage('extract'), inputs=('file_type',)),
+        Stage('digest', stage('digest'), inputs=('primary_goals', 'target_audience')),
+        Stage('generate', stage('generate'), inputs=('primary_goals', 'target_audience', 'bypass_filtering'), cached=False),
+    ])
+
+
+def test_retargeting_reruns_goal_stages_only():
+    """New goals re-run digest and generate; extraction is reused"""
+    calls = []
+    pipeline = build_pipeline(calls)
+
+    def run_all(context):
+        text = pipeline.run('extract', b'%PDF bytes', context)
+        digest = pipeline.run('digest', text, context)
+        return pipeline.run('generate', digest, context)
+
+    context = dict(CONTEXT, file_type='application/pdf', bypass_filtering=False)
+    run_all(context)
+    assert calls == ['extract', 'digest', 'generate']
+
+    calls.clear()
+    run_all(dict(context, target_audience='maintenance technicians'))
+    assert calls == ['digest', 'generate']
+
+    # A setting read only by the last stage leaves every cached artifact in place
+    calls.clear()
+    run_all(dict(context, bypass_filtering=True))
+    assert calls == ['generate']
+
+    # Fields no stage declares do not split the cache
+    calls.clear()
+    run_all(dict(context, success_metrics='fewer incidents'))
+    assert calls == ['generate']
+    assert pipeline.stats()['extract'] == {'computed': 1, 'reused': 3}
+
+    assert pipeline.invalidated_by(changed_fields(context, dict(context, target_audience='welders'))) == ['digest', 'generate']
+    assert pipeline.invalidated_by(['file_type']) == ['extract']
+
+
+def test_discard_and_eviction():
+    """Discarded and uncached results are recomputed; the store stays bounded"""
+    calls = []
+    pipeline = build_pipeline(calls)
+    pipeline.run('extract', b'data', CONTEXT)
+    assert pipeline.discard('extract', b'data', CONTEXT)
+    pipeline.run('extract', b'data', CONTEXT)
+    assert calls == ['extract', 'extract']
+
+    # Results marked Uncached (failed model calls, failed extractions) are recomputed
+    outcomes = [Uncached('fallback'), 'model summary']
+    pipeline = Pipeline([Stage('flaky', lambda content, inputs: outcomes.pop(0))])
+    assert pipeline.run('flaky', 'text') == 'fallback'
+    assert pipeline.run('flaky', 'text') == 'model summary'
+    assert pipeline.run('flaky', 'text') == 'model summary'
+    assert pipeline.stats()['flaky'] == {'computed': 2, 'reused': 1}
+
+    pipeline = Pipeline([Stage('echo', lambda content, inputs: content)], max_artifacts=3)
+    for number in range(10):
+        pipeline.run('echo', str(number))
+    assert len(pipeline._artifacts) == 3
+    assert content_key({'a.txt': 'x'}) != content_key({'a.txt': b'x'})
+
+
+def test_tally_counts_only_this_run():
+    """A run's tally excludes stage hits made by other callers, including their threads"""
+    import threading
+    from modules.telemetry import bind_context
+    calls = []
+    pipeline = build_pipeline(calls)
+    pipeline.run('extract', b'shared', CONTEXT)
+
+    other = threading.Thread(target=lambda: [pipeline.run('extract', b'shared', CONTEXT) for _ in range(5)])
+    with pipeline.tally() as counts:
+        other.start()
+        other.join()
+        pipeline.run('extract', b'shared', CONTEXT)
+        worker = threading.Thread(target=bind_context(lambda: pipeline.run('digest', 'text', CONTEXT)))
+        worker.start()
+        worker.join()
+    assert counts == {'extract': {'computed': 0, 'reused': 1}, 'digest': {'computed': 1, 'reused': 0}}
+    assert pipeline.stats()['extract']['reused'] == 6
+
+
+def test_pathway_stages():
+    """Extraction and cleaning are keyed by content and their own settings only"""
+    pipeline = get_pipeline()
+    pipeline.clear()
+    assert list(pipeline.stages) == ['extract_text', 'clean', 'digest', 'generate']
+    assert 'primary_goals' not in pipeline.stages['clean'].inputs
+
+    text = pipeline.run('extract_text', MEETING.encode(), {'file_name': 'meeting.txt', 'file_type': 'text/plain'})
+    assert text == MEETING
+    assert extract_file_text(b'\x00', 'clip.xyz', 'application/octet-stream') == "[Unsupported file type for extraction]"
+    pipeline.run('extract_text', b'\x00', {'file_name': 'clip.xyz', 'file_type': 'application/octet-stream'})
+    assert len(pipeline._artifacts) == 1
+
+    cleaned = pipeline.run('clean', text, dict(CONTEXT, keep_speakers=True))
+    assert cleaned.splitlines()[1] == 'Sarah Lee: The first step is to isolate every energy source.'
+    assert pipeline.run('clean', text, dict(CONTEXT, keep_speakers=True, primary_goals='forklifts')) is cleaned
+    assert pipeline.stats()['clean'] == {'computed': 1, 'reused': 1}
+    pipeline.clear()
+
+
+if __name__ == "__main__":
+    print("🧱 Testing Staged Pipeline")
+    print("=" * 50)
+    test_retargeting_reruns_goal_stages_only()
+    test_discard_and_eviction()
+    test_tally_counts_only_this_run()
+    test_pathway_stages()
+    print("✅ Pipeline tests completed!")
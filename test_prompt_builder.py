@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-budget-aware prompt builder
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.prompt_builder import (
+    PromptBuilder, estimate_tokens, count_tokens, select_excerpts,
+    tracked_generate, get_token_usage_summary, TOKEN_USAGE_LOG
+)
+
+FILLER = "The quarterly newsletter covered the office party, parking changes and the new coffee machine. "
+RELEVANT = "Lockout tagout procedure: isolate the energy source, apply the lock and verify zero energy. "
+
+
+def build_source():
+    paragraphs = [FILLER * 3 for _ in range(20)]
+    paragraphs[13] = RELEVANT * 3
+    return '\n\n'.join(paragraphs)
+
+
+def test_estimate_tokens_is_close_to_chars_over_four():
+    """The local estimate lands in a sensible range for English prose"""
+    text = FILLER * 10
+    assert len(text) / 6 < estimate_tokens(text) < len(text) / 3
+
+
+def test_count_tokens_prefers_model_tokenizer():
+    """A model tokenizer is used when available"""
+    class CountResult:
+        total_tokens = 42
+
+    class TokenizingModel:
+        def count_tokens(self, text):
+            return CountResult()
+
+    assert count_tokens("anything", TokenizingModel()) == 42
+    assert count_tokens("anything") == estimate_tokens("anything")
+
+
+def test_select_excerpts_prefers_relevant_text():
+    """Relevant excerpts are chosen first and the budget is respected"""
+    excerpt = select_excerpts(build_source(), 120, {'primary_goals': 'lockout tagout procedure'}, excerpt_tokens=60)
+    assert 'Lockout tagout' in excerpt
+    assert estimate_tokens(excerpt) <= 120
+
+
+def test_builder_fits_budget_and_reports_usage():
+    """Slots are filled to the remaining budget and usage is reported"""
+    builder = PromptBuilder('section', max_tokens=400, training_context={'primary_goals': 'lockout tagout'})
+    source = builder.slot('source', build_source(), fallback='No content')
+    notes = builder.slot('notes', "Short note about isolation points.")
+    prompt = builder.render(f"""Write a training section.
+
+SOURCE:
+{source}
+
+NOTES:
+{notes}
+
+Return JSON {{"title": "..."}}""")
+
+    assert '\x00' not in prompt
+    assert 'Short note about isolation points.' in prompt
+    assert 'Lockout tagout' in prompt
+    assert builder.usage['prompt_tokens'] <= 400
+    assert builder.usage['slots']['notes'] == estimate_tokens("Short note about isolation points.")
+
+
+def test_empty_slot_uses_fallback():
+    """Empty content renders the fallback text"""
+    builder = PromptBuilder('module')
+    source = builder.slot('source', '', fallback='No additional source material')
+    assert builder.render(f"SOURCE: {source}") == "SOURCE: No additional source material"
+
+
+def test_tracked_generate_records_usage():
+    """LLM calls are logged with token counts under the caller's name"""
+    class Response:
+        text = "Generated answer text"
+
+    class Model:
+        def generate_content(self, prompt):
+            return Response()
+
+    TOKEN_USAGE_LOG.clear()
+    tracked_generate(Model(), "Explain lockout tagout.")
+    summary = get_token_usage_summary()
+    stats = summary['test_tracked_generate_records_usage']
+    assert stats['calls'] == 1
+    assert stats['prompt_tokens'] == estimate_tokens("Explain lockout tagout.")
+    assert stats['response_tokens'] == estimate_tokens("Generated answer text")
+
+
+if __name__ == "__main__":
+    print("🧮 Testing Prompt Builder")
+    print("=" * 50)
+    test_estimate_tokens_is_close_to_chars_over_four()
+    test_count_tokens_prefers_model_tokenizer()
+    test_select_excerpts_prefers_relevant_text()
+    test_builder_fits_budget_and_reports_usage()
+    test_empty_slot_uses_fallback()
+    test_tracked_generate_records_usage()
+    print("✅ Prompt builder tests completed!")
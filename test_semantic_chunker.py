@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared semantic chunker
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.chunker import iter_blocks, iter_chunks, get_chunks, split_sentences
+from modules.prompt_builder import estimate_tokens
+
+MANUAL = """# Press Setup
+
+Check the die height before clamping. The tolerance is 0.05 mm on each side.
+
+1. Lower the ram to 3.5 inches.
+2. Engage the clamps.
+3. Run one stroke at inch speed.
+
+## Shutdown
+
+Return the ram to top dead center and isolate power.
+"""
+
+TRANSCRIPT = """Teams Meeting
+
+0:00 - Mike Wright
+Morning all. Today we cover the new badge process for the loading dock.
+
+0:45 - Bruce Mullaney
+Badges are scanned at gate 2. Visitors sign in at reception first.
+"""
+
+
+def test_blocks_respect_structure():
+    """Headings, lists, paragraphs and speaker turns become separate blocks"""
+    kinds = [block.kind for block in iter_blocks(MANUAL)]
+    assert kinds == ['heading', 'paragraph', 'list', 'heading', 'paragraph']
+
+    turns = [block for block in iter_blocks(TRANSCRIPT) if block.kind == 'turn']
+    assert [turn.speaker for turn in turns] == ['Mike Wright', 'Bruce Mullaney']
+
+
+def test_sentences_keep_decimals_and_steps():
+    """Decimals and numbered steps are not split apart"""
+    sentences = split_sentences(MANUAL)
+    assert "The tolerance is 0.05 mm on each side." in sentences
+    assert "1. Lower the ram to 3.5 inches." in sentences
+    # Speaker header lines are not sentences
+    assert not any(sentence.startswith('0:00') for sentence in split_sentences(TRANSCRIPT))
+
+
+def test_chunks_fit_target_and_start_at_headings():
+    """Chunks stay within the target and new sections start new chunks"""
+    chunks = list(iter_chunks(MANUAL * 20, target_tokens=60))
+    assert all(chunk.tokens <= 60 for chunk in chunks)
+    assert any(chunk.text.startswith('## Shutdown') for chunk in chunks)
+    assert all(MANUAL[:20] not in chunk.text[1:] for chunk in chunks)
+
+
+def test_overlap_repeats_trailing_blocks():
+    """Overlap carries the previous chunk's tail into the next chunk"""
+    paragraphs = '\n\n'.join(f"Paragraph {i} explains check number {i} in detail." for i in range(30))
+    chunks = list(iter_chunks(paragraphs, target_tokens=50, overlap_tokens=15))
+    assert len(chunks) > 2
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start < previous.end
+
+
+def test_chunks_are_cached_by_content():
+    """The same content and configuration returns the cached chunks"""
+    first = get_chunks(TRANSCRIPT * 10, 80)
+    second = get_chunks(TRANSCRIPT * 10, 80)
+    assert first is second
+
+
+def test_large_transcript_is_linear():
+    """A multi-MB transcript chunks quickly"""
+    big = TRANSCRIPT * 12000
+    started = time.time()
+    count = sum(1 for _ in iter_chunks(big, target_tokens=400))
+    elapsed = time.time() - started
+    assert count > 100
+    assert elapsed < 20, f"chunking took {elapsed:.1f}s"
+    print(f"   {len(big) / 1e6:.1f} MB chunked in {elapsed:.2f}s ({count} chunks)")
+
+
+
+def test_unpunctuated_text_is_linear():
+    """One 1 MB sentence without punctuation (raw ASR output) is cut in linear time"""
+    words = ("so then we move the pallet over to bay four and check the load " * 16000)[:1000000]
+    started = time.time()
+    chunks = list(iter_chunks(words, target_tokens=400))
+    elapsed = time.time() - started
+    assert ' '.join(chunk.text for chunk in chunks).split() == words.split()
+    assert elapsed < 3, f"chunking took {elapsed:.1f}s"
+
+
+if __name__ == "__main__":
+    print("✂️ Testing Semantic Chunker")
+    print("=" * 50)
+    test_blocks_respect_structure()
+    test_sentences_keep_decimals_and_steps()
+    test_chunks_fit_target_and_start_at_headings()
+    test_overlap_repeats_trailing_blocks()
+    test_chunks_are_cached_by_content()
+    test_large_transcript_is_linear()
+    test_unpunctuated_text_is_linear()
+    print("✅ Semantic chunker tests completed!")
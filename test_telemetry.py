@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for timing spans and their exports
+"""
+
+import sys
+import os
+import json
+import tempfile
+import concurrent.futures
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import telemetry
+from modules.telemetry import span, traced, annotate, bind_context, finished_spans, summarize_spans
+from modules.prompt_builder import tracked_generate
+
+
+class FakeResponse:
+    text = '{"pathways": []}'
+    usage_metadata = None
+
+
+class FakeModel:
+    def generate_content(self, prompt, **kwargs):
+        return FakeResponse()
+
+
+def test_spans_nest_across_threads():
+    """Spans created in pool threads through bind_context share the caller's trace"""
+    telemetry.clear_spans()
+
+    @traced('work.item')
+    def work(value):
+        annotate(value=value)
+        return value * 2
+
+    with span('work.batch') as batch:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(bind_context(work), range(6)))
+
+    assert results == [0, 2, 4, 6, 8, 10]
+    items = [s for s in finished_spans(batch.trace_id) if s.name == 'work.item']
+    assert len(items) == 6
+    assert all(item.parent_id == batch.span_id for item in items)
+    assert sorted(item.attributes['value'] for item in items) == list(range(6))
+
+
+def test_llm_calls_record_tokens():
+    telemetry.clear_spans()
+    with span('pathway.generate'):
+        tracked_generate(FakeModel(), "Create a pathway about lockout tagout", label='pathway')
+    llm = [s for s in finished_spans() if s.name == 'llm.generate'][0]
+    assert llm.attributes['label'] == 'pathway'
+    assert llm.attributes['prompt_tokens'] > 0
+    assert llm.attributes['cache_hit'] is False
+    summary = {row['name']: row for row in summarize_spans()}
+    assert summary['llm.generate']['count'] == 1
+    assert 'p95_ms' in summary['pathway.generate']
+
+
+def test_errors_mark_span_status():
+    telemetry.clear_spans()
+    try:
+        with span('parse.pathways'):
+            json.loads('not json')
+    except ValueError:
+        pass
+    failed = finished_spans()[0]
+    assert failed.status == 'error'
+    assert 'JSONDecodeError' in failed.attributes['error']
+
+
+def test_exports():
+    """JSONL has one object per span; OTLP keeps parent links"""
+    telemetry.clear_spans()
+    with span('extract', filename='manual.pdf'):
+        with span('llm.generate', prompt_tokens=12):
+            pass
+    directory = tempfile.mkdtemp()
+    jsonl_path = os.path.join(directory, 'spans.jsonl')
+    otlp_path = os.path.join(directory, 'spans.otlp.json')
+    assert telemetry.export_jsonl(jsonl_path) == 2
+    with open(jsonl_path) as handle:
+        lines = [json.loads(line) for line in handle]
+    assert {line['name'] for line in lines} == {'extract', 'llm.generate'}
+
+    assert telemetry.export_otlp_json(otlp_path) == 2
+    with open(otlp_path) as handle:
+        payload = json.load(handle)
+    spans = payload['resourceSpans'][0]['scopeSpans'][0]['spans']
+    child = next(s for s in spans if s['name'] == 'llm.generate')
+    parent = next(s for s in spans if s['name'] == 'extract')
+    assert child['parentSpanId'] == parent['spanId']
+    assert {'key': 'prompt_tokens', 'value': {'intValue': '12'}} in child['attributes']
+
+
+if __name__ == "__main__":
+    print("⏱️ Testing Telemetry")
+    print("=" * 50)
+    test_spans_nest_across_threads()
+    test_llm_calls_record_tokens()
+    test_errors_mark_span_status()
+    test_exports()
+    print("✅ Telemetry tests completed!")
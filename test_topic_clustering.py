@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for local topic clustering of modules into sections and pathways
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import topic_clustering
+from modules.topic_clustering import cluster_modules, theme_labels, polish_section_titles, suggest_cluster_count
+
+TOPICS = {
+    'safety': 'Lockout tagout and energy isolation keep technicians safe; wear PPE and report every hazard.',
+    'quality': 'Quality inspection checks each defect against the gauge tolerance after calibration.',
+    'handover': 'Shift handover meetings cover open work orders, email escalation and the handover report.',
+}
+
+
+def topical_modules(per_topic=4, seed=3):
+    modules = []
+    for topic, text in TOPICS.items():
+        for i in range(per_topic):
+            modules.append({'title': f"Module {len(modules) + 1}: {topic.title()} part {i + 1}",
+                            'content': f"{text} Example {i} for the {topic} team."})
+    random.Random(seed).shuffle(modules)
+    return modules
+
+
+def test_clusters_follow_topics():
+    modules = topical_modules()
+    clusters = cluster_modules(modules, n_clusters=3)
+    assert len(clusters) == 3
+    assert sorted(i for cluster in clusters for i in cluster['module_indices']) == list(range(len(modules)))
+    for cluster in clusters:
+        topics = {modules[i]['title'].split(': ')[1].split()[0] for i in cluster['module_indices']}
+        assert len(topics) == 1, topics
+        assert cluster['section_title'] and cluster['section_title'] != 'General'
+        assert cluster['module_indices'] == sorted(cluster['module_indices'])
+    # Clusters are ordered by their first module
+    assert [cluster['module_indices'][0] for cluster in clusters] == sorted(c['module_indices'][0] for c in clusters)
+    assert cluster_modules(modules, n_clusters=3) == clusters
+    print(f"   Titles: {[cluster['section_title'] for cluster in clusters]}")
+
+
+def test_balanced_sizes_and_caps():
+    modules = topical_modules(per_topic=7)
+    clusters = cluster_modules(modules, max_clusters=6, max_cluster_size=8)
+    assert len(clusters) == 3
+    assert all(len(cluster['module_indices']) <= 8 for cluster in clusters)
+    # More modules than max_clusters * max_cluster_size: the cap grows to an even share
+    clusters = cluster_modules(topical_modules(per_topic=30), max_clusters=6, max_cluster_size=8)
+    assert len(clusters) == 6 and all(len(cluster['module_indices']) <= 15 for cluster in clusters)
+    assert suggest_cluster_count(90, max_clusters=6, max_cluster_size=8) == 6
+    assert suggest_cluster_count(1) == 1
+    assert cluster_modules([]) == []
+    single = cluster_modules(modules[:1])
+    assert single[0]['module_indices'] == [0]
+
+
+def test_pure_python_path_is_fast():
+    modules = topical_modules(per_topic=100)
+    saved = topic_clustering._numpy, topic_clustering._numpy_checked
+    topic_clustering._numpy, topic_clustering._numpy_checked = None, True
+    try:
+        started = time.perf_counter()
+        clusters = cluster_modules(modules, n_clusters=3)
+        elapsed = time.perf_counter() - started
+    finally:
+        topic_clustering._numpy, topic_clustering._numpy_checked = saved
+    sizes = sorted(len(cluster['module_indices']) for cluster in clusters)
+    assert sizes == [100, 100, 100], sizes
+    print(f"   300 modules clustered in {elapsed * 1000:.1f} ms without NumPy")
+    assert elapsed < 5
+
+
+def test_themes_and_title_polish():
+    modules = topical_modules()
+    assert len(theme_labels(modules)) == 3
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    class Model:
+        def __init__(self, text):
+            self.text = text
+
+        def generate_content(self, prompt):
+            return Response(self.text)
+
+    clusters = cluster_modules(modules, n_clusters=3)
+    polished = polish_section_titles(clusters, modules, Model('["Stay Safe", "Check Quality", "Hand Over"]'))
+    assert [cluster['section_title'] for cluster in polished] == ["Stay Safe", "Check Quality", "Hand Over"]
+    assert [cluster['module_indices'] for cluster in polished] == [cluster['module_indices'] for cluster in clusters]
+    # Wrong length or unparseable output keeps the local titles
+    assert polish_section_titles(clusters, modules, Model('["Only one"]')) == clusters
+    assert polish_section_titles(clusters, modules, Model('not json')) == clusters
+
+
+if __name__ == "__main__":
+    print("🧭 Testing Topic Clustering")
+    print("=" * 50)
+    test_clusters_follow_topics()
+    test_balanced_sizes_and_caps()
+    test_pure_python_path_is_fast()
+    test_themes_and_title_polish()
+    print("✅ Topic clustering tests completed!")
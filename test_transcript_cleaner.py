@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the local transcript cleaner
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.transcript_cleaner import (
+    parse_turns, is_transcript, clean_transcript, clean_sentence_text, conversational_elements, needs_rewrite
+)
+
+MEETING = """Teams Meeting Transcript
+Meeting ID: 123 456 789
+0:00 - John Smith
+Um, so yeah, can you hear me? Okay, so today we cover the lockout procedure.
+0:12 - Sarah Lee: Right. The the first step is to, uh, isolate every energy source.
+1:02:03 - John Smith: And you know what, the breaker must be locked, you know, before work starts, 3.5 mm gap.
+Sarah Lee joined the meeting
+Sarah Lee: Thanks everyone, bye!
+"""
+
+CONVERSATIONAL = """
+    Um, so yeah, I think we can hear you now. Okay, so what we're going to do today is,
+    you know, talk about the truss assembly process. Right? So, um, if you go to the
+    fabrication area, you'll see that, uh, that's the truss. Can you hear me? Is that working?
+    Anyway, so yeah, that's basically it. Thanks for listening, bye!
+"""
+
+
+def test_parse_turns():
+    """Header, inline and name-only turns with times and offsets"""
+    turns = parse_turns(MEETING)
+    assert [turn.speaker for turn in turns] == ['John Smith', 'Sarah Lee', 'John Smith', 'Sarah Lee']
+    assert [turn.time for turn in turns] == [0.0, 12.0, 3723.0, None]
+    assert turns[1].text.startswith('Right. The the first step')
+    assert MEETING[turns[1].start:turns[1].end] == turns[1].text
+    assert is_transcript(MEETING)
+    assert not is_transcript("Step: isolate the press.\nNote: wear gloves.\nThe press runs at 200 psi.")
+
+
+def test_clean_transcript():
+    """Fillers, disfluencies, logistics and metadata are removed; content stays"""
+    cleaned = clean_transcript(MEETING, keep_speakers=True)
+    assert cleaned.splitlines() == [
+        'John Smith: Today we cover the lockout procedure.',
+        'Sarah Lee: The first step is to isolate every energy source.',
+        'John Smith: And you know what, the breaker must be locked before work starts, 3.5 mm gap.',
+    ]
+    text = clean_sentence_text(CONVERSATIONAL, drop_logistics=True)
+    assert text.startswith("What we're going to do today is talk about the truss assembly process.")
+    assert "you'll see that that's the truss." in text
+    for leftover in ('um', 'uh', 'hear me', 'bye', 'Anyway'):
+        assert f' {leftover}' not in f' {text}', leftover
+    # A lead marker before a dropped logistics sentence capitalizes the kept text, not the dropped one
+    assert clean_sentence_text("Okay. Let me share my screen. The load limit is high.", drop_logistics=True) == \
+        "The load limit is high."
+    assert clean_sentence_text("Okay. Let me share my screen. Um, the load is high.", drop_logistics=True) == \
+        "The load is high."
+    # Words that only look like fillers survive
+    assert clean_sentence_text("Sum the umbrella readings, then erase the summary.") == \
+        "Sum the umbrella readings, then erase the summary."
+
+
+SAFETY_PROCEDURE = """Vehicle Safety Procedure
+After a car accident in the yard, call the ER department and secure the scene.
+Wash your hands in the restroom before returning to the line.
+If the delivery is running late, hold the dock door closed.
+The bye-laws require a second driver on every night shift.
+Keep radios on mute near the blasting area.
+The team is paged for any injury."""
+
+
+def test_documents_keep_their_sentences():
+    """Documents lose only fillers: logistics lexicon words and acronyms are content there"""
+    assert not is_transcript(SAFETY_PROCEDURE)
+    cleaned = clean_transcript(SAFETY_PROCEDURE)
+    assert cleaned.split() == SAFETY_PROCEDURE.split()
+    assert clean_sentence_text("The UM and AH codes go to the ER department, um, today.") == \
+        "The UM and AH codes go to the ER department today."
+    # In a transcript only short asides are dropped; long sentences mentioning logistics stay
+    turns = ("0:00 - Ana: Can you hear me?\n"
+             "0:05 - Ben: Yes. Keep radios on mute near the blasting area because the detonators are radio triggered.\n"
+             "0:09 - Ana: The bye-laws require a second driver.\n")
+    assert clean_transcript(turns).splitlines() == [
+        'Keep radios on mute near the blasting area because the detonators are radio triggered.',
+        'The bye-laws require a second driver.',
+    ]
+
+
+def test_elements_and_residual_rewrite():
+    """Found elements are reported; clean technical text does not need the model"""
+    elements = conversational_elements(CONVERSATIONAL)
+    assert 'uh' in elements and 'can you hear me' in elements and 'hear you now' in elements
+    assert not needs_rewrite("Isolate the press. Lock the breaker. Verify zero energy.")
+    assert needs_rewrite("I think we're gonna do stuff? Yeah I'm not sure.")
+
+
+def test_hour_long_transcript_is_fast():
+    """An hour of meeting (about 150 KB) cleans in well under a second"""
+    lines = []
+    for minute in range(60):
+        for turn in range(12):
+            lines.append(f"{minute}:{turn * 5:02d} - {['Maria', 'Dev', 'Priya'][turn % 3]}")
+            lines.append("Um, so when we isolate the energy isolation point on the hydraulic press, "
+                         "we always, you know, check it twice because last month it failed. Okay.")
+    transcript = '\n'.join(lines)
+    started = time.time()
+    cleaned = clean_transcript(transcript)
+    elapsed = time.time() - started
+    assert cleaned.count('\n') == 719
+    assert 'Um' not in cleaned and 'you know' not in cleaned
+    assert elapsed < 0.5, f"cleaning took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    print("🧹 Testing Transcript Cleaner")
+    print("=" * 50)
+    test_parse_turns()
+    test_clean_transcript()
+    test_documents_keep_their_sentences()
+    test_elements_and_residual_rewrite()
+    test_hour_long_transcript_is_fast()
+    print("✅ Transcript cleaner tests completed!")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for transcript topic segmentation
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.transcript_segmenter import TurnTable, get_segments, segment_table, topic_units, topic_chunks, format_time
+
+TOPICS = [
+    "lockout tagout energy isolation breaker padlock verify hydraulic press valve".split(),
+    "forklift pallet capacity mast forks aisle pedestrian horn ramp battery".split(),
+    "welding torch shielding gas bead porosity electrode amperage helmet fumes".split(),
+    "inspection caliper tolerance defect gauge measurement sample report audit burr".split(),
+]
+COMMON = "check before after always sure process step then".split()
+
+
+def build_meeting(turns_per_topic=24, seed=1):
+    """Four topics, three speakers, a turn every 20 seconds"""
+    rng = random.Random(seed)
+    lines = []
+    seconds = 0
+    for topic in TOPICS:
+        weights = [1.0 / (rank + 1) for rank in range(len(topic))]
+        for turn in range(turns_per_topic):
+            words = [rng.choices(topic, weights)[0] if rng.random() < 0.6 else rng.choice(COMMON) for _ in range(25)]
+            lines.append(f"{format_time(seconds)} - {['Maria Lopez', 'Dev Patel', 'Priya Shah'][turn % 3]}")
+            lines.append(' '.join(words).capitalize() + '.')
+            seconds += 20
+    return '\n'.join(lines)
+
+
+def test_turn_table_columns():
+    """Turns are stored column-wise with interned speakers and offsets into the source"""
+    text = build_meeting(turns_per_topic=2)
+    table = TurnTable.from_text(text)
+    assert len(table) == 8
+    assert table.speakers == ['', 'Maria Lopez', 'Dev Patel']
+    assert list(table.speaker_ids) == [1, 2, 1, 2, 1, 2, 1, 2]
+    assert table.time(3) == 60.0
+    assert table.row_text(0) == text[table.starts[0]:table.ends[0]]
+
+    # A long monologue becomes several rows of the same speaker, cut at sentence ends
+    monologue = "0:00 - Host\n" + ' '.join(f"Sentence number {i} ends here." for i in range(150))
+    table = TurnTable.from_text(monologue + "\n0:30 - Guest: Thanks.\n0:40 - Host: Next.")
+    rows = [row for row in range(len(table)) if table.speaker(row) == 'Host']
+    assert len(rows) > 3
+    assert all(table.row_text(row).endswith('.') for row in rows)
+    assert table.time(rows[1]) == 0.0
+
+    # Plain documents become speakerless paragraph rows
+    table = TurnTable.from_text("First paragraph here.\n\nSecond paragraph here.")
+    assert len(table) == 2 and table.speaker(1) == '' and table.time(1) is None
+
+
+def test_topic_boundaries():
+    """Boundaries land on the turns where the discussion changes topic"""
+    text = build_meeting()
+    table, segments = get_segments(text)
+    assert [segment.first_row for segment in segments] == [0, 24, 48, 72]
+    assert [segment.start_time for segment in segments] == [0.0, 480.0, 960.0, 1440.0]
+    assert 'lockout' in segments[0].terms and 'forklift' in segments[1].terms
+    assert segments[1].speakers == ('Maria Lopez', 'Dev Patel', 'Priya Shah')
+    assert get_segments(text) is get_segments(text)
+
+    # A cap keeps only the deepest boundaries
+    assert len(segment_table(table, max_segments=2)) == 2
+
+    units = topic_units(text)
+    assert units[1]['label'].startswith('8:00 · ')
+    assert units[1]['text'].splitlines()[0].startswith('Maria Lopez: ')
+    assert len(units) == 4
+
+
+def test_one_topic_stays_whole():
+    """Short or single-topic text is one segment"""
+    assert len(get_segments("0:00 - A: Just one short remark.")[1]) == 1
+    assert get_segments('')[1] == ()
+    assert format_time(3723.0) == '1:02:03' and format_time(65.0) == '1:05'
+
+
+def test_topic_chunks_are_bounded():
+    """A single-topic hour is re-split to the chunk size; documents keep logistics words"""
+    rng = random.Random(5)
+    lines = []
+    for turn in range(180):
+        lines.append(f"{format_time(turn * 20)} - {['Maria Lopez', 'Dev Patel'][turn % 2]}")
+        lines.append(' '.join(rng.choice(TOPICS[0]) for _ in range(25)).capitalize() + '.')
+    chunks = topic_chunks('\n'.join(lines), max_chars=2000)
+    assert len(chunks) > 5
+    assert all(len(chunk) <= 2400 for chunk in chunks)
+
+    meeting = "0:00 - Ana: Can you hear me?\n0:05 - Ben: Lock the breaker first.\n0:09 - Ana: Then verify zero energy.\n"
+    assert topic_units(meeting)[0]['text'].splitlines()[0] == 'Ben: Lock the breaker first.'
+    document = "After a car accident, call the ER department.\n\nCan you hear me on the radio? Answer on channel two."
+    assert topic_units(document)[0]['text'].split() == document.split()
+
+
+def test_long_transcript_is_fast():
+    """Four hours of meeting (about 150 KB) segment in well under a second"""
+    text = build_meeting(turns_per_topic=180, seed=3)
+    started = time.time()
+    segments = segment_table(TurnTable.from_text(text))
+    elapsed = time.time() - started
+    assert [segment.first_row for segment in segments] == [0, 180, 360, 540]
+    assert elapsed < 1.0, f"segmentation took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    print("🗣️ Testing Transcript Segmenter")
+    print("=" * 50)
+    test_turn_table_columns()
+    test_topic_boundaries()
+    test_one_topic_stays_whole()
+    test_topic_chunks_are_bounded()
+    test_long_transcript_is_fast()
+    print("✅ Transcript segmenter tests completed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous Veo3 video job queue against the local stand-in server
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.fake_veo3 import FakeVeo3Server
+from modules.video_jobs import VideoJobQueue, VideoJobStore, Veo3Backend, job_key, QUEUED, RUNNING, COMPLETED, FAILED
+from modules.veo3_integration import Veo3VideoGenerator
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_queue(server, path=None, **kwargs):
+    store = VideoJobStore(path or os.path.join(tempfile.mkdtemp(), 'jobs.sqlite3'))
+    return VideoJobQueue(store, Veo3Backend(api_key='', base_url=server.base_url), **kwargs)
+
+
+def test_dedup_cap_and_backoff():
+    server = FakeVeo3Server(render_seconds=3600)
+    server.start()
+    try:
+        clock = Clock()
+        queue = make_queue(server, max_concurrent=2, poll_initial=5, poll_max=20, clock=clock)
+        jobs = [queue.submit(f"Video about step {i}") for i in range(5)]
+        assert queue.submit("Video about step 0")['job_id'] == jobs[0]['job_id']
+        assert job_key("Video about step 0") == jobs[0]['job_id']
+
+        assert queue.run_once() == 5
+        statuses = [queue.status(job['job_id'])['status'] for job in jobs]
+        assert statuses.count(RUNNING) == 2 and statuses.count(QUEUED) == 3
+        assert server.submissions == 2 and server.status_checks == 0
+
+        intervals = []
+        for _ in range(4):
+            clock.now += 100
+            queue.run_once()
+            intervals.append(queue.status(jobs[0]['job_id'])['poll_interval'])
+        assert intervals == [10, 20, 20, 20]
+        assert server.submissions == 2  # cap holds while the first two are still running
+    finally:
+        server.stop()
+
+
+def test_background_poller_completes_jobs_and_persists():
+    server = FakeVeo3Server(render_seconds=0.2, fail_pattern='forbidden')
+    server.start()
+    path = os.path.join(tempfile.mkdtemp(), 'jobs.sqlite3')
+    try:
+        queue = make_queue(server, path, max_concurrent=4, poll_initial=0.05, poll_max=0.2)
+        started = time.time()
+        jobs = [queue.submit(f"Module {i} walkthrough") for i in range(8)] + [queue.submit("forbidden scene")]
+        assert time.time() - started < 1  # submitting never waits for rendering
+        queue.start()
+        finished = [queue.wait(job['job_id'], timeout=20) for job in jobs]
+        queue.stop()
+        assert [job['status'] for job in finished[:8]] == [COMPLETED] * 8
+        assert all(job['video_url'].endswith('.mp4') for job in finished[:8])
+        assert finished[8]['status'] == FAILED and 'rejected' in finished[8]['error']
+        assert server.submissions == 9
+
+        # A new queue over the same file sees the finished jobs and does not resubmit them
+        again = make_queue(server, path)
+        assert again.submit("Module 3 walkthrough")['status'] == COMPLETED
+        assert again.submit("forbidden scene")['status'] == QUEUED  # failed jobs can be retried
+        assert server.submissions == 9
+    finally:
+        server.stop()
+
+
+def test_generator_returns_immediately():
+    server = FakeVeo3Server(render_seconds=0.1)
+    server.start()
+    try:
+        queue = make_queue(server, poll_initial=0.05)
+        generator = Veo3VideoGenerator(job_queue=queue)
+        result = generator.generate_training_video({'title': 'Lockout', 'content': 'Isolate energy first.'})
+        assert result['success'] and result['status'] == 'generating' and result['video_url'] is None
+        queue.start()
+        queue.wait(result['generation_id'], timeout=10)
+        queue.stop()
+        status = generator.check_video_status(result['generation_id'])
+        assert status['status'] == 'completed' and status['video_url']
+        assert generator.check_video_status('missing')['status'] == 'error'
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    print("🎬 Testing Video Job Queue")
+    print("=" * 50)
+    test_dedup_cap_and_backoff()
+    test_background_poller_completes_jobs_and_persists()
+    test_generator_returns_immediately()
+    print("✅ Video job queue tests completed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for deterministic widget keys
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.widget_keys import WidgetKeyAllocator
+
+
+def render(allocator, modules):
+    """Simulate one script run creating the editor widgets"""
+    allocator.begin_run()
+    keys = []
+    for module in modules:
+        keys.append(allocator.key("title", module, module['title']))
+        keys.append(allocator.key("del", module))
+    return keys
+
+
+def test_keys_are_stable_across_reruns():
+    """The same modules produce the same keys on every run"""
+    allocator = WidgetKeyAllocator()
+    modules = [{'title': 'Lockout'}, {'title': 'PPE'}]
+    assert render(allocator, modules) == render(allocator, modules)
+
+
+def test_keys_follow_module_identity():
+    """Reordering modules keeps each module's keys; equal titles do not collide"""
+    allocator = WidgetKeyAllocator()
+    first, second = {'title': 'Same'}, {'title': 'Same'}
+    keys = render(allocator, [first, second])
+    assert len(set(keys)) == len(keys)
+    reordered = render(allocator, [second, first])
+    assert set(reordered) == set(keys)
+    assert reordered[2] == keys[0]
+
+
+def test_revision_changes_value_widgets_only():
+    allocator = WidgetKeyAllocator()
+    module = {'title': 'Old'}
+    before = render(allocator, [module])
+    module['title'] = 'New'
+    after = render(allocator, [module])
+    assert before[0] != after[0]
+    assert before[1] == after[1]
+
+
+def test_repeats_get_counters_reset_each_run():
+    allocator = WidgetKeyAllocator()
+    allocator.begin_run()
+    first = allocator.key("button", "Save")
+    second = allocator.key("button", "Save")
+    assert second == f"{first}_2"
+    allocator.begin_run()
+    assert allocator.key("button", "Save") == first
+
+
+def test_unused_identities_are_released():
+    """Identities not rendered in the last run are dropped, bounding memory"""
+    allocator = WidgetKeyAllocator()
+    for run in range(50):
+        render(allocator, [{'title': f'Module {run}.{i}'} for i in range(20)])
+    allocator.begin_run()
+    assert len(allocator) <= 20
+
+
+if __name__ == "__main__":
+    print("🔑 Testing Widget Keys")
+    print("=" * 50)
+    test_keys_are_stable_across_reruns()
+    test_keys_follow_module_identity()
+    test_revision_changes_value_widgets_only()
+    test_repeats_get_counters_reset_each_run()
+    test_unused_identities_are_released()
+    print("✅ Widget key tests completed!")